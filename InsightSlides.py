@@ -8,806 +8,60 @@ by Harmonic Insight
 特徴:
 - 抽出/更新モード切替
 - インライングリッド編集
-- PPTX比較機能
+- PPTX比較機能（2ファイル / フォルダ一括）
+- フォルダ監視による自動抽出
 - フィルタ機能
 - 統一ライセンス形式 (INSS-{TIER}-XXXX-{EMAIL_HASH}-XXXX-CCCC)
 - 折りたたみ可能なオプション
+- ヘッドレスCLI（引数付きで起動: extract / update / preview / compare / batch / watch / serve）
 """
+import sys
+
+# 引数付きで起動された場合は tkinter を読み込まずに CLI として動作する
+# （EXE のワーカープロセスも引数付きで起動されるため、先に freeze_support で振り分ける）
+if __name__ == "__main__" and len(sys.argv) > 1:
+    import multiprocessing
+    multiprocessing.freeze_support()
+    from insightslides_cli import main as _cli_main
+    sys.exit(_cli_main(sys.argv[1:]))
+
 import tkinter as tk
-from tkinter import ttk, filedialog, messagebox, scrolledtext, simpledialog
-import pptx
-import openpyxl
-from openpyxl.styles import Font as XLFont, PatternFill
+from tkinter import ttk, filedialog, messagebox, scrolledtext
+import importlib.util
 import os
-import sys
-import re
 import csv
 import json
-import hashlib
-import random
-import string
 import webbrowser
-import traceback
-from datetime import datetime, timedelta
+from datetime import datetime
 from typing import Dict, Tuple, List, Optional
 
 # グリッド表示（複数行テキスト対応）
-try:
-    from tksheet import Sheet
-    TKSHEET_AVAILABLE = True
-except ImportError:
-    TKSHEET_AVAILABLE = False
-
-# ライセンス検証（ローカル実装）
-import hmac
-import base64
-from enum import Enum
-from dataclasses import dataclass
-
-class ProductCode(Enum):
-    INSS = "INSS"  # InsightSlide Standard
-    INSP = "INSP"  # InsightSlide Pro
-
-class InsightLicenseTier(Enum):
-    TRIAL = "TRIAL"
-    STD = "STD"
-    PRO = "PRO"
-    ENT = "ENT"
-
-@dataclass
-class LicenseInfo:
-    is_valid: bool
-    tier: Optional[InsightLicenseTier] = None
-    product: Optional[ProductCode] = None
-    expires: Optional[datetime] = None
-    error: Optional[str] = None
-
-# 署名用シークレットキー
-_LICENSE_SECRET = b"insight-series-license-secret-2026"
-
-# ライセンスキー正規表現: PPPP-PLAN-YYMM-HASH-SIG1-SIG2
-import re as _re
-_LICENSE_KEY_REGEX = _re.compile(r"^(INSS|INSP)-(TRIAL|STD|PRO)-(\d{4})-([A-Z0-9]{4})-([A-Z0-9]{4})-([A-Z0-9]{4})$")
-
-def _generate_signature(data: str) -> str:
-    sig = hmac.new(_LICENSE_SECRET, data.encode(), hashlib.sha256).digest()
-    return base64.b32encode(sig)[:8].decode().upper()
-
-def _verify_signature(data: str, signature: str) -> bool:
-    try:
-        expected = _generate_signature(data)
-        return hmac.compare_digest(expected, signature)
-    except Exception:
-        return False
-
-class LicenseValidator:
-    def validate(self, key: str, expires_at=None) -> LicenseInfo:
-        if not key:
-            return LicenseInfo(is_valid=False, error="キーが空です")
-
-        key = key.strip().upper()
-        match = _LICENSE_KEY_REGEX.match(key)
-        if not match:
-            return LicenseInfo(is_valid=False, error="キー形式が不正です")
-
-        product_str, tier_str, yymm, email_hash, sig1, sig2 = match.groups()
-
-        try:
-            product = ProductCode(product_str)
-            tier = InsightLicenseTier(tier_str)
-        except ValueError:
-            return LicenseInfo(is_valid=False, error="無効な製品/プラン")
-
-        # 署名検証
-        signature = sig1 + sig2
-        sign_data = f"{product_str}-{tier_str}-{yymm}-{email_hash}"
-        if not _verify_signature(sign_data, signature):
-            return LicenseInfo(is_valid=False, error="署名が無効です")
-
-        # 有効期限
-        try:
-            year = 2000 + int(yymm[:2])
-            month = int(yymm[2:])
-            if month == 12:
-                expires = datetime(year + 1, 1, 1) - timedelta(days=1)
-            else:
-                expires = datetime(year, month + 1, 1) - timedelta(days=1)
-        except ValueError:
-            return LicenseInfo(is_valid=False, error="有効期限が不正です")
-
-        if datetime.now() > expires:
-            return LicenseInfo(is_valid=False, tier=tier, error="期限切れです")
-
-        return LicenseInfo(is_valid=True, tier=tier, product=product, expires=expires)
-
-    def is_product_covered(self, info: LicenseInfo, product_code: str) -> bool:
-        if not info or not info.product:
-            return False
-        return info.product.value.startswith(product_code[:3])
+# tksheet 本体はグリッドを初めて表示するときに読み込む（起動時は有無の確認のみ）
+TKSHEET_AVAILABLE = importlib.util.find_spec("tksheet") is not None
 
-TIER_NAMES = {
-    InsightLicenseTier.TRIAL: "トライアル",
-    InsightLicenseTier.STD: "Standard",
-    InsightLicenseTier.PRO: "Pro",
-    InsightLicenseTier.ENT: "Enterprise",
-}
-
-INSIGHT_TIERS = {
-    InsightLicenseTier.TRIAL: {"duration_days": 14},
-    InsightLicenseTier.STD: {"duration_months": 12},
-    InsightLicenseTier.PRO: {"duration_months": 12},
-    InsightLicenseTier.ENT: {},
-}
 import threading
-from pathlib import Path
-import shutil
-
-# ============== App Info ==============
-APP_VERSION = "2.0.0"
-APP_NAME = "Insight Slides"
-
-# ============== Config Paths ==============
-CONFIG_DIR = Path.home() / ".insightslides"
-CONFIG_FILE = CONFIG_DIR / "config.json"
-LICENSE_FILE = CONFIG_DIR / "license.key"
-ERROR_LOG_FILE = CONFIG_DIR / "error_log.txt"
-
-# ============== Support Links ==============
-SUPPORT_LINKS = {
-    "faq": "https://example.com/insightslides/faq",
-    "tutorial": "https://example.com/insightslides/tutorial",
-    "purchase": "https://example.com/insightslides/purchase",
-    "contact": "mailto:support@example.com",
-}
-
-# ============== Internationalization (i18n) ==============
-LANGUAGES = {
-    'en': {
-        'app_subtitle': 'Extract → Edit → Update PowerPoint Text',
-        'welcome_title': 'Welcome to Insight Slides!',
-        'mode_extract': 'Extract Mode',
-        'mode_update': 'Update Mode',
-        'mode_extract_short': 'Extract Text',
-        'mode_update_short': 'Overwrite',
-        'panel_mode': 'Mode Selection',
-        'panel_file': 'File Operations',
-        'panel_input': 'Input (Single File)',
-        'panel_output_file': 'Output (Single File)',
-        'panel_settings': 'Settings',
-        'panel_status': 'Status',
-        'panel_output': 'Extracted Data',
-        'panel_extract_options': 'Extract Options',
-        'panel_update_options': 'Update Options',
-        'panel_extract_run': 'Run Extract',
-        'panel_update_run': 'Run Update',
-        'panel_pro_features': 'Pro Features',
-        'btn_load_pptx': 'Load PPTX',
-        'btn_load_excel': 'Load Excel',
-        'btn_load_json': 'Load JSON',
-        'btn_single_file': 'Select File',
-        'btn_from_excel': 'From Excel',
-        'btn_from_json': 'From JSON',
-        'btn_apply_pptx': 'Apply to PPTX',
-        'btn_export_to_excel': 'Export to Excel',
-        'btn_export_to_json': 'Export to JSON',
-        'panel_batch': 'Folder Batch',
-        'btn_batch_extract': 'Folder → Excel',
-        'btn_batch_update': 'Excel → Folder',
-        'btn_batch_export_excel': 'Export to Folder (Excel)',
-        'btn_batch_export_json': 'Export to Folder (JSON)',
-        'btn_batch_import_excel': 'Import from Folder (Excel)',
-        'btn_batch_import_json': 'Import from Folder (JSON)',
-        'btn_diff_preview': 'Diff Preview',
-        'btn_compare_pptx': 'Compare PPTX',
-        'btn_cancel': 'Stop',
-        'btn_clear': 'Clear Log',
-        'btn_copy': 'Copy Log',
-        'btn_license': 'License',
-        'btn_activate': 'Activate',
-        'btn_deactivate': 'Deactivate',
-        'btn_purchase': 'Purchase',
-        'btn_close': 'Close',
-        'btn_start': 'Get Started',
-        'btn_filter': 'Filter',
-        'btn_clear_filter': 'Clear Filter',
-        'setting_output_format': 'Output Format:',
-        'setting_include_meta': 'Include file name & date',
-        'setting_auto_backup': 'Auto backup before update',
-        'chk_include_notes': 'Include Speaker Notes',
-        'format_tab': 'Tab-separated',
-        'format_csv': 'CSV',
-        'format_excel': 'Excel',
-        'status_waiting': 'Waiting...',
-        'status_processing': 'Processing...',
-        'status_complete': 'Complete',
-        'status_cancelled': 'Cancelled',
-        'status_error': 'Error',
-        'msg_extract_desc': 'Extract text from PowerPoint files.',
-        'msg_update_desc': 'Apply edited text back to PowerPoint.',
-        'msg_update_limit': 'Update: First {0} slides only\nUpgrade to Standard for unlimited!',
-        'msg_processing_file': 'Processing: {0}',
-        'msg_saved': 'Saved: {0}',
-        'msg_extracted': 'Extracted: {0} items from {1} slides',
-        'msg_updated': 'Updated: {0} items, Skipped: {1}',
-        'msg_no_pptx': 'No PPTX files found',
-        'msg_no_data': 'No update data found',
-        'msg_copied': 'Copied to clipboard',
-        'license_title': 'License Management',
-        'license_current': 'Current License',
-        'license_enter_key': 'Enter License Key:',
-        'license_activated': '{0} has been activated',
-        'license_deactivated': 'License deactivated',
-        'license_deactivate_confirm': 'Deactivate license?\nThe app will run as Free version.',
-        'btn_continue_free': 'Continue as Free',
-        'license_invalid': 'Invalid license key',
-        'license_email_mismatch': 'Email address does not match the license key',
-        'license_enter_prompt': 'Please enter a license key',
-        'upgrade_title': 'Upgrade',
-        'dialog_confirm': 'Confirm',
-        'dialog_error': 'Error',
-        'dialog_complete': 'Complete',
-        'header_slide': 'Slide',
-        'header_id': 'Object ID',
-        'header_type': 'Type',
-        'header_text': 'Text Content',
-        'header_filename': 'Filename',
-        'header_datetime': 'Extracted At',
-        'diff_title': 'Diff Preview',
-        'menu_help': 'Help',
-        'menu_guide': 'User Guide',
-        'menu_faq': 'FAQ',
-        'menu_license': 'License Management',
-        'menu_about': 'About',
-        'lang_menu': 'Language',
-        'font_size_menu': 'Font Size',
-        'font_size_small': 'Small',
-        'font_size_medium': 'Medium',
-        'font_size_large': 'Large',
-        'advanced_options': 'Advanced Options',
-        'type_notes': 'Notes',
-        'filter_placeholder': 'Filter text...',
-        # UI elements
-        'mode_section': 'Mode',
-        'btn_compare': '2-File Compare',
-        'show_detail': 'Show details',
-        'welcome_guide_title': 'Edit PowerPoint Text',
-        'guide_step1': 'Select a PPTX file from the left panel',
-        'guide_step2': 'Text will be displayed in a list',
-        'guide_step3': 'Double-click a cell to edit',
-        'guide_step4': 'Click "Apply to PPTX" to save changes',
-        'btn_apply': 'Apply to PPTX',
-        'btn_export_excel': 'Excel Export',
-        'btn_export_json': 'JSON Export',
-        'filter_label': 'Filter:',
-        'mode_desc_extract': 'Extract text from PPTX for editing',
-        'mode_desc_update': 'Apply edited data to PPTX',
-        # Grid toolbar
-        'btn_clear_grid': 'Clear',
-        'btn_replace_all': 'Replace All',
-        'btn_undo': 'Undo',
-        'btn_redo': 'Redo',
-        # Replace dialog
-        'replace_search': 'Search:',
-        'replace_with': 'Replace:',
-        'btn_replace': 'Replace',
-        # Compare dialog
-        'compare_title': 'Compare 2 PowerPoint files',
-        'compare_file1': 'Original:',
-        'compare_file2': 'New file:',
-        'btn_browse': 'Browse',
-        'compare_ignore_ws': 'Ignore whitespace',
-        'btn_run_compare': 'Compare',
-        # Compare result
-        'btn_export_csv': 'CSV Export',
-        'header_select': 'Select',
-        'header_status': 'Status',
-        'btn_select_original': 'All Original',
-        'btn_select_new': 'All New',
-        'btn_apply_selection': 'Apply Selection',
-        # Log dialog
-        'btn_copy_log': 'Copy',
-        'btn_clear_log': 'Clear',
-        # License dialog (auth)
-        'license_auth_title': 'License Activation',
-        'license_email': 'Email Address:',
-        'license_key': 'License Key:',
-        'license_wrong_product': 'This license key is not valid for Insight Slides',
-        'license_perpetual': 'Perpetual',
-        'license_expiry_warning': 'Your license will expire in {0} days ({1}). Please renew.',
-        'license_expired': 'Your license has expired. Please renew to continue using all features.',
-        'license_trial_link': 'Request Trial',
-        'license_email_required': 'Please enter your email address',
-        'license_status_active': 'Active',
-        'license_status_expired': 'Expired',
-        'license_valid_until': 'Valid until: {0}',
-        'license_days_remaining': '({0} days remaining)',
-        'license_feature_restricted': 'This feature requires a Pro license. Current: {0}',
-        'license_batch_restricted': 'Batch processing requires a Pro license.',
-        'license_json_restricted': 'JSON export requires a Pro license.',
-        'license_continue_free': 'Continue as Free',
-        # Status messages
-        'status_slides_items': '{0} slides / {1} items',
-        'status_complete_items': 'Complete: {0} items',
-        'status_batch_complete': 'Batch extract complete: {0} items ({1})',
-        'status_update_complete': 'Update complete: {0} items',
-        'lang_changed': 'Language changed.',
-        # Log messages
-        'log_cancelled': 'Cancelled',
-        'log_cancel_request': 'Cancellation requested...',
-        'log_no_text': 'No text found',
-        'log_error': 'Error: {0}',
-        'log_found_files': 'Found: {0} files',
-        'log_no_pptx_found': 'No PPTX files found',
-        'log_invalid_header': 'Invalid header format',
-        'log_no_update_data': 'No update data',
-        'log_processing': 'Processing...',
-        'dialog_select_folder': 'Select Folder (containing PPTX files)',
-        'dialog_select_folder_update': 'Select Folder (*_extracted{0} + PPTX)',
-        'dialog_select_pptx': 'Select PowerPoint to update',
-        'dialog_processing_exit': 'Processing in progress. Exit anyway?',
-        'dialog_confirm_title': 'Confirm',
-        'result_updated': 'Updated: {0} items\nSkipped: {1} items',
-        'result_replaced': '{0} items replaced',
-        'result_applied': '{0} items applied',
-        'result_csv_saved': 'CSV saved',
-        'result_export_complete': 'Export complete: {0}',
-    },
-    'ja': {
-        'app_subtitle': 'PowerPointテキストを抽出 → 編集 → 反映',
-        'welcome_title': 'Insight Slides へようこそ！',
-        'mode_extract': '抽出モード',
-        'mode_update': '更新モード',
-        'mode_extract_short': 'テキスト抽出',
-        'mode_update_short': '上書き更新',
-        'panel_mode': 'モード選択',
-        'panel_file': 'ファイル操作',
-        'panel_input': '入力（1ファイル）',
-        'panel_output_file': '出力（1ファイル）',
-        'panel_settings': '処理設定',
-        'panel_status': '処理状況',
-        'panel_output': '抽出結果',
-        'panel_extract_options': '抽出オプション',
-        'panel_update_options': '更新オプション',
-        'panel_extract_run': '抽出実行',
-        'panel_update_run': '更新実行',
-        'panel_pro_features': '拡張機能',
-        'btn_load_pptx': 'PPTX読込',
-        'btn_load_excel': 'Excel読込',
-        'btn_load_json': 'JSON読込',
-        'btn_single_file': 'ファイル選択',
-        'btn_from_excel': 'Excelから更新',
-        'btn_from_json': 'JSONから更新',
-        'btn_apply_pptx': 'PPTXに反映',
-        'btn_export_to_excel': 'Excel出力',
-        'btn_export_to_json': 'JSON出力',
-        'panel_batch': 'フォルダ一括',
-        'btn_batch_extract': 'フォルダ→Excel',
-        'btn_batch_update': 'Excel→フォルダ',
-        'btn_batch_export_excel': 'フォルダに出力 (Excel)',
-        'btn_batch_export_json': 'フォルダに出力 (JSON)',
-        'btn_batch_import_excel': 'フォルダから読込 (Excel)',
-        'btn_batch_import_json': 'フォルダから読込 (JSON)',
-        'btn_diff_preview': '差分プレビュー',
-        'btn_compare_pptx': 'PPTX比較',
-        'btn_cancel': '中止',
-        'btn_clear': 'ログクリア',
-        'btn_copy': 'ログコピー',
-        'btn_license': 'ライセンス',
-        'btn_activate': 'アクティベート',
-        'btn_deactivate': 'ライセンス解除',
-        'btn_purchase': '購入ページ',
-        'btn_close': '閉じる',
-        'btn_start': '始める',
-        'btn_filter': 'フィルタ',
-        'btn_clear_filter': 'クリア',
-        'setting_output_format': '出力形式:',
-        'setting_include_meta': 'ファイル名・日時を含める',
-        'setting_auto_backup': '更新前に自動バックアップ',
-        'chk_include_notes': 'スピーカーノート含む',
-        'format_tab': 'タブ区切り',
-        'format_csv': 'CSV形式',
-        'format_excel': 'Excel形式',
-        'status_waiting': '処理待機中...',
-        'status_processing': '処理中...',
-        'status_complete': '完了',
-        'status_cancelled': 'キャンセルされました',
-        'status_error': 'エラー',
-        'msg_extract_desc': 'PowerPointからテキストを抽出します。',
-        'msg_update_desc': '編集したファイルの変更をPowerPointに反映します。',
-        'msg_update_limit': '更新機能: 最初の{0}スライドのみ\nStandard版で無制限に！',
-        'msg_processing_file': '処理中: {0}',
-        'msg_saved': '保存完了: {0}',
-        'msg_extracted': '抽出: {0}件 / スライド: {1}枚',
-        'msg_updated': '更新: {0}件 / スキップ: {1}件',
-        'msg_no_pptx': 'PPTXファイルが見つかりません',
-        'msg_no_data': '更新データがありません',
-        'msg_copied': 'クリップボードにコピーしました',
-        'license_title': 'ライセンス管理',
-        'license_current': '現在のライセンス',
-        'license_enter_key': 'ライセンスキー:',
-        'license_activated': '{0}版がアクティベートされました',
-        'license_deactivated': 'ライセンスを解除しました',
-        'license_deactivate_confirm': 'ライセンスを解除しますか？\n解除後はFree版として動作します。',
-        'btn_continue_free': 'Free版で続行',
-        'license_invalid': '無効なライセンスキーです',
-        'license_email_mismatch': 'メールアドレスがライセンスキーと一致しません',
-        'license_enter_prompt': 'ライセンスキーを入力してください',
-        'upgrade_title': 'アップグレード',
-        'dialog_confirm': '確認',
-        'dialog_error': 'エラー',
-        'dialog_complete': '完了',
-        'header_slide': 'スライド番号',
-        'header_id': 'オブジェクトID',
-        'header_type': 'タイプ',
-        'header_text': 'テキスト内容',
-        'header_filename': 'ファイル名',
-        'header_datetime': '抽出日時',
-        'diff_title': '差分プレビュー',
-        'menu_help': 'ヘルプ',
-        'menu_guide': '使い方ガイド',
-        'menu_faq': 'よくある質問',
-        'menu_license': 'ライセンス管理',
-        'menu_about': 'バージョン情報',
-        'lang_menu': '言語 / Language',
-        'font_size_menu': '文字サイズ',
-        'font_size_small': '小',
-        'font_size_medium': '中',
-        'font_size_large': '大',
-        'advanced_options': '詳細オプション',
-        'type_notes': 'ノート',
-        'filter_placeholder': 'フィルタ...',
-        # UI elements
-        'mode_section': '操作モード',
-        'btn_compare': '2ファイル比較',
-        'show_detail': '詳細を表示',
-        'welcome_guide_title': 'PowerPointテキストを編集',
-        'guide_step1': '左のパネルでPPTXファイルを選択',
-        'guide_step2': 'テキストが一覧で表示されます',
-        'guide_step3': 'セルをダブルクリックして編集',
-        'guide_step4': '「PPTXに反映」で変更を保存',
-        'btn_apply': 'PPTXに反映',
-        'btn_export_excel': 'Excelエクスポート',
-        'btn_export_json': 'JSONエクスポート',
-        'filter_label': 'フィルタ:',
-        'mode_desc_extract': 'PPTXからテキストを抽出して編集',
-        'mode_desc_update': '編集したデータをPPTXに反映',
-        # Grid toolbar
-        'btn_clear_grid': 'クリア',
-        'btn_replace_all': '一括置換',
-        'btn_undo': '元に戻す',
-        'btn_redo': 'やり直し',
-        # Replace dialog
-        'replace_search': '検索:',
-        'replace_with': '置換:',
-        'btn_replace': '置換',
-        # Compare dialog
-        'compare_title': '2つのPowerPointファイルを比較',
-        'compare_file1': '元ファイル:',
-        'compare_file2': '新ファイル:',
-        'btn_browse': '参照',
-        'compare_ignore_ws': '空白の違いを無視',
-        'btn_run_compare': '比較実行',
-        # Compare result
-        'btn_export_csv': 'CSVエクスポート',
-        'header_select': '採用',
-        'header_status': '状態',
-        'btn_select_original': '全て元',
-        'btn_select_new': '全て新',
-        'btn_apply_selection': '選択を反映',
-        # Log dialog
-        'btn_copy_log': 'コピー',
-        'btn_clear_log': 'クリア',
-        # License dialog (auth)
-        'license_auth_title': 'ライセンス認証',
-        'license_email': 'メールアドレス:',
-        'license_key': 'ライセンスキー:',
-        'license_wrong_product': 'このライセンスキーはInsight Slidesには適用できません',
-        'license_perpetual': '永続',
-        'license_expiry_warning': 'ライセンスの有効期限まであと{0}日です（{1}まで）。更新をご検討ください。',
-        'license_expired': 'ライセンスの有効期限が切れました。継続してご利用いただくには更新が必要です。',
-        'license_trial_link': 'トライアル申請',
-        'license_email_required': 'メールアドレスを入力してください',
-        'license_status_active': '有効',
-        'license_status_expired': '期限切れ',
-        'license_valid_until': '有効期限: {0}',
-        'license_days_remaining': '（残り{0}日）',
-        'license_feature_restricted': 'この機能はProライセンスが必要です。現在: {0}',
-        'license_batch_restricted': 'フォルダ一括処理はProライセンスが必要です。',
-        'license_json_restricted': 'JSON出力はProライセンスが必要です。',
-        'license_continue_free': 'Free版で続行',
-        # Status messages
-        'status_slides_items': '{0}スライド / {1}項目',
-        'status_complete_items': '完了: {0}件',
-        'status_batch_complete': 'バッチ抽出完了: {0}件 ({1})',
-        'status_update_complete': '更新完了: {0}件',
-        'lang_changed': '言語を変更しました。',
-        # Log messages
-        'log_cancelled': 'キャンセルされました',
-        'log_cancel_request': 'キャンセルをリクエスト...',
-        'log_no_text': 'テキストが見つかりませんでした',
-        'log_error': 'エラー: {0}',
-        'log_found_files': '発見: {0}件',
-        'log_no_pptx_found': 'PPTXファイルが見つかりません',
-        'log_invalid_header': 'ヘッダー形式が不正です',
-        'log_no_update_data': '更新データなし',
-        'log_processing': '処理中...',
-        'dialog_select_folder': 'フォルダを選択 (PPTXファイルを含む)',
-        'dialog_select_folder_update': 'フォルダを選択 (*_抽出{0} + PPTX)',
-        'dialog_select_pptx': '更新するPowerPointを選択',
-        'dialog_processing_exit': '処理中です。終了しますか？',
-        'dialog_confirm_title': '確認',
-        'result_updated': '更新: {0}件\nスキップ: {1}件',
-        'result_replaced': '{0} 件を置換しました',
-        'result_applied': '{0} 件を反映しました',
-        'result_csv_saved': 'CSVを保存しました',
-        'result_export_complete': 'エクスポート完了: {0}',
-    },
-}
-
-_current_lang = 'ja'
-
-def t(key: str, *args) -> str:
-    text = LANGUAGES.get(_current_lang, LANGUAGES['ja']).get(key, key)
-    if args:
-        return text.format(*args)
-    return text
-
-def set_language(lang: str):
-    global _current_lang
-    if lang in LANGUAGES:
-        _current_lang = lang
-
-def get_language() -> str:
-    return _current_lang
-
-
-# ============== ライセンス設定（insight-common 統合） ==============
-PRODUCT_CODE = "INS"  # InsightSlide製品コードプレフィックス
-EXPIRY_WARNING_DAYS = 30  # 期限切れ警告の日数
-
-# ローカルティア定義（FREE追加）
-class LicenseTier:
-    FREE = "FREE"
-    TRIAL = "TRIAL"
-    STD = "STD"
-    PRO = "PRO"
-    ENT = "ENT"
-
-# ティア別設定（InsightSlide固有）
-# json: 1ファイルJSON入出力, batch: フォルダ一括処理, compare: 2ファイル比較
-TIERS = {
-    LicenseTier.FREE: {'name': 'Free', 'name_ja': 'フリー', 'badge': 'Free', 'update_limit': 3, 'batch': False, 'json': False, 'compare': False},
-    LicenseTier.TRIAL: {'name': 'Trial', 'name_ja': 'トライアル', 'badge': 'Trial', 'update_limit': None, 'batch': True, 'json': True, 'compare': True},
-    LicenseTier.STD: {'name': 'Standard', 'name_ja': 'スタンダード', 'badge': 'Standard', 'update_limit': None, 'batch': True, 'json': True, 'compare': True},
-    LicenseTier.PRO: {'name': 'Professional', 'name_ja': 'プロフェッショナル', 'badge': 'Pro', 'update_limit': None, 'batch': True, 'json': True, 'compare': True},
-    LicenseTier.ENT: {'name': 'Enterprise', 'name_ja': 'エンタープライズ', 'badge': 'Enterprise', 'update_limit': None, 'batch': True, 'json': True, 'compare': True},
-}
-
-# 未認証時のデフォルト設定（Free版と同じ）
-TIER_NOT_ACTIVATED = TIERS[LicenseTier.FREE]
-
-
-class LicenseManager:
-    """insight-common 統合ライセンスマネージャー（メールハッシュ検証付き）"""
-
-    def __init__(self):
-        CONFIG_DIR.mkdir(parents=True, exist_ok=True)
-        self.validator = LicenseValidator()
-        self.license_info: Dict = {}
-        self.insight_info: Optional[LicenseInfo] = None
-        self._load_license()
-
-    @staticmethod
-    def _compute_email_hash(email: str) -> str:
-        """メールアドレスからハッシュを生成（Base32エンコード、4文字）
-
-        insight-commonと同じBase32形式を使用
-        """
-        import base64
-        normalized = email.strip().lower()
-        hash_bytes = hashlib.sha256(normalized.encode('utf-8')).digest()
-        return base64.b32encode(hash_bytes)[:4].decode().upper()
-
-    @staticmethod
-    def _extract_email_hash_from_key(key: str) -> Optional[str]:
-        """ライセンスキーからメールハッシュ部分を抽出
-
-        形式: {PRODUCT}-{TIER}-XXXX-{EMAIL_HASH}-XXXX-CCCC
-        例: INSS-STD-3101-S467-J72J-IQB3
-        ハッシュは4番目のセグメント（0-indexed: 3）
-        """
-        parts = key.strip().upper().split('-')
-        if len(parts) >= 6:
-            return parts[3]  # 4番目のセグメント = EMAIL_HASH
-        return None
-
-    def _load_license(self):
-        """保存されたライセンス情報を読み込む"""
-        self.license_info = {'type': None, 'key': '', 'email': '', 'expires': None}
-
-        if LICENSE_FILE.exists():
-            try:
-                with open(LICENSE_FILE, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-
-                if data.get('key') and data.get('email'):
-                    # メールハッシュ検証
-                    stored_hash = self._extract_email_hash_from_key(data['key'])
-                    computed_hash = self._compute_email_hash(data['email'])
-
-                    if stored_hash != computed_hash:
-                        # ハッシュ不一致 - ライセンス無効
-                        return
-
-                    # 有効期限を復元
-                    expires_at = None
-                    if data.get('expires'):
-                        try:
-                            expires_at = datetime.fromisoformat(data['expires'])
-                        except:
-                            pass
-
-                    # insight-common で検証
-                    self.insight_info = self.validator.validate(data['key'], expires_at)
-
-                    if self.insight_info.is_valid:
-                        # 製品チェック
-                        if self.validator.is_product_covered(self.insight_info, PRODUCT_CODE):
-                            tier = self._map_insight_tier(self.insight_info.tier)
-                            self.license_info = {
-                                'type': tier,
-                                'key': data['key'],
-                                'email': data.get('email', ''),
-                                'expires': data.get('expires')
-                            }
-                            return
-
-            except Exception as e:
-                print(f"License load error: {e}")
-
-    def _save_license(self):
-        """ライセンス情報を保存"""
-        with open(LICENSE_FILE, 'w', encoding='utf-8') as f:
-            json.dump(self.license_info, f, ensure_ascii=False, indent=2)
-
-    def _map_insight_tier(self, tier: Optional[InsightLicenseTier]) -> Optional[str]:
-        """insight-common のティアをローカルティアにマップ"""
-        if not tier:
-            return None
-        mapping = {
-            InsightLicenseTier.TRIAL: LicenseTier.TRIAL,
-            InsightLicenseTier.STD: LicenseTier.STD,
-            InsightLicenseTier.PRO: LicenseTier.PRO,
-            InsightLicenseTier.ENT: LicenseTier.ENT,
-        }
-        return mapping.get(tier, None)
-
-    def activate(self, email: str, key: str) -> Tuple[bool, str]:
-        """ライセンスをアクティベート（メールハッシュ検証付き）"""
-        if not email or not key:
-            return False, t('license_enter_prompt')
-
-        email = email.strip()
-        key = key.strip().upper()
-
-        # メールハッシュ検証
-        key_hash = self._extract_email_hash_from_key(key)
-        email_hash = self._compute_email_hash(email)
-
-        if key_hash != email_hash:
-            return False, t('license_email_mismatch')
-
-        # insight-common で検証
-        self.insight_info = self.validator.validate(key)
-
-        if not self.insight_info.is_valid:
-            error_msg = self.insight_info.error or t('license_invalid')
-            return False, error_msg
-
-        # 製品チェック
-        if not self.validator.is_product_covered(self.insight_info, PRODUCT_CODE):
-            return False, t('license_wrong_product')
-
-        # 有効期限を計算（初回アクティベーション時）
-        expires_str = None
-        if self.insight_info.tier and self.insight_info.tier != InsightLicenseTier.ENT:
-            tier_config = INSIGHT_TIERS.get(self.insight_info.tier, {})
-            duration_months = tier_config.get('duration_months')
-            duration_days = tier_config.get('duration_days')
-
-            if duration_days:
-                expires = datetime.now() + timedelta(days=duration_days)
-                expires_str = expires.isoformat()
-            elif duration_months:
-                now = datetime.now()
-                new_month = now.month + duration_months
-                new_year = now.year + (new_month - 1) // 12
-                new_month = (new_month - 1) % 12 + 1
-                expires = datetime(new_year, new_month, min(now.day, 28))
-                expires_str = expires.isoformat()
-
-        tier = self._map_insight_tier(self.insight_info.tier)
-        self.license_info = {
-            'type': tier,
-            'key': key,
-            'email': email,
-            'expires': expires_str
-        }
-        self._save_license()
-
-        tier_info = TIERS.get(tier, TIERS[LicenseTier.TRIAL])
-        name = tier_info['name_ja'] if get_language() == 'ja' else tier_info['name']
-        return True, t('license_activated', name)
-
-    def deactivate(self):
-        """ライセンスを解除"""
-        self.license_info = {'type': None, 'key': '', 'email': '', 'expires': None}
-        self.insight_info = None
-        if LICENSE_FILE.exists():
-            LICENSE_FILE.unlink()
-
-    def get_tier(self) -> Optional[str]:
-        return self.license_info.get('type')
-
-    def get_tier_info(self) -> Dict:
-        tier = self.get_tier()
-        if tier is None:
-            return TIER_NOT_ACTIVATED
-        return TIERS.get(tier, TIER_NOT_ACTIVATED)
-
-    def get_update_limit(self) -> Optional[int]:
-        return self.get_tier_info().get('update_limit')
-
-    def can_batch(self) -> bool:
-        """フォルダ一括処理が可能か（PRO/Trial/ENT）"""
-        return self.get_tier_info().get('batch', False)
-
-    def can_json(self) -> bool:
-        """1ファイルJSON入出力が可能か（PRO/Trial/ENT）"""
-        return self.get_tier_info().get('json', False)
-
-    def can_compare(self) -> bool:
-        """2ファイル比較が可能か（STD以上）"""
-        return self.get_tier_info().get('compare', False)
-
-    def is_pro(self) -> bool:
-        """後方互換性のため維持（PRO機能 = batch + json）"""
-        return self.can_batch() and self.can_json()
-
-    def is_activated(self) -> bool:
-        """ライセンスがアクティベートされているか"""
-        return self.get_tier() is not None
-
-    def get_days_until_expiry(self) -> Optional[int]:
-        """有効期限までの日数を取得（期限なしの場合はNone）"""
-        expires_str = self.license_info.get('expires')
-        if not expires_str:
-            return None
-        try:
-            expires = datetime.fromisoformat(expires_str)
-            delta = expires - datetime.now()
-            return delta.days
-        except:
-            return None
-
-    def should_show_expiry_warning(self) -> bool:
-        """期限切れ警告を表示すべきか"""
-        days = self.get_days_until_expiry()
-        if days is None:
-            return False
-        return 0 < days <= EXPIRY_WARNING_DAYS
-
-    def get_expiry_date_str(self) -> str:
-        """有効期限の表示文字列"""
-        expires_str = self.license_info.get('expires')
-        if not expires_str:
-            return t('license_perpetual') if self.get_tier() == LicenseTier.ENT else '-'
-        try:
-            expires = datetime.fromisoformat(expires_str)
-            return expires.strftime('%Y/%m/%d')
-        except:
-            return '-'
-
+import time
+from collections import deque
+import multiprocessing
+
+# pptx / openpyxl はコア側で処理が必要になった時点で読み込まれる
+import insightslides_core as core
+import insightslides_batch as batch
+import insightslides_watch as watch
+import insightslides_jobs as jobs
+from insightslides_log import LogBuffer
+import insightslides_progress as progress
+import insightslides_metrics as metrics
+import insightslides_profile as profiling
+import insightslides_timing as timing
+import insightslides_trace as tracing
+
+from insightslides_config import (
+    APP_VERSION, APP_NAME, CONFIG_DIR, SESSION_LOG_FILE, SUPPORT_LINKS,
+    t, set_language, get_language, save_error_log,
+    ConfigManager as _BaseConfigManager,
+)
+from insightslides_license import LicenseManager
 
 # ============== モダンデザインシステム ==============
 # B2B SaaS品質 - Notion/Linear/Figma風
@@ -866,6 +120,7 @@ COLOR_PALETTE = {
     "diff_changed": "#FEF3C7",
     "diff_added": "#D1FAE5",
     "diff_removed": "#FEE2E2",
+    "diff_moved": "#EDE9FE",
 
     # Unified aliases for consistency
     "primary": "#3B82F6",
@@ -931,49 +186,14 @@ RADIUS = {
 }
 
 
-class ConfigManager:
-    DEFAULT = {
-        'language': 'ja', 'output_format': 'excel', 'include_metadata': True,
-        'auto_backup': True, 'last_directory': '', 'font_size': 'medium',
-        'advanced_expanded': False,
-    }
+class ConfigManager(_BaseConfigManager):
+    """設定管理（フォントサイズ設定を GUI のフォント定義へ反映）"""
 
     def __init__(self):
         global FONTS
-        CONFIG_DIR.mkdir(parents=True, exist_ok=True)
-        self.config = self._load()
-        set_language(self.config.get('language', 'ja'))
+        super().__init__()
         FONTS = get_fonts(self.config.get('font_size', 'medium'))
 
-    def _load(self) -> Dict:
-        if CONFIG_FILE.exists():
-            try:
-                with open(CONFIG_FILE, 'r', encoding='utf-8') as f:
-                    return {**self.DEFAULT, **json.load(f)}
-            except:
-                pass
-        return self.DEFAULT.copy()
-
-    def save(self):
-        with open(CONFIG_FILE, 'w', encoding='utf-8') as f:
-            json.dump(self.config, f, ensure_ascii=False, indent=2)
-
-    def get(self, key: str, default=None):
-        return self.config.get(key, default)
-
-    def set(self, key: str, value):
-        self.config[key] = value
-        self.save()
-
-
-def save_error_log(error: Exception, context: str = ""):
-    try:
-        CONFIG_DIR.mkdir(parents=True, exist_ok=True)
-        with open(ERROR_LOG_FILE, 'a', encoding='utf-8') as f:
-            f.write(f"\n{'='*60}\n{datetime.now()}\n{context}\n{error}\n{traceback.format_exc()}\n")
-    except:
-        pass
-
 
 # ============== グリッドUI (Undo/Redo対応) ==============
 class UndoManager:
@@ -1075,6 +295,7 @@ class EditableGrid(ttk.Frame):
         self._row_height = 60  # 複数行表示のためデフォルト高さを増やす
 
         if TKSHEET_AVAILABLE:
+            from tksheet import Sheet
             self.sheet = Sheet(
                 sheet_frame,
                 headers=[t('header_slide'), t('header_id'), t('header_type'), t('header_text')],
@@ -1433,11 +654,12 @@ class EditableGrid(ttk.Frame):
 
 # ============== 比較機能 ==============
 class CompareDialog:
-    def __init__(self, parent, callback):
+    def __init__(self, parent, callback, on_export=None):
         self.callback = callback
+        self.on_export = on_export
         self.dialog = tk.Toplevel(parent)
         self.dialog.title("PPTX比較")
-        self.dialog.geometry("600x280")
+        self.dialog.geometry("600x310")
         self.dialog.transient(parent)
         self.dialog.grab_set()
 
@@ -1468,8 +690,16 @@ class CompareDialog:
         # オプション
         opt = ttk.Frame(frame)
         opt.pack(fill='x', pady=15)
-        self.ignore_ws = tk.BooleanVar(value=True)
+        self.ignore_ws = tk.BooleanVar(value=False)
         ttk.Checkbutton(opt, text=t('compare_ignore_ws'), variable=self.ignore_ws).pack(side='left')
+        self.ignore_width = tk.BooleanVar(value=False)
+        ttk.Checkbutton(opt, text=t('compare_ignore_width'), variable=self.ignore_width).pack(side='left', padx=(15, 0))
+        self.ignore_case = tk.BooleanVar(value=False)
+        ttk.Checkbutton(opt, text=t('compare_ignore_case'), variable=self.ignore_case).pack(side='left', padx=(15, 0))
+
+        self.csv_only = tk.BooleanVar(value=False)
+        if self.on_export:
+            ttk.Checkbutton(frame, text=t('compare_csv_only'), variable=self.csv_only).pack(anchor='w')
 
         # ボタン
         btn = ttk.Frame(frame)
@@ -1483,12 +713,25 @@ class CompareDialog:
         if path:
             var.set(path)
 
+    def _profile_spec(self) -> str:
+        """チェック状態から正規化プロファイル指定（例: "whitespace+width"）を作成"""
+        options = [name for name, var in (("whitespace", self.ignore_ws), ("width", self.ignore_width),
+                                          ("case", self.ignore_case)) if var.get()]
+        return "+".join(options) or core.DEFAULT_PROFILE
+
     def _execute(self):
         f1, f2 = self.file1_var.get(), self.file2_var.get()
         if not f1 or not f2:
             messagebox.showwarning("警告", "2つのファイルを選択してください")
             return
-        self.callback(f1, f2, self.ignore_ws.get())
+        if self.on_export and self.csv_only.get():
+            out = filedialog.asksaveasfilename(parent=self.dialog, defaultextension=".csv",
+                                               filetypes=[("CSV", "*.csv"), ("JSON Lines", "*.jsonl")])
+            if not out:
+                return
+            self.on_export(f1, f2, self._profile_spec(), out)
+        else:
+            self.callback(f1, f2, self._profile_spec())
         self.dialog.destroy()
 
 
@@ -1509,6 +752,8 @@ class CompareResultWindow:
                 self.selections[i] = "after"
             elif row["status"] == "削除":
                 self.selections[i] = "before"
+            elif row["status"] == "移動":
+                self.selections[i] = "after"
             else:
                 self.selections[i] = "same"
 
@@ -1518,7 +763,7 @@ class CompareResultWindow:
         # 統計
         top = ttk.Frame(self.window, padding=10)
         top.pack(fill='x')
-        ttk.Label(top, text=f"📊 {stats['same']} | {stats['changed']} | {stats['added']} | {stats['removed']}",
+        ttk.Label(top, text=f"📊 {stats['same']} | {stats['changed']} | {stats['added']} | {stats['removed']} | {stats.get('moved', 0)}",
                   font=FONTS["heading"]).pack(side='left')
 
         ttk.Button(top, text=t('btn_export_csv'), command=self._export_csv).pack(side='right')
@@ -1539,8 +784,8 @@ class CompareResultWindow:
 
         self.tree.column("select", width=60, anchor="center")
         self.tree.column("slide", width=60, anchor="center")
-        self.tree.column("id", width=80)
-        self.tree.column("status", width=60, anchor="center")
+        self.tree.column("id", width=110)
+        self.tree.column("status", width=80, anchor="center")
         self.tree.column("before", width=350)
         self.tree.column("after", width=350)
 
@@ -1553,6 +798,7 @@ class CompareResultWindow:
         self.tree.tag_configure("changed", background=COLOR_PALETTE["diff_changed"])
         self.tree.tag_configure("added", background=COLOR_PALETTE["diff_added"])
         self.tree.tag_configure("removed", background=COLOR_PALETTE["diff_removed"])
+        self.tree.tag_configure("moved", background=COLOR_PALETTE["diff_moved"])
 
         self.tree.bind("<Button-1>", self._on_click)
         self.item_map = {}
@@ -1577,13 +823,19 @@ class CompareResultWindow:
         for i, row in enumerate(self.diff_data):
             sel = self.selections.get(i)
             sel_text = {"before": "◀ 元", "after": "新 ▶", "same": "─"}.get(sel, "")
-            tag = {"一致": "same", "変更": "changed", "追加": "added", "削除": "removed"}.get(row["status"], "same")
+            tag = {"一致": "same", "変更": "changed", "追加": "added", "削除": "removed", "移動": "moved"}.get(row["status"], "same")
 
             before = (row.get("before") or "").replace("\n", " ↵ ")[:50]
             after = (row.get("after") or "").replace("\n", " ↵ ")[:50]
 
+            # 移動検出で対応付いた行は移動元と類似度を併記
+            oid, status = row.get("id", ""), row["status"]
+            if "from_slide" in row:
+                oid = f"{oid} ← {row['from_slide']}:{row['from_id']}"
+                status = f"{status} {row['score']:.0%}"
+
             item_id = self.tree.insert("", "end", values=(
-                sel_text, row["slide"], row.get("id", ""), row["status"], before, after
+                sel_text, row["slide"], oid, status, before, after
             ), tags=(tag,))
             self.item_map[item_id] = i
 
@@ -1636,26 +888,92 @@ class CompareResultWindow:
 
         with open(path, 'w', newline='', encoding='utf-8-sig') as f:
             w = csv.writer(f)
-            w.writerow(["スライド", "ID", "状態", "元", "新"])
+            w.writerow(["スライド", "ID", "状態", "元", "新", "移動元", "類似度"])
             for row in self.diff_data:
-                w.writerow([row["slide"], row.get("id", ""), row["status"], row.get("before", ""), row.get("after", "")])
+                moved_from = f"{row['from_slide']}:{row['from_id']}" if "from_slide" in row else ""
+                w.writerow([row["slide"], row.get("id", ""), row["status"], row.get("before", ""), row.get("after", ""),
+                            moved_from, row.get("score", "")])
         messagebox.showinfo(t('dialog_complete'), t('result_csv_saved'))
 
 
+# ============== UI更新チャネル ==============
+UI_DRAIN_INTERVAL_MS = 50      # キューを反映する間隔
+UI_DRAIN_MAX_ITEMS = 2000      # 1回の反映で処理する最大件数（残りは次の周期へ）
+LOG_PAGE_LINES = 500           # ログダイアログで1度に読み込む行数
+TIMING_LOG_FILES = 10          # 処理時間の計測時、ログに内訳を出すファイル数（時間のかかった順）
+TIMINGS_DIR = CONFIG_DIR / "timings"
+TRACES_DIR = CONFIG_DIR / "traces"
+
+
+class UiChannel:
+    """ワーカースレッドから Tk への更新を1本のキューに集めるチャネル
+
+    どのスレッドからも post_* / call を呼べる（Tk には触れない）。
+    Tk のスレッドで定期的に drain() を呼び、溜まった更新をまとめて受け取る。
+    - ログ行はまとめて1回で追記する
+    - ステータス（ミニログ）と進捗は最後の1件だけを反映する
+    - call() で積んだ関数は投入順に Tk のスレッドで呼ぶ
+    """
+
+    LOG = "log"
+    STATUS = "status"
+    PROGRESS = "progress"
+    CALL = "call"
+
+    def __init__(self):
+        self._items = deque()
+        self._lock = threading.Lock()
+
+    def post_log(self, text: str, level: str = "info", clear: bool = False):
+        with self._lock:
+            self._items.append((self.LOG, text, level, clear))
+
+    def post_status(self, text: str):
+        with self._lock:
+            self._items.append((self.STATUS, text, None, False))
+
+    def post_progress(self, snapshot: Dict):
+        """進捗（ProgressTracker のスナップショット）。最後の1件だけが反映される"""
+        with self._lock:
+            self._items.append((self.PROGRESS, snapshot, None, False))
+
+    def call(self, fn):
+        with self._lock:
+            self._items.append((self.CALL, fn, None, False))
+
+    def drain(self, max_items: int = UI_DRAIN_MAX_ITEMS) -> Tuple[List, bool]:
+        """溜まった更新を取り出す。(更新のリスト, まだ残っているか) を返す"""
+        with self._lock:
+            count = min(len(self._items), max_items)
+            items = [self._items.popleft() for _ in range(count)]
+            return items, bool(self._items)
+
+
 # ============== メインアプリケーション ==============
 class InsightSlidesApp:
     def __init__(self, root):
         self.root = root
         self.license_manager = LicenseManager()
         self.config_manager = ConfigManager()
-        self.processing = False
-        self.cancel_requested = False
-        self.presentation = None
-        self.log_buffer = []
+        self.ui = UiChannel()
+        self.jobs = jobs.JobScheduler(deliver=self.ui.call, on_state=self._on_job_state)
+        cfg = self.config_manager
+        self.log_buffer = LogBuffer(cfg.get('log_buffer_lines', 5000),
+                                    spill_path=SESSION_LOG_FILE if cfg.get('log_spill', True) else None,
+                                    max_bytes=cfg.get('log_spill_max_kb', 2048) * 1024)
         self.extracted_data = []  # グリッド用
         self.loaded_pptx_path = None  # 読み込んだファイルのパス
         self.include_notes_var = tk.BooleanVar(value=False)
         self.auto_backup_var = tk.BooleanVar(value=self.config_manager.get('auto_backup', True))
+        self.include_subfolders_var = tk.BooleanVar(value=self.config_manager.get('include_subfolders', False))
+        self.worker_pool = None  # 一括処理用の常駐ワーカープール（_start_worker_pool）
+        self.timing_var = tk.BooleanVar(value=self.config_manager.get('timing_enabled', False))
+        timing.set_enabled(self.timing_var.get())
+        self.trace_var = tk.BooleanVar(value=self.config_manager.get('trace_enabled', False))
+        self._trace_enabled = self.trace_var.get()  # ジョブのスレッドから読むため Tk 変数とは別に持つ
+        self.profile_var = tk.BooleanVar(value=profiling.armed())  # 環境変数 INSIGHTSLIDES_PROFILE で最初から有効
+        batch.set_memory_budget(self.config_manager.get('batch_memory_budget_mb'))
+        batch.set_task_limits(self.config_manager.get('task_timeout_s'), self.config_manager.get('task_max_rss_mb'))
 
         self._setup_window()
         self._apply_styles()
@@ -1665,6 +983,9 @@ class InsightSlidesApp:
 
         # 起動時ライセンスチェック（UIが表示された後に実行）
         self.root.after(100, self._check_license_on_startup)
+        # 一括処理用のワーカーを裏で起動しておく（pptx などの読み込みを最初の一括処理より前に済ませる）
+        self.root.after(500, self._start_worker_pool)
+        self.root.after(UI_DRAIN_INTERVAL_MS, self._drain_ui)
 
     def _setup_window(self):
         tier = self.license_manager.get_tier_info()
@@ -1782,6 +1103,10 @@ class InsightSlidesApp:
         lang_menu.add_command(label="English", command=lambda: self._change_language('en'))
         lang_menu.add_command(label="日本語", command=lambda: self._change_language('ja'))
 
+        help_menu.add_separator()
+        help_menu.add_checkbutton(label=t('menu_timing'), variable=self.timing_var, command=self._toggle_timing)
+        help_menu.add_checkbutton(label=t('menu_trace'), variable=self.trace_var, command=self._toggle_trace)
+        help_menu.add_checkbutton(label=t('menu_profile_next'), variable=self.profile_var, command=self._toggle_profile)
         help_menu.add_separator()
         help_menu.add_command(label=t('menu_about'), command=self._show_about)
 
@@ -1907,12 +1232,30 @@ class InsightSlidesApp:
                       bg=COLOR_PALETTE["brand_primary"], fg="#FFFFFF", relief="flat",
                       activebackground=COLOR_PALETTE["brand_hover"],
                       padx=SPACING["md"], pady=SPACING["sm"],
-                      cursor="hand2", command=self._batch_update_dialog).grid(row=2, column=0, sticky='ew')
+                      cursor="hand2", command=self._batch_update_dialog).grid(row=2, column=0, sticky='ew', pady=(0, SPACING["xs"]))
+
+            # フォルダ比較ボタン（青）
+            tk.Button(batch_card, text=t('btn_batch_compare'), font=btn_font,
+                      bg=COLOR_PALETTE["brand_primary"], fg="#FFFFFF", relief="flat",
+                      activebackground=COLOR_PALETTE["brand_hover"],
+                      padx=SPACING["md"], pady=SPACING["sm"],
+                      cursor="hand2", command=self._compare_batch).grid(row=3, column=0, sticky='ew', pady=(0, SPACING["xs"]))
+
+            # フォルダ監視ボタン（青）
+            tk.Button(batch_card, text=t('btn_watch_folder'), font=btn_font,
+                      bg=COLOR_PALETTE["brand_primary"], fg="#FFFFFF", relief="flat",
+                      activebackground=COLOR_PALETTE["brand_hover"],
+                      padx=SPACING["md"], pady=SPACING["sm"],
+                      cursor="hand2", command=self._watch_folder).grid(row=4, column=0, sticky='ew')
         else:
             tk.Label(batch_card, text=f"{t('btn_batch_extract')} (Pro)", font=btn_font,
                      fg=COLOR_PALETTE["text_muted"], bg=COLOR_PALETTE["bg_primary"]).grid(row=0, column=0, sticky='w', pady=(0, SPACING["xs"]))
             tk.Label(batch_card, text=f"{t('btn_batch_update')} (Pro)", font=btn_font,
-                     fg=COLOR_PALETTE["text_muted"], bg=COLOR_PALETTE["bg_primary"]).grid(row=1, column=0, sticky='w')
+                     fg=COLOR_PALETTE["text_muted"], bg=COLOR_PALETTE["bg_primary"]).grid(row=1, column=0, sticky='w', pady=(0, SPACING["xs"]))
+            tk.Label(batch_card, text=f"{t('btn_batch_compare')} (Pro)", font=btn_font,
+                     fg=COLOR_PALETTE["text_muted"], bg=COLOR_PALETTE["bg_primary"]).grid(row=2, column=0, sticky='w', pady=(0, SPACING["xs"]))
+            tk.Label(batch_card, text=f"{t('btn_watch_folder')} (Pro)", font=btn_font,
+                     fg=COLOR_PALETTE["text_muted"], bg=COLOR_PALETTE["bg_primary"]).grid(row=3, column=0, sticky='w')
 
         # ============ 2ファイル比較ボタン（青） ============
         compare_text = t('btn_compare') if can_compare else f"{t('btn_compare')} (STD)"
@@ -1940,13 +1283,24 @@ class InsightSlidesApp:
                                         variable=self.auto_backup_var)
         backup_check.grid(row=1, column=0, sticky='w')
 
+        # サブフォルダを含むチェックボックス（フォルダ一括処理）
+        subfolders_check = ttk.Checkbutton(options_card, text=t('chk_include_subfolders'),
+                                            variable=self.include_subfolders_var,
+                                            command=lambda: self.config_manager.set(
+                                                'include_subfolders', self.include_subfolders_var.get()))
+        subfolders_check.grid(row=2, column=0, sticky='w')
+
         # ステータス＆ミニログ
         status_frame = ttk.Frame(frame, style='Main.TFrame')
         status_frame.grid(row=4, column=0, sticky='sew')
 
         # プログレスバー（処理中のみ表示）
         self.progress = ttk.Progressbar(status_frame, mode='indeterminate')
-        self.progress.pack(fill='x', pady=(0, SPACING["sm"]))
+        self.progress.pack(fill='x', pady=(0, SPACING["xs"]))
+        # 一括処理の進捗率・処理速度・残り時間
+        self.progress_label = tk.Label(status_frame, text="", font=(FONT_FAMILY_SANS, 8),
+                                       fg=COLOR_PALETTE["text_tertiary"], bg=COLOR_PALETTE["bg_primary"], anchor='w')
+        self.progress_label.pack(fill='x', pady=(0, SPACING["xs"]))
 
         # ミニログ（1-2行、クリックで詳細表示）
         log_frame = tk.Frame(status_frame, bg=COLOR_PALETTE["bg_secondary"], cursor="hand2")
@@ -2009,8 +1363,7 @@ class InsightSlidesApp:
 
         # グリッドビュー（データ読込後に表示）
         self.grid_container = ttk.Frame(edit_area, style='Main.TFrame')
-        self.grid_view = EditableGrid(self.grid_container, on_change=self._on_grid_change)
-        self.grid_view.grid(row=0, column=0, sticky='nsew')
+        self._grid_view = None  # 初回アクセス時に生成（grid_view プロパティ）
         self.grid_container.grid_columnconfigure(0, weight=1)
         self.grid_container.grid_rowconfigure(0, weight=1)
 
@@ -2076,6 +1429,14 @@ class InsightSlidesApp:
             tk.Label(step_frame, text=text, font=(FONT_FAMILY_SANS, 10),
                      fg=COLOR_PALETTE["text_secondary"], bg=COLOR_PALETTE["bg_primary"]).pack(side='left')
 
+    @property
+    def grid_view(self) -> EditableGrid:
+        """編集グリッド（tksheet の読み込みを起動時から外すため初回アクセス時に生成）"""
+        if self._grid_view is None:
+            self._grid_view = EditableGrid(self.grid_container, on_change=self._on_grid_change)
+            self._grid_view.grid(row=0, column=0, sticky='nsew')
+        return self._grid_view
+
     def _show_edit_area(self):
         """ウェルカムガイドを隠してグリッドを表示"""
         self.welcome_frame.grid_remove()
@@ -2108,17 +1469,8 @@ class InsightSlidesApp:
         self._update_mini_log(f"{APP_NAME} v{APP_VERSION} ({tier['name']}) - 準備完了")
 
     # === Output helpers ===
-    def _update_output(self, text, clear=False):
-        """ログバッファに追加し、ミニログを更新"""
-        if clear:
-            self.log_buffer = []
-        self.log_buffer.append(text)
-        # ミニログには最新の1行のみ表示
-        last_line = text.strip().split('\n')[-1] if text.strip() else ""
-        self._update_mini_log(last_line)
-
     def _update_output_safe(self, text, clear=False):
-        self.root.after(0, lambda: self._update_output(text, clear))
+        self.ui.post_log(text, clear=clear)
 
     def _update_mini_log(self, text):
         """ミニログラベルを更新（最新メッセージのみ）"""
@@ -2128,42 +1480,243 @@ class InsightSlidesApp:
         self.mini_log_label.configure(text=display_text)
 
     def _update_mini_log_safe(self, text):
-        self.root.after(0, lambda: self._update_mini_log(text))
+        self.ui.post_status(text)
 
     def _update_status(self, text, color=None):
         """ステータス更新（ミニログに統合）"""
         self._update_mini_log(text)
 
     def _update_status_safe(self, text, color=None):
-        self.root.after(0, lambda: self._update_status(text, color))
+        self.ui.post_status(text)
 
     def _log(self, msg, level="info"):
+        """ログを1行積む（どのスレッドからでも呼べる。画面への反映は _drain_ui）"""
         timestamp = datetime.now().strftime("%H:%M:%S")
         prefix = {"error": "× ", "warning": "! ", "success": "✓ "}.get(level, "")
-        full_msg = f"[{timestamp}] {prefix}{msg}"
-        self._update_output_safe(f"{full_msg}\n")
+        self.ui.post_log(f"[{timestamp}] {prefix}{msg}\n", level)
+
+    def _drain_ui(self):
+        """UiChannel に溜まった更新をまとめて反映する（Tk のスレッドで定期実行）"""
+        items, more = self.ui.drain()
+        lines, mini, level, snap = [], None, None, None
+        for kind, payload, lvl, clear in items:
+            if kind == UiChannel.LOG:
+                if clear:
+                    # 消す前の行も spill ファイルには残す
+                    self.log_buffer.extend(lines)
+                    self.log_buffer.clear()
+                    lines = []
+                lines.append((payload, lvl))
+                mini = payload
+                level = lvl
+            elif kind == UiChannel.STATUS:
+                mini, level = payload, None
+            elif kind == UiChannel.PROGRESS:
+                snap = payload
+            else:
+                # 後続の更新より先に、ここまでのログ・進捗を反映してから呼ぶ
+                self._flush_log_lines(lines, mini, level)
+                self._show_progress(snap)
+                lines, mini, level, snap = [], None, None, None
+                try:
+                    payload()
+                except Exception as e:
+                    save_error_log(e, "_drain_ui")
+        self._flush_log_lines(lines, mini, level)
+        self._show_progress(snap)
+        try:
+            self.root.after(1 if more else UI_DRAIN_INTERVAL_MS, self._drain_ui)
+        except tk.TclError:
+            pass  # ウィンドウ破棄後
+
+    def _flush_log_lines(self, lines: List[Tuple[str, str]], mini: Optional[str], level: Optional[str]):
+        self.log_buffer.extend(lines)
+        if mini is None:
+            return
+        # ミニログには最新の1行のみ表示
+        stripped = mini.strip()
+        self._update_mini_log(stripped.split('\n')[-1] if stripped else "")
         # エラー時は色を変える
         if level == "error":
             self.mini_log_label.configure(fg=COLOR_PALETTE["error"])
         elif level == "success":
             self.mini_log_label.configure(fg=COLOR_PALETTE["success"])
-        else:
+        elif level is not None:
             self.mini_log_label.configure(fg=COLOR_PALETTE["text_tertiary"])
 
-    def _start_progress(self):
-        self.progress.start(10)
-        self.processing = True
-        self.cancel_requested = False
-        self.root.after(0, lambda: self.cancel_btn.configure(state='normal'))
+    # === Jobs ===
+    @property
+    def processing(self) -> bool:
+        return self.jobs.busy
+
+    def _submit_job(self, name: str, fn, priority: int = jobs.PRIORITY_NORMAL, on_done=None,
+                    params: Optional[Dict] = None, background: bool = False):
+        """ジョブを積む。実行中のジョブがあれば待機し、順番が来たら fn(ctx) が実行される
 
-    def _stop_progress(self):
+        params（処理の種類・対象など）は計測レポートとプロファイルに記録される。
+        background=True（フォルダ監視など取り消すまで終わらないジョブ）はキューに積まず
+        すぐに別スレッドで始め、ほかのジョブはその間も順に実行される。
+        """
+        job = self._metered_job(self._profiled_job(self._traced_job(self._timed_job(fn))))
+        if background:
+            return self.jobs.start_background(name, job, priority=priority, on_done=on_done, params=params)
+        ctx = self.jobs.submit(name, job, priority=priority, on_done=on_done, params=params)
+        ahead = self.jobs.ahead_of(ctx)
+        if ahead:
+            self._log(t('log_job_queued', name, ahead))
+        return ctx
+
+    def _timed_job(self, fn):
+        """計測が有効なら、ジョブの段階ごとの処理時間をログとレポートに出す"""
+        def run(ctx):
+            if not timing.enabled():
+                return fn(ctx)
+            with timing.collect() as timings:
+                try:
+                    return fn(ctx)
+                finally:
+                    self._report_timings(ctx, timings)
+        return run
+
+    def _metered_job(self, fn):
+        """設定の metrics_dir があれば、フォルダ一括処理・監視のメトリクスを処理中から書き出す"""
+        def run(ctx):
+            directory = self.config_manager.get('metrics_dir')
+            if not directory or ctx.priority != jobs.PRIORITY_LOW:
+                return fn(ctx)
+            with metrics.export(directory, ctx.params.get("action", ctx.name), ctx.params,
+                                self.config_manager.get('metrics_interval_s', 5)) as exporter:
+                result = fn(ctx)
+                if exporter is not None and ctx.cancelled:
+                    exporter.status = "cancelled"
+                return result
+        return run
+
+    def _traced_job(self, fn):
+        """タイムラインの記録がオンなら、ジョブを Chrome trace-event 形式で TRACES_DIR に書き出す"""
+        def run(ctx):
+            if not self._trace_enabled:
+                return fn(ctx)
+            path = TRACES_DIR / f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_job{ctx.id}.json"
+            recorder = None
+            try:
+                with tracing.record(ctx.name, str(path), {"job": ctx.id, **ctx.params}) as recorder:
+                    return fn(ctx)
+            finally:
+                if recorder is not None and recorder.write_error:
+                    self._log(t('log_error', recorder.write_error), "warning")
+                elif recorder is not None:
+                    self._log(t('log_trace_saved', path))
+        return run
+
+    def _toggle_trace(self):
+        self._trace_enabled = self.trace_var.get()
+        self.config_manager.set('trace_enabled', self._trace_enabled)
+
+    def _profiled_job(self, fn):
+        """「次の処理をプロファイル」がオンなら、順番が来たジョブを cProfile / tracemalloc にかける（1回で解除）"""
+        def run(ctx):
+            if not profiling.armed():
+                return fn(ctx)
+            capture = None
+            try:
+                with profiling.capture(ctx.name, {"job": ctx.id, **ctx.params}) as capture:
+                    return fn(ctx)
+            finally:
+                if capture is not None and capture.write_error:
+                    self._log(t('log_error', capture.write_error), "warning")
+                elif capture is not None:
+                    self._log(t('log_profile_saved', ctx.name, os.path.dirname(capture.base)))
+                    for path in capture.paths:
+                        self._log(f"  📊 {os.path.basename(path)}")
+                    self.ui.call(lambda: self.profile_var.set(profiling.armed()))
+        return run
+
+    def _toggle_profile(self):
+        profiling.arm(self.profile_var.get())
+
+    def _report_timings(self, ctx, timings):
+        if not timings.spans:
+            return
+        self._log(t('log_timings', ctx.name, timings.elapsed, timings.summary()))
+        # ファイルごとの内訳は時間のかかった順に数件だけログへ（全件はレポート）
+        slowest = sorted(timings.files.items(), key=lambda kv: sum(kv[1].values()), reverse=True)
+        for file, spans in slowest[:TIMING_LOG_FILES]:
+            ranked = sorted(spans.items(), key=lambda kv: kv[1], reverse=True)[:timing.SUMMARY_TOP]
+            self._log(f"  ⏱ {file}: " + " · ".join(f"{name} {sec:.2f}s" for name, sec in ranked))
+        try:
+            path = TIMINGS_DIR / f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_job{ctx.id}.json"
+            timing.write_report(timings, str(path), job=ctx.name, params=ctx.params)
+            self._log(t('log_timings_saved', path))
+        except OSError as e:
+            self._log(t('log_error', e), "warning")
+
+    def _toggle_timing(self):
+        timing.set_enabled(self.timing_var.get())
+        self.config_manager.set('timing_enabled', self.timing_var.get())
+
+    def _on_job_state(self, ctx, state: str):
+        """ジョブの状態変化（Tk のスレッドで呼ばれる）"""
+        if state == jobs.STATE_RUNNING:
+            self._reset_progress()
+            self.progress.start(10)
+            self.cancel_btn.configure(state='normal')
+            return
+        if state == jobs.STATE_QUEUED:
+            return
+        if state == jobs.STATE_CANCELLED:
+            self._log(t('log_job_cancelled', ctx.name), "warning")
+        elif state == jobs.STATE_FAILED:
+            save_error_log(ctx.error, ctx.name)
+            self._log(t('log_error', ctx.error), "error")
+        if not self.jobs.busy:
+            self._reset_progress()
+            self.cancel_btn.configure(state='disabled')
+        elif self.jobs.current is None and not self.jobs.pending():
+            # 残っているのは監視などのバックグラウンドのジョブだけ
+            self._reset_progress()
+            self.progress.start(10)
+
+    def _reset_progress(self):
         self.progress.stop()
-        self.processing = False
-        self.root.after(0, lambda: self.cancel_btn.configure(state='disabled'))
+        self.progress.configure(mode='indeterminate', value=0)
+        self.progress_label.configure(text="")
+
+    def _show_progress(self, snap: Optional[Dict]):
+        """一括処理の進捗を表示する（Tk のスレッド。最初の1件で確定表示に切り替える）"""
+        if snap is None:
+            return
+        if str(self.progress.cget('mode')) != 'determinate':
+            self.progress.stop()
+            self.progress.configure(mode='determinate', maximum=100)
+        self.progress.configure(value=snap["fraction"] * 100)
+        self.progress_label.configure(text=t('progress_detail', int(snap["fraction"] * 100),
+                                             snap["files_done"], snap["files_total"],
+                                             snap["slides_per_s"], snap["files_per_s"],
+                                             progress.format_eta(snap["eta_s"])))
+
+    def _progress_tracker(self, ctx, scan) -> Optional["progress.ProgressTracker"]:
+        """事前スキャンして進捗の追跡を始める（設定で無効なら None）"""
+        if not self.config_manager.get('progress_prescan', True):
+            return None
+        self._log(t('log_prescan'))
+        weights = scan()
+        if ctx.cancelled:
+            return None
+        tracker = progress.ProgressTracker(weights)
+        self._log(t('log_prescan_done', tracker.files_total, tracker.slides_total))
+        self.ui.post_progress(tracker.snapshot())
+        return tracker
+
+    def _track(self, tracker, key: str):
+        """完了1件を記録し、間引いた上で進捗を UI に送る（ワーカースレッドから呼ぶ）"""
+        if tracker:
+            snap = tracker.advance(key)
+            if snap:
+                self.ui.post_progress(snap)
 
     def _cancel(self):
-        if self.processing:
-            self.cancel_requested = True
+        if self.jobs.cancel():
             self._log(t('log_cancel_request'), "warning")
 
     def _show_log_detail(self):
@@ -2174,6 +1727,23 @@ class InsightSlidesApp:
         dialog.transient(self.root)
         dialog.grab_set()
 
+        # 絞り込み・前のページ
+        top = tk.Frame(dialog, bg=COLOR_PALETTE["bg_primary"])
+        top.pack(fill='x', padx=SPACING["md"], pady=(SPACING["md"], 0))
+
+        filters = {t('log_filter_all'): None,
+                   t('log_filter_warning'): ("warning", "error"),
+                   t('log_filter_error'): ("error",)}
+        filter_var = tk.StringVar(value=t('log_filter_all'))
+        filter_box = ttk.Combobox(top, textvariable=filter_var, values=list(filters),
+                                  state='readonly', width=16)
+        filter_box.pack(side='left')
+        older_btn = ttk.Button(top, text=t('btn_load_older'))
+        older_btn.pack(side='left', padx=(SPACING["sm"], 0))
+        info_label = tk.Label(top, font=(FONT_FAMILY_SANS, 9), bg=COLOR_PALETTE["bg_primary"],
+                              fg=COLOR_PALETTE["text_tertiary"], anchor='e')
+        info_label.pack(side='right', fill='x', expand=True)
+
         # ログテキストエリア
         text_frame = ttk.Frame(dialog)
         text_frame.pack(fill='both', expand=True, padx=SPACING["md"], pady=SPACING["md"])
@@ -2185,25 +1755,50 @@ class InsightSlidesApp:
                                               relief="flat", bd=1)
         log_text.pack(fill='both', expand=True)
 
-        # ログ内容を表示
-        log_content = "".join(self.log_buffer) if self.log_buffer else "ログはありません"
-        log_text.insert('1.0', log_content)
-        log_text.configure(state=tk.DISABLED)
-        log_text.see(tk.END)
+        # 末尾から1ページずつ読み込む（前のページは先頭に足す）
+        view = {"oldest": None, "shown": 0}
+
+        def load_page(reset: bool = False):
+            if reset:
+                view["oldest"], view["shown"] = None, 0
+            page = self.log_buffer.tail(LOG_PAGE_LINES, filters.get(filter_var.get()), before=view["oldest"])
+            log_text.configure(state=tk.NORMAL)
+            if reset:
+                log_text.delete('1.0', tk.END)
+            if page:
+                view["oldest"] = page[0][0]
+                view["shown"] += len(page)
+                log_text.insert('1.0', "".join(entry[2] for entry in page))
+            elif reset:
+                log_text.insert('1.0', "ログはありません")
+            log_text.configure(state=tk.DISABLED)
+            if reset:
+                log_text.see(tk.END)
+            older_btn.configure(state='normal' if len(page) == LOG_PAGE_LINES else 'disabled')
+            info = t('log_dialog_info', view["shown"], len(self.log_buffer))
+            if self.log_buffer.dropped and self.log_buffer.spill_path:
+                info += "  " + t('log_dialog_spilled', self.log_buffer.dropped, self.log_buffer.spill_path.name)
+            info_label.configure(text=info)
+
+        older_btn.configure(command=load_page)
+        filter_box.bind("<<ComboboxSelected>>", lambda e: load_page(reset=True))
+        load_page(reset=True)
 
         # ボタンフレーム
         btn_frame = tk.Frame(dialog, bg=COLOR_PALETTE["bg_primary"])
         btn_frame.pack(fill='x', padx=SPACING["md"], pady=(0, SPACING["md"]))
 
         def copy_log():
-            content = "".join(self.log_buffer)
+            # 読み込み済み（表示中）の範囲をコピー
+            content = log_text.get('1.0', 'end-1c') if view["shown"] else ""
             if content:
                 self.root.clipboard_clear()
                 self.root.clipboard_append(content)
                 messagebox.showinfo("コピー完了", "ログをクリップボードにコピーしました")
 
         def clear_log():
-            self.log_buffer = []
+            self.log_buffer.clear()
+            load_page(reset=True)
             log_text.configure(state=tk.NORMAL)
             log_text.delete('1.0', tk.END)
             log_text.insert('1.0', "ログをクリアしました")
@@ -2236,91 +1831,31 @@ class InsightSlidesApp:
 
     # === Utility ===
     def clean_text(self, text):
-        if text is None:
-            return ""
-        text = re.sub(r'[\x00-\x08\x0B-\x0C\x0E-\x1F]', '', text)
-        text = text.replace('\r\n', '\n').replace('\r', '\n').replace('\v', '\n')
-        return text
+        return core.clean_text(text)
 
     def _normalize_for_compare(self, text):
-        if text is None:
-            return ""
-        text = text.replace('\r\n', '\n').replace('\r', '\n').replace('\v', '\n')
-        text = text.replace('\u00A0', ' ').replace('\u3000', ' ')
-        return text.strip()
+        return core.normalize_for_compare(text)
 
-    def _texts_are_equal(self, old_text, new_text):
-        return self._normalize_for_compare(old_text) == self._normalize_for_compare(new_text)
+    def _texts_are_equal(self, old_text, new_text, profile=None):
+        return core.texts_are_equal(old_text, new_text, profile)
 
     def get_shape_type(self, shape):
-        try:
-            if shape.is_placeholder:
-                types_ja = {1: "タイトル", 2: "本文", 3: "図表", 4: "日付", 5: "スライド番号"}
-                return types_ja.get(shape.placeholder_format.type, "その他")
-            elif hasattr(shape, "has_table") and shape.has_table:
-                return "表"
-            elif shape.shape_type == 1:
-                return "テキストボックス"
-            return "その他"
-        except:
-            return "不明"
+        return core.get_shape_type(shape)
 
     def _create_backup(self, path: str):
         if not self.license_manager.is_pro() or not self.auto_backup_var.get():
             return
         try:
-            backup_dir = Path(path).parent / "backup"
-            backup_dir.mkdir(exist_ok=True)
-            backup_name = f"{Path(path).stem}_{datetime.now().strftime('%Y%m%d_%H%M%S')}{Path(path).suffix}"
-            shutil.copy2(path, backup_dir / backup_name)
-            self._log(f"バックアップ作成: {backup_name}")
+            backup_path = core.create_backup(path)
+            self._log(f"バックアップ作成: {backup_path.name}")
         except Exception as e:
             self._log(f"バックアップ失敗: {e}", "warning")
 
     # === Extract ===
-    def extract_from_ppt(self, path: str, include_notes: bool = False) -> Tuple[List, Dict]:
+    def extract_from_ppt(self, path: str, include_notes: bool = False, should_cancel=None) -> Tuple[List, Dict]:
         try:
-            prs = pptx.Presentation(path)
-            data = []
-            meta = {'file_name': os.path.basename(path), 'slide_count': len(prs.slides)}
-
-            for slide_num, slide in enumerate(prs.slides, 1):
-                if self.cancel_requested:
-                    break
-                for shape in slide.shapes:
-                    try:
-                        sid = str(shape.shape_id)
-                        stype = self.get_shape_type(shape)
-
-                        if hasattr(shape, "text") and shape.text.strip():
-                            data.append({
-                                "slide": slide_num, "id": sid, "type": stype, "text": self.clean_text(shape.text)
-                            })
-
-                        if hasattr(shape, "has_table") and shape.has_table:
-                            for r, row in enumerate(shape.table.rows):
-                                for c, cell in enumerate(row.cells):
-                                    if cell.text.strip():
-                                        data.append({
-                                            "slide": slide_num, "id": f"{sid}_t{r}_{c}",
-                                            "type": f"表({r+1},{c+1})", "text": self.clean_text(cell.text)
-                                        })
-                    except:
-                        pass
-
-                if include_notes:
-                    try:
-                        if slide.has_notes_slide and slide.notes_slide.notes_text_frame:
-                            notes_text = slide.notes_slide.notes_text_frame.text.strip()
-                            if notes_text:
-                                data.append({
-                                    "slide": slide_num, "id": "notes", "type": t('type_notes'),
-                                    "text": self.clean_text(notes_text)
-                                })
-                    except:
-                        pass
-
-            return data, meta
+            return core.extract_from_ppt(path, include_notes, notes_label=t('type_notes'),
+                                         should_cancel=should_cancel)
         except Exception as e:
             save_error_log(e, f"extract_from_ppt: {path}")
             self._log(f"読み込みエラー: {e}", "error")
@@ -2328,205 +1863,173 @@ class InsightSlidesApp:
 
     def save_to_file(self, data: List[Dict], path: str, fmt: str = "excel") -> bool:
         try:
-            if fmt == "excel":
-                wb = openpyxl.Workbook()
-                ws = wb.active
-                ws.append([t('header_slide'), t('header_id'), t('header_type'), t('header_text')])
-                for row in data:
-                    ws.append([row["slide"], row["id"], row["type"], row["text"]])
-                wb.save(path)
-            elif fmt == "json":
-                with open(path, 'w', encoding='utf-8') as f:
-                    json.dump(data, f, ensure_ascii=False, indent=2)
-            else:
-                with open(path, 'w', encoding='utf-8', newline='') as f:
-                    w = csv.writer(f, delimiter='\t')
-                    w.writerow([t('header_slide'), t('header_id'), t('header_type'), t('header_text')])
-                    for row in data:
-                        w.writerow([row["slide"], row["id"], row["type"], row["text"]])
+            core.save_extracted(data, path, fmt, self._extract_headers())
             return True
         except Exception as e:
             save_error_log(e, f"save_to_file: {path}")
             self._log(f"保存エラー: {e}", "error")
             return False
 
+    def _extract_headers(self) -> List[str]:
+        return [t('header_slide'), t('header_id'), t('header_type'), t('header_text')]
+
     def _extract_single(self):
-        if self.processing:
-            return
         path = filedialog.askopenfilename(title="PowerPointファイルを選択", filetypes=[("PowerPoint", "*.pptx")])
         if not path:
             return
         self.config_manager.set('last_directory', os.path.dirname(path))
 
         include_notes = self.include_notes_var.get() if self.license_manager.is_pro() else False
+        filename = os.path.basename(path)
 
-        def run():
-            try:
-                self._start_progress()
-                self._update_status_safe(t('log_processing'))
-                self._update_output_safe(f"\n📄 処理開始: {os.path.basename(path)}\n", clear=True)
-
-                data, meta = self.extract_from_ppt(path, include_notes)
-                if self.cancel_requested:
-                    return self._log(t('log_cancelled'), "warning")
-
-                if data:
-                    # 読み込んだファイルパスを保存
-                    self.loaded_pptx_path = path
-
-                    # ファイル情報を更新
-                    filename = os.path.basename(path)
-                    slide_count = meta.get('slide_count', 0)
-                    self.root.after(0, lambda: self._update_file_info(filename, len(data), slide_count))
-
-                    # グリッドにロード
-                    self.extracted_data = data
-                    self.root.after(0, lambda: self.grid_view.load_data(data))
-                    self.root.after(0, lambda: self._show_edit_area())
-
-                    # ファイル保存（デフォルトはExcel）
-                    out = os.path.splitext(path)[0] + "_抽出.xlsx"
-                    if self.save_to_file(data, out, "excel"):
-                        self._log(f"✅ {t('status_complete_items', len(data))} → {os.path.basename(out)}", "success")
-                        self._update_status_safe(t('status_complete_items', len(data)))
-                else:
-                    self._log(t('log_no_text'), "warning")
-            except Exception as e:
-                save_error_log(e, "_extract_single")
-                self._log(t('log_error', e), "error")
-            finally:
-                self._stop_progress()
+        def run(ctx):
+            self._update_status_safe(t('log_processing'))
+            self._update_output_safe(f"\n📄 処理開始: {filename}\n", clear=True)
 
-        threading.Thread(target=run, daemon=True).start()
+            data, meta = self.extract_from_ppt(path, include_notes, should_cancel=ctx.token)
+            ctx.check()
+
+            for warning in meta.get('errors', []):
+                self._log(t('log_shape_skipped', warning), "warning")
+
+            if not data:
+                self._log(t('log_no_text'), "warning")
+                return None
+
+            # ファイル保存（デフォルトはExcel）
+            out = os.path.splitext(path)[0] + "_抽出.xlsx"
+            if self.save_to_file(data, out, "excel"):
+                self._log(f"✅ {t('status_complete_items', len(data))} → {os.path.basename(out)}", "success")
+                self._update_status_safe(t('status_complete_items', len(data)))
+            return data, meta.get('slide_count', 0)
+
+        def done(ctx):
+            # グリッドへの反映は Tk のスレッドで行う
+            if ctx.state != jobs.STATE_DONE or not ctx.result:
+                return
+            data, slide_count = ctx.result
+            self.loaded_pptx_path = path
+            self.extracted_data = data
+            self._update_file_info(filename, len(data), slide_count)
+            self.grid_view.load_data(data)
+            self._show_edit_area()
+
+        self._submit_job(f"{t('btn_load_pptx')}: {filename}", run, jobs.PRIORITY_HIGH, on_done=done,
+                         params={"action": "extract", "path": path})
 
     def _extract_batch(self, format: str = "excel"):
         """フォルダ一括抽出 (excel/json)"""
-        if self.processing:
-            return
         folder = filedialog.askdirectory(title=t('dialog_select_folder'))
         if not folder:
             return
 
         include_notes = self.include_notes_var.get() if self.license_manager.is_pro() else False
-        ext = ".xlsx" if format == "excel" else ".json"
+        mode = self._ask_batch_mode(folder, "extract", format)
+        if mode is None:
+            return
+        recursive = self.include_subfolders_var.get()
 
-        def run():
+        def run(ctx):
             try:
-                self._start_progress()
                 self._update_output_safe(f"\n📁 フォルダ一括出力 ({format.upper()}): {folder}\n", clear=True)
-
-                files = [f for f in Path(folder).glob("*.pptx") if not f.name.startswith("~$")]
-                if not files:
+                tracker = self._progress_tracker(ctx, lambda: progress.scan_extract(folder, recursive,
+                                                                                    should_stop=ctx.token))
+
+                def on_progress(done, count, res):
+                    self._track(tracker, res["path"])
+                    if res["status"] == batch.RESULT_CACHED:
+                        return  # 前回処理済みの件数は完了後に _log_cached でまとめて出す
+                    if res["status"] == batch.RESULT_ERROR:
+                        self._log(f"[{done}/{count}] {res['file']}: 読み込みエラー: {res['error']}", "error")
+                    else:
+                        self._log(f"[{done}/{count}] {res['file']}")
+                    for warning in res.get("warnings", []):
+                        self._log(f"  {t('log_shape_skipped', warning)}", "warning")
+
+                results = batch.extract_folder(folder, format, include_notes, notes_label=t('type_notes'),
+                                               headers=self._extract_headers(), on_progress=on_progress,
+                                               should_cancel=ctx.token, mode=mode,
+                                               recursive=recursive)
+                if not results:
                     return self._log(t('log_no_pptx_found'), "warning")
+                self._log_cached(results)
+                self._log_pool_stats()
+                total = sum(r["items"] for r in results if r["status"] == batch.RESULT_OK)
+                self._log(f"✅ {t('status_batch_complete', total, format.upper())}", "success")
+            except Exception as e:
+                self._log(t('log_error', e), "error")
 
-                self._log(t('log_found_files', len(files)))
-                total = 0
+        self._submit_job(f"{t('btn_batch_extract')}: {os.path.basename(folder)}", run, jobs.PRIORITY_LOW,
+                         params={"action": "batch_extract", "folder": folder, "format": format,
+                                 "include_notes": include_notes, "mode": mode, "recursive": recursive})
 
-                for i, f in enumerate(files, 1):
-                    if self.cancel_requested:
-                        break
-                    self._log(f"[{i}/{len(files)}] {f.name}")
-                    data, meta = self.extract_from_ppt(str(f), include_notes)
-                    if data:
-                        out = str(f.with_suffix('')) + f"_抽出{ext}"
-                        self.save_to_file(data, out, format)
-                        total += len(data)
+    def _ask_batch_mode(self, folder: str, operation: str, format: str) -> Optional[str]:
+        """前回の実行記録があれば再開するか確認（キャンセル時は None）"""
+        if not os.path.exists(batch.manifest_path(folder, operation, format)):
+            return batch.RUN_ALL
+        answer = messagebox.askyesnocancel(t('dialog_resume_title'), t('dialog_resume_batch'))
+        if answer is None:
+            return None
+        return batch.RUN_RESUME if answer else batch.RUN_ALL
+
+    def _log_cached(self, results: List[Dict]):
+        cached = sum(1 for r in results if r["status"] == batch.RESULT_CACHED)
+        if cached:
+            self._log(t('log_batch_cached', cached))
+
+    def _log_pool_stats(self):
+        stats = batch.last_pool_stats()
+        if stats:
+            from insightslides_pool import format_stats
+            self._log(t('log_pool_stats', format_stats(stats)))
+
+    def _start_worker_pool(self):
+        """一括処理が使えて設定が有効なら、常駐ワーカープールをバックグラウンドで起動する"""
+        cfg = self.config_manager
+        if self.worker_pool or not self.license_manager.can_batch() or not cfg.get('prewarm_workers', True):
+            return
 
-                self._log(f"✅ {t('status_batch_complete', total, format.upper())}", "success")
+        def run():
+            try:
+                from insightslides_pool import WorkerPool
+
+                pool = WorkerPool(cfg.get('pool_workers') or None,
+                                  max_tasks_per_child=cfg.get('pool_max_tasks_per_child', 200),
+                                  max_rss_mb=cfg.get('pool_max_rss_mb', 1024),
+                                  task_timeout=cfg.get('task_timeout_s', 600),
+                                  task_max_rss_mb=cfg.get('task_max_rss_mb', 4096)).start()
+                self.worker_pool = pool
+                batch.set_shared_pool(pool)
+                deadline = time.monotonic() + 120
+                while not pool.warm and time.monotonic() < deadline:
+                    time.sleep(0.2)
+                stats = pool.stats()
+                if stats["warm"]:
+                    self._log(t('log_pool_ready', stats["workers"], stats["warmup_s"]))
             except Exception as e:
-                self._log(t('log_error', e), "error")
-            finally:
-                self._stop_progress()
+                # 起動できなくても一括処理は処理ごとにワーカーを作って動く
+                save_error_log(e, "_start_worker_pool")
 
         threading.Thread(target=run, daemon=True).start()
 
     # === Update ===
     def _load_updates(self, path: str, source: str) -> Dict:
-        updates = {}
         try:
-            if source == "excel":
-                wb = openpyxl.load_workbook(path)
-                ws = wb.active
-                headers = [c.value for c in ws[1]]
-                try:
-                    si = headers.index("スライド番号") if "スライド番号" in headers else headers.index("slide")
-                    oi = headers.index("オブジェクトID") if "オブジェクトID" in headers else headers.index("id")
-                    ti = headers.index("テキスト内容") if "テキスト内容" in headers else headers.index("text")
-                except:
-                    self._log(t('log_invalid_header'), "error")
-                    return {}
-                for row in list(ws.rows)[1:]:
-                    try:
-                        sn = int(row[si].value) if row[si].value else None
-                        oid = str(row[oi].value) if row[oi].value else None
-                        txt = str(row[ti].value) if row[ti].value else ""
-                        if txt == "None":
-                            txt = ""
-                        if sn and oid:
-                            updates[(sn, oid)] = txt
-                    except:
-                        pass
-            elif source == "json":
-                with open(path, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                for item in data:
-                    sn = item.get('スライド番号') or item.get('slide')
-                    oid = item.get('オブジェクトID') or item.get('id')
-                    txt = item.get('テキスト内容') or item.get('text', '')
-                    if sn and oid:
-                        updates[(int(sn), str(oid))] = str(txt)
+            return core.load_updates(path, source)
+        except core.InvalidHeaderError:
+            self._log(t('log_invalid_header'), "error")
         except Exception as e:
             self._log(f"読み込みエラー: {e}", "error")
-        return updates
-
-    def _update_ppt(self, ppt_path: str, updates: Dict, preview: bool = False) -> Tuple[int, int, List]:
-        limit = self.license_manager.get_update_limit()
-        self.presentation = pptx.Presentation(ppt_path)
-        updated, skipped = 0, 0
-        changes = []
-
-        for slide_idx, slide in enumerate(self.presentation.slides, 1):
-            if self.cancel_requested:
-                break
-            if limit and slide_idx > limit:
-                skipped += len([k for k in updates if k[0] == slide_idx])
-                continue
-
-            for shape in slide.shapes:
-                try:
-                    sid = str(shape.shape_id)
-                    key = (slide_idx, sid)
-
-                    if key in updates and hasattr(shape, "text"):
-                        new_txt = updates[key]
-                        old_txt = shape.text
-                        if not self._texts_are_equal(old_txt, new_txt):
-                            changes.append({'slide': slide_idx, 'id': sid, 'old': old_txt[:50], 'new': new_txt[:50]})
-                            if not preview:
-                                shape.text = self._normalize_for_compare(new_txt)
-                                updated += 1
-
-                    if hasattr(shape, "has_table") and shape.has_table:
-                        for r, row in enumerate(shape.table.rows):
-                            for c, cell in enumerate(row.cells):
-                                ckey = (slide_idx, f"{sid}_t{r}_{c}")
-                                if ckey in updates:
-                                    new_txt = updates[ckey]
-                                    old_txt = cell.text
-                                    if not self._texts_are_equal(old_txt, new_txt):
-                                        changes.append({'slide': slide_idx, 'id': ckey[1], 'old': old_txt[:30], 'new': new_txt[:30]})
-                                        if not preview:
-                                            cell.text = self._normalize_for_compare(new_txt)
-                                            updated += 1
-                except Exception as e:
-                    skipped += 1
+        return {}
 
-        return updated, skipped, changes
+    def _update_ppt(self, ctx, ppt_path: str, updates: Dict, preview: bool = False, profile=None) -> Tuple[int, int, List]:
+        # Presentation はジョブごとに持つ（後から積んだジョブに置き換えられない）
+        ctx.presentation = core.load_presentation(ppt_path)
+        return core.apply_updates(ctx.presentation, updates, preview=preview,
+                                  limit=self.license_manager.get_update_limit(), profile=profile,
+                                  should_cancel=ctx.token)
 
     def _run_update(self, source: str):
-        if self.processing:
-            return
-
         limit = self.license_manager.get_update_limit()
         if limit:
             if not messagebox.askyesno("確認", f"Free版では最初の{limit}スライドのみ更新されます。続行しますか？"):
@@ -2540,9 +2043,8 @@ class InsightSlidesApp:
         if not ppt_path:
             return
 
-        def run():
+        def run(ctx):
             try:
-                self._start_progress()
                 self._update_output_safe(f"\n📥 更新処理開始\n", clear=True)
                 self._create_backup(ppt_path)
 
@@ -2551,26 +2053,25 @@ class InsightSlidesApp:
                     return self._log(t('log_no_update_data'), "warning")
 
                 self._log(f"読み込み: {len(updates)}件")
-                updated, skipped, _ = self._update_ppt(ppt_path, updates)
-
-                if self.cancel_requested:
-                    return
-
-                def save():
-                    out = filedialog.asksaveasfilename(defaultextension=".pptx", filetypes=[("PowerPoint", "*.pptx")],
-                                                       initialfile=os.path.splitext(os.path.basename(ppt_path))[0] + "_更新済み.pptx")
-                    if out:
-                        self.presentation.save(out)
-                        self._log(f"✅ 保存完了: {os.path.basename(out)}", "success")
-                        messagebox.showinfo(t('dialog_complete'), t('result_updated', updated, skipped))
-
-                self.root.after(0, save)
+                updated, skipped, _ = self._update_ppt(ctx, ppt_path, updates)
+                return updated, skipped
             except Exception as e:
                 self._log(t('log_error', e), "error")
-            finally:
-                self._stop_progress()
 
-        threading.Thread(target=run, daemon=True).start()
+        def save(ctx):
+            if ctx.state != jobs.STATE_DONE or not ctx.result:
+                return
+            updated, skipped = ctx.result
+            out = filedialog.asksaveasfilename(defaultextension=".pptx", filetypes=[("PowerPoint", "*.pptx")],
+                                               initialfile=os.path.splitext(os.path.basename(ppt_path))[0] + "_更新済み.pptx")
+            if out:
+                core.save_presentation(ctx.presentation, out)
+                self._log(f"✅ 保存完了: {os.path.basename(out)}", "success")
+                messagebox.showinfo(t('dialog_complete'), t('result_updated', updated, skipped))
+
+        label = t('btn_from_excel') if source == "excel" else t('btn_from_json')
+        self._submit_job(f"{label}: {os.path.basename(ppt_path)}", run, jobs.PRIORITY_HIGH, on_done=save,
+                         params={"action": "update", "source": source, "data": data_path, "pptx": ppt_path})
 
     def _update_excel(self):
         self._run_update("excel")
@@ -2580,73 +2081,53 @@ class InsightSlidesApp:
 
     def _update_batch(self, format: str = "excel"):
         """フォルダ内のExcel/JSONファイルとPPTXを一括更新"""
-        if self.processing:
-            return
-
-        ext = ".xlsx" if format == "excel" else ".json"
+        ext = core.EXTRACT_EXTENSIONS[format]
         folder = filedialog.askdirectory(title=t('dialog_select_folder_update', ext))
         if not folder:
             return
+        backup = self.license_manager.is_pro() and self.auto_backup_var.get()
+        mode = self._ask_batch_mode(folder, "update", format)
+        if mode is None:
+            return
+        recursive = self.include_subfolders_var.get()
 
-        def run():
+        def run(ctx):
             try:
-                self._start_progress()
                 self._update_output_safe(f"\n📁 フォルダ一括読込 ({format.upper()}): {folder}\n", clear=True)
+                tracker = self._progress_tracker(ctx, lambda: progress.scan_update(folder, format, recursive,
+                                                                                   should_stop=ctx.token))
 
-                folder_path = Path(folder)
-
-                # 指定形式のファイルを検索
-                data_files = list(folder_path.glob(f"*_抽出{ext}"))
+                def on_progress(done, count, res):
+                    self._track(tracker, res["path"])
+                    if res["status"] == batch.RESULT_CACHED:
+                        return
+                    prefix = f"[{done}/{count}] {res['file']}"
+                    if res["status"] == batch.RESULT_OK:
+                        self._log(f"{prefix}\n  → {res['updated']}件更新, 保存: {os.path.basename(res['output'])}")
+                    elif res["status"] == batch.RESULT_SKIPPED:
+                        self._log(f"{prefix}: {res['error']} (スキップ)", "warning")
+                    else:
+                        self._log(f"{prefix}\n  → エラー: {res['error']}", "error")
 
-                if not data_files:
+                results = batch.update_folder(folder, format, limit=self.license_manager.get_update_limit(),
+                                              backup=backup, on_progress=on_progress,
+                                              should_cancel=ctx.token, mode=mode,
+                                              recursive=recursive)
+                if not results:
                     return self._log(f"抽出ファイル (*_抽出{ext}) が見つかりません", "warning")
-
-                self._log(t('log_found_files', len(data_files)))
-                updated_count = 0
-                error_count = 0
-
-                for i, data_file in enumerate(data_files, 1):
-                    if self.cancel_requested:
-                        break
-
-                    # 対応するPPTXファイルを検索
-                    base_name = data_file.stem.replace("_抽出", "")
-                    pptx_path = folder_path / f"{base_name}.pptx"
-
-                    if not pptx_path.exists():
-                        self._log(f"[{i}/{len(data_files)}] {data_file.name}: PPTXなし (スキップ)", "warning")
-                        continue
-
-                    self._log(f"[{i}/{len(data_files)}] {pptx_path.name}")
-
-                    try:
-                        updates = self._load_updates(str(data_file), format)
-
-                        if not updates:
-                            self._log(f"  → 更新データなし", "warning")
-                            continue
-
-                        self._create_backup(str(pptx_path))
-                        updated, skipped, _ = self._update_ppt(str(pptx_path), updates)
-
-                        # 更新済みファイルを保存
-                        out_path = folder_path / f"{base_name}_更新済み.pptx"
-                        self.presentation.save(str(out_path))
-                        self._log(f"  → {updated}件更新, 保存: {out_path.name}")
-                        updated_count += 1
-
-                    except Exception as e:
-                        self._log(f"  → エラー: {e}", "error")
-                        error_count += 1
+                self._log_cached(results)
+                self._log_pool_stats()
+                summary = batch.summarize_results(results)
+                updated_count, error_count = summary["ok"], summary["errors"]
 
                 self._log(f"\n✅ バッチ読込完了 ({format.upper()}): {updated_count}件成功, {error_count}件エラー", "success")
 
             except Exception as e:
                 self._log(t('log_error', e), "error")
-            finally:
-                self._stop_progress()
 
-        threading.Thread(target=run, daemon=True).start()
+        self._submit_job(f"{t('btn_batch_update')}: {os.path.basename(folder)}", run, jobs.PRIORITY_LOW,
+                         params={"action": "batch_update", "folder": folder, "format": format,
+                                 "backup": backup, "mode": mode, "recursive": recursive})
 
     def _run_preview(self):
         data_path = filedialog.askopenfilename(title="編集済みファイルを選択", filetypes=[("Excel/TXT", "*.xlsx *.txt")])
@@ -2656,16 +2137,15 @@ class InsightSlidesApp:
         if not ppt_path:
             return
 
-        def run():
+        def run(ctx):
             try:
-                self._start_progress()
                 self._update_output_safe(f"\n👁 差分プレビュー\n", clear=True)
                 source = "excel" if data_path.endswith('.xlsx') else "json"
                 updates = self._load_updates(data_path, source)
                 if not updates:
                     return self._log(t('log_no_update_data'), "warning")
 
-                _, _, changes = self._update_ppt(ppt_path, updates, preview=True)
+                _, _, changes = self._update_ppt(ctx, ppt_path, updates, preview=True)
                 if changes:
                     self._log(f"\n変更箇所: {len(changes)}件")
                     for i, c in enumerate(changes[:20], 1):
@@ -2674,67 +2154,108 @@ class InsightSlidesApp:
                     self._log("変更箇所なし")
             except Exception as e:
                 self._log(t('log_error', e), "error")
-            finally:
-                self._stop_progress()
 
-        threading.Thread(target=run, daemon=True).start()
+        self._submit_job(f"{t('btn_diff_preview')}: {os.path.basename(ppt_path)}", run, jobs.PRIORITY_HIGH,
+                         params={"action": "preview", "data": data_path, "pptx": ppt_path})
 
     # === 比較機能 ===
     def _show_compare_dialog(self):
-        CompareDialog(self.root, self._run_compare)
+        CompareDialog(self.root, self._run_compare, on_export=self._run_compare_export)
 
-    def _run_compare(self, file1: str, file2: str, ignore_ws: bool):
-        def run():
+    def _run_compare(self, file1: str, file2: str, profile: str = core.DEFAULT_PROFILE):
+        def run(ctx):
             try:
-                self._start_progress()
                 self._update_output_safe(f"\n🔀 比較処理中...\n", clear=True)
 
-                data1, _ = self.extract_from_ppt(file1)
-                data2, _ = self.extract_from_ppt(file2)
-
-                # マッピング
-                map1 = {(d["slide"], d["id"]): d["text"] for d in data1}
-                map2 = {(d["slide"], d["id"]): d["text"] for d in data2}
-
-                all_keys = set(map1.keys()) | set(map2.keys())
-                diff_data = []
-                stats = {"same": 0, "changed": 0, "added": 0, "removed": 0}
-
-                for key in sorted(all_keys):
-                    t1 = map1.get(key)
-                    t2 = map2.get(key)
-
-                    if t1 and t2:
-                        if self._texts_are_equal(t1, t2):
-                            status = "一致"
-                            stats["same"] += 1
-                        else:
-                            status = "変更"
-                            stats["changed"] += 1
-                    elif t1:
-                        status = "削除"
-                        stats["removed"] += 1
-                    else:
-                        status = "追加"
-                        stats["added"] += 1
+                data1, _ = self.extract_from_ppt(file1, should_cancel=ctx.token)
+                data2, _ = self.extract_from_ppt(file2, should_cancel=ctx.token)
+                if ctx.cancelled:
+                    return None
+                diff_data, stats = core.compare_texts(data1, data2, detect_moves=True, profile=profile)
 
-                    diff_data.append({
-                        "slide": key[0], "id": key[1], "status": status,
-                        "before": t1 or "", "after": t2 or ""
-                    })
+                self._log(f"比較完了: 一致{stats['same']} 変更{stats['changed']} 追加{stats['added']} 削除{stats['removed']} 移動{stats['moved']}")
+                return diff_data, stats
+            except Exception as e:
+                self._log(t('log_error', e), "error")
+
+        def show(ctx):
+            if ctx.state != jobs.STATE_DONE or not ctx.result:
+                return
+            diff_data, stats = ctx.result
+            CompareResultWindow(self.root, os.path.basename(file1), os.path.basename(file2),
+                                diff_data, stats, on_apply=self._apply_compare_result)
 
+        self._submit_job(f"{t('btn_compare_pptx')}: {os.path.basename(file2)}", run, jobs.PRIORITY_HIGH, on_done=show,
+                         params={"action": "compare", "file1": file1, "file2": file2, "profile": profile})
+
+    def _run_compare_export(self, file1: str, file2: str, profile: str, out_path: str):
+        """比較結果をUIに載せず、差分行を生成しながら直接ファイルに書き出す"""
+        fmt = "jsonl" if out_path.lower().endswith(".jsonl") else "csv"
+
+        def run(ctx):
+            try:
+                self._update_output_safe(f"\n🔀 比較処理中 (直接出力)...\n", clear=True)
+                stats = core.stream_compare(file1, file2, out_path, fmt=fmt, profile=profile,
+                                            should_cancel=ctx.token)
+                if ctx.cancelled:
+                    return None
                 self._log(f"比較完了: 一致{stats['same']} 変更{stats['changed']} 追加{stats['added']} 削除{stats['removed']}")
+                self._log(f"✅ {t('result_csv_saved')}: {os.path.basename(out_path)}", "success")
+            except Exception as e:
+                save_error_log(e, "_run_compare_export")
+                self._log(t('log_error', e), "error")
 
-                self.root.after(0, lambda: CompareResultWindow(
-                    self.root, os.path.basename(file1), os.path.basename(file2),
-                    diff_data, stats, on_apply=self._apply_compare_result
-                ))
+        self._submit_job(f"{t('btn_compare_pptx')}: {os.path.basename(out_path)}", run, jobs.PRIORITY_HIGH,
+                         params={"action": "compare_export", "file1": file1, "file2": file2,
+                                 "profile": profile, "output": out_path})
+
+    def _compare_batch(self):
+        """フォルダ比較: 2フォルダのPPTXをファイル名で対応付けて一括比較"""
+        folder1 = filedialog.askdirectory(title=t('dialog_select_compare_before'))
+        if not folder1:
+            return
+        folder2 = filedialog.askdirectory(title=t('dialog_select_compare_after'))
+        if not folder2:
+            return
+        out_path = filedialog.asksaveasfilename(
+            title="保存先を選択",
+            defaultextension=".xlsx",
+            filetypes=[("Excel", "*.xlsx"), ("CSV", "*.csv")],
+            initialfile="フォルダ比較.xlsx",
+            initialdir=folder2
+        )
+        if not out_path:
+            return
+
+        def run(ctx):
+            try:
+                self._update_output_safe(f"\n🔀 フォルダ比較: {folder1} ↔ {folder2}\n", clear=True)
+                tracker = self._progress_tracker(ctx, lambda: progress.scan_compare(folder1, folder2))
+
+                def on_progress(done, total, result):
+                    self._track(tracker, result["file"])
+                    s = result["stats"]
+                    msg = f"[{done}/{total}] {result['file']} ({result['pair']}) 一致{s['same']} 変更{s['changed']} 追加{s['added']} 削除{s['removed']} 移動{s['moved']}"
+                    if result["error"]:
+                        self._log(f"{msg} - {result['error']}", "error")
+                    else:
+                        self._log(msg)
+
+                results = batch.compare_folders(folder1, folder2, on_progress=on_progress,
+                                                should_cancel=ctx.token)
+                if not results:
+                    return self._log(t('log_no_pptx_found'), "warning")
+
+                batch.write_folder_compare(results, out_path)
+                total = batch.summarize_folder_compare(results)
+                self._log(f"✅ {t('status_batch_compare_complete', total['files'], total['same'], total['changed'], total['added'], total['removed'], total['moved'])} → {os.path.basename(out_path)}", "success")
             except Exception as e:
+                save_error_log(e, "_compare_batch")
                 self._log(t('log_error', e), "error")
-            finally:
-                self._stop_progress()
 
-        threading.Thread(target=run, daemon=True).start()
+        self._submit_job(f"{t('btn_batch_compare')}: {os.path.basename(folder2)}", run, jobs.PRIORITY_LOW,
+                         params={"action": "batch_compare", "folder1": folder1, "folder2": folder2,
+                                 "output": out_path})
 
     def _apply_compare_result(self, selected_data: List[Dict]):
         # 比較結果をグリッドに反映
@@ -2796,23 +2317,28 @@ class InsightSlidesApp:
         if not out_path:
             return
 
-        def run():
+        def run(ctx):
             try:
-                self._start_progress()
                 self._log(f"グリッドから更新: {len(updates)}件")
                 self._create_backup(ppt_path)
 
-                updated, skipped, _ = self._update_ppt(ppt_path, updates)
+                updated, skipped, _ = self._update_ppt(ctx, ppt_path, updates)
+                if ctx.cancelled:
+                    return None
 
-                self.presentation.save(out_path)
+                core.save_presentation(ctx.presentation, out_path)
                 self._log(f"✅ 保存完了: {out_path}", "success")
-                self.root.after(0, lambda: messagebox.showinfo(t('dialog_complete'), t('status_update_complete', updated)))
+                return updated
             except Exception as e:
                 self._log(t('log_error', e), "error")
-            finally:
-                self._stop_progress()
 
-        threading.Thread(target=run, daemon=True).start()
+        def done(ctx):
+            if ctx.state == jobs.STATE_DONE and ctx.result is not None:
+                messagebox.showinfo(t('dialog_complete'), t('status_update_complete', ctx.result))
+
+        self._submit_job(f"{t('btn_apply')}: {os.path.basename(out_path)}", run, jobs.PRIORITY_HIGH, on_done=done,
+                         params={"action": "grid_apply", "pptx": ppt_path, "updates": len(updates),
+                                 "output": out_path})
 
     def _export_grid_excel(self):
         data = self.grid_view.get_data()
@@ -2874,6 +2400,7 @@ class InsightSlidesApp:
             return
 
         try:
+            import openpyxl
             wb = openpyxl.load_workbook(path)
             ws = wb.active
             headers = [c.value for c in ws[1]]
@@ -2972,6 +2499,38 @@ class InsightSlidesApp:
         """フォルダ一括更新（Excel形式）"""
         self._update_batch("excel")
 
+    def _watch_folder(self):
+        """フォルダ監視: 追加・更新された PPTX をキャンセルされるまで自動抽出"""
+        folder = filedialog.askdirectory(title=t('dialog_select_folder'))
+        if not folder:
+            return
+        include_notes = self.include_notes_var.get() if self.license_manager.is_pro() else False
+
+        def on_event(record):
+            name = os.path.relpath(record["file"], folder)
+            if record["event"] == watch.EVENT_EXTRACTED:
+                self._log(f"✅ {name} → {os.path.basename(record['output'])} ({record['items']}件)", "success")
+            elif record["event"] == watch.EVENT_ERROR:
+                self._log(f"{name}: 読み込みエラー: {record['error']}", "error")
+            elif record["event"] == watch.EVENT_UNCHANGED:
+                self._log(f"{name}: 内容に変更なし (スキップ)")
+
+        def run(ctx):
+            try:
+                self._update_output_safe(f"\n📡 {t('log_watch_started', folder)}\n", clear=True)
+                watcher = watch.FolderWatcher(folder, "excel", include_notes, notes_label=t('type_notes'),
+                                              headers=self._extract_headers(), on_event=on_event)
+                watcher.run(ctx.token)
+                s = watcher.stats
+                self._log(t('log_watch_stopped', s['extracted'], s['unchanged'], s['errors']), "success")
+            except Exception as e:
+                save_error_log(e, "_watch_folder")
+                self._log(t('log_error', e), "error")
+
+        self._submit_job(f"{t('btn_watch_folder')}: {os.path.basename(folder)}", run, jobs.PRIORITY_LOW,
+                         params={"action": "watch", "folder": folder, "include_notes": include_notes},
+                         background=True)
+
     # === Dialogs ===
     def _check_license_on_startup(self):
         """起動時のライセンスチェック"""
@@ -3122,6 +2681,7 @@ class InsightSlidesApp:
                 error_var.set("")
                 dialog.destroy()
                 self._create_layout()
+                self._start_worker_pool()
             else:
                 error_var.set(msg)
 
@@ -3171,10 +2731,17 @@ class InsightSlidesApp:
         if self.processing:
             if not messagebox.askokcancel(t('dialog_confirm_title'), t('dialog_processing_exit')):
                 return
+        self.jobs.shutdown()
+        if self.worker_pool:
+            batch.set_shared_pool(None)
+            self.worker_pool.shutdown(wait=False)
+        self.log_buffer.close()
         self.root.destroy()
 
 
 def main():
+    # PyInstaller(EXE)でプロセスプールを使うために必要
+    multiprocessing.freeze_support()
     try:
         import ctypes
         ctypes.windll.shcore.SetProcessDpiAwareness(1)
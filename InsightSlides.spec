@@ -33,6 +33,25 @@ a = Analysis(
         'tksheet',
         'tkinter',
         'tkinter.ttk',
+
+        # app modules (CLI / i18n tables are imported lazily)
+        'insightslides_cli',
+        'insightslides_core',
+        'insightslides_batch',
+        'insightslides_config',
+        'insightslides_i18n',
+        'insightslides_license',
+        'insightslides_service',
+        'insightslides_watch',
+        'insightslides_shard',
+        'insightslides_pool',
+        'insightslides_jobs',
+        'insightslides_log',
+        'insightslides_progress',
+        'insightslides_metrics',
+        'insightslides_profile',
+        'insightslides_timing',
+        'insightslides_trace',
     ],
     hookspath=[],
     hooksconfig={},
@@ -0,0 +1,38 @@
+# -*- coding: utf-8 -*-
+"""
+ベンチマーク共通処理
+
+各ベンチマークは結果を同じ JSON 形式で標準出力に書き出す:
+    {"benchmark": 名前, "python": バージョン, "platform": ..., ["params": 実行条件,] "results": [{"name": ..., ...}]}
+"""
+import json
+import os
+import platform
+import sys
+import timeit
+from typing import Callable, Dict, List, Optional
+
+# リポジトリ直下のモジュール (insightslides_core など) を import できるようにする
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+
+def time_call(func: Callable[[], object], repeat: int = 5, number: int = 1) -> Dict:
+    """func を number 回 × repeat セット計測し、1回あたりの最小/中央値（秒）を返す"""
+    timings = sorted(t / number for t in timeit.repeat(func, repeat=repeat, number=number))
+    return {"min_s": timings[0], "median_s": timings[len(timings) // 2], "repeat": repeat, "number": number}
+
+
+def report(benchmark: str, results: List[Dict], params: Optional[Dict] = None):
+    """結果を JSON で書き出す（params を渡すと、実行条件として "params" に載せる）"""
+    out = {
+        "benchmark": benchmark,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+    }
+    if params is not None:
+        out["params"] = params
+    out["results"] = results
+    json.dump(out, sys.stdout, ensure_ascii=False, indent=2)
+    sys.stdout.write("\n")
@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+"""
+ベンチマーク用の合成デッキ生成（python-pptx が必要）
+
+同じ引数なら同じ内容のデッキを作る（乱数は seed 固定）。
+スライド数・テキストボックス数・表の行×列・ノート・埋め込みメディアの大きさ・
+本文の言語（日本語 / 英語 / 混在）を指定できる。
+"""
+import math
+import os
+import random
+import struct
+import zlib
+from typing import List
+
+_WORDS_JA = "売上 前年比 増加 新規 顧客 獲得 好調 市場 分析 資料 第四半期 施策 計画 実績 課題".split()
+_WORDS_EN = "revenue growth customer market analysis quarter plan result issue strategy".split()
+
+LANGS = ("mixed", "ja", "en")
+
+
+def _sentence(rnd: random.Random, words: int, lang: str = "mixed") -> str:
+    if lang == "mixed":
+        vocab = _WORDS_JA if rnd.random() < 0.6 else _WORDS_EN
+    else:
+        vocab = _WORDS_JA if lang == "ja" else _WORDS_EN
+    return " ".join(rnd.choice(vocab) for _ in range(words))
+
+
+def table_arg(value: str):
+    """コマンドライン引数の "行x列"（例: 4x3）を (行, 列) にする"""
+    import argparse
+
+    try:
+        rows, cols = (int(v) for v in value.lower().split("x"))
+    except ValueError:
+        raise argparse.ArgumentTypeError("行x列 で指定してください（例: 4x3）")
+    if rows < 1 or cols < 1:
+        raise argparse.ArgumentTypeError("行・列は1以上")
+    return rows, cols
+
+
+def make_png(size_bytes: int, seed: int = 0) -> bytes:
+    """およそ size_bytes の PNG（乱数の画素で圧縮が効かない、メディアの重しにする）"""
+    side = max(1, int(math.sqrt(size_bytes / 3)))
+    rnd = random.Random(seed)
+    raw = b"".join(b"\x00" + rnd.randbytes(side * 3) for _ in range(side))
+
+    def chunk(tag: bytes, data: bytes) -> bytes:
+        return struct.pack(">I", len(data)) + tag + data + struct.pack(">I", zlib.crc32(tag + data) & 0xFFFFFFFF)
+
+    return (b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", struct.pack(">IIBBBBB", side, side, 8, 2, 0, 0, 0))
+            + chunk(b"IDAT", zlib.compress(raw, 1)) + chunk(b"IEND", b""))
+
+
+def make_deck(path: str, slides: int, seed: int = 0, table: bool = True, notes: bool = True,
+              text_boxes: int = 1, table_rows: int = 3, table_cols: int = 3,
+              media_kb: int = 0, media_count: int = 1, lang: str = "mixed") -> str:
+    """タイトル・本文・テキストボックス・表・ノートを持つスライドを slides 枚並べたデッキを保存
+
+    Args:
+        text_boxes: 1スライドあたりのテキストボックス数
+        table_rows / table_cols: 表の行×列（table=False で表なし）
+        media_kb: 埋め込む画像の合計 KB（0 でなし）。media_count 枚に分けて先頭のスライドから順に置く
+        lang: 本文の言語（"mixed" / "ja" / "en"）
+    """
+    import io
+
+    from pptx import Presentation
+    from pptx.util import Inches
+
+    rnd = random.Random(seed)
+    prs = Presentation()
+    media = media_count if media_kb > 0 else 0
+    for i in range(slides):
+        slide = prs.slides.add_slide(prs.slide_layouts[1])
+        slide.shapes.title.text = f"{i + 1}. {_sentence(rnd, 3, lang)}"
+        slide.placeholders[1].text = "\n".join(_sentence(rnd, rnd.randint(4, 12), lang) for _ in range(3))
+        for b in range(text_boxes):
+            box = slide.shapes.add_textbox(Inches(1), Inches(5 + b * 0.3), Inches(4), Inches(1))
+            box.text = _sentence(rnd, 6, lang)
+        if table:
+            tbl = slide.shapes.add_table(table_rows, table_cols, Inches(5), Inches(5), Inches(4), Inches(1)).table
+            for r in range(table_rows):
+                for c in range(table_cols):
+                    tbl.cell(r, c).text = _sentence(rnd, 2, lang)
+        if notes:
+            slide.notes_slide.notes_text_frame.text = _sentence(rnd, 10, lang)
+        if i < media:
+            # 画像ごとに内容を変える（同じ画像は python-pptx がパッケージ内で1つにまとめるため）
+            image = make_png(media_kb * 1024 // media, seed=seed * 1000 + i)
+            slide.shapes.add_picture(io.BytesIO(image), Inches(0.5), Inches(0.5), Inches(2), Inches(2))
+    prs.save(path)
+    return path
+
+
+def make_corpus(folder: str, sizes: List[int], prefix: str = "deck", **options) -> List[str]:
+    """sizes[i] 枚のデッキを <prefix>_<i>.pptx として作り、パスのリストを返す（options は make_deck へ）"""
+    os.makedirs(folder, exist_ok=True)
+    return [make_deck(os.path.join(folder, f"{prefix}_{i:03d}.pptx"), n, seed=i, **options)
+            for i, n in enumerate(sizes)]
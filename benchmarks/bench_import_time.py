@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+"""
+起動時間（コールドスタート）のベンチマーク
+
+モジュールごとに新しいインタープリタを起動して import 時間を計測し、
+その時点で読み込まれていた重いライブラリ（pptx / openpyxl / tkinter / tksheet）も記録する。
+CLI は `InsightSlides.py compare --help` の実行時間（プロセス起動込み）を計測する。
+スクリプトとして起動した InsightSlides.py は pyc が使われず毎回コンパイルされる点に注意
+（EXE ではビルド時にコンパイル済み）。
+
+    python benchmarks/bench_import_time.py [--repeat 7] [--check]
+
+--check を付けると、コア / CLI の import で重いライブラリが読み込まれた場合に終了コード 1。
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+from _common import ROOT, report
+
+HEAVY_MODULES = ("pptx", "openpyxl", "lxml", "tkinter", "tksheet", "insightslides_i18n")
+
+# 重いライブラリを読み込んではいけないモジュール
+LAZY_TARGETS = ("insightslides_core", "insightslides_batch", "insightslides_config", "insightslides_cli")
+
+_CHILD = """
+import json, sys, time
+t0 = time.perf_counter()
+import {module}
+dt = time.perf_counter() - t0
+print(json.dumps({{"import_s": dt, "loaded": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+
+def _run_child(args):
+    return subprocess.run([sys.executable] + args, cwd=ROOT, capture_output=True, text=True)
+
+
+def measure_import(module: str, repeat: int):
+    timings, loaded = [], []
+    for _ in range(repeat):
+        proc = _run_child(["-c", _CHILD.format(module=module, heavy=HEAVY_MODULES)])
+        if proc.returncode != 0:
+            return {"name": f"import {module}", "error": proc.stderr.strip().splitlines()[-1]}
+        out = json.loads(proc.stdout)
+        timings.append(out["import_s"])
+        loaded = out["loaded"]
+    timings.sort()
+    return {"name": f"import {module}", "min_s": timings[0], "median_s": statistics.median(timings),
+            "repeat": repeat, "heavy_loaded": loaded}
+
+
+def measure_command(name: str, args, repeat: int):
+    timings = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        proc = _run_child(args)
+        timings.append(time.perf_counter() - t0)
+        if proc.returncode != 0:
+            return {"name": name, "error": proc.stderr.strip().splitlines()[-1]}
+    timings.sort()
+    return {"name": name, "min_s": timings[0], "median_s": statistics.median(timings), "repeat": repeat}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=7)
+    parser.add_argument("--check", action="store_true", help="コア / CLI が重いライブラリを読み込んでいたら失敗")
+    args = parser.parse_args()
+
+    results = [measure_command("python -c pass", ["-c", "pass"], args.repeat),
+               measure_command("InsightSlides.py compare --help",
+                               [os.path.join(ROOT, "InsightSlides.py"), "compare", "--help"], args.repeat)]
+    for module in LAZY_TARGETS + ("InsightSlides", "pptx", "openpyxl"):
+        results.append(measure_import(module, args.repeat))
+    report("import_time", results)
+
+    if args.check:
+        bad = [r["name"] for r in results
+               if r["name"].split(" ")[-1] in LAZY_TARGETS and (r.get("error") or r.get("heavy_loaded"))]
+        if bad:
+            print(f"重いライブラリを読み込んでいます: {', '.join(bad)}", file=sys.stderr)
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
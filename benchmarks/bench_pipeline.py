@@ -0,0 +1,158 @@
+# -*- coding: utf-8 -*-
+"""
+抽出・保存・更新データの読み込み・更新と保存・比較・グリッド表示のベンチマーク
+
+_decks.py で合成デッキ（スライド数ごとに1つ）を作り、GUI の各処理が呼んでいる
+エンジン側の関数の時間・処理速度・ピークメモリ（tracemalloc）を計測する。
+
+    extract                 core.extract_from_ppt（InsightSlidesApp.extract_from_ppt）
+    save[excel|json|tsv]    core.save_extracted（save_to_file）
+    load_updates[excel|json] core.load_updates（_load_updates）
+    update+save             core.load_presentation + apply_updates + save_presentation（_update_ppt と保存）
+    compare                 core.compare_texts(detect_moves=True)（PPTX 比較）
+    grid_load               EditableGrid.load_data（画面を開けない環境では skipped）
+
+更新と比較には、抽出結果の半分の行を書き換えたデータを使う。
+時間は repeat 回の最小値と中央値、速度は最小値から求める。ピークメモリは計測とは別の1回で測る。
+
+    python benchmarks/bench_pipeline.py [--slides 10 100] [--text-boxes 1] [--table 3x3] [--no-notes]
+                                        [--media-kb 0] [--media-count 1] [--lang mixed] [--repeat 3]
+"""
+import argparse
+import os
+import shutil
+import tempfile
+import tracemalloc
+
+from _common import report, time_call
+from _decks import LANGS, make_deck, table_arg
+
+import insightslides_core as core
+
+HEADERS = ["スライド番号", "オブジェクトID", "タイプ", "テキスト内容"]
+
+
+def peak_mb(func) -> float:
+    """func を1回実行したときの Python のメモリ確保のピーク（MB）"""
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak / 1024 / 1024
+
+
+def edited(data):
+    """偶数行のテキストを書き換えた抽出結果（更新・比較の入力）"""
+    return [dict(row, text=f"{row['text']} 改訂") if i % 2 == 0 else dict(row) for i, row in enumerate(data)]
+
+
+def grid_loader():
+    """EditableGrid に読み込んで描画を済ませる関数（画面を開けなければ (None, 理由)）"""
+    try:
+        import tkinter as tk
+        root = tk.Tk()
+    except Exception as e:  # ImportError / TclError（ディスプレイなし）
+        return None, f"{type(e).__name__}: {e}".strip()
+    root.withdraw()
+    import InsightSlides
+
+    grid = InsightSlides.EditableGrid(root)
+
+    def load(data):
+        grid.load_data(data)
+        root.update_idletasks()
+    return load, None
+
+
+def measure(name: str, func, repeat: int, **work) -> dict:
+    """時間・ピークメモリと、work（items / slides / bytes）からの速度"""
+    timing = time_call(func, repeat=repeat)
+    result = {"name": name, **work, **{k: round(v, 6) if isinstance(v, float) else v for k, v in timing.items()}}
+    seconds = max(timing["min_s"], 1e-9)
+    if "items" in work:
+        result["items_per_s"] = round(work["items"] / seconds, 1)
+    if "slides" in work:
+        result["slides_per_s"] = round(work["slides"] / seconds, 1)
+    if "bytes" in work:
+        result["mb_per_s"] = round(work["bytes"] / 1024 / 1024 / seconds, 3)
+    result["peak_mb"] = round(peak_mb(func), 3)
+    return result
+
+
+def bench_deck(path: str, slides: int, work_dir: str, repeat: int, grid) -> list:
+    label = f"slides={slides}"
+    size = os.path.getsize(path)
+    data, _ = core.extract_from_ppt(path, include_notes=True)
+    items = len(data)
+    results = [measure(f"extract[{label}]", lambda: core.extract_from_ppt(path, include_notes=True), repeat,
+                       slides=slides, items=items, bytes=size)]
+
+    changed = edited(data)
+    for fmt, ext in core.EXTRACT_EXTENSIONS.items():
+        out = os.path.join(work_dir, f"extract_{slides}{ext}")
+        core.save_extracted(changed, out, fmt, HEADERS)
+        results.append(measure(f"save[{fmt}, {label}]", lambda: core.save_extracted(changed, out, fmt, HEADERS),
+                               repeat, items=items, bytes=os.path.getsize(out)))
+
+    updates = {}
+    for source, ext in (("excel", ".xlsx"), ("json", ".json")):
+        src = os.path.join(work_dir, f"extract_{slides}{ext}")
+        updates = core.load_updates(src, source)
+        results.append(measure(f"load_updates[{source}, {label}]", lambda: core.load_updates(src, source), repeat,
+                               items=len(updates), bytes=os.path.getsize(src)))
+
+    out = os.path.join(work_dir, f"updated_{slides}.pptx")
+
+    def update_and_save():
+        prs = core.load_presentation(path)
+        core.apply_updates(prs, updates)
+        core.save_presentation(prs, out)
+
+    results.append(measure(f"update+save[{label}]", update_and_save, repeat, slides=slides, items=len(updates),
+                           bytes=size))
+
+    rows, _ = core.compare_texts(data, changed, detect_moves=True)
+    results.append(measure(f"compare[{label}]", lambda: core.compare_texts(data, changed, detect_moves=True),
+                           repeat, items=len(rows)))
+
+    load, reason = grid
+    if load is None:
+        results.append({"name": f"grid_load[{label}]", "items": items, "skipped": reason})
+    else:
+        results.append(measure(f"grid_load[{label}]", lambda: load(data), repeat, items=items))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--slides", type=int, nargs="+", default=[10, 100], help="デッキのスライド数（複数指定可）")
+    parser.add_argument("--text-boxes", type=int, default=1, help="1スライドあたりのテキストボックス数")
+    parser.add_argument("--table", type=table_arg, default=(3, 3), metavar="RxC", help="表の行x列（既定: 3x3）")
+    parser.add_argument("--no-table", action="store_true")
+    parser.add_argument("--no-notes", action="store_true")
+    parser.add_argument("--media-kb", type=int, default=0, help="埋め込む画像の合計 KB（既定: 0）")
+    parser.add_argument("--media-count", type=int, default=1, help="画像の枚数")
+    parser.add_argument("--lang", choices=LANGS, default="mixed", help="本文の言語")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--no-grid", action="store_true", help="グリッド表示を計測しない")
+    args = parser.parse_args()
+
+    deck = {"text_boxes": args.text_boxes, "table": not args.no_table, "table_rows": args.table[0],
+            "table_cols": args.table[1], "notes": not args.no_notes, "media_kb": args.media_kb,
+            "media_count": args.media_count, "lang": args.lang}
+    root = tempfile.mkdtemp(prefix="insightslides_pipeline_")
+    try:
+        grid = (None, "--no-grid") if args.no_grid else grid_loader()
+        results = []
+        for slides in args.slides:
+            path = make_deck(os.path.join(root, f"deck_{slides}.pptx"), slides, seed=slides, **deck)
+            results += bench_deck(path, slides, root, args.repeat, grid)
+        report("pipeline", results, params={"slides": args.slides, "repeat": args.repeat, **deck})
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
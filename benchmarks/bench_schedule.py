@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+"""
+一括処理のスケジューリング（投入順）のベンチマーク
+
+小さいデッキ多数と、ファイル名順で最後に来る大きいデッキ数個からなる偏った
+コーパスを作り、名前順（従来）と見積もりコストの大きい順で全体の完了時間
+（makespan）を比べる。
+
+1. 各ファイルの抽出時間を1件ずつ実測する
+2. その実測時間で k ワーカーのリストスケジューリング（空いたワーカーが次を取る）を
+   模擬し、makespan を求める。大きい順の並びは実測時間ではなく estimate_cost で決める
+3. --measure を付けると実際のプロセスプールでも計測する（CPU 数が k 未満だと差は出ない）
+
+    python benchmarks/bench_schedule.py [--small 40] [--large 2] [--large-slides 300] [--workers 2 4 8]
+"""
+import argparse
+import heapq
+import os
+import shutil
+import tempfile
+import time
+
+from _common import report
+from _decks import make_corpus
+
+import insightslides_batch as batch
+
+
+def simulate_makespan(durations, workers: int) -> float:
+    """durations の順に、最も早く空くワーカーへ割り当てたときの完了時間"""
+    free_at = [0.0] * workers
+    for d in durations:
+        heapq.heappush(free_at, heapq.heappop(free_at) + d)
+    return max(free_at)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--small", type=int, default=40, help="小さいデッキの数")
+    parser.add_argument("--large", type=int, default=2, help="大きいデッキの数")
+    parser.add_argument("--large-slides", type=int, default=300)
+    parser.add_argument("--workers", type=int, nargs="+", default=[2, 4, 8])
+    parser.add_argument("--measure", action="store_true", help="実際のプロセスプールでも計測")
+    args = parser.parse_args()
+
+    root = tempfile.mkdtemp(prefix="insightslides_schedule_")
+    try:
+        # 大きいデッキを "zz_" で始めて名前順の最後に置く
+        paths = make_corpus(root, [5 + i % 11 for i in range(args.small)], prefix="deck")
+        paths += make_corpus(root, [args.large_slides] * args.large, prefix="zz_large")
+        paths.sort()
+
+        tasks = [(p, "json", False, "ノート", None) for p in paths]
+        duration = {}
+        for task in tasks:
+            t0 = time.perf_counter()
+            batch._extract_file(task)
+            duration[task[0]] = time.perf_counter() - t0
+
+        by_name = [duration[p] for p in paths]
+        by_cost = [duration[p] for p in sorted(paths, key=lambda p: -batch.estimate_cost([p]))]
+        total = sum(by_name)
+        results = []
+        for k in args.workers:
+            lower = max(max(by_name), total / k)
+            for order, durations in (("name", by_name), ("largest_first", by_cost)):
+                makespan = simulate_makespan(durations, k)
+                results.append({"name": f"simulated[{order}, workers={k}]", "files": len(paths),
+                                "makespan_s": makespan, "lower_bound_s": lower,
+                                "efficiency": lower / makespan})
+            if args.measure:
+                for order, cost in (("name", None), ("largest_first", lambda t: batch.estimate_cost([t[0]]))):
+                    t0 = time.perf_counter()
+                    batch._run_pool(batch._extract_file, tasks, k, None, None, cost=cost)
+                    results.append({"name": f"measured[{order}, workers={k}]", "files": len(paths),
+                                    "makespan_s": time.perf_counter() - t0, "cpus": os.cpu_count()})
+        report("schedule", results)
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
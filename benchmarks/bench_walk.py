@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+"""
+フォルダ探索（batch.walk_files）のベンチマーク
+
+一時フォルダに空の PPTX を並べた深いツリーを作り、Path.rglob（基準）・
+1スレッド・複数スレッドの walk_files で全件列挙にかかる時間と、最初の1件が
+見つかるまでの時間（ストリーミング投入の立ち上がり）を計測する。
+--latency-ms を指定すると os.scandir の呼び出しごとに待ちを入れ、
+ネットワークドライブの往復遅延を模擬する。
+
+    python benchmarks/bench_walk.py [--dirs 400] [--files 20] [--latency-ms 2]
+"""
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+from _common import report, time_call
+
+import insightslides_batch as batch
+
+
+def make_tree(root: str, dirs: int, files: int, fanout: int = 8):
+    """dirs 個のフォルダを fanout 分岐の木にし、それぞれに files 個の PPTX とその他のファイルを置く"""
+    paths = [root]
+    for i in range(1, dirs):
+        parent = paths[(i - 1) // fanout]
+        path = os.path.join(parent, f"d{i:05d}")
+        os.mkdir(path)
+        paths.append(path)
+    for path in paths:
+        for j in range(files):
+            open(os.path.join(path, f"deck{j:03d}.pptx"), "wb").close()
+            open(os.path.join(path, f"deck{j:03d}_抽出.xlsx"), "wb").close()
+    return len(paths) * files
+
+
+def first_item_s(func) -> float:
+    t0 = time.perf_counter()
+    next(iter(func()))
+    return time.perf_counter() - t0
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--dirs", type=int, default=400)
+    parser.add_argument("--files", type=int, default=20)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="os.scandir ごとの模擬遅延（ミリ秒）")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    root = tempfile.mkdtemp(prefix="insightslides_walk_")
+    real_scandir = os.scandir
+    try:
+        expected = make_tree(root, args.dirs, args.files)
+        if args.latency_ms:
+            def slow_scandir(path="."):
+                time.sleep(args.latency_ms / 1000)
+                return real_scandir(path)
+            os.scandir = slow_scandir
+
+        from pathlib import Path
+        cases = {
+            "Path.rglob": lambda: (p for p in Path(root).rglob("*.pptx")),
+            "walk_files[threads=1]": lambda: batch.walk_files(root, threads=1),
+            f"walk_files[threads={batch.WALK_THREADS}]": lambda: batch.walk_files(root),
+            "walk_files[threads=32]": lambda: batch.walk_files(root, threads=32),
+        }
+        results = []
+        for name, func in cases.items():
+            count = sum(1 for _ in func())
+            timing = time_call(lambda: sum(1 for _ in func()), repeat=args.repeat)
+            results.append({"name": name, "dirs": args.dirs, "files": count, "ok": count == expected,
+                            "latency_ms": args.latency_ms, "first_item_s": first_item_s(func), **timing})
+        report("walk", results)
+    finally:
+        os.scandir = real_scandir
+        shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+# -*- coding: utf-8 -*-
+"""
+合成デッキのコーパスをフォルダに作る（一括処理の手元計測・再現用、python-pptx が必要）
+
+    python benchmarks/gen_decks.py OUT_DIR [--decks 20] [--slides 30] [--text-boxes 1] [--table 3x3]
+                                   [--no-table] [--no-notes] [--media-kb 0] [--media-count 1] [--lang mixed]
+
+--slides に複数の値を渡すと、デッキごとに順に使う（例: --slides 5 5 5 300 で小3つ・大1つの繰り返し）。
+同じ引数なら同じ内容のデッキができる。作ったファイルの一覧と合計サイズを JSON で標準出力に書き出す。
+"""
+import argparse
+import json
+import os
+import sys
+
+from _decks import LANGS, make_corpus, table_arg
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("out", help="出力フォルダ")
+    parser.add_argument("--decks", type=int, default=20)
+    parser.add_argument("--slides", type=int, nargs="+", default=[30])
+    parser.add_argument("--text-boxes", type=int, default=1)
+    parser.add_argument("--table", type=table_arg, default=(3, 3), metavar="RxC")
+    parser.add_argument("--no-table", action="store_true")
+    parser.add_argument("--no-notes", action="store_true")
+    parser.add_argument("--media-kb", type=int, default=0)
+    parser.add_argument("--media-count", type=int, default=1)
+    parser.add_argument("--lang", choices=LANGS, default="mixed")
+    parser.add_argument("--prefix", default="deck")
+    args = parser.parse_args()
+
+    sizes = [args.slides[i % len(args.slides)] for i in range(args.decks)]
+    paths = make_corpus(args.out, sizes, prefix=args.prefix, table=not args.no_table, notes=not args.no_notes,
+                        text_boxes=args.text_boxes, table_rows=args.table[0], table_cols=args.table[1],
+                        media_kb=args.media_kb, media_count=args.media_count, lang=args.lang)
+    json.dump({"folder": os.path.abspath(args.out), "decks": len(paths), "slides": sum(sizes),
+               "bytes": sum(os.path.getsize(p) for p in paths)}, sys.stdout, ensure_ascii=False, indent=2)
+    sys.stdout.write("\n")
+
+
+if __name__ == "__main__":
+    main()
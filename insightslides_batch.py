@@ -0,0 +1,1092 @@
+# -*- coding: utf-8 -*-
+"""
+Insight Slides - フォルダ一括処理（GUI非依存）
+
+プロセスプールで複数ファイルを並列処理する。ワーカー関数は pickle 可能な
+モジュールレベル関数として定義する。
+サブフォルダを含む探索は複数スレッドで os.scandir し、見つかったファイルから
+順にプールへ投入する（探索の完了を待たずに処理が始まる）。
+投入順はファイルサイズとスライド数から見積もった処理コストの大きい順
+（大きいファイルが最後に残って全体の完了が遅れないようにする）。
+"""
+import csv
+import fnmatch
+import functools
+import heapq
+import json
+import os
+import queue
+import re
+import threading
+import time
+import zipfile
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import insightslides_core as core
+import insightslides_metrics as metrics
+import insightslides_profile as profiling
+import insightslides_timing as timing
+import insightslides_trace as tracing
+
+# 比較ペアの状態
+PAIR_BOTH = "両方"
+PAIR_ONLY_BEFORE = "元のみ"
+PAIR_ONLY_AFTER = "新のみ"
+PAIR_ERROR = "エラー"
+
+# 一括抽出・一括更新の結果状態
+RESULT_OK = "完了"
+RESULT_SKIPPED = "スキップ"
+RESULT_ERROR = "エラー"
+RESULT_CACHED = "前回処理済み"
+
+# 結果状態 → メトリクスの status ラベル
+_METRIC_STATUS = {RESULT_OK: "ok", RESULT_SKIPPED: "skipped", RESULT_ERROR: "error", RESULT_CACHED: "cached"}
+
+# 一括処理の実行モード（マニフェストの使い方）
+RUN_ALL = "all"          # すべて処理（マニフェストは記録のみ）
+RUN_RESUME = "resume"    # 前回完了して以降変わっていないものを飛ばし、残りを処理
+RUN_CHANGED = "changed"  # 前回の記録から追加・変更されたものだけを処理
+RUN_MODES = (RUN_ALL, RUN_RESUME, RUN_CHANGED)
+
+# 探索時に降りないフォルダ（更新時のバックアップ先）
+SKIP_DIRS = {"backup"}
+
+# 同時にフォルダを列挙するスレッド数（ネットワークドライブでは待ち時間が支配的なため多め）
+WALK_THREADS = 8
+
+# 処理コストの見積もりで1スライドをファイルサイズ何バイト分とみなすか
+# （実測で抽出は1スライドあたり約2.5ms、画像などのサイズは1MBあたり約2ms）
+SLIDE_COST_BYTES = 1024 * 1024
+
+# メモリ使用量の見積もり（実測: XML は展開後サイズの約13倍、画像などは約1.3倍を消費）
+MEMORY_BASE_BYTES = 16 * 1024 * 1024
+XML_MEMORY_FACTOR = 14
+MEDIA_MEMORY_FACTOR = 1.5
+_MEDIA_DIRS = ("/media/", "/embeddings/")
+
+# 1ファイルの結果に残す、読み取れなかった図形の件数の上限
+MAX_WARNINGS = 20
+
+_SLIDE_ID_RE = re.compile(rb"<(?:\w+:)?sldId\b")
+
+
+# ============== ワーカープール ==============
+_shared_pool = None
+_last_pool_stats: Optional[Dict] = None
+_memory_budget: Optional[int] = None
+_task_limits: Dict[str, float] = {}
+
+
+def set_shared_pool(pool):
+    """一括処理で使い回すワーカープール（insightslides_pool.WorkerPool）を登録する（None で解除）"""
+    global _shared_pool
+    _shared_pool = pool
+
+
+def shared_pool():
+    return _shared_pool
+
+
+def set_memory_budget(budget_mb: Optional[int]):
+    """一括処理の同時実行で見積もりメモリの合計をこの MB 以内に抑える（None / 0 で物理メモリから自動）"""
+    global _memory_budget
+    _memory_budget = budget_mb * 1024 * 1024 if budget_mb else None
+
+
+def set_task_limits(timeout: Optional[float] = None, max_rss_mb: Optional[int] = None):
+    """処理ごとに作るワーカープールの1ファイルあたりの制限時間（秒）とメモリ上限（MB）
+
+    None は insightslides_pool の既定値、0 は無制限。共有プールには作成時の値が使われる。
+    """
+    _task_limits.clear()
+    if timeout is not None:
+        _task_limits["task_timeout"] = timeout
+    if max_rss_mb is not None:
+        _task_limits["task_max_rss_mb"] = max_rss_mb
+
+
+def last_pool_stats() -> Optional[Dict]:
+    """直近の一括処理で使ったワーカープールの統計（プールを使わなかった場合は None）"""
+    return _last_pool_stats
+
+
+# ============== ファイル探索 ==============
+def _matches(name: str, rel: str, patterns: Sequence[str]) -> bool:
+    """ファイル名または相対パス（/ 区切り）がパターンのどれかに一致するか（大文字小文字は区別しない）"""
+    name, rel = name.lower(), rel.lower()
+    return any(fnmatch.fnmatchcase(name, p) or fnmatch.fnmatchcase(rel, p) for p in patterns)
+
+
+def _list_dir(path: str, rel: str, pattern: str, include: Sequence[str], exclude: Sequence[str], recursive: bool):
+    """1フォルダを列挙し、(一致したファイル [(パス, 相対パス, 更新日時ns, サイズ)], 降りるサブフォルダ) を返す"""
+    files, subdirs = [], []
+    try:
+        with os.scandir(path) as it:
+            for entry in it:
+                entry_rel = f"{rel}/{entry.name}" if rel else entry.name
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        if (recursive and entry.name.lower() not in SKIP_DIRS
+                                and not _matches(entry.name, entry_rel, exclude)):
+                            subdirs.append((entry.path, entry_rel))
+                    elif (not entry.name.startswith("~$") and fnmatch.fnmatchcase(entry.name.lower(), pattern)
+                          and (not include or _matches(entry.name, entry_rel, include))
+                          and not _matches(entry.name, entry_rel, exclude)):
+                        st = entry.stat()
+                        files.append((entry.path, entry_rel, st.st_mtime_ns, st.st_size))
+                except OSError:
+                    pass  # 列挙中に削除されたファイルなど
+    except OSError:
+        pass
+    return files, subdirs
+
+
+def walk_files(folder: str, pattern: str = "*.pptx", include: Sequence[str] = (), exclude: Sequence[str] = (),
+               recursive: bool = True, threads: int = WALK_THREADS,
+               should_stop: Optional[Callable[[], bool]] = None) -> Iterator[Tuple[str, str, int, int]]:
+    """フォルダ以下のファイルを os.scandir で探索し、見つかった順に (パス, 相対パス, 更新日時ns, サイズ) を返す
+
+    フォルダの列挙は複数スレッドで並行して行う。順序は不定。
+    ~$ で始まるロックファイルと backup/ フォルダは常に対象外。
+
+    Args:
+        pattern: 対象とするファイル名のパターン（ファイルの種類）
+        include: さらに絞り込むファイル名または相対パス（/ 区切り）のパターン。空ならすべて
+        exclude: 除外するファイル・フォルダのパターン（一致したフォルダには降りない）
+        recursive: False ならフォルダ直下のみ
+        should_stop: True を返したら探索を打ち切る
+    """
+    pattern = pattern.lower()
+    include = [p.lower() for p in include]
+    exclude = [p.lower() for p in exclude]
+    if not recursive or threads <= 1:
+        stack = [(folder, "")]
+        while stack and not (should_stop and should_stop()):
+            files, subdirs = _list_dir(*stack.pop(), pattern, include, exclude, recursive)
+            yield from files
+            stack.extend(subdirs)
+        return
+
+    from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+    executor = ThreadPoolExecutor(max_workers=threads, thread_name_prefix="walk")
+    try:
+        pending = {executor.submit(_list_dir, folder, "", pattern, include, exclude, recursive)}
+        while pending and not (should_stop and should_stop()):
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                files, subdirs = future.result()
+                pending.update(executor.submit(_list_dir, path, rel, pattern, include, exclude, recursive)
+                               for path, rel in subdirs)
+                yield from files
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def list_pptx(folder: str, recursive: bool = False, include: Sequence[str] = (),
+              exclude: Sequence[str] = ()) -> List[Path]:
+    """PPTX を列挙して名前順で返す（~$ で始まるロックファイルは除外）"""
+    return sorted((Path(f[0]) for f in walk_files(folder, "*.pptx", include, exclude, recursive)),
+                  key=lambda p: str(p).lower())
+
+
+def pair_folder_files(folder1: str, folder2: str) -> List[Tuple[str, Optional[str], Optional[str]]]:
+    """2フォルダの PPTX をファイル名で対応付ける
+
+    Windows に合わせて大文字小文字は区別しない。
+
+    Returns:
+        (表示名, 元ファイルパス or None, 新ファイルパス or None) のリスト（名前順）
+    """
+    before = {f.name.lower(): f for f in list_pptx(folder1)}
+    after = {f.name.lower(): f for f in list_pptx(folder2)}
+
+    pairs = []
+    for key in sorted(set(before) | set(after)):
+        f1, f2 = before.get(key), after.get(key)
+        name = (f1 or f2).name
+        pairs.append((name, str(f1) if f1 else None, str(f2) if f2 else None))
+    return pairs
+
+
+def _feed_pool(executor, worker: Callable[[Tuple], Dict], tasks: Iterable[Tuple], governor,
+               cost: Optional[Callable[[Tuple], float]], memory: Optional[Callable[[Tuple], int]],
+               completed: "queue.Queue", stop: threading.Event, counts: Dict[str, int], futures: List,
+               estimate_all: bool = False):
+    """スレッド: タスクを見積もりコストの大きい順にプールへ投入し、完了した future を completed に積む
+
+    tasks は別スレッドで取り出し（探索しながら）コストを見積もって優先度付きキューに溜める。
+    プールへ渡すのは governor（insightslides_pool.MemoryGovernor）が許可した分
+    （ワーカー数＋待機分まで、かつ見積もりメモリの合計が予算内）にとどめ、どれを渡すかは
+    ワーカーに空きが出る直前に決める。プロセスプールは全ワーカー共通のキューから
+    空いたワーカーが次のタスクを取るため、空いたワーカーが残りのうち最も重いものを
+    引き取る形になる。予算の大半を使う大きなファイルは governor が単独で処理させる。
+    estimate_all なら（件数が決まっているリストの場合）全件を
+    見積もってから投入を始める。完了したものは (タスク, future) で積み、
+    最後に None を積んで投入の終了を知らせる。
+    """
+    discovered: "queue.Queue" = queue.Queue()
+
+    def produce():
+        try:
+            for task in tasks:
+                if stop.is_set():
+                    return
+                discovered.put((cost(task) if cost else 0, memory(task) if memory else 0, task))
+                counts["found"] += 1
+        except Exception as e:
+            discovered.put(e)  # タスク列の生成（探索）で起きた例外は呼び出し側で送出する
+        finally:
+            discovered.put(None)
+
+    def on_done(need, task, future):
+        governor.release(need)
+        completed.put((task, future))
+
+    threading.Thread(target=produce, daemon=True).start()
+    heap: List[Tuple] = []
+    seq = 0
+    producing = True
+    try:
+        while not stop.is_set() and (producing or heap):
+            # 見つかった分をすべて優先度付きキューへ（キューが空なら次が見つかるまで少し待つ）
+            try:
+                wait = not heap or (estimate_all and producing)
+                item = discovered.get(timeout=0.1) if wait else discovered.get_nowait()
+                while True:
+                    if item is None:
+                        producing = False
+                        break
+                    if isinstance(item, Exception):
+                        raise item
+                    heapq.heappush(heap, (-item[0], seq, item[2], item[1]))  # 同じコストなら見つかった順
+                    seq += 1
+                    item = discovered.get_nowait()
+            except queue.Empty:
+                pass
+            if estimate_all and producing:
+                continue
+            if heap and governor.acquire(heap[0][3], timeout=0.05, key=heap[0][1]):
+                _, _, task, need = heapq.heappop(heap)
+                counts["submitted"] += 1
+                futures.append(executor.submit(worker, task))
+                futures[-1].add_done_callback(functools.partial(on_done, need, task))
+                if stop.is_set():
+                    futures[-1].cancel()  # 呼び出し側が取り消しを済ませた後に投入してしまった分
+    except Exception as e:
+        completed.put(e)
+    finally:
+        completed.put(None)
+
+
+def _wrapped_run_args(run, collect, worker, tasks, cost, memory, on_error, on_progress):
+    """_run_pool の引数を、各タスクを run で包んだものに置き換える
+
+    run はワーカーで (worker, task) を受け取り、結果に付加情報を載せて返す関数。
+    collect(result) は完了ごとに呼び出し側で付加情報を取り出して集計する。
+    """
+    if isinstance(tasks, Sequence):
+        wrapped = [(worker, task) for task in tasks]
+    else:
+        wrapped = ((worker, task) for task in tasks)
+
+    def unwrap(fn):
+        return (lambda task: fn(task[1])) if fn else None
+
+    def progress(done, total, result):
+        collect(result)
+        if on_progress:
+            on_progress(done, total, result)
+
+    error = (lambda task, e: on_error(task[1], e)) if on_error else None
+    return run, wrapped, unwrap(cost), unwrap(memory), error, progress
+
+
+def _run_pool(worker: Callable[[Tuple], Dict], tasks: Iterable[Tuple], jobs: Optional[int],
+              on_progress: Optional[Callable[[int, int, Dict], None]],
+              should_cancel: Optional[Callable[[], bool]],
+              cost: Optional[Callable[[Tuple], float]] = None,
+              memory: Optional[Callable[[Tuple], int]] = None,
+              on_error: Optional[Callable[[Tuple, BaseException], Dict]] = None,
+              label: Optional[Callable[[Dict], None]] = None) -> List[Dict]:
+    """タスクをプロセスプールで実行し、結果をファイル名順で返す（jobs=1 ならこのプロセスで実行）
+
+    tasks はリストのほか、探索中のファイルから順に生成するイテレータでもよい
+    （その場合は取り出せたものから処理を始める）。
+    cost を渡すと、見積もりコストの大きいタスクから順にワーカーへ渡す（None なら渡された順）。
+    memory を渡すと、タスクごとの見積もりメモリの合計がメモリ予算（set_memory_budget）に
+    収まる範囲でだけ並列に処理する。
+    完了順に on_progress(完了数, 総数, 結果) を呼ぶ。総数はイテレータの場合、
+    その時点までに見つかった件数。should_cancel が True を返した時点で未着手のタスクを取り消す。
+    登録済みの共有プール（set_shared_pool）があればそれを使い、なければ処理ごとに
+    ワーカープールを作る。1件でもワーカーで処理するため、制限時間・メモリ上限を超えたファイルや
+    ワーカーを落とすファイルはそのワーカーだけが終了し、on_error(タスク, 例外) の結果
+    （既定: _failed_result）として記録されて残りの処理は続く。
+    label を渡すと、完了した結果ごとに計測・記録・on_progress より先に呼ぶ
+    （result["file"] をサブフォルダ付きの表示名に置き換えるなど）。
+    """
+    global _last_pool_stats
+    _last_pool_stats = None
+    results = []
+    known_total = len(tasks) if isinstance(tasks, Sequence) else None
+    workers = max(1, min(jobs or os.cpu_count() or 1, known_total or jobs or os.cpu_count() or 1))
+    shared = _shared_pool if jobs != 1 else None
+    exporter = metrics.current()
+    if exporter is not None:
+        # メトリクス出力中ならワーカーでファイルごとの処理時間・読み書きしたバイト数を測って記録する
+        worker, tasks, cost, memory, on_error, on_progress = _wrapped_run_args(
+            _run_measured, functools.partial(_record_metrics, exporter),
+            worker, tasks, cost, memory, on_error, on_progress)
+        if jobs == 1:
+            exporter.begin_pool(1)
+        else:
+            exporter.begin_pool(min(jobs, shared.size) if shared and jobs else shared.size if shared else workers)
+    timings = timing.current()
+    if timings is not None:
+        # 計測中ならワーカーでもファイルごとに計測し、結果を呼び出し側の Timings に集める
+        worker, tasks, cost, memory, on_error, on_progress = _wrapped_run_args(
+            _run_timed, lambda result: timings.merge(result.pop("timings", None), result["file"]),
+            worker, tasks, cost, memory, on_error, on_progress)
+    recorder = tracing.current()
+    if recorder is not None:
+        # タイムラインの記録中ならファイルごと・段階ごとの区間をワーカーから集めて親の時間軸に載せる
+        worker, tasks, cost, memory, on_error, on_progress = _wrapped_run_args(
+            _run_traced, functools.partial(_record_trace, recorder),
+            worker, tasks, cost, memory, on_error, on_progress)
+    capture = profiling.current()
+    if capture is not None and jobs != 1:
+        # プロファイル中ならワーカーでもファイルごとに cProfile / tracemalloc をかけて集める
+        # （jobs=1 はこのスレッドで処理するため、呼び出し側のプロファイルにそのまま入る）
+        worker, tasks, cost, memory, on_error, on_progress = _wrapped_run_args(
+            _run_profiled, lambda result: capture.add_worker(result["file"], result.pop("profile", None)),
+            worker, tasks, cost, memory, on_error, on_progress)
+    on_error = on_error or functools.partial(_failed_result, worker)
+    if label is not None:
+        # 計測・記録がファイルごとの表示名で集計されるよう、どの on_progress よりも先に名前を決める
+        named = on_progress
+
+        def on_progress(done, total, result):
+            label(result)
+            if named:
+                named(done, total, result)
+
+    if jobs == 1:
+        # jobs=1 ならプロセスを起動せずにこのプロセスで順に処理する（制限時間・メモリ上限はかからない）
+        for done, task in enumerate(tasks, 1):
+            result = worker(task)
+            results.append(result)
+            if on_progress:
+                on_progress(done, known_total or done, result)
+            if should_cancel and should_cancel():
+                break
+        if exporter is not None:
+            exporter.end_pool()
+        results.sort(key=lambda r: r["file"].lower())
+        return results
+
+    # multiprocessing 一式を読み込むため、プールを使うときに import する
+    from insightslides_pool import MemoryGovernor, WorkerPool
+
+    if shared:
+        pool = shared
+        limit = min(jobs, pool.size) if jobs else pool.size * 2
+    else:
+        pool = WorkerPool(workers, **_task_limits).start()
+        limit = workers * 2
+    governor = MemoryGovernor(limit, _memory_budget)
+    completed: "queue.Queue" = queue.Queue()
+    stop = threading.Event()
+    counts = {"found": 0, "submitted": 0}
+    futures: List = []
+    feeder = threading.Thread(target=_feed_pool, daemon=True,
+                              args=(pool, worker, tasks, governor, cost, memory, completed, stop, counts,
+                                    futures, known_total is not None))
+    feeder.start()
+    try:
+        feeding = True
+        received = 0
+        while feeding or received < counts["submitted"]:
+            item = completed.get()
+            if item is None:
+                feeding = False
+                continue
+            if isinstance(item, Exception):
+                raise item
+            received += 1
+            task, future = item
+            if future.cancelled():
+                continue  # 共有プールが終了された
+            error = future.exception()
+            results.append(on_error(task, error) if error else future.result())
+            if on_progress:
+                on_progress(len(results), known_total or counts["found"], results[-1])
+            if should_cancel and should_cancel():
+                break
+    finally:
+        stop.set()
+        if shared:
+            for future in futures:
+                future.cancel()  # 未着手のものだけ取り消される（処理中のものはそのまま終わる）
+        else:
+            pool.shutdown()
+        _last_pool_stats = {**pool.stats(), "memory": governor.stats()}
+        if exporter is not None:
+            exporter.end_pool()
+
+    results.sort(key=lambda r: r["file"].lower())
+    return results
+
+
+# ============== 処理コストの見積もり ==============
+def count_slides(path: str) -> int:
+    """presentation.xml のスライド一覧だけを読んでスライド数を返す（読めなければ 0）"""
+    try:
+        with zipfile.ZipFile(path) as zf:
+            return len(_SLIDE_ID_RE.findall(zf.read("ppt/presentation.xml")))
+    except (OSError, KeyError, zipfile.BadZipFile):
+        return 0
+
+
+def estimate_cost(paths: Iterable[Optional[str]]) -> int:
+    """入力ファイルの処理コストをバイト相当で見積もる（サイズ + スライド数 × SLIDE_COST_BYTES）"""
+    cost = 0
+    for path in paths:
+        if not path:
+            continue
+        try:
+            cost += os.path.getsize(path)
+        except OSError:
+            continue
+        if path.lower().endswith(".pptx"):
+            cost += count_slides(path) * SLIDE_COST_BYTES
+    return cost
+
+
+def _package_sizes(path: str) -> Tuple[int, int]:
+    """ZIP パッケージ（pptx / xlsx）の展開後サイズを (XML など, 画像・埋め込み) に分けて返す
+
+    中央ディレクトリだけを読む。ZIP でなければファイルサイズ全体を XML 側に数える。
+    """
+    try:
+        with zipfile.ZipFile(path) as zf:
+            xml = media = 0
+            for info in zf.infolist():
+                if any(d in "/" + info.filename for d in _MEDIA_DIRS):
+                    media += info.file_size
+                else:
+                    xml += info.file_size
+            return xml, media
+    except zipfile.BadZipFile:
+        pass
+    except OSError:
+        return 0, 0
+    try:
+        return os.path.getsize(path), 0
+    except OSError:
+        return 0, 0
+
+
+def estimate_memory(paths: Iterable[Optional[str]]) -> int:
+    """入力ファイルを処理するワーカーの使用メモリの増分をバイトで見積もる
+
+    python-pptx / openpyxl はパッケージの全パーツを読み込み、XML は lxml のツリーにするため、
+    展開後の XML サイズ × XML_MEMORY_FACTOR + 画像など × MEDIA_MEMORY_FACTOR とする。
+    """
+    total = MEMORY_BASE_BYTES
+    for path in paths:
+        if path:
+            xml, media = _package_sizes(path)
+            total += int(xml * XML_MEMORY_FACTOR + media * MEDIA_MEMORY_FACTOR)
+    return total
+
+
+# ============== マニフェスト ==============
+def manifest_path(folder: str, operation: str, fmt: str) -> str:
+    """一括処理のマニフェストの保存先（出力と同じフォルダ）"""
+    return os.path.join(folder, f".insightslides_{operation}_{fmt}.manifest.jsonl")
+
+
+def input_signature(paths: List[str]) -> List[List[int]]:
+    """入力ファイルごとの [更新日時ns, サイズ]（存在しないファイルは [0, -1]）"""
+    sig = []
+    for p in paths:
+        try:
+            st = os.stat(p)
+            sig.append([st.st_mtime_ns, st.st_size])
+        except OSError:
+            sig.append([0, -1])
+    return sig
+
+
+def _input_digest(paths: List[str]) -> str:
+    return "+".join(core.file_digest(p) if os.path.exists(p) else "-" for p in paths)
+
+
+def _run_timed(task: Tuple[Callable[[Tuple], Dict], Tuple]) -> Dict:
+    """ワーカー: 1件の処理を段階ごとに計測し、結果の "timings" に載せて返す（計測が有効なとき）"""
+    worker, inner = task
+    timing.set_enabled(True)
+    with timing.collect() as timings:
+        result = worker(inner)
+    result["timings"] = timings.as_dict()
+    return result
+
+
+def _run_traced(task: Tuple[Callable[[Tuple], Dict], Tuple]) -> Dict:
+    """ワーカー: 1件の処理のファイル全体と段階ごとの区間を記録し、結果の "trace" に載せて返す（記録中のとき）"""
+    worker, inner = task
+    result, events = tracing.trace_call(worker, inner)
+    result["trace"] = events
+    return result
+
+
+def _record_trace(recorder, result: Dict):
+    args = {"status": result.get("status") or result.get("pair")}
+    if result.get("error"):
+        args["error"] = result["error"]
+    recorder.add_worker(result.get("file", ""), result.pop("trace", None), args)
+
+
+def _run_profiled(task: Tuple[Callable[[Tuple], Dict], Tuple]) -> Dict:
+    """ワーカー: 1件の処理を cProfile / tracemalloc にかけ、結果の "profile" に載せて返す（プロファイル中のとき）"""
+    worker, inner = task
+    result, stats = profiling.profile_call(worker, inner)
+    result["profile"] = stats
+    return result
+
+
+def _run_measured(task: Tuple[Callable[[Tuple], Dict], Tuple]) -> Dict:
+    """ワーカー: 1件の処理時間と入出力のバイト数を測り、結果の "metrics" に載せて返す（メトリクス出力中のとき）"""
+    worker, inner = task
+    started = time.perf_counter()
+    result = worker(inner)
+    elapsed = time.perf_counter() - started
+    written = 0
+    if result.get("output") and os.path.isfile(result["output"]):
+        written = os.path.getsize(result["output"])
+    result["metrics"] = {"elapsed": elapsed, "read": _file_bytes(_task_inputs(worker, inner)), "written": written}
+    return result
+
+
+def _task_inputs(worker: Callable[[Tuple], Dict], task: Tuple) -> List[str]:
+    """タスクが読む入力ファイル"""
+    if worker in (_run_measured, _run_timed, _run_traced, _run_profiled):
+        return _task_inputs(*task)
+    if worker is _run_tracked:
+        return task[1]
+    if worker is _extract_file:
+        return [task[0]]
+    if worker is _update_file:
+        return [task[0], task[1]]
+    if worker is _compare_pair:
+        return [p for p in task[1:3] if p]
+    # insightslides_shard._run_claimed などの (worker, ..., inputs, inner) 形式
+    return next((t for t in task if isinstance(t, list)), [])
+
+
+def _file_bytes(paths: Iterable[str]) -> int:
+    size = 0
+    for path in paths:
+        try:
+            size += os.path.getsize(path)
+        except OSError:
+            pass
+    return size
+
+
+def _record_metrics(exporter, result: Dict):
+    """_run_measured の結果を MetricsExporter に記録する（他ノードが処理中だったものは数えない）"""
+    measured = result.pop("metrics", None) or {}
+    if "pair" in result:
+        kind, status = "compare", "error" if result["pair"] == PAIR_ERROR else "ok"
+    else:
+        kind = "update" if "updated" in result else "extract"
+        status = _METRIC_STATUS.get(result.get("status"))
+        if status is None:
+            return
+    counts = {}
+    if kind == "extract":
+        counts["extracted"] = result.get("items", 0)
+    elif kind == "update":
+        counts = {"updated": result.get("updated", 0), "skipped": result.get("skipped", 0)}
+    exporter.record_file(kind, status, result.get("file", ""), measured.get("elapsed"),
+                         measured.get("read", 0), measured.get("written", 0), result.get("error_type", ""),
+                         counts, result.get("stats") if kind == "compare" else None)
+
+
+def _run_tracked(task: Tuple[Callable[[Tuple], Dict], List[str], Tuple]) -> Dict:
+    """ワーカー: 処理前に入力のシグネチャとハッシュを取り、結果に添えてマニフェストへ記録させる"""
+    worker, inputs, inner = task
+    inputs_sig = input_signature(inputs)
+    try:
+        digest = _input_digest(inputs)
+    except OSError:
+        digest = ""
+    result = worker(inner)
+    result["inputs"] = inputs_sig
+    result["digest"] = digest
+    return result
+
+
+class BatchManifest:
+    """一括処理の進捗記録（JSON Lines）
+
+    1行目は処理条件（形式など）、以降は1ファイル1行で
+    {key, inputs, digest, output, status, error, at} を追記する。
+    完了ごとに追記・flush するため、中断やクラッシュの後も完了分が残る。
+    同じキーは後の行が優先で、close() で1キー1行に詰め直す。
+    処理条件が前回と異なる場合は前回の記録を使わない。
+    """
+
+    def __init__(self, path: str, options: Dict):
+        self.path = path
+        self.options = options
+        self.entries: Dict[str, Dict] = {}
+        self._file = None
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                header = json.loads(f.readline() or "{}")
+                if header.get("options") != self.options:
+                    return
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                        self.entries[entry["key"]] = entry
+                    except (ValueError, KeyError):
+                        pass  # 書き込み途中で終了した最終行など
+        except (OSError, ValueError):
+            pass
+
+    def is_unchanged(self, key: str, inputs: List[str]) -> bool:
+        """前回の記録から入力が変わっていないか（日時・サイズが違えば内容ハッシュで確認）"""
+        entry = self.entries.get(key)
+        if not entry:
+            return False
+        sig = input_signature(inputs)
+        if entry.get("inputs") == sig:
+            return True
+        if [s[1] for s in entry.get("inputs", [])] != [s[1] for s in sig] or not entry.get("digest"):
+            return False
+        try:
+            if _input_digest(inputs) != entry["digest"]:
+                return False
+        except OSError:
+            return False
+        entry["inputs"] = sig  # 内容が同じなら日時だけ更新し、次回はハッシュを取らずに済ませる
+        return True
+
+    def needs_run(self, key: str, inputs: List[str], mode: str) -> bool:
+        if mode == RUN_ALL:
+            return True
+        unchanged = self.is_unchanged(key, inputs)
+        if mode == RUN_CHANGED:
+            return not unchanged
+        entry = self.entries.get(key, {})
+        if entry.get("status") == RESULT_SKIPPED:
+            return not unchanged
+        done = entry.get("status") == RESULT_OK and os.path.exists(self.output_of(key))
+        return not (unchanged and done)
+
+    def output_of(self, key: str) -> str:
+        """記録された出力先（マニフェストからの相対パスで保存している）"""
+        output = self.entries.get(key, {}).get("output")
+        return os.path.join(os.path.dirname(self.path), output) if output else ""
+
+    def record(self, key: str, result: Dict):
+        output = result.get("output", "")
+        if output:
+            output = os.path.relpath(output, os.path.dirname(self.path) or ".")
+        entry = {"key": key, "inputs": result.get("inputs"), "digest": result.get("digest", ""),
+                 "output": output, "status": result["status"], "error": result.get("error", ""),
+                 "at": datetime.now().isoformat(timespec="seconds")}
+        self.entries[key] = entry
+        if self._file is None:
+            self._file = open(self.path, 'w', encoding='utf-8')
+            self._write_all(self._file)
+        else:
+            self._file.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        self._file.flush()
+
+    def _write_all(self, f):
+        f.write(json.dumps({"options": self.options}, ensure_ascii=False) + "\n")
+        for entry in self.entries.values():
+            f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+    def close(self, keep_keys: Optional[List[str]] = None):
+        """追記を終えて1キー1行に詰め直す（keep_keys 以外のキー＝消えたファイルは削除）"""
+        if self._file:
+            self._file.close()
+            self._file = None
+        if keep_keys is not None:
+            keep = set(keep_keys)
+            self.entries = {k: v for k, v in self.entries.items() if k in keep}
+        with core.atomic_output(self.path) as tmp:
+            with open(tmp, 'w', encoding='utf-8') as f:
+                self._write_all(f)
+
+
+def _run_with_manifest(manifest: BatchManifest, items: Iterable[Tuple[str, List[str], Tuple]],
+                       worker: Callable[[Tuple], Dict], mode: str, jobs: Optional[int],
+                       on_progress: Optional[Callable[[int, int, Dict], None]],
+                       should_cancel: Optional[Callable[[], bool]]) -> List[Dict]:
+    """マニフェストに従って処理対象を絞り込み、完了ごとに記録しながら実行
+
+    Args:
+        items: (マニフェストのキー＝表示名, 入力ファイル, ワーカーへのタスク) の列。
+            探索中のイテレータでもよく、取り出したものから順に処理する。
+        on_progress: (完了数, その時点までに見つかった件数, 結果) で呼ばれる。前回の記録から
+            飛ばしたファイルも状態 RESULT_CACHED の結果で呼ぶため、事前スキャンした全件で進捗を数えられる
+
+    Returns:
+        実行した結果と、飛ばしたファイルの結果（状態 RESULT_CACHED）を合わせたリスト（ファイル名順）
+    """
+    cached = []
+    keys: Dict[str, str] = {}
+    walked = [False]
+    exporter = metrics.current()
+    reported = [0]
+    report_lock = threading.Lock()   # 飛ばしたファイルは探索側のスレッドから報告する
+
+    def report(result):
+        if on_progress:
+            with report_lock:
+                reported[0] += 1
+                on_progress(reported[0], len(keys), result)
+
+    def tasks():
+        for key, inputs, task in items:
+            keys[inputs[0]] = key
+            run = manifest.needs_run(key, inputs, mode)
+            if exporter is not None and mode != RUN_ALL:
+                exporter.record_cache("manifest", hit=not run)
+            if run:
+                yield (worker, inputs, task)
+            else:
+                cached.append({"file": key, "path": inputs[0], "output": manifest.output_of(key),
+                               "status": RESULT_CACHED, "error": ""})
+                if exporter is not None:
+                    exporter.record_file("extract" if worker is _extract_file else "update", "cached", key)
+                report(cached[-1])
+        # 取り消しで探索が途中で打ち切られた場合は、見つからなかったファイルを削除済みとみなさない
+        walked[0] = not (should_cancel and should_cancel())
+
+    def label(result):
+        result["file"] = keys[result["path"]]  # サブフォルダ内のファイルは相対パスで表示・記録
+
+    def progress(done, total, result):
+        manifest.record(result["file"], result)
+        report(result)
+
+    try:
+        results = _run_pool(_run_tracked, tasks(), jobs, progress, should_cancel,
+                            cost=lambda task: estimate_cost(task[1]), memory=lambda task: estimate_memory(task[1]),
+                            label=label)
+    finally:
+        # 探索を最後まで終えた場合だけ、見つからなかった（削除された）ファイルの記録を消す
+        manifest.close(keep_keys=list(keys.values()) if walked[0] else None)
+    return sorted(results + cached, key=lambda r: r["file"].lower())
+
+
+# ============== 一括抽出 ==============
+def _extract_result(path: str) -> Dict:
+    return {"file": os.path.basename(path), "path": path, "output": "", "status": RESULT_OK,
+            "items": 0, "slides": 0, "error": "", "warnings": []}
+
+
+def _extract_file(task: Tuple[str, str, bool, str, List[str]]) -> Dict:
+    """ワーカー: 1ファイルを抽出して <名前>_抽出.<拡張子> に保存"""
+    path, fmt, include_notes, notes_label, headers = task
+    result = _extract_result(path)
+    try:
+        data, meta = core.extract_from_ppt(path, include_notes, notes_label=notes_label)
+        result["slides"] = meta.get("slide_count", 0)
+        result["items"] = len(data)
+        result["warnings"] = meta.get("errors", [])[:MAX_WARNINGS]
+        if not data:
+            result["status"] = RESULT_SKIPPED
+            return result
+        out = core.extract_output_path(path, fmt)
+        with core.atomic_output(out) as tmp:
+            core.save_extracted(data, tmp, fmt, headers)
+        result["output"] = out
+    except Exception as e:
+        result["status"] = RESULT_ERROR
+        result["error"] = str(e)
+        result["error_type"] = type(e).__name__
+    return result
+
+
+def extract_files(paths: List[str], fmt: str = "excel", include_notes: bool = False,
+                  notes_label: str = "ノート", headers: Optional[List[str]] = None,
+                  jobs: Optional[int] = None,
+                  on_progress: Optional[Callable[[int, int, Dict], None]] = None,
+                  should_cancel: Optional[Callable[[], bool]] = None) -> List[Dict]:
+    """複数の PPTX をプロセスプールで抽出し、それぞれの隣に抽出ファイルを保存
+
+    Returns:
+        ファイルごとの結果 {file, path, output, status, items, slides, error} のリスト（ファイル名順）
+    """
+    tasks = [(str(p), fmt, include_notes, notes_label, headers) for p in paths]
+    if not tasks:
+        return []
+    return _run_pool(_extract_file, tasks, jobs, on_progress, should_cancel,
+                     cost=lambda task: estimate_cost([task[0]]), memory=lambda task: estimate_memory([task[0]]))
+
+
+def extract_items(folder: str, fmt: str, include_notes: bool, notes_label: str, headers: Optional[List[str]],
+                  recursive: bool = False, include: Sequence[str] = (), exclude: Sequence[str] = (),
+                  should_stop: Optional[Callable[[], bool]] = None) -> Iterator[Tuple[str, List[str], Tuple]]:
+    """フォルダ一括抽出の処理対象を探索しながら (表示名＝相対パス, 入力ファイル, _extract_file のタスク) で返す"""
+    for path, rel, _, _ in walk_files(folder, "*.pptx", include, exclude, recursive, should_stop=should_stop):
+        yield rel, [path], (path, fmt, include_notes, notes_label, headers)
+
+
+def extract_folder(folder: str, fmt: str = "excel", include_notes: bool = False,
+                   notes_label: str = "ノート", headers: Optional[List[str]] = None,
+                   jobs: Optional[int] = None,
+                   on_progress: Optional[Callable[[int, int, Dict], None]] = None,
+                   should_cancel: Optional[Callable[[], bool]] = None,
+                   mode: str = RUN_ALL, recursive: bool = False,
+                   include: Sequence[str] = (), exclude: Sequence[str] = ()) -> List[Dict]:
+    """フォルダの PPTX を一括抽出し、進捗をフォルダ内のマニフェストに記録
+
+    探索しながら見つかったファイルから処理する。抽出ファイルは各 PPTX の隣に保存する。
+
+    Args:
+        mode: RUN_ALL / RUN_RESUME / RUN_CHANGED（前回の記録をどう使うか）
+        recursive: True ならサブフォルダも対象
+        include / exclude: walk_files と同じ
+        その他は extract_files と同じ
+    """
+    manifest = BatchManifest(manifest_path(folder, "extract", fmt), {"format": fmt, "include_notes": include_notes})
+    items = extract_items(folder, fmt, include_notes, notes_label, headers, recursive, include, exclude, should_cancel)
+    return _run_with_manifest(manifest, items, _extract_file, mode, jobs, on_progress, should_cancel)
+
+
+# ============== 一括更新 ==============
+def update_items(folder: str, fmt: str, limit: Optional[int], backup: bool, profile: str,
+                 recursive: bool = False, include: Sequence[str] = (), exclude: Sequence[str] = (),
+                 should_stop: Optional[Callable[[], bool]] = None) -> Iterator[Tuple[str, List[str], Tuple]]:
+    """フォルダ一括更新の処理対象を探索しながら (表示名＝PPTX の相対パス, 入力ファイル, _update_file のタスク) で返す"""
+    suffix = f"_抽出{core.EXTRACT_EXTENSIONS[fmt]}".lower()
+    for data_file, rel, _, _ in walk_files(folder, f"*{suffix}", include, exclude, recursive, should_stop=should_stop):
+        pptx_path = data_file[:-len(suffix)] + ".pptx"
+        task = (data_file, pptx_path, core.updated_output_path(pptx_path), fmt, limit, backup, profile)
+        yield rel[:-len(suffix)] + ".pptx", [data_file, pptx_path], task
+
+
+def _update_result(data_file: str, pptx_path: str) -> Dict:
+    return {"file": os.path.basename(pptx_path), "path": data_file, "data_file": os.path.basename(data_file),
+            "output": "", "status": RESULT_OK, "updated": 0, "skipped": 0, "backup": "", "error": ""}
+
+
+def _update_file(task: Tuple[str, str, str, str, Optional[int], bool, str]) -> Dict:
+    """ワーカー: 抽出ファイル1つを対応する PPTX に反映して <名前>_更新済み.pptx に保存"""
+    data_file, pptx_path, out_path, source, limit, backup, profile = task
+    result = _update_result(data_file, pptx_path)
+    try:
+        if not os.path.exists(pptx_path):
+            result["status"] = RESULT_SKIPPED
+            result["error"] = "PPTXなし"
+            return result
+
+        updates = core.load_updates(data_file, source)
+        if not updates:
+            result["status"] = RESULT_SKIPPED
+            result["error"] = "更新データなし"
+            return result
+
+        if backup:
+            result["backup"] = str(core.create_backup(pptx_path))
+        prs = core.load_presentation(pptx_path)
+        result["updated"], result["skipped"], _ = core.apply_updates(prs, updates, limit=limit, profile=profile)
+        with core.atomic_output(out_path) as tmp:
+            core.save_presentation(prs, tmp)
+        result["output"] = out_path
+    except Exception as e:
+        result["status"] = RESULT_ERROR
+        result["error"] = str(e)
+        result["error_type"] = type(e).__name__
+    return result
+
+
+def update_folder(folder: str, fmt: str = "excel", limit: Optional[int] = None, backup: bool = False,
+                  jobs: Optional[int] = None,
+                  on_progress: Optional[Callable[[int, int, Dict], None]] = None,
+                  should_cancel: Optional[Callable[[], bool]] = None,
+                  profile: str = core.DEFAULT_PROFILE, mode: str = RUN_ALL, recursive: bool = False,
+                  include: Sequence[str] = (), exclude: Sequence[str] = ()) -> List[Dict]:
+    """フォルダ内の <名前>_抽出.<拡張子> を同じフォルダの同名 PPTX に一括反映し、進捗をマニフェストに記録
+
+    抽出ファイルと PPTX のどちらかが変われば「変更あり」として扱う。
+
+    Args:
+        limit: 更新対象とする先頭スライド数（ライセンス制限）
+        backup: True なら更新前に backup/ へコピー
+        mode: RUN_ALL / RUN_RESUME / RUN_CHANGED（前回の記録をどう使うか）
+        recursive: True ならサブフォルダも対象
+        include / exclude: 抽出ファイルの絞り込み（walk_files と同じ）
+
+    Returns:
+        ファイルごとの結果 {file, data_file, output, status, updated, skipped, backup, error}
+        のリスト（ファイル名順）
+    """
+    manifest = BatchManifest(manifest_path(folder, "update", fmt), {"format": fmt, "limit": limit, "profile": profile})
+    items = update_items(folder, fmt, limit, backup, profile, recursive, include, exclude, should_cancel)
+    return _run_with_manifest(manifest, items, _update_file, mode, jobs, on_progress, should_cancel)
+
+
+def _failed_result(worker: Callable[[Tuple], Dict], task: Tuple, error: BaseException) -> Dict:
+    """ワーカーが結果を返せなかったタスク（制限時間・メモリ上限の超過、ワーカーの異常終了）のエラー結果"""
+    if worker in (_run_measured, _run_timed, _run_traced, _run_profiled):
+        return _failed_result(*task, error)
+    if worker is _run_tracked:
+        inner_worker, inputs, inner = task
+        result = _failed_result(inner_worker, inner, error)
+        result["inputs"] = input_signature(inputs)
+        result["digest"] = ""
+        return result
+    if worker is _compare_pair:
+        result = _compare_result(task[0])
+        result["pair"] = PAIR_ERROR
+    else:
+        if worker is _extract_file:
+            result = _extract_result(task[0])
+        elif worker is _update_file:
+            result = _update_result(task[0], task[1])
+        else:
+            result = {"file": str(task[0])}
+        result["status"] = RESULT_ERROR
+    result["error"] = str(error)
+    result["error_type"] = type(error).__name__
+    return result
+
+
+def summarize_results(results: List[Dict]) -> Dict:
+    """一括抽出・一括更新の結果を状態ごとに集計"""
+    total = {"files": len(results), "ok": 0, "skipped": 0, "cached": 0, "errors": 0}
+    for res in results:
+        key = {RESULT_OK: "ok", RESULT_SKIPPED: "skipped", RESULT_CACHED: "cached"}.get(res["status"], "errors")
+        total[key] += 1
+        for k in ("items", "updated"):
+            if k in res:
+                total[k] = total.get(k, 0) + res[k]
+    return total
+
+
+# ============== フォルダ比較 ==============
+def _compare_result(name: str) -> Dict:
+    return {"file": name, "pair": PAIR_BOTH, "rows": [],
+            "stats": {"same": 0, "changed": 0, "added": 0, "removed": 0, "moved": 0}, "error": ""}
+
+
+def _compare_pair(task: Tuple[str, Optional[str], Optional[str], str]) -> Dict:
+    """ワーカー: 1ペアを比較（片側のみのファイルは全行を追加/削除として扱う）"""
+    name, file1, file2, profile = task
+    result = _compare_result(name)
+    try:
+        data1 = core.extract_from_ppt(file1)[0] if file1 else []
+        data2 = core.extract_from_ppt(file2)[0] if file2 else []
+        if not file1:
+            result["pair"] = PAIR_ONLY_AFTER
+        elif not file2:
+            result["pair"] = PAIR_ONLY_BEFORE
+        result["rows"], result["stats"] = core.compare_texts(data1, data2, detect_moves=True, profile=profile)
+    except Exception as e:
+        result["pair"] = PAIR_ERROR
+        result["error"] = str(e)
+        result["error_type"] = type(e).__name__
+    return result
+
+
+def compare_folders(folder1: str, folder2: str, jobs: Optional[int] = None,
+                    on_progress: Optional[Callable[[int, int, Dict], None]] = None,
+                    should_cancel: Optional[Callable[[], bool]] = None,
+                    profile: str = core.DEFAULT_PROFILE) -> List[Dict]:
+    """2フォルダをファイル名で対応付けてプロセスプールで一括比較
+
+    Args:
+        jobs: ワーカープロセス数（None で CPU 数）
+        profile: 正規化プロファイル指定（ワーカーへ渡すため文字列）
+        on_progress: 1ペア完了ごとに (完了数, 総数, 結果) で呼ばれる
+        should_cancel: True を返すと未着手のペアを取り消す
+
+    Returns:
+        ペアごとの結果 {file, pair, rows, stats, error} のリスト（ファイル名順）
+    """
+    pairs = pair_folder_files(folder1, folder2)
+    if not pairs:
+        return []
+
+    return _run_pool(_compare_pair, [p + (profile,) for p in pairs], jobs, on_progress, should_cancel,
+                     cost=lambda task: estimate_cost(task[1:3]), memory=lambda task: estimate_memory(task[1:3]))
+
+
+def write_folder_compare(results: List[Dict], out_path: str):
+    """一括比較の結果を出力
+
+    .xlsx の場合は「差分」「サマリー」の2シート、それ以外は CSV 本体と
+    `<名前>_summary.csv` の2ファイルを書き出す。
+    """
+    diff_header = ["ファイル", "スライド", "ID", "状態", "元", "新", "移動元", "類似度"]
+    summary_header = ["ファイル", "対応", "一致", "変更", "追加", "削除", "移動", "エラー"]
+
+    def diff_rows():
+        for res in results:
+            for row in res["rows"]:
+                moved_from = f"{row['from_slide']}:{row['from_id']}" if "from_slide" in row else ""
+                yield [res["file"], row["slide"], row.get("id", ""), row["status"],
+                       row.get("before", ""), row.get("after", ""), moved_from, row.get("score", "")]
+
+    def summary_rows():
+        for res in results:
+            s = res["stats"]
+            yield [res["file"], res["pair"], s["same"], s["changed"], s["added"], s["removed"], s["moved"], res["error"]]
+
+    if out_path.lower().endswith(".xlsx"):
+        import openpyxl
+        from openpyxl.cell import WriteOnlyCell
+        from openpyxl.styles import Font as XLFont
+
+        wb = openpyxl.Workbook(write_only=True)
+        bold = XLFont(bold=True)
+        for title, header, rows in (("差分", diff_header, diff_rows()),
+                                    ("サマリー", summary_header, summary_rows())):
+            ws = wb.create_sheet(title)
+            header_cells = []
+            for h in header:
+                cell = WriteOnlyCell(ws, value=h)
+                cell.font = bold
+                header_cells.append(cell)
+            ws.append(header_cells)
+            for r in rows:
+                ws.append(r)
+        wb.save(out_path)
+        return
+
+    with open(out_path, 'w', newline='', encoding='utf-8-sig') as f:
+        w = csv.writer(f)
+        w.writerow(diff_header)
+        w.writerows(diff_rows())
+    summary_path = os.path.splitext(out_path)[0] + "_summary.csv"
+    with open(summary_path, 'w', newline='', encoding='utf-8-sig') as f:
+        w = csv.writer(f)
+        w.writerow(summary_header)
+        w.writerows(summary_rows())
+
+
+def summarize_folder_compare(results: List[Dict]) -> Dict:
+    """ペアごとの集計を合算"""
+    total = {"files": len(results), "same": 0, "changed": 0, "added": 0, "removed": 0, "moved": 0, "errors": 0}
+    for res in results:
+        for k in ("same", "changed", "added", "removed", "moved"):
+            total[k] += res["stats"][k]
+        if res["pair"] == PAIR_ERROR:
+            total["errors"] += 1
+    return total
@@ -0,0 +1,566 @@
+# -*- coding: utf-8 -*-
+"""
+Insight Slides - コマンドライン（GUI非依存）
+
+GUI と同じエンジン（insightslides_core / insightslides_batch）を tkinter を
+読み込まずに呼び出す。`InsightSlides.py` に引数を付けて起動した場合もここに入る。
+
+使い方:
+    InsightSlides.py extract deck.pptx [-o out.xlsx] [--format excel|json|tsv] [--include-notes]
+    InsightSlides.py update deck_抽出.xlsx deck.pptx [-o out.pptx] [--no-backup]
+    InsightSlides.py preview deck_抽出.xlsx deck.pptx
+    InsightSlides.py compare 元.pptx 新.pptx -o diff.csv [--changes-only]
+    InsightSlides.py batch extract FOLDER [--format excel|json] [--jobs N] [--resume|--changed]
+                                          [-r] [--include PATTERN] [--exclude PATTERN]
+    InsightSlides.py batch update FOLDER [--format excel|json] [--jobs N] [--resume|--changed] [-r]
+    InsightSlides.py batch extract|update FOLDER --distributed [--shard-dir DIR] [--lease 120]
+    InsightSlides.py batch compare 元フォルダ 新フォルダ -o diff.xlsx [--jobs N]
+    （batch / extract / watch は --memory-budget MB で同時処理の見積もりメモリの上限、
+      --task-timeout SEC / --task-max-rss MB で1ファイルあたりの処理時間・メモリの上限を指定できる。
+      上限を超えたファイルはワーカーごと終了させてエラーとして記録し、残りの処理を続ける）
+    InsightSlides.py watch FOLDER [--format excel|json] [--debounce 2] [--once]
+    InsightSlides.py serve [--port 8765] [--workers 4]
+    （コマンドの前に --timings を付けると段階ごとの処理時間をサマリーに載せ、
+      --timings-report PATH でファイルごとの内訳を含む JSON レポートを書き出す。
+      --profile を付けるとそのコマンドを cProfile / tracemalloc にかけ、.prof と確保の上位を
+      --profile-dir（既定: 設定フォルダの profiles）へ書き出す。環境変数 INSIGHTSLIDES_PROFILE=1 でも同じ。
+      --metrics-dir DIR（既定: 設定の metrics_dir）で処理件数・エラー・処理時間などのメトリクスを
+      DIR/insightslides.prom（Prometheus テキスト形式）と DIR/insightslides_events.jsonl に処理中から書き出す。
+      --trace PATH でファイルごと・段階ごとのタイムラインを Chrome trace-event 形式の JSON に書き出す）
+
+処理結果（エラー時も含む）は1行の JSON サマリーとして標準出力へ書く
+（差分本体を標準出力へ流す compare -o - の場合のみ標準エラー出力）。
+ファイルごとの経過は標準エラー出力。
+
+終了コード:
+    0 成功 / 1 エラー / 2 引数不正 / 3 ライセンス外の機能 /
+    4 対象データなし / 5 一部のファイルが失敗 / 130 中断
+"""
+import argparse
+import functools
+import json
+import os
+import sys
+from typing import Dict, List, Optional, Tuple
+
+import insightslides_core as core
+import insightslides_batch as batch
+import insightslides_metrics as metrics
+import insightslides_profile as profiling
+import insightslides_timing as timing
+import insightslides_trace as tracing
+from insightslides_config import ConfigManager, t
+from insightslides_license import LicenseManager
+
+# ============== 終了コード ==============
+EXIT_OK = 0
+EXIT_ERROR = 1
+EXIT_USAGE = 2
+EXIT_LICENSE = 3
+EXIT_NO_DATA = 4
+EXIT_PARTIAL = 5
+EXIT_CANCELLED = 130
+
+_STATUS_NAMES = {
+    EXIT_OK: "ok", EXIT_ERROR: "error", EXIT_USAGE: "usage", EXIT_LICENSE: "license",
+    EXIT_NO_DATA: "no_data", EXIT_PARTIAL: "partial", EXIT_CANCELLED: "cancelled",
+}
+
+
+class CliError(Exception):
+    """終了コード付きで処理を打ち切る"""
+
+    def __init__(self, code: int, message: str):
+        super().__init__(message)
+        self.code = code
+
+
+def _emit(summary: Dict, code: int, stream=None) -> int:
+    """JSON サマリーを1行で出力して終了コードを返す"""
+    summary = {**summary, "status": _STATUS_NAMES.get(code, "error"), "exit_code": code}
+    timings = timing.current()
+    if timings is not None:
+        summary["timings"] = timings.report()["spans"]
+    capture = profiling.current()
+    if capture is not None:
+        summary["profile"] = capture.base + ".prof"
+    print(json.dumps(summary, ensure_ascii=False, default=str), file=stream or sys.stdout, flush=True)
+    return code
+
+
+def _summary_stream(args):
+    """差分本体を標準出力へ流す compare -o - のときだけサマリーを標準エラー出力へ"""
+    return sys.stderr if args.command == "compare" and args.output == "-" else sys.stdout
+
+
+def _require(allowed: bool, feature: str):
+    if not allowed:
+        raise CliError(EXIT_LICENSE, f"現在のライセンスでは {feature} を利用できません")
+
+
+def _extract_headers() -> List[str]:
+    return [t('header_slide'), t('header_id'), t('header_type'), t('header_text')]
+
+
+def _batch_exit_code(summary: Dict) -> int:
+    if summary["files"] == 0:
+        return EXIT_NO_DATA
+    if summary["errors"]:
+        return EXIT_PARTIAL if summary["errors"] < summary["files"] else EXIT_ERROR
+    return EXIT_OK
+
+
+def _progress(quiet: bool):
+    """1ファイル完了ごとに標準エラー出力へ経過を書く"""
+    if quiet:
+        return None
+
+    def on_progress(done, total, res):
+        note = res.get("error") or (res.get("status") if res.get("status") == batch.RESULT_CACHED else "")
+        note = f" ({note})" if note else ""
+        print(f"[{done}/{total}] {res['file']}{note}", file=sys.stderr, flush=True)
+    return on_progress
+
+
+# ============== 単体コマンド ==============
+def _cmd_extract(args, lic: LicenseManager, cfg: ConfigManager) -> int:
+    _require(args.format != "json" or lic.can_json(), "JSON出力")
+    _require(not args.include_notes or lic.is_pro(), "ノート抽出")
+    if args.output and len(args.files) > 1:
+        raise CliError(EXIT_USAGE, "-o は入力ファイルが1つのときのみ指定できます")
+
+    if len(args.files) == 1:
+        path = args.files[0]
+        data, meta = core.extract_from_ppt(path, args.include_notes, notes_label=t('type_notes'))
+        summary = {"command": "extract", "file": path, "slides": meta.get("slide_count", 0), "items": len(data),
+                   "warnings": meta.get("errors", [])}
+        if not data:
+            return _emit(summary, EXIT_NO_DATA)
+        out = args.output or core.extract_output_path(path, args.format)
+        core.save_extracted(data, out, args.format, _extract_headers())
+        return _emit({**summary, "output": out}, EXIT_OK)
+
+    _require(lic.can_batch(), "フォルダ一括処理")  # 複数ファイルはワーカープールでの一括処理
+    results = batch.extract_files(args.files, args.format, args.include_notes, notes_label=t('type_notes'),
+                                  headers=_extract_headers(), jobs=args.jobs, on_progress=_progress(args.quiet))
+    summary = batch.summarize_results(results)
+    return _emit({"command": "extract", **summary, "results": results}, _batch_exit_code(summary))
+
+
+def _load_updates_or_fail(path: str, source: Optional[str]) -> Dict:
+    try:
+        updates = core.load_updates(path, source or core.update_source_for(path))
+    except core.InvalidHeaderError:
+        raise CliError(EXIT_ERROR, t('log_invalid_header'))
+    if not updates:
+        raise CliError(EXIT_NO_DATA, t('log_no_update_data'))
+    return updates
+
+
+def _cmd_update(args, lic: LicenseManager, cfg: ConfigManager) -> int:
+    source = args.source or core.update_source_for(args.data)
+    _require(source != "json" or lic.can_json(), "JSON入力")
+    updates = _load_updates_or_fail(args.data, source)
+
+    limit = lic.get_update_limit()
+    backup = ""
+    if not args.no_backup and lic.is_pro() and cfg.get('auto_backup', True):
+        backup = str(core.create_backup(args.pptx))
+
+    prs = core.load_presentation(args.pptx)
+    updated, skipped, _ = core.apply_updates(prs, updates, limit=limit, profile=args.normalize)
+    out = args.output or core.updated_output_path(args.pptx)
+    core.save_presentation(prs, out)
+    return _emit({"command": "update", "file": args.pptx, "data": args.data, "output": out, "backup": backup,
+                  "updates": len(updates), "updated": updated, "skipped": skipped, "limit": limit}, EXIT_OK)
+
+
+def _cmd_preview(args, lic: LicenseManager, cfg: ConfigManager) -> int:
+    source = args.source or core.update_source_for(args.data)
+    _require(source != "json" or lic.can_json(), "JSON入力")
+    updates = _load_updates_or_fail(args.data, source)
+
+    prs = core.load_presentation(args.pptx)
+    _, skipped, changes = core.apply_updates(prs, updates, preview=True, limit=lic.get_update_limit(),
+                                             profile=args.normalize)
+    return _emit({"command": "preview", "file": args.pptx, "data": args.data, "updates": len(updates),
+                  "changes": len(changes), "skipped": skipped, "diff": changes}, EXIT_OK)
+
+
+def _cmd_compare(args, lic: LicenseManager, cfg: ConfigManager) -> int:
+    _require(lic.can_compare(), "比較機能")
+    fmt = args.format
+    if fmt is None:
+        fmt = "jsonl" if args.output.lower().endswith(".jsonl") else "csv"
+
+    out = sys.stdout if args.output == "-" else args.output
+    stats = core.stream_compare(args.before, args.after, out, fmt=fmt, include_same=not args.changes_only,
+                                profile=args.normalize)
+
+    summary = {"command": "compare", "before": args.before, "after": args.after, "output": args.output,
+               "normalize": core.get_profile(args.normalize).spec, **stats}
+    return _emit(summary, EXIT_OK, _summary_stream(args))
+
+
+# ============== 一括コマンド ==============
+def _cmd_batch(args, lic: LicenseManager, cfg: ConfigManager) -> int:
+    _require(lic.can_batch(), "フォルダ一括処理")
+    progress = _progress(args.quiet)
+
+    if args.action == "compare":
+        _require(lic.can_compare(), "比較機能")
+        results = batch.compare_folders(args.folder, args.folder2, jobs=args.jobs, on_progress=progress,
+                                        profile=args.normalize)
+        summary = batch.summarize_folder_compare(results)
+        if not results:
+            return _emit({"command": "batch compare", **summary}, EXIT_NO_DATA)
+        batch.write_folder_compare(results, args.output)
+        return _emit({"command": "batch compare", "output": args.output, **summary}, _batch_exit_code(summary))
+
+    if args.distributed:
+        return _cmd_batch_distributed(args, lic, cfg, progress)
+
+    if args.action == "extract":
+        _require(not args.include_notes or lic.is_pro(), "ノート抽出")
+        results = batch.extract_folder(args.folder, args.format, include_notes=args.include_notes,
+                                       notes_label=t('type_notes'), headers=_extract_headers(),
+                                       jobs=args.jobs, on_progress=progress, mode=args.mode,
+                                       **_walk_options(args))
+    else:
+        backup = not args.no_backup and lic.is_pro() and cfg.get('auto_backup', True)
+        results = batch.update_folder(args.folder, args.format, limit=lic.get_update_limit(), backup=backup,
+                                      jobs=args.jobs, on_progress=progress, profile=args.normalize,
+                                      mode=args.mode, **_walk_options(args))
+
+    summary = batch.summarize_results(results)
+    return _emit({"command": f"batch {args.action}", "folder": args.folder, **summary,
+                  "pool": batch.last_pool_stats(), "results": results}, _batch_exit_code(summary))
+
+
+def _walk_options(args) -> Dict:
+    return {"recursive": args.recursive, "include": args.include, "exclude": args.exclude}
+
+
+def _cmd_batch_distributed(args, lic: LicenseManager, cfg: ConfigManager, progress) -> int:
+    """共有の作業フォルダを介して他のプロセス・マシンと分担する一括抽出 / 一括更新"""
+    import insightslides_shard as shard
+
+    if args.mode != batch.RUN_ALL:
+        raise CliError(EXIT_USAGE, "--distributed は --resume / --changed と併用できません（処理済みは常に飛ばします）")
+    walk = _walk_options(args)
+    if args.action == "extract":
+        _require(not args.include_notes or lic.is_pro(), "ノート抽出")
+        items = functools.partial(batch.extract_items, args.folder, args.format, args.include_notes,
+                                  t('type_notes'), _extract_headers(), **walk)
+        worker = batch._extract_file
+    else:
+        backup = not args.no_backup and lic.is_pro() and cfg.get('auto_backup', True)
+        items = functools.partial(batch.update_items, args.folder, args.format, lic.get_update_limit(),
+                                  backup, args.normalize, **walk)
+        worker = batch._update_file
+
+    shard_dir = args.shard_dir or shard.shard_dir_for(args.folder, args.action, args.format)
+    results, processed = shard.run_distributed(items, worker, shard_dir, jobs=args.jobs, lease=args.lease,
+                                               node=args.node, on_progress=progress)
+    summary = batch.summarize_results(results)
+    return _emit({"command": f"batch {args.action}", "folder": args.folder, "shard_dir": shard_dir,
+                  "node": args.node or shard.node_name(), "processed": len(processed), **summary,
+                  "pool": batch.last_pool_stats(), "results": results}, _batch_exit_code(summary))
+
+
+# ============== フォルダ監視 ==============
+def _cmd_watch(args, lic: LicenseManager, cfg: ConfigManager) -> int:
+    _require(lic.can_batch(), "フォルダ監視")
+    _require(not args.include_notes or lic.is_pro(), "ノート抽出")
+    import insightslides_watch as watch
+
+    # 抽出・エラーなどのイベントは1件ずつ JSON Lines で標準出力へ
+    def on_event(record):
+        print(json.dumps(record, ensure_ascii=False), flush=True)
+
+    watcher = watch.FolderWatcher(args.folder, args.format, args.include_notes, notes_label=t('type_notes'),
+                                  headers=_extract_headers(), interval=args.interval, debounce=args.debounce,
+                                  jobs=args.jobs, on_event=on_event)
+    pool = None
+    if args.once:
+        watcher.prime()
+        watcher.poll(force=True)
+    else:
+        # 常駐中は変更のたびにワーカーを起動し直さないよう、プールを使い回す（-j 1 ならこのプロセスで処理）
+        if args.jobs != 1:
+            pool = _start_pool(args, cfg)
+        try:
+            watcher.run(lambda: False)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            if pool:
+                batch.set_shared_pool(None)
+                pool.shutdown()
+    code = EXIT_PARTIAL if watcher.stats["errors"] else EXIT_OK
+    return _emit({"command": "watch", "folder": args.folder, **watcher.stats,
+                  "pool": pool.stats() if pool else None}, code)
+
+
+def _start_pool(args, cfg: ConfigManager):
+    """設定に従って常駐ワーカープールを起動し、一括処理用に登録する"""
+    from insightslides_pool import WorkerPool
+
+    timeout, max_rss = _task_limits(args, cfg)
+    pool = WorkerPool(args.jobs or cfg.get('pool_workers') or None,
+                      max_tasks_per_child=cfg.get('pool_max_tasks_per_child', 200),
+                      max_rss_mb=cfg.get('pool_max_rss_mb', 1024),
+                      task_timeout=timeout, task_max_rss_mb=max_rss).start()
+    batch.set_shared_pool(pool)
+    return pool
+
+
+def _task_limits(args, cfg: ConfigManager) -> Tuple[float, int]:
+    """1ファイルあたりの (制限時間 秒, メモリ上限 MB)。引数が優先、なければ設定値"""
+    timeout = getattr(args, "task_timeout", None)
+    max_rss = getattr(args, "task_max_rss", None)
+    return (cfg.get('task_timeout_s', 600) if timeout is None else timeout,
+            cfg.get('task_max_rss_mb', 4096) if max_rss is None else max_rss)
+
+
+# ============== 常駐サービス ==============
+def _cmd_serve(args, lic: LicenseManager, cfg: ConfigManager) -> int:
+    _require(lic.can_batch(), "常駐サービス")
+    import insightslides_service as service
+
+    try:
+        server = service.create_server(args.host, args.port, workers=args.workers, cache_entries=args.cache_entries,
+                                       cache_mb=args.cache_mb, verbose=args.verbose)
+    except ValueError as e:
+        raise CliError(EXIT_USAGE, str(e))
+    exporter = metrics.current()
+    if exporter is not None:
+        exporter.add_collector(lambda: _service_metrics(server.service))
+    # 待ち受け開始を1行の JSON で通知（--port 0 の場合の実ポートもここで分かる）
+    print(json.dumps({"command": "serve", "event": "listening", "url": server.url}), flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return _emit({"command": "serve", "url": server.url, **server.service.health()}, EXIT_OK)
+
+
+def _service_metrics(service) -> List[Tuple[str, Dict, float]]:
+    """常駐サービスのリクエスト数とキャッシュのヒット/ミス（メトリクスの書き出しごとに読む）"""
+    health = service.health()
+    cache = health["cache"]
+    return [("insightslides_service_requests_total", {}, health["requests"]),
+            ("insightslides_cache_lookups_total", {"cache": "service", "result": "hit"}, cache["hits"]),
+            ("insightslides_cache_lookups_total", {"cache": "service", "result": "miss"}, cache["misses"])]
+
+
+# ============== 引数定義 ==============
+def _profile_arg(value: str) -> str:
+    try:
+        return core.get_profile(value).spec
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+
+
+def _jobs_arg(value: str) -> int:
+    try:
+        jobs = int(value)
+    except ValueError:
+        jobs = 0
+    if jobs < 1:
+        raise argparse.ArgumentTypeError("1 以上の整数を指定してください")
+    return jobs
+
+
+def _add_normalize(p: argparse.ArgumentParser):
+    p.add_argument("--normalize", default=core.DEFAULT_PROFILE, type=_profile_arg,
+                   help=f"比較時の正規化（{'/'.join(core.PROFILE_OPTIONS)} を + で連結、既定: {core.DEFAULT_PROFILE}）")
+
+
+def _add_pool_options(p: argparse.ArgumentParser):
+    p.add_argument("-j", "--jobs", type=_jobs_arg, help="ワーカープロセス数（既定: CPU 数）")
+    _add_limit_options(p)
+    p.add_argument("-q", "--quiet", action="store_true", help="ファイルごとの経過を出力しない")
+
+
+def _add_limit_options(p: argparse.ArgumentParser):
+    p.add_argument("--memory-budget", type=_jobs_arg, metavar="MB",
+                   help="同時に処理するファイルの見積もりメモリの上限 MB（既定: 設定値、未設定なら物理メモリの6割）")
+    p.add_argument("--task-timeout", type=float, metavar="SEC",
+                   help="1ファイルの処理時間の上限 秒。超えたファイルはエラーとして次へ進む（0 で無制限、既定: 設定値）")
+    p.add_argument("--task-max-rss", type=int, metavar="MB",
+                   help="1ファイルの処理中のメモリ上限 MB（0 で無制限、既定: 設定値）")
+
+
+def _add_run_mode(p: argparse.ArgumentParser):
+    group = p.add_mutually_exclusive_group()
+    group.add_argument("--resume", dest="mode", action="store_const", const=batch.RUN_RESUME,
+                       help="前回完了して以降変わっていないファイルを飛ばし、中断した所から再開")
+    group.add_argument("--changed", dest="mode", action="store_const", const=batch.RUN_CHANGED,
+                       help="前回の実行から追加・変更されたファイルだけを処理")
+    p.set_defaults(mode=batch.RUN_ALL)
+
+
+def _add_walk_options(p: argparse.ArgumentParser, target: str):
+    p.add_argument("-r", "--recursive", action="store_true", help="サブフォルダも対象にする（backup/ は除く）")
+    p.add_argument("--include", action="append", default=[], metavar="PATTERN",
+                   help=f"対象とする{target}を絞り込むパターン（ファイル名または相対パス、複数指定可）")
+    p.add_argument("--exclude", action="append", default=[], metavar="PATTERN",
+                   help="除外するファイル・フォルダのパターン（複数指定可）")
+
+
+def _add_distributed_options(p: argparse.ArgumentParser):
+    p.add_argument("--distributed", action="store_true",
+                   help="共有の作業フォルダを介して、同じコマンドを実行している他のプロセス・マシンと分担する")
+    p.add_argument("--shard-dir", help="作業フォルダ（既定: <FOLDER>/.insightslides_shard_<処理>_<形式>）")
+    p.add_argument("--lease", type=float, default=120.0,
+                   help="この秒数ロックが更新されなければ異常終了とみなして引き継ぐ（既定: 120）")
+    p.add_argument("--node", help="ノード名（既定: ホスト名:プロセスID）")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog=os.path.basename(sys.argv[0]) or "InsightSlides",
+                                     description="Insight Slides - PowerPoint テキスト処理（ヘッドレス）")
+    parser.add_argument("--timings", action="store_true",
+                        help="段階ごとの処理時間を計測し、サマリーの timings に載せる")
+    parser.add_argument("--timings-report", metavar="PATH",
+                        help="段階ごと・ファイルごとの処理時間を JSON レポートに書き出す（--timings を含む）")
+    parser.add_argument("--profile", action="store_true",
+                        help="cProfile / tracemalloc で記録し、.prof とメモリ確保の上位を書き出す")
+    parser.add_argument("--profile-dir", metavar="DIR",
+                        help="--profile の出力先（--profile を含む。既定: 設定フォルダの profiles）")
+    parser.add_argument("--metrics-dir", metavar="DIR",
+                        help="メトリクス（insightslides.prom と insightslides_events.jsonl）の出力先（既定: 設定の metrics_dir）")
+    parser.add_argument("--trace", metavar="PATH",
+                        help="ファイルごと・段階ごとのタイムラインを Chrome trace-event 形式で書き出す（chrome://tracing / Perfetto で表示）")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("extract", help="PPTXのテキストを Excel/JSON/TSV に抽出")
+    p.add_argument("files", nargs="+", help="PPTXファイル（複数指定時はプロセスプールで並列処理）")
+    p.add_argument("-o", "--output", help="出力先（既定: <名前>_抽出.<拡張子>）")
+    p.add_argument("--format", choices=list(core.EXTRACT_EXTENSIONS), default="excel", help="出力形式（既定: excel）")
+    p.add_argument("--include-notes", action="store_true", help="スピーカーノートも抽出")
+    _add_pool_options(p)
+    p.set_defaults(func=_cmd_extract)
+
+    for name, help_text in (("update", "編集済みの Excel/JSON を PPTX に反映"),
+                            ("preview", "更新を適用せず変更箇所だけを表示")):
+        p = sub.add_parser(name, help=help_text)
+        p.add_argument("data", help="編集済みファイル (.xlsx / .json)")
+        p.add_argument("pptx", help="更新対象のPPTX")
+        p.add_argument("--source", choices=["excel", "json"], help="編集済みファイルの形式（既定: 拡張子から判定）")
+        _add_normalize(p)
+        if name == "update":
+            p.add_argument("-o", "--output", help="出力先（既定: <名前>_更新済み.pptx）")
+            p.add_argument("--no-backup", action="store_true", help="backup/ へのバックアップを作らない")
+            p.set_defaults(func=_cmd_update)
+        else:
+            p.set_defaults(func=_cmd_preview)
+
+    p = sub.add_parser("compare", help="2つのPPTXを比較し、差分をストリーミングで書き出す")
+    p.add_argument("before", help="元ファイル (.pptx)")
+    p.add_argument("after", help="新ファイル (.pptx)")
+    p.add_argument("-o", "--output", default="-", help="出力先（既定: 標準出力）")
+    p.add_argument("--format", choices=["csv", "jsonl"], help="出力形式（既定: 拡張子から判定、なければ csv）")
+    p.add_argument("--changes-only", action="store_true", help="「一致」行を出力しない")
+    _add_normalize(p)
+    p.set_defaults(func=_cmd_compare)
+
+    p = sub.add_parser("batch", help="フォルダ一括処理（抽出 / 更新 / 比較）")
+    actions = p.add_subparsers(dest="action", required=True)
+    a = actions.add_parser("extract", help="フォルダ直下の PPTX を一括抽出")
+    a.add_argument("folder")
+    a.add_argument("--format", choices=["excel", "json"], default="excel", help="出力形式（既定: excel）")
+    a.add_argument("--include-notes", action="store_true", help="スピーカーノートも抽出")
+    _add_run_mode(a)
+    _add_walk_options(a, "PPTX")
+    _add_distributed_options(a)
+    a = actions.add_parser("update", help="<名前>_抽出.<拡張子> を同名の PPTX に一括反映")
+    a.add_argument("folder")
+    a.add_argument("--format", choices=["excel", "json"], default="excel", help="抽出ファイルの形式（既定: excel）")
+    a.add_argument("--no-backup", action="store_true", help="backup/ へのバックアップを作らない")
+    _add_normalize(a)
+    _add_run_mode(a)
+    _add_walk_options(a, "抽出ファイル")
+    _add_distributed_options(a)
+    a = actions.add_parser("compare", help="2フォルダを同名ファイルで対応付けて一括比較")
+    a.add_argument("folder", help="元フォルダ")
+    a.add_argument("folder2", help="新フォルダ")
+    a.add_argument("-o", "--output", required=True, help="出力先（.xlsx または .csv）")
+    _add_normalize(a)
+    for a in actions.choices.values():
+        _add_pool_options(a)
+    p.set_defaults(func=_cmd_batch)
+
+    p = sub.add_parser("watch", help="フォルダを監視し、追加・更新された PPTX を自動で抽出")
+    p.add_argument("folder")
+    p.add_argument("--format", choices=["excel", "json"], default="excel", help="出力形式（既定: excel）")
+    p.add_argument("--include-notes", action="store_true", help="スピーカーノートも抽出")
+    p.add_argument("--interval", type=float, default=1.0, help="ポーリング間隔 秒（既定: 1）")
+    p.add_argument("--debounce", type=float, default=2.0, help="変化が止まってから抽出するまでの秒数（既定: 2）")
+    p.add_argument("--once", action="store_true", help="未抽出・更新済みのものを1回処理して終了")
+    p.add_argument("-j", "--jobs", type=_jobs_arg, help="ワーカープロセス数（既定: CPU 数）")
+    _add_limit_options(p)
+    p.set_defaults(func=_cmd_watch)
+
+    p = sub.add_parser("serve", help="localhost で常駐し、読み込んだデッキをキャッシュして繰り返しの呼び出しに応答")
+    p.add_argument("--host", default="127.0.0.1", help="待ち受けアドレス（ループバックのみ。既定: 127.0.0.1）")
+    p.add_argument("--port", type=int, default=8765, help="待ち受けポート（0 で自動割り当て、既定: 8765）")
+    p.add_argument("--workers", type=_jobs_arg, default=4, help="リクエスト処理スレッド数（既定: 4）")
+    p.add_argument("--cache-entries", type=_jobs_arg, default=64, help="キャッシュの最大件数（既定: 64）")
+    p.add_argument("--cache-mb", type=_jobs_arg, default=512, help="キャッシュの概算上限 MB（既定: 512）")
+    p.add_argument("-v", "--verbose", action="store_true", help="アクセスログを標準エラー出力へ書く")
+    p.set_defaults(func=_cmd_serve)
+
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    # 言語設定（見出し・メッセージ）とライセンスは GUI と共通の設定ファイルから読む
+    cfg = ConfigManager()
+    lic = LicenseManager()
+    batch.set_memory_budget(getattr(args, "memory_budget", None) or cfg.get('batch_memory_budget_mb'))
+    batch.set_task_limits(*_task_limits(args, cfg))
+    command = args.command if args.command != "batch" else f"batch {args.action}"
+    argv = argv if argv is not None else sys.argv[1:]
+    if args.timings or args.timings_report:
+        timing.set_enabled(True)
+    if args.profile or args.profile_dir:
+        profiling.arm()
+    metrics_dir = args.metrics_dir or cfg.get('metrics_dir')
+    with metrics.export(metrics_dir, command, {"argv": argv}, cfg.get('metrics_interval_s', 5)) as exporter, \
+            profiling.capture(command, {"command": command, "argv": argv}, args.profile_dir) as capture, \
+            tracing.record(command, args.trace, {"argv": argv}) as recorder, \
+            timing.collect() as timings:
+        try:
+            code = _run_command(args, command, lic, cfg)
+            if exporter is not None:
+                exporter.status = _STATUS_NAMES.get(code, "error")
+        finally:
+            if args.timings_report:
+                timing.write_report(timings, args.timings_report, command=command, argv=argv)
+    for output in (capture, recorder):
+        if output is not None and output.write_error:
+            print(t('log_error', output.write_error), file=sys.stderr, flush=True)
+    return code
+
+
+def _run_command(args, command: str, lic: LicenseManager, cfg: ConfigManager) -> int:
+    try:
+        return args.func(args, lic, cfg)
+    except CliError as e:
+        return _emit({"command": command, "error": str(e)}, e.code, _summary_stream(args))
+    except KeyboardInterrupt:
+        return _emit({"command": command, "error": t('log_cancelled')}, EXIT_CANCELLED, _summary_stream(args))
+    except BrokenPipeError:
+        # `| head` などで出力先が先に閉じられた場合
+        return EXIT_OK
+    except Exception as e:
+        return _emit({"command": command, "error": str(e)}, EXIT_ERROR, _summary_stream(args))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
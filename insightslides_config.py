@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+"""
+Insight Slides - アプリ情報・設定・多言語リソース（GUI非依存）
+
+GUI / CLI の双方から参照する。tkinter には依存しない。
+"""
+import json
+import traceback
+from datetime import datetime
+from pathlib import Path
+from typing import Dict
+
+# ============== App Info ==============
+APP_VERSION = "2.0.0"
+APP_NAME = "Insight Slides"
+
+# ============== Config Paths ==============
+CONFIG_DIR = Path.home() / ".insightslides"
+CONFIG_FILE = CONFIG_DIR / "config.json"
+LICENSE_FILE = CONFIG_DIR / "license.key"
+ERROR_LOG_FILE = CONFIG_DIR / "error_log.txt"
+SESSION_LOG_FILE = CONFIG_DIR / "session_log.txt"
+
+# ============== Support Links ==============
+SUPPORT_LINKS = {
+    "faq": "https://example.com/insightslides/faq",
+    "tutorial": "https://example.com/insightslides/tutorial",
+    "purchase": "https://example.com/insightslides/purchase",
+    "contact": "mailto:support@example.com",
+}
+
+# ============== Internationalization (i18n) ==============
+# 文言テーブル（insightslides_i18n.LANGUAGES）は初回の t() 呼び出しで読み込む
+SUPPORTED_LANGUAGES = ('ja', 'en')
+_languages = None
+
+_current_lang = 'ja'
+
+def _get_languages() -> Dict[str, Dict[str, str]]:
+    global _languages
+    if _languages is None:
+        from insightslides_i18n import LANGUAGES
+        _languages = LANGUAGES
+    return _languages
+
+def t(key: str, *args) -> str:
+    languages = _get_languages()
+    text = languages.get(_current_lang, languages['ja']).get(key, key)
+    if args:
+        return text.format(*args)
+    return text
+
+def set_language(lang: str):
+    global _current_lang
+    if lang in SUPPORTED_LANGUAGES:
+        _current_lang = lang
+
+def get_language() -> str:
+    return _current_lang
+
+
+class ConfigManager:
+    DEFAULT = {
+        'language': 'ja', 'output_format': 'excel', 'include_metadata': True,
+        'auto_backup': True, 'last_directory': '', 'font_size': 'medium',
+        'advanced_expanded': False, 'include_subfolders': False,
+        # 一括処理用の常駐ワーカープール（pool_workers=0 で CPU 数）
+        'prewarm_workers': True, 'pool_workers': 0,
+        'pool_max_tasks_per_child': 200, 'pool_max_rss_mb': 1024,
+        # 同時に処理するファイルの見積もりメモリの上限（0 で物理メモリの6割）
+        'batch_memory_budget_mb': 0,
+        # 一括処理で1ファイルにかけてよい時間（秒）とメモリ（MB）。超えたワーカーは終了させる（0 で無制限）
+        'task_timeout_s': 600, 'task_max_rss_mb': 4096,
+        # 処理ログ: 画面に持つ行数と、全行を session_log.txt に書き出すか（KB ごとにローテーション）
+        'log_buffer_lines': 5000, 'log_spill': True, 'log_spill_max_kb': 2048,
+        # 一括処理の前に対象のスライド数を数えて、進捗率と残り時間を出す
+        'progress_prescan': True,
+        # 段階ごとの処理時間を計測してログと CONFIG_DIR/timings/ のレポートに出す
+        'timing_enabled': False,
+        # ジョブのタイムラインを Chrome trace-event 形式で CONFIG_DIR/traces/ に書き出す
+        'trace_enabled': False,
+        # 一括処理・ヘッドレス実行のメトリクス（Prometheus テキストと JSONL）の出力先（空で出力しない）
+        'metrics_dir': '', 'metrics_interval_s': 5,
+    }
+
+    def __init__(self):
+        CONFIG_DIR.mkdir(parents=True, exist_ok=True)
+        self.config = self._load()
+        set_language(self.config.get('language', 'ja'))
+
+    def _load(self) -> Dict:
+        if CONFIG_FILE.exists():
+            try:
+                with open(CONFIG_FILE, 'r', encoding='utf-8') as f:
+                    return {**self.DEFAULT, **json.load(f)}
+            except:
+                pass
+        return self.DEFAULT.copy()
+
+    def save(self):
+        with open(CONFIG_FILE, 'w', encoding='utf-8') as f:
+            json.dump(self.config, f, ensure_ascii=False, indent=2)
+
+    def get(self, key: str, default=None):
+        return self.config.get(key, default)
+
+    def set(self, key: str, value):
+        self.config[key] = value
+        self.save()
+
+
+def save_error_log(error: Exception, context: str = ""):
+    try:
+        CONFIG_DIR.mkdir(parents=True, exist_ok=True)
+        with open(ERROR_LOG_FILE, 'a', encoding='utf-8') as f:
+            f.write(f"\n{'='*60}\n{datetime.now()}\n{context}\n{error}\n{traceback.format_exc()}\n")
+    except:
+        pass
@@ -0,0 +1,815 @@
+# -*- coding: utf-8 -*-
+"""
+Insight Slides - コアエンジン（GUI非依存）
+
+抽出・更新・比較・ファイル入出力のロジックを tkinter から切り離したモジュール。
+プロセスプールのワーカーからも読み込めるよう、GUI 関連の import を持たない。
+pptx / openpyxl は読み込みに時間がかかるため、必要になった関数の中で import する
+（CLI のヘルプ表示や GUI の起動直後の画面表示を遅くしない）。
+"""
+import os
+import re
+import csv
+import json
+import shutil
+import hashlib
+import unicodedata
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from insightslides_timing import span, timed
+
+# ============== 比較ステータス ==============
+STATUS_SAME = "一致"
+STATUS_CHANGED = "変更"
+STATUS_ADDED = "追加"
+STATUS_REMOVED = "削除"
+STATUS_MOVED = "移動"
+
+# 除去する制御文字（\t \n \r 以外の C0 制御文字。\v もここで消える）
+_CONTROL_CHARS_RE = re.compile(r'[\x00-\x08\x0B-\x0C\x0E-\x1F]')
+_CONTROL_CHARS_BYTES = bytes(c for c in range(0x20) if c not in (0x09, 0x0A, 0x0D))
+# バッチ結合用の区切り文字。ASCII のみのバッチは DEL で連結して高速経路に乗せ、
+# それ以外は XML 1.0 で使えない U+FFFF（PPTX のテキストには現れない）で連結する
+_BATCH_SEP_ASCII = '\x7f'
+_BATCH_SEP = '\uFFFF'
+
+
+# ============== テキスト処理 ==============
+def clean_text(text: Optional[str]) -> str:
+    """制御文字を除去し、改行コードを \\n に統一"""
+    if text is None:
+        return ""
+    if text.isascii():
+        # ASCII のみなら bytes.translate の削除テーブルで一括除去（正規表現より速い）
+        text = text.encode('ascii').translate(None, _CONTROL_CHARS_BYTES).decode('ascii')
+    else:
+        text = _CONTROL_CHARS_RE.sub('', text)
+    if '\r' in text:
+        text = text.replace('\r\n', '\n').replace('\r', '\n')
+    return text
+
+
+def clean_texts(texts: List[Optional[str]]) -> List[str]:
+    """clean_text のバッチ版（結果は1件ずつ処理した場合と同一）
+
+    区切り文字で1本の文字列に連結して除去・改行統一を1回で済ませ、
+    呼び出しごとのオーバーヘッドを削る。
+    """
+    if len(texts) < 2:
+        return [clean_text(text) for text in texts]
+    if None in texts:
+        texts = ["" if text is None else text for text in texts]
+    sep = _BATCH_SEP_ASCII
+    joined = sep.join(texts)
+    if not joined.isascii():
+        sep = _BATCH_SEP
+        joined = joined.replace(_BATCH_SEP_ASCII, sep)
+    cleaned = clean_text(joined).split(sep)
+    if len(cleaned) != len(texts):
+        # 区切り文字を含むテキストがあった場合は1件ずつ処理
+        return [clean_text(text) for text in texts]
+    return cleaned
+
+
+# ============== 比較用の正規化プロファイル ==============
+# standard: 改行コード・特殊空白の統一 + 前後の空白除去（従来の比較と同じ）
+# exact: 正規化しない / whitespace: 空白・改行をすべて無視
+# width: 全角/半角の違いを無視 (NFKC) / case: 大文字/小文字を無視
+# 組み合わせは "whitespace+width" のように + で連結する
+PROFILE_OPTIONS = ("exact", "standard", "whitespace", "width", "case")
+DEFAULT_PROFILE = "standard"
+
+_WHITESPACE_CHARS = [cp for cp in range(0x3001) if chr(cp).isspace()]
+
+
+class NormalizationProfile:
+    """比較用正規化プロファイル
+
+    変換テーブルは生成時に1回だけ構築する。get_profile() 経由で取得すれば
+    同じ指定のプロファイルは使い回される。
+    """
+
+    def __init__(self, spec: str = DEFAULT_PROFILE):
+        options = {o.strip() for o in spec.replace(',', '+').split('+') if o.strip()} or {DEFAULT_PROFILE}
+        unknown = options - set(PROFILE_OPTIONS)
+        if unknown:
+            raise ValueError(f"不明な正規化プロファイル: {', '.join(sorted(unknown))}")
+        if "exact" in options and len(options) > 1:
+            raise ValueError("exact は他のプロファイルと組み合わせられません")
+
+        self.spec = "+".join(o for o in PROFILE_OPTIONS if o in options)
+        self.exact = "exact" in options
+        self.nfkc = "width" in options
+        self.casefold = "case" in options
+
+        table = {ord('\r'): '\n', ord('\v'): '\n', 0x00A0: ' ', 0x3000: ' '}
+        if "whitespace" in options:
+            table = dict.fromkeys(_WHITESPACE_CHARS)
+        self._table = str.maketrans(table)
+
+    def normalize(self, text: Optional[str]) -> str:
+        if text is None:
+            return ""
+        if self.exact:
+            return text
+        if self.nfkc and not text.isascii():
+            text = unicodedata.normalize('NFKC', text)
+        if '\r' in text:
+            text = text.replace('\r\n', '\n')
+        text = text.translate(self._table)
+        if self.casefold:
+            text = text.casefold()
+        return text.strip()
+
+    def digest(self, text: Optional[str]) -> bytes:
+        """正規化後テキストのハッシュ（等価判定はこの値同士で行う）"""
+        return self.hash_normalized(self.normalize(text))
+
+    @staticmethod
+    def hash_normalized(normalized: str) -> bytes:
+        """normalize() 済みテキストのハッシュ（digest と同じ値）"""
+        return hashlib.blake2b(normalized.encode('utf-8', 'surrogatepass'), digest_size=16).digest()
+
+    def __repr__(self):
+        return f"NormalizationProfile({self.spec!r})"
+
+
+_profiles: Dict[str, NormalizationProfile] = {}
+
+
+def get_profile(spec=None) -> NormalizationProfile:
+    """プロファイル指定（文字列 / NormalizationProfile / None）からプロファイルを取得"""
+    if isinstance(spec, NormalizationProfile):
+        return spec
+    spec = spec or DEFAULT_PROFILE
+    profile = _profiles.get(spec)
+    if profile is None:
+        profile = _profiles[spec] = NormalizationProfile(spec)
+    return profile
+
+
+def normalize_for_compare(text: Optional[str]) -> str:
+    """比較用の正規化（改行コード・特殊空白の統一 + 前後の空白除去）"""
+    return get_profile(DEFAULT_PROFILE).normalize(text)
+
+
+def texts_are_equal(old_text: Optional[str], new_text: Optional[str], profile=None) -> bool:
+    profile = get_profile(profile)
+    return profile.digest(old_text) == profile.digest(new_text)
+
+
+def get_shape_type(shape) -> str:
+    try:
+        if shape.is_placeholder:
+            types_ja = {1: "タイトル", 2: "本文", 3: "図表", 4: "日付", 5: "スライド番号"}
+            return types_ja.get(shape.placeholder_format.type, "その他")
+        elif hasattr(shape, "has_table") and shape.has_table:
+            return "表"
+        elif shape.shape_type == 1:
+            return "テキストボックス"
+        return "その他"
+    except Exception:
+        return "不明"
+
+
+# ============== 抽出 ==============
+def extract_from_ppt(path: str, include_notes: bool = False, notes_label: str = "ノート",
+                     should_cancel: Optional[Callable[[], bool]] = None) -> Tuple[List[Dict], Dict]:
+    """PPTXからテキストを抽出
+
+    ファイルを開けない場合は例外をそのまま送出する（呼び出し側でログ出力）。
+
+    Args:
+        notes_label: スピーカーノート行の type 列に入れる表示名
+        should_cancel: True を返すとスライド単位で抽出を打ち切る
+    """
+    return extract_from_presentation(load_presentation(path), os.path.basename(path), include_notes,
+                                     notes_label, should_cancel)
+
+
+def extract_from_presentation(prs, file_name: str, include_notes: bool = False, notes_label: str = "ノート",
+                              should_cancel: Optional[Callable[[], bool]] = None) -> Tuple[List[Dict], Dict]:
+    """読み込み済みの Presentation からテキストを抽出（Presentation は変更しない）
+
+    読み取れなかった図形・ノートは飛ばし、その内容を meta['errors'] に残す。
+    """
+    data = []
+    meta = {'file_name': file_name, 'slide_count': len(prs.slides), 'errors': []}
+
+    for slide_num, slide in enumerate(prs.slides, 1):
+        if should_cancel and should_cancel():
+            break
+        data.extend(_slide_texts(slide, slide_num, include_notes, notes_label, meta['errors'], should_cancel))
+
+    return data, meta
+
+
+def iter_extract_sorted(path: str, include_notes: bool = False, notes_label: str = "ノート",
+                        should_cancel: Optional[Callable[[], bool]] = None) -> Iterator[Dict]:
+    """スライド単位で (slide, id) 順に並べた抽出行を逐次返す
+
+    ファイル全体のリストは作らず、保持するのは1スライド分のみ。
+    同じキーが重複した場合は compare_texts と同じく後勝ち。
+    """
+    prs = load_presentation(path)
+    for slide_num, slide in enumerate(prs.slides, 1):
+        if should_cancel and should_cancel():
+            break
+        rows = {row["id"]: row for row in _slide_texts(slide, slide_num, include_notes, notes_label,
+                                                      should_cancel=should_cancel)}
+        for sid in sorted(rows):
+            yield rows[sid]
+
+
+def _slide_texts(slide, slide_num: int, include_notes: bool, notes_label: str,
+                 errors: Optional[List[str]] = None,
+                 should_cancel: Optional[Callable[[], bool]] = None) -> List[Dict]:
+    """1スライド分の抽出行（テキストのクリーニングはスライド単位でまとめて行う）"""
+    with span("read_text"):
+        rows = list(_iter_slide_raw_texts(slide, slide_num, include_notes, notes_label, errors, should_cancel))
+    with span("clean_text"):
+        cleaned = clean_texts([row["text"] for row in rows])
+    for row, text in zip(rows, cleaned):
+        row["text"] = text
+    return rows
+
+
+def _iter_slide_raw_texts(slide, slide_num: int, include_notes: bool, notes_label: str,
+                          errors: Optional[List[str]] = None,
+                          should_cancel: Optional[Callable[[], bool]] = None) -> Iterator[Dict]:
+    """1スライド分の未加工の抽出行（図形 → 表セル → ノートの順）
+
+    読み取れない図形・ノートは飛ばし、errors があれば「スライド番号・図形: 例外」を追加する。
+    should_cancel は図形ごとに確認する（図形の多いスライドでも取り消しがすぐ効くように）。
+    """
+    for shape in slide.shapes:
+        if should_cancel and should_cancel():
+            return
+        try:
+            sid = str(shape.shape_id)
+            stype = get_shape_type(shape)
+
+            if hasattr(shape, "text") and shape.text.strip():
+                yield {"slide": slide_num, "id": sid, "type": stype, "text": shape.text}
+
+            if hasattr(shape, "has_table") and shape.has_table:
+                for r, row in enumerate(shape.table.rows):
+                    for c, cell in enumerate(row.cells):
+                        if cell.text.strip():
+                            yield {
+                                "slide": slide_num, "id": f"{sid}_t{r}_{c}",
+                                "type": f"表({r+1},{c+1})", "text": cell.text
+                            }
+        except Exception as e:
+            if errors is not None:
+                errors.append(f"スライド{slide_num} 図形{getattr(shape, 'shape_id', '?')}: {type(e).__name__}: {e}")
+
+    if include_notes:
+        try:
+            if slide.has_notes_slide and slide.notes_slide.notes_text_frame:
+                notes_text = slide.notes_slide.notes_text_frame.text.strip()
+                if notes_text:
+                    yield {"slide": slide_num, "id": "notes", "type": notes_label, "text": notes_text}
+        except Exception as e:
+            if errors is not None:
+                errors.append(f"スライド{slide_num} ノート: {type(e).__name__}: {e}")
+
+
+# ============== 比較 ==============
+@timed("compare")
+def compare_texts(data1: List[Dict], data2: List[Dict], detect_moves: bool = False,
+                  profile=None) -> Tuple[List[Dict], Dict]:
+    """2つの抽出結果を (slide, id) で突き合わせて差分行と集計を返す
+
+    detect_moves=True の場合、削除行と追加行の組を移動/変更として対応付ける
+    （detect_moved_text を参照）。profile は比較に使う正規化プロファイル。
+    """
+    profile = get_profile(profile)
+    map1 = {(d["slide"], d["id"]): d["text"] for d in data1}
+    map2 = {(d["slide"], d["id"]): d["text"] for d in data2}
+
+    all_keys = set(map1.keys()) | set(map2.keys())
+    diff_data = []
+    stats = {"same": 0, "changed": 0, "added": 0, "removed": 0, "moved": 0}
+    keyed = {}  # 削除・追加行の index -> (正規化後テキスト, ハッシュ)（移動検出用）
+
+    for key in sorted(all_keys):
+        t1 = map1.get(key)
+        t2 = map2.get(key)
+
+        if t1 and t2:
+            if profile.digest(t1) == profile.digest(t2):
+                status = STATUS_SAME
+                stats["same"] += 1
+            else:
+                status = STATUS_CHANGED
+                stats["changed"] += 1
+        elif t1:
+            status = STATUS_REMOVED
+            stats["removed"] += 1
+        else:
+            status = STATUS_ADDED
+            stats["added"] += 1
+
+        if detect_moves and status in (STATUS_REMOVED, STATUS_ADDED):
+            normalized = profile.normalize(t1 or t2)
+            keyed[len(diff_data)] = (normalized, profile.hash_normalized(normalized))
+        diff_data.append({
+            "slide": key[0], "id": key[1], "status": status,
+            "before": t1 or "", "after": t2 or ""
+        })
+
+    if detect_moves:
+        diff_data = detect_moved_text(diff_data, stats, profile=profile, keyed=keyed)
+    return diff_data, stats
+
+
+# ============== 移動検出 ==============
+MOVE_SIMILARITY_THRESHOLD = 0.5  # これ未満の類似度は対応付けない
+_SHINGLE_SIZE = 3                # 文字単位の shingle 長（日本語は分かち書き不要）
+_MINHASH_BANDS = 8               # LSH のバンド数
+_MINHASH_ROWS = 2                # 1バンドあたりのハッシュ数
+_LSH_BUCKET_LIMIT = 64           # 定型文などで巨大化したバケットは候補生成に使わない
+# MinHash の各「置換」は 64bit ハッシュとの XOR で近似する（実行ごとに結果が変わらないよう固定値）
+_MINHASH_MASKS = [int.from_bytes(hashlib.blake2b(str(i).encode(), digest_size=8).digest(), 'little')
+                  for i in range(_MINHASH_BANDS * _MINHASH_ROWS)]
+
+
+def _shingles(text: str) -> frozenset:
+    if len(text) <= _SHINGLE_SIZE:
+        return frozenset([text])
+    return frozenset(text[i:i + _SHINGLE_SIZE] for i in range(len(text) - _SHINGLE_SIZE + 1))
+
+
+def _minhash_bands(shingles: frozenset, hash_cache: Dict[str, int]) -> List[Tuple[int, ...]]:
+    hashes = []
+    for sh in shingles:
+        h = hash_cache.get(sh)
+        if h is None:
+            h = hash_cache[sh] = int.from_bytes(hashlib.blake2b(sh.encode('utf-8'), digest_size=8).digest(), 'little')
+        hashes.append(h)
+    sig = [min(map(mask.__xor__, hashes)) for mask in _MINHASH_MASKS]
+    return [(band,) + tuple(sig[band * _MINHASH_ROWS:(band + 1) * _MINHASH_ROWS])
+            for band in range(_MINHASH_BANDS)]
+
+
+@timed("detect_moves")
+def detect_moved_text(diff_data: List[Dict], stats: Dict,
+                      threshold: float = MOVE_SIMILARITY_THRESHOLD, profile=None,
+                      keyed: Optional[Dict[int, Tuple[str, bytes]]] = None) -> List[Dict]:
+    """削除行と追加行を対応付け、別の図形・スライドへ移動したテキストを検出
+
+    1. 正規化後の全文が一致する組 → 「移動」（score 1.0）
+    2. 残りを文字 shingle の MinHash/LSH で候補化し、Jaccard 類似度が
+       threshold 以上の組 → 「変更」（score = 類似度。1.0 でも全文一致でなければ変更）
+
+    keyed は削除・追加行の index -> (正規化後テキスト, ハッシュ)。compare_texts が
+    計算済みの値を渡す（省略時はここで計算する）。
+
+    対応付いた2行は移動先のキー位置にある1行にまとめ、移動元を
+    from_slide / from_id に記録する。候補生成はバケット単位のため、
+    行数に対してほぼ線形で動作する。
+
+    Returns:
+        新しい差分行リスト（stats の件数も更新する）
+    """
+    profile = get_profile(profile)
+    removed = [i for i, row in enumerate(diff_data) if row["status"] == STATUS_REMOVED]
+    added = [i for i, row in enumerate(diff_data) if row["status"] == STATUS_ADDED]
+    stats.setdefault("moved", 0)
+    if not removed or not added:
+        return diff_data
+
+    if keyed is None:
+        keyed = {}
+    for i in removed + added:
+        if i not in keyed:
+            row = diff_data[i]
+            normalized = profile.normalize(row["before"] if row["status"] == STATUS_REMOVED else row["after"])
+            keyed[i] = (normalized, profile.hash_normalized(normalized))
+
+    pairs = {}  # 追加行 index -> (削除行 index, score, 全文一致か)
+
+    # 1. 完全一致（正規化後）
+    by_text: Dict[bytes, List[int]] = {}
+    for i in removed:
+        by_text.setdefault(keyed[i][1], []).append(i)
+    rest_added = []
+    for j in added:
+        candidates = by_text.get(keyed[j][1])
+        if candidates:
+            pairs[j] = (candidates.pop(0), 1.0, True)
+        else:
+            rest_added.append(j)
+    used = {i for i, _, _ in pairs.values()}
+    rest_removed = [i for i in removed if i not in used]
+
+    # 2. 類似（MinHash/LSH で候補化 → Jaccard で検証）
+    if rest_removed and rest_added:
+        shingles = {}
+        hash_cache: Dict[str, int] = {}
+        buckets: Dict[Tuple[int, ...], List[int]] = {}
+        for i in rest_removed:
+            shingles[i] = _shingles(keyed[i][0])
+            for band in _minhash_bands(shingles[i], hash_cache):
+                buckets.setdefault(band, []).append(i)
+
+        candidates = set()
+        for j in rest_added:
+            shingles[j] = _shingles(keyed[j][0])
+            for band in _minhash_bands(shingles[j], hash_cache):
+                members = buckets.get(band)
+                if members and len(members) <= _LSH_BUCKET_LIMIT:
+                    candidates.update((i, j) for i in members)
+
+        scored = []
+        for i, j in candidates:
+            a, b = shingles[i], shingles[j]
+            score = len(a & b) / len(a | b)
+            if score >= threshold:
+                same_slide = diff_data[i]["slide"] == diff_data[j]["slide"]
+                scored.append((-score, not same_slide, i, j, score))
+        scored.sort()
+
+        for _, _, i, j, score in scored:
+            if i in used or j in pairs:
+                continue
+            pairs[j] = (i, round(score, 3), False)
+            used.add(i)
+
+    if not pairs:
+        return diff_data
+
+    result = []
+    for idx, row in enumerate(diff_data):
+        if idx in used:
+            continue
+        if idx in pairs:
+            src_idx, score, exact = pairs[idx]
+            src = diff_data[src_idx]
+            status = STATUS_MOVED if exact else STATUS_CHANGED
+            stats["removed"] -= 1
+            stats["added"] -= 1
+            stats["moved" if status == STATUS_MOVED else "changed"] += 1
+            row = {
+                "slide": row["slide"], "id": row["id"], "status": status,
+                "before": src["before"], "after": row["after"],
+                "from_slide": src["slide"], "from_id": src["id"], "score": score,
+            }
+        result.append(row)
+    return result
+
+
+def compare_files(file1: str, file2: str, detect_moves: bool = False, profile=None) -> Tuple[List[Dict], Dict]:
+    """2つのPPTXを抽出して比較"""
+    data1, _ = extract_from_ppt(file1)
+    data2, _ = extract_from_ppt(file2)
+    return compare_texts(data1, data2, detect_moves=detect_moves, profile=profile)
+
+
+# ============== ストリーミング比較 ==============
+COMPARE_CSV_HEADER = ["スライド", "ID", "状態", "元", "新"]
+
+
+def iter_compare(rows1: Iterable[Dict], rows2: Iterable[Dict], stats: Optional[Dict] = None,
+                 profile=None) -> Iterator[Dict]:
+    """(slide, id) 順に並んだ2つの抽出ストリームをマージ結合して差分行を逐次返す
+
+    出力順・判定は compare_texts と同じ。stats を渡すと件数を加算していく。
+    """
+    profile = get_profile(profile)
+    if stats is None:
+        stats = {}
+    for k in ("same", "changed", "added", "removed"):
+        stats.setdefault(k, 0)
+
+    it1, it2 = iter(rows1), iter(rows2)
+    r1, r2 = next(it1, None), next(it2, None)
+    while r1 is not None or r2 is not None:
+        k1 = (r1["slide"], r1["id"]) if r1 is not None else None
+        k2 = (r2["slide"], r2["id"]) if r2 is not None else None
+
+        if k2 is None or (k1 is not None and k1 < k2):
+            key, t1, t2 = k1, r1["text"], None
+            r1 = next(it1, None)
+        elif k1 is None or k2 < k1:
+            key, t1, t2 = k2, None, r2["text"]
+            r2 = next(it2, None)
+        else:
+            key, t1, t2 = k1, r1["text"], r2["text"]
+            r1, r2 = next(it1, None), next(it2, None)
+
+        if t1 and t2:
+            if profile.digest(t1) == profile.digest(t2):
+                status = STATUS_SAME
+                stats["same"] += 1
+            else:
+                status = STATUS_CHANGED
+                stats["changed"] += 1
+        elif t1:
+            status = STATUS_REMOVED
+            stats["removed"] += 1
+        else:
+            status = STATUS_ADDED
+            stats["added"] += 1
+
+        yield {"slide": key[0], "id": key[1], "status": status, "before": t1 or "", "after": t2 or ""}
+
+
+@timed("compare")
+def stream_compare(file1: str, file2: str, out, fmt: str = "csv", include_same: bool = True,
+                   should_cancel: Optional[Callable[[], bool]] = None, profile=None) -> Dict:
+    """2つのPPTXを比較し、差分行を生成しながらそのまま CSV/JSONL に書き出す
+
+    UI 用の差分リストや全キーの集合を作らないため、巨大なデッキでもメモリは
+    1スライド分程度に収まる。
+
+    Args:
+        out: 出力先パス、または書き込み可能なテキストストリーム
+        fmt: "csv" または "jsonl"
+        include_same: False なら「一致」行を書き出さない
+        profile: 比較に使う正規化プロファイル
+
+    Returns:
+        集計 {same, changed, added, removed}
+    """
+    stats = {"same": 0, "changed": 0, "added": 0, "removed": 0, "moved": 0}
+    rows = iter_compare(iter_extract_sorted(file1, should_cancel=should_cancel),
+                        iter_extract_sorted(file2, should_cancel=should_cancel), stats, profile)
+
+    if isinstance(out, str):
+        encoding = 'utf-8-sig' if fmt == "csv" else 'utf-8'
+        with open(out, 'w', newline='', encoding=encoding) as f:
+            _write_compare_rows(rows, f, fmt, include_same)
+    else:
+        _write_compare_rows(rows, out, fmt, include_same)
+    return stats
+
+
+def _write_compare_rows(rows: Iterable[Dict], f, fmt: str, include_same: bool):
+    if fmt == "jsonl":
+        for row in rows:
+            if include_same or row["status"] != STATUS_SAME:
+                f.write(json.dumps(row, ensure_ascii=False) + "\n")
+        return
+
+    w = csv.writer(f)
+    w.writerow(COMPARE_CSV_HEADER)
+    for row in rows:
+        if include_same or row["status"] != STATUS_SAME:
+            w.writerow([row["slide"], row["id"], row["status"], row["before"], row["after"]])
+
+
+# ============== 抽出データの入出力 ==============
+# 抽出ファイルの拡張子（tsv は従来どおり .txt）
+EXTRACT_EXTENSIONS = {"excel": ".xlsx", "json": ".json", "tsv": ".txt"}
+# 更新データとして読めるヘッダー名（日本語 / 英字キー）
+_UPDATE_HEADERS = (("スライド番号", "slide"), ("オブジェクトID", "id"), ("テキスト内容", "text"))
+
+
+class InvalidHeaderError(ValueError):
+    """更新データのヘッダーにスライド番号・ID・テキスト列が揃っていない"""
+
+
+def extract_output_path(pptx_path: str, fmt: str = "excel") -> str:
+    """抽出ファイルの既定の出力先（<元ファイル名>_抽出.<拡張子>）"""
+    return os.path.splitext(pptx_path)[0] + "_抽出" + EXTRACT_EXTENSIONS[fmt]
+
+
+def updated_output_path(pptx_path: str) -> str:
+    """更新済みPPTXの既定の出力先（<元ファイル名>_更新済み.pptx）"""
+    return os.path.splitext(pptx_path)[0] + "_更新済み.pptx"
+
+
+@contextmanager
+def atomic_output(path: str) -> Iterator[str]:
+    """同じフォルダの一時ファイルへ書かせ、成功したら目的のパスへ置き換える
+
+    書き込み途中のファイルを他のプロセス（監視中の翻訳者の Excel など）に見せない。
+    一時ファイル名は呼び出しごとに変える（serve のスレッドや GUI と監視が同じ出力を
+    同時に書いても、互いの書きかけを置き換えない）。例外時は一時ファイルを削除して送出する。
+
+        with atomic_output(out) as tmp:
+            save_extracted(data, tmp, "excel")
+    """
+    tmp = f"{path}.{os.getpid()}.{uuid.uuid4().hex[:12]}.tmp"
+    try:
+        yield tmp
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        raise
+
+
+def file_digest(path: str, chunk_size: int = 1024 * 1024) -> str:
+    """ファイル内容のハッシュ（blake2b、16進）。更新日時だけ変わった場合の判定に使う"""
+    h = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def save_extracted(data: List[Dict], path: str, fmt: str = "excel", headers: Optional[List[str]] = None):
+    """抽出結果を Excel / JSON / TSV で保存（失敗時は例外を送出）
+
+    Args:
+        headers: Excel / TSV の見出し行（スライド, ID, タイプ, テキストの4列）
+    """
+    headers = headers or ["スライド番号", "オブジェクトID", "タイプ", "テキスト内容"]
+    with span(f"write_{fmt}"):
+        if fmt == "excel":
+            import openpyxl
+            wb = openpyxl.Workbook()
+            ws = wb.active
+            ws.append(headers)
+            for row in data:
+                ws.append([row["slide"], row["id"], row["type"], row["text"]])
+            wb.save(path)
+        elif fmt == "json":
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False, indent=2)
+        else:
+            with open(path, 'w', encoding='utf-8', newline='') as f:
+                w = csv.writer(f, delimiter='\t')
+                w.writerow(headers)
+                for row in data:
+                    w.writerow([row["slide"], row["id"], row["type"], row["text"]])
+
+
+def load_updates(path: str, source: str) -> Dict[Tuple[int, str], str]:
+    """編集済みの Excel / JSON から {(スライド番号, ID): テキスト} を読み込む
+
+    読み取れない行は無視する。Excel のヘッダーが不正な場合は InvalidHeaderError。
+    """
+    with span(f"load_{source}"):
+        return _load_updates(path, source)
+
+
+def _load_updates(path: str, source: str) -> Dict[Tuple[int, str], str]:
+    updates = {}
+    if source == "excel":
+        import openpyxl
+        check_package(path)
+        wb = openpyxl.load_workbook(path)
+        ws = wb.active
+        headers = [c.value for c in ws[1]]
+        try:
+            si, oi, ti = (headers.index(ja) if ja in headers else headers.index(en) for ja, en in _UPDATE_HEADERS)
+        except ValueError:
+            raise InvalidHeaderError(path)
+        for row in list(ws.rows)[1:]:
+            try:
+                sn = int(row[si].value) if row[si].value else None
+                oid = str(row[oi].value) if row[oi].value else None
+                txt = str(row[ti].value) if row[ti].value else ""
+                if txt == "None":
+                    txt = ""
+                if sn and oid:
+                    updates[(sn, oid)] = txt
+            except (TypeError, ValueError, IndexError):
+                pass
+    elif source == "json":
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        for item in data:
+            sn = item.get('スライド番号') or item.get('slide')
+            oid = item.get('オブジェクトID') or item.get('id')
+            txt = item.get('テキスト内容') or item.get('text', '')
+            if sn and oid:
+                updates[(int(sn), str(oid))] = str(txt)
+    return updates
+
+
+def update_source_for(path: str) -> str:
+    """更新データの拡張子から読み込み形式を判定（.xlsx → excel、それ以外 → json）"""
+    return "excel" if path.lower().endswith(".xlsx") else "json"
+
+
+# ============== 更新 ==============
+def load_presentation(path: str):
+    """PPTX を開く（python-pptx は初回呼び出し時に読み込む）"""
+    with span("open_zip"):
+        check_package(path)
+    with span("open_pptx"):
+        import pptx
+        return pptx.Presentation(path)
+
+
+def save_presentation(prs, path: str):
+    """Presentation を保存する"""
+    with span("save_pptx"):
+        prs.save(path)
+
+
+# ZIP 爆弾対策（展開後の合計サイズと、大きなパーツの圧縮率の上限）
+MAX_PACKAGE_BYTES = 2 * 1024 * 1024 * 1024
+MAX_COMPRESSION_RATIO = 200
+_RATIO_CHECK_BYTES = 16 * 1024 * 1024
+
+
+class PackageTooLargeError(ValueError):
+    """展開後のサイズや圧縮率が異常な（ZIP 爆弾の疑いがある）パッケージ"""
+
+
+def check_package(path: str):
+    """pptx / xlsx を展開する前に、中央ディレクトリの展開後サイズを確かめる
+
+    zipfile は宣言された展開後サイズを超えて展開しないため、宣言値で判定できる。
+    ZIP として読めない場合は何もしない（読み込み側のエラーに任せる）。
+    """
+    import zipfile
+
+    try:
+        with zipfile.ZipFile(path) as zf:
+            infos = zf.infolist()
+    except (zipfile.BadZipFile, OSError):
+        return
+    total = 0
+    for info in infos:
+        total += info.file_size
+        if (info.file_size > _RATIO_CHECK_BYTES
+                and info.file_size > info.compress_size * MAX_COMPRESSION_RATIO):
+            raise PackageTooLargeError(
+                f"{info.filename} の圧縮率が異常です（{info.file_size // max(info.compress_size, 1)}倍）")
+    if total > MAX_PACKAGE_BYTES:
+        raise PackageTooLargeError(f"展開後のサイズが上限を超えています（{total // 1024 // 1024}MB）")
+
+
+@timed("apply_updates")
+def apply_updates(prs, updates: Dict[Tuple[int, str], str], preview: bool = False,
+                  limit: Optional[int] = None, profile=None,
+                  should_cancel: Optional[Callable[[], bool]] = None) -> Tuple[int, int, List[Dict]]:
+    """読み込み済みの Presentation に更新データを反映
+
+    Args:
+        preview: True なら変更箇所の収集のみ行い、図形は書き換えない
+        limit: 更新対象とする先頭スライド数（ライセンス制限、None で無制限）
+        profile: 差分判定に使う正規化プロファイル
+
+    Returns:
+        (更新件数, スキップ件数, 変更箇所のリスト)
+    """
+    updated, skipped = 0, 0
+    changes = []
+
+    # 更新テキスト側のハッシュは1回だけ計算し、図形側と比較する
+    profile = get_profile(profile)
+    update_digests = {k: profile.digest(v) for k, v in updates.items()}
+
+    for slide_idx, slide in enumerate(prs.slides, 1):
+        if should_cancel and should_cancel():
+            break
+        if limit and slide_idx > limit:
+            skipped += len([k for k in updates if k[0] == slide_idx])
+            continue
+
+        for shape in slide.shapes:
+            if should_cancel and should_cancel():
+                break
+            try:
+                sid = str(shape.shape_id)
+                key = (slide_idx, sid)
+
+                if key in updates and hasattr(shape, "text"):
+                    new_txt = updates[key]
+                    old_txt = shape.text
+                    if profile.digest(old_txt) != update_digests[key]:
+                        changes.append({'slide': slide_idx, 'id': sid, 'old': old_txt[:50], 'new': new_txt[:50]})
+                        if not preview:
+                            shape.text = normalize_for_compare(new_txt)
+                            updated += 1
+
+                if hasattr(shape, "has_table") and shape.has_table:
+                    for r, row in enumerate(shape.table.rows):
+                        for c, cell in enumerate(row.cells):
+                            ckey = (slide_idx, f"{sid}_t{r}_{c}")
+                            if ckey in updates:
+                                new_txt = updates[ckey]
+                                old_txt = cell.text
+                                if profile.digest(old_txt) != update_digests[ckey]:
+                                    changes.append({'slide': slide_idx, 'id': ckey[1], 'old': old_txt[:30], 'new': new_txt[:30]})
+                                    if not preview:
+                                        cell.text = normalize_for_compare(new_txt)
+                                        updated += 1
+            except Exception:
+                skipped += 1
+
+    return updated, skipped, changes
+
+
+@timed("backup")
+def create_backup(path: str) -> Path:
+    """元ファイルを同じフォルダの backup/ に日時付きでコピー（失敗時は例外を送出）"""
+    backup_dir = Path(path).parent / "backup"
+    backup_dir.mkdir(exist_ok=True)
+    backup_path = backup_dir / f"{Path(path).stem}_{datetime.now().strftime('%Y%m%d_%H%M%S')}{Path(path).suffix}"
+    shutil.copy2(path, backup_path)
+    return backup_path
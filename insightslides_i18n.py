@@ -0,0 +1,453 @@
+# -*- coding: utf-8 -*-
+"""
+Insight Slides - 多言語リソース
+
+insightslides_config.t() の初回呼び出し時に読み込まれる。
+"""
+
+LANGUAGES = {
+    'en': {
+        'app_subtitle': 'Extract → Edit → Update PowerPoint Text',
+        'welcome_title': 'Welcome to Insight Slides!',
+        'mode_extract': 'Extract Mode',
+        'mode_update': 'Update Mode',
+        'mode_extract_short': 'Extract Text',
+        'mode_update_short': 'Overwrite',
+        'panel_mode': 'Mode Selection',
+        'panel_file': 'File Operations',
+        'panel_input': 'Input (Single File)',
+        'panel_output_file': 'Output (Single File)',
+        'panel_settings': 'Settings',
+        'panel_status': 'Status',
+        'panel_output': 'Extracted Data',
+        'panel_extract_options': 'Extract Options',
+        'panel_update_options': 'Update Options',
+        'panel_extract_run': 'Run Extract',
+        'panel_update_run': 'Run Update',
+        'panel_pro_features': 'Pro Features',
+        'btn_load_pptx': 'Load PPTX',
+        'btn_load_excel': 'Load Excel',
+        'btn_load_json': 'Load JSON',
+        'btn_single_file': 'Select File',
+        'btn_from_excel': 'From Excel',
+        'btn_from_json': 'From JSON',
+        'btn_apply_pptx': 'Apply to PPTX',
+        'btn_export_to_excel': 'Export to Excel',
+        'btn_export_to_json': 'Export to JSON',
+        'panel_batch': 'Folder Batch',
+        'btn_batch_extract': 'Folder → Excel',
+        'btn_batch_update': 'Excel → Folder',
+        'btn_batch_compare': 'Folder Compare',
+        'btn_watch_folder': 'Watch Folder',
+        'btn_batch_export_excel': 'Export to Folder (Excel)',
+        'btn_batch_export_json': 'Export to Folder (JSON)',
+        'btn_batch_import_excel': 'Import from Folder (Excel)',
+        'btn_batch_import_json': 'Import from Folder (JSON)',
+        'btn_diff_preview': 'Diff Preview',
+        'btn_compare_pptx': 'Compare PPTX',
+        'btn_cancel': 'Stop',
+        'btn_clear': 'Clear Log',
+        'btn_copy': 'Copy Log',
+        'btn_license': 'License',
+        'btn_activate': 'Activate',
+        'btn_deactivate': 'Deactivate',
+        'btn_purchase': 'Purchase',
+        'btn_close': 'Close',
+        'btn_start': 'Get Started',
+        'btn_filter': 'Filter',
+        'btn_clear_filter': 'Clear Filter',
+        'setting_output_format': 'Output Format:',
+        'setting_include_meta': 'Include file name & date',
+        'setting_auto_backup': 'Auto backup before update',
+        'chk_include_notes': 'Include Speaker Notes',
+        'chk_include_subfolders': 'Include Subfolders (Batch)',
+        'format_tab': 'Tab-separated',
+        'format_csv': 'CSV',
+        'format_excel': 'Excel',
+        'status_waiting': 'Waiting...',
+        'status_processing': 'Processing...',
+        'status_complete': 'Complete',
+        'status_cancelled': 'Cancelled',
+        'status_error': 'Error',
+        'msg_extract_desc': 'Extract text from PowerPoint files.',
+        'msg_update_desc': 'Apply edited text back to PowerPoint.',
+        'msg_update_limit': 'Update: First {0} slides only\nUpgrade to Standard for unlimited!',
+        'msg_processing_file': 'Processing: {0}',
+        'msg_saved': 'Saved: {0}',
+        'msg_extracted': 'Extracted: {0} items from {1} slides',
+        'msg_updated': 'Updated: {0} items, Skipped: {1}',
+        'msg_no_pptx': 'No PPTX files found',
+        'msg_no_data': 'No update data found',
+        'msg_copied': 'Copied to clipboard',
+        'license_title': 'License Management',
+        'license_current': 'Current License',
+        'license_enter_key': 'Enter License Key:',
+        'license_activated': '{0} has been activated',
+        'license_deactivated': 'License deactivated',
+        'license_deactivate_confirm': 'Deactivate license?\nThe app will run as Free version.',
+        'btn_continue_free': 'Continue as Free',
+        'license_invalid': 'Invalid license key',
+        'license_email_mismatch': 'Email address does not match the license key',
+        'license_enter_prompt': 'Please enter a license key',
+        'upgrade_title': 'Upgrade',
+        'dialog_confirm': 'Confirm',
+        'dialog_error': 'Error',
+        'dialog_complete': 'Complete',
+        'header_slide': 'Slide',
+        'header_id': 'Object ID',
+        'header_type': 'Type',
+        'header_text': 'Text Content',
+        'header_filename': 'Filename',
+        'header_datetime': 'Extracted At',
+        'diff_title': 'Diff Preview',
+        'menu_help': 'Help',
+        'menu_guide': 'User Guide',
+        'menu_faq': 'FAQ',
+        'menu_license': 'License Management',
+        'menu_about': 'About',
+        'menu_timing': 'Measure Processing Time',
+        'menu_profile_next': 'Profile Next Job',
+        'menu_trace': 'Record Job Timelines',
+        'lang_menu': 'Language',
+        'font_size_menu': 'Font Size',
+        'font_size_small': 'Small',
+        'font_size_medium': 'Medium',
+        'font_size_large': 'Large',
+        'advanced_options': 'Advanced Options',
+        'type_notes': 'Notes',
+        'filter_placeholder': 'Filter text...',
+        # UI elements
+        'mode_section': 'Mode',
+        'btn_compare': '2-File Compare',
+        'show_detail': 'Show details',
+        'welcome_guide_title': 'Edit PowerPoint Text',
+        'guide_step1': 'Select a PPTX file from the left panel',
+        'guide_step2': 'Text will be displayed in a list',
+        'guide_step3': 'Double-click a cell to edit',
+        'guide_step4': 'Click "Apply to PPTX" to save changes',
+        'btn_apply': 'Apply to PPTX',
+        'btn_export_excel': 'Excel Export',
+        'btn_export_json': 'JSON Export',
+        'filter_label': 'Filter:',
+        'mode_desc_extract': 'Extract text from PPTX for editing',
+        'mode_desc_update': 'Apply edited data to PPTX',
+        # Grid toolbar
+        'btn_clear_grid': 'Clear',
+        'btn_replace_all': 'Replace All',
+        'btn_undo': 'Undo',
+        'btn_redo': 'Redo',
+        # Replace dialog
+        'replace_search': 'Search:',
+        'replace_with': 'Replace:',
+        'btn_replace': 'Replace',
+        # Compare dialog
+        'compare_title': 'Compare 2 PowerPoint files',
+        'compare_file1': 'Original:',
+        'compare_file2': 'New file:',
+        'btn_browse': 'Browse',
+        'compare_ignore_ws': 'Ignore whitespace',
+        'compare_ignore_width': 'Ignore full/half width',
+        'compare_ignore_case': 'Ignore case',
+        'compare_csv_only': 'Export CSV directly (no result view)',
+        'btn_run_compare': 'Compare',
+        # Compare result
+        'btn_export_csv': 'CSV Export',
+        'header_select': 'Select',
+        'header_status': 'Status',
+        'btn_select_original': 'All Original',
+        'btn_select_new': 'All New',
+        'btn_apply_selection': 'Apply Selection',
+        # Log dialog
+        'btn_copy_log': 'Copy',
+        'btn_clear_log': 'Clear',
+        # License dialog (auth)
+        'license_auth_title': 'License Activation',
+        'license_email': 'Email Address:',
+        'license_key': 'License Key:',
+        'license_wrong_product': 'This license key is not valid for Insight Slides',
+        'license_perpetual': 'Perpetual',
+        'license_expiry_warning': 'Your license will expire in {0} days ({1}). Please renew.',
+        'license_expired': 'Your license has expired. Please renew to continue using all features.',
+        'license_trial_link': 'Request Trial',
+        'license_email_required': 'Please enter your email address',
+        'license_status_active': 'Active',
+        'license_status_expired': 'Expired',
+        'license_valid_until': 'Valid until: {0}',
+        'license_days_remaining': '({0} days remaining)',
+        'license_feature_restricted': 'This feature requires a Pro license. Current: {0}',
+        'license_batch_restricted': 'Batch processing requires a Pro license.',
+        'license_json_restricted': 'JSON export requires a Pro license.',
+        'license_continue_free': 'Continue as Free',
+        # Status messages
+        'status_slides_items': '{0} slides / {1} items',
+        'status_complete_items': 'Complete: {0} items',
+        'status_batch_complete': 'Batch extract complete: {0} items ({1})',
+        'status_update_complete': 'Update complete: {0} items',
+        'lang_changed': 'Language changed.',
+        # Log messages
+        'log_cancelled': 'Cancelled',
+        'log_cancel_request': 'Cancellation requested...',
+        'log_job_queued': 'Queued: {0} ({1} ahead)',
+        'log_job_cancelled': 'Cancelled: {0}',
+        'log_prescan': 'Scanning files...',
+        'log_timings': '⏱ {0}: {1:.2f}s total · {2}',
+        'log_timings_saved': 'Timing report: {0}',
+        'log_profile_saved': '📊 Profile of {0} saved to {1}',
+        'log_trace_saved': '🧭 Timeline (open in chrome://tracing or Perfetto): {0}',
+        'log_prescan_done': 'Found {0} files, {1} slides',
+        'progress_detail': '{0}% · {1}/{2} files · {3:.1f} slides/s · {4:.2f} files/s · ETA {5}',
+        'log_no_text': 'No text found',
+        'log_error': 'Error: {0}',
+        'log_found_files': 'Found: {0} files',
+        'log_no_pptx_found': 'No PPTX files found',
+        'log_invalid_header': 'Invalid header format',
+        'log_no_update_data': 'No update data',
+        'log_processing': 'Processing...',
+        'dialog_select_folder': 'Select Folder (containing PPTX files)',
+        'dialog_select_folder_update': 'Select Folder (*_extracted{0} + PPTX)',
+        'dialog_select_pptx': 'Select PowerPoint to update',
+        'dialog_select_compare_before': 'Select folder with original PPTX files',
+        'dialog_select_compare_after': 'Select folder with new PPTX files',
+        'status_batch_compare_complete': 'Folder compare complete: {0} files (same {1} / changed {2} / added {3} / removed {4} / moved {5})',
+        'log_watch_started': 'Watching {0} (press Cancel to stop)',
+        'log_watch_stopped': 'Watch stopped: {0} extracted / {1} unchanged / {2} errors',
+        'dialog_resume_title': 'Resume',
+        'dialog_resume_batch': 'This folder has a record of a previous run.\n\nYes: skip files finished and unchanged since then (resume)\nNo: process all files again',
+        'log_batch_cached': 'Skipped {0} file(s) finished in the previous run',
+        'log_pool_stats': 'Worker pool: {0}',
+        'log_shape_skipped': 'Skipped unreadable content: {0}',
+        'log_pool_ready': 'Worker pool ready ({0} workers, {1}s)',
+        'dialog_processing_exit': 'Processing in progress. Exit anyway?',
+        'dialog_confirm_title': 'Confirm',
+        'result_updated': 'Updated: {0} items\nSkipped: {1} items',
+        'result_replaced': '{0} items replaced',
+        'result_applied': '{0} items applied',
+        'result_csv_saved': 'CSV saved',
+        'result_export_complete': 'Export complete: {0}',
+    },
+    'ja': {
+        'app_subtitle': 'PowerPointテキストを抽出 → 編集 → 反映',
+        'welcome_title': 'Insight Slides へようこそ！',
+        'mode_extract': '抽出モード',
+        'mode_update': '更新モード',
+        'mode_extract_short': 'テキスト抽出',
+        'mode_update_short': '上書き更新',
+        'panel_mode': 'モード選択',
+        'panel_file': 'ファイル操作',
+        'panel_input': '入力（1ファイル）',
+        'panel_output_file': '出力（1ファイル）',
+        'panel_settings': '処理設定',
+        'panel_status': '処理状況',
+        'panel_output': '抽出結果',
+        'panel_extract_options': '抽出オプション',
+        'panel_update_options': '更新オプション',
+        'panel_extract_run': '抽出実行',
+        'panel_update_run': '更新実行',
+        'panel_pro_features': '拡張機能',
+        'btn_load_pptx': 'PPTX読込',
+        'btn_load_excel': 'Excel読込',
+        'btn_load_json': 'JSON読込',
+        'btn_single_file': 'ファイル選択',
+        'btn_from_excel': 'Excelから更新',
+        'btn_from_json': 'JSONから更新',
+        'btn_apply_pptx': 'PPTXに反映',
+        'btn_export_to_excel': 'Excel出力',
+        'btn_export_to_json': 'JSON出力',
+        'panel_batch': 'フォルダ一括',
+        'btn_batch_extract': 'フォルダ→Excel',
+        'btn_batch_update': 'Excel→フォルダ',
+        'btn_batch_compare': 'フォルダ比較',
+        'btn_watch_folder': 'フォルダ監視',
+        'btn_batch_export_excel': 'フォルダに出力 (Excel)',
+        'btn_batch_export_json': 'フォルダに出力 (JSON)',
+        'btn_batch_import_excel': 'フォルダから読込 (Excel)',
+        'btn_batch_import_json': 'フォルダから読込 (JSON)',
+        'btn_diff_preview': '差分プレビュー',
+        'btn_compare_pptx': 'PPTX比較',
+        'btn_cancel': '中止',
+        'btn_clear': 'ログクリア',
+        'btn_copy': 'ログコピー',
+        'btn_license': 'ライセンス',
+        'btn_activate': 'アクティベート',
+        'btn_deactivate': 'ライセンス解除',
+        'btn_purchase': '購入ページ',
+        'btn_close': '閉じる',
+        'btn_start': '始める',
+        'btn_filter': 'フィルタ',
+        'btn_clear_filter': 'クリア',
+        'setting_output_format': '出力形式:',
+        'setting_include_meta': 'ファイル名・日時を含める',
+        'setting_auto_backup': '更新前に自動バックアップ',
+        'chk_include_notes': 'スピーカーノート含む',
+        'chk_include_subfolders': 'サブフォルダも含める（一括処理）',
+        'format_tab': 'タブ区切り',
+        'format_csv': 'CSV形式',
+        'format_excel': 'Excel形式',
+        'status_waiting': '処理待機中...',
+        'status_processing': '処理中...',
+        'status_complete': '完了',
+        'status_cancelled': 'キャンセルされました',
+        'status_error': 'エラー',
+        'msg_extract_desc': 'PowerPointからテキストを抽出します。',
+        'msg_update_desc': '編集したファイルの変更をPowerPointに反映します。',
+        'msg_update_limit': '更新機能: 最初の{0}スライドのみ\nStandard版で無制限に！',
+        'msg_processing_file': '処理中: {0}',
+        'msg_saved': '保存完了: {0}',
+        'msg_extracted': '抽出: {0}件 / スライド: {1}枚',
+        'msg_updated': '更新: {0}件 / スキップ: {1}件',
+        'msg_no_pptx': 'PPTXファイルが見つかりません',
+        'msg_no_data': '更新データがありません',
+        'msg_copied': 'クリップボードにコピーしました',
+        'license_title': 'ライセンス管理',
+        'license_current': '現在のライセンス',
+        'license_enter_key': 'ライセンスキー:',
+        'license_activated': '{0}版がアクティベートされました',
+        'license_deactivated': 'ライセンスを解除しました',
+        'license_deactivate_confirm': 'ライセンスを解除しますか？\n解除後はFree版として動作します。',
+        'btn_continue_free': 'Free版で続行',
+        'license_invalid': '無効なライセンスキーです',
+        'license_email_mismatch': 'メールアドレスがライセンスキーと一致しません',
+        'license_enter_prompt': 'ライセンスキーを入力してください',
+        'upgrade_title': 'アップグレード',
+        'dialog_confirm': '確認',
+        'dialog_error': 'エラー',
+        'dialog_complete': '完了',
+        'header_slide': 'スライド番号',
+        'header_id': 'オブジェクトID',
+        'header_type': 'タイプ',
+        'header_text': 'テキスト内容',
+        'header_filename': 'ファイル名',
+        'header_datetime': '抽出日時',
+        'diff_title': '差分プレビュー',
+        'menu_help': 'ヘルプ',
+        'menu_guide': '使い方ガイド',
+        'menu_faq': 'よくある質問',
+        'menu_license': 'ライセンス管理',
+        'menu_about': 'バージョン情報',
+        'menu_timing': '処理時間を計測',
+        'menu_profile_next': '次の処理をプロファイル',
+        'menu_trace': '処理のタイムラインを記録',
+        'lang_menu': '言語 / Language',
+        'font_size_menu': '文字サイズ',
+        'font_size_small': '小',
+        'font_size_medium': '中',
+        'font_size_large': '大',
+        'advanced_options': '詳細オプション',
+        'type_notes': 'ノート',
+        'filter_placeholder': 'フィルタ...',
+        # UI elements
+        'mode_section': '操作モード',
+        'btn_compare': '2ファイル比較',
+        'show_detail': '詳細を表示',
+        'welcome_guide_title': 'PowerPointテキストを編集',
+        'guide_step1': '左のパネルでPPTXファイルを選択',
+        'guide_step2': 'テキストが一覧で表示されます',
+        'guide_step3': 'セルをダブルクリックして編集',
+        'guide_step4': '「PPTXに反映」で変更を保存',
+        'btn_apply': 'PPTXに反映',
+        'btn_export_excel': 'Excelエクスポート',
+        'btn_export_json': 'JSONエクスポート',
+        'filter_label': 'フィルタ:',
+        'mode_desc_extract': 'PPTXからテキストを抽出して編集',
+        'mode_desc_update': '編集したデータをPPTXに反映',
+        # Grid toolbar
+        'btn_clear_grid': 'クリア',
+        'btn_replace_all': '一括置換',
+        'btn_undo': '元に戻す',
+        'btn_redo': 'やり直し',
+        # Replace dialog
+        'replace_search': '検索:',
+        'replace_with': '置換:',
+        'btn_replace': '置換',
+        # Compare dialog
+        'compare_title': '2つのPowerPointファイルを比較',
+        'compare_file1': '元ファイル:',
+        'compare_file2': '新ファイル:',
+        'btn_browse': '参照',
+        'compare_ignore_ws': '空白の違いを無視',
+        'compare_ignore_width': '全角/半角の違いを無視',
+        'compare_ignore_case': '大文字/小文字を無視',
+        'compare_csv_only': '結果を表示せずCSVに直接出力',
+        'btn_run_compare': '比較実行',
+        # Compare result
+        'btn_export_csv': 'CSVエクスポート',
+        'header_select': '採用',
+        'header_status': '状態',
+        'btn_select_original': '全て元',
+        'btn_select_new': '全て新',
+        'btn_apply_selection': '選択を反映',
+        # Log dialog
+        'btn_copy_log': 'コピー',
+        'btn_clear_log': 'クリア',
+        'btn_load_older': 'さらに古いログ',
+        'log_filter_all': 'すべて',
+        'log_filter_warning': '警告とエラー',
+        'log_filter_error': 'エラーのみ',
+        'log_dialog_info': '{1}行中 {0}行を表示',
+        'log_dialog_spilled': '（古い{0}行は {1} に保存）',
+        # License dialog (auth)
+        'license_auth_title': 'ライセンス認証',
+        'license_email': 'メールアドレス:',
+        'license_key': 'ライセンスキー:',
+        'license_wrong_product': 'このライセンスキーはInsight Slidesには適用できません',
+        'license_perpetual': '永続',
+        'license_expiry_warning': 'ライセンスの有効期限まであと{0}日です（{1}まで）。更新をご検討ください。',
+        'license_expired': 'ライセンスの有効期限が切れました。継続してご利用いただくには更新が必要です。',
+        'license_trial_link': 'トライアル申請',
+        'license_email_required': 'メールアドレスを入力してください',
+        'license_status_active': '有効',
+        'license_status_expired': '期限切れ',
+        'license_valid_until': '有効期限: {0}',
+        'license_days_remaining': '（残り{0}日）',
+        'license_feature_restricted': 'この機能はProライセンスが必要です。現在: {0}',
+        'license_batch_restricted': 'フォルダ一括処理はProライセンスが必要です。',
+        'license_json_restricted': 'JSON出力はProライセンスが必要です。',
+        'license_continue_free': 'Free版で続行',
+        # Status messages
+        'status_slides_items': '{0}スライド / {1}項目',
+        'status_complete_items': '完了: {0}件',
+        'status_batch_complete': 'バッチ抽出完了: {0}件 ({1})',
+        'status_update_complete': '更新完了: {0}件',
+        'lang_changed': '言語を変更しました。',
+        # Log messages
+        'log_cancelled': 'キャンセルされました',
+        'log_cancel_request': 'キャンセルをリクエスト...',
+        'log_job_queued': '待機中: {0}（前に{1}件）',
+        'log_job_cancelled': 'キャンセルしました: {0}',
+        'log_prescan': '対象ファイルを確認中...',
+        'log_timings': '⏱ {0}: 全体 {1:.2f}秒 · {2}',
+        'log_timings_saved': '処理時間レポート: {0}',
+        'log_profile_saved': '📊 {0} のプロファイルを保存しました: {1}',
+        'log_trace_saved': '🧭 タイムライン（chrome://tracing / Perfetto で表示）: {0}',
+        'log_prescan_done': '対象: {0}ファイル / {1}スライド',
+        'progress_detail': '{0}% · {1}/{2}ファイル · {3:.1f}スライド/秒 · {4:.2f}ファイル/秒 · 残り {5}',
+        'log_no_text': 'テキストが見つかりませんでした',
+        'log_error': 'エラー: {0}',
+        'log_found_files': '発見: {0}件',
+        'log_no_pptx_found': 'PPTXファイルが見つかりません',
+        'log_invalid_header': 'ヘッダー形式が不正です',
+        'log_no_update_data': '更新データなし',
+        'log_processing': '処理中...',
+        'dialog_select_folder': 'フォルダを選択 (PPTXファイルを含む)',
+        'dialog_select_folder_update': 'フォルダを選択 (*_抽出{0} + PPTX)',
+        'dialog_select_pptx': '更新するPowerPointを選択',
+        'dialog_select_compare_before': '元のPPTXがあるフォルダを選択',
+        'dialog_select_compare_after': '新しいPPTXがあるフォルダを選択',
+        'status_batch_compare_complete': 'フォルダ比較完了: {0}ファイル (一致{1} 変更{2} 追加{3} 削除{4} 移動{5})',
+        'log_watch_started': '監視中: {0}（キャンセルで停止）',
+        'log_watch_stopped': '監視終了: 抽出{0}件 / 変更なし{1}件 / エラー{2}件',
+        'dialog_resume_title': '再開',
+        'dialog_resume_batch': 'このフォルダには前回の実行記録があります。\n\nはい: 前回完了して以降変わっていないファイルを飛ばす（続きから再開）\nいいえ: すべてのファイルを処理し直す',
+        'log_batch_cached': '前回処理済みのため{0}件をスキップしました',
+        'log_pool_stats': 'ワーカープール: {0}',
+        'log_shape_skipped': '読み取れない内容を飛ばしました: {0}',
+        'log_pool_ready': 'ワーカープールの準備ができました（{0}プロセス, {1}秒）',
+        'dialog_processing_exit': '処理中です。終了しますか？',
+        'dialog_confirm_title': '確認',
+        'result_updated': '更新: {0}件\nスキップ: {1}件',
+        'result_replaced': '{0} 件を置換しました',
+        'result_applied': '{0} 件を反映しました',
+        'result_csv_saved': 'CSVを保存しました',
+        'result_export_complete': 'エクスポート完了: {0}',
+    },
+}
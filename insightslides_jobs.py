@@ -0,0 +1,263 @@
+# -*- coding: utf-8 -*-
+"""
+Insight Slides - ジョブスケジューラ（GUI非依存）
+
+GUI の各操作（抽出・更新・プレビュー・比較・一括処理・監視）をジョブとして
+優先度付きキューに積み、専用のスレッドで1件ずつ順に実行する。
+
+- ジョブごとに JobContext を作り、キャンセル用のトークン（ctx.token）と
+  ジョブ中に読み込んだ Presentation などの作業データ（ctx.presentation）はそこに持たせる。
+  アプリ全体で共有する状態を持たないため、実行中の更新ジョブの Presentation を
+  後から積んだプレビューが置き換えることはない
+- トークンは should_cancel としてそのまま core / batch に渡せ、スライド・図形の
+  ループの中で確認される
+- 実行中のジョブがあれば次のジョブは待機し、優先度（小さいほど先）→ 投入順に実行する。
+  一括処理を続けて積んでおけば順に処理される
+- フォルダ監視のように取り消すまで終わらないジョブは start_background で
+  キューとは別のスレッドで動かす（キューの順番を塞がず、単一ファイルの操作も待たされない）
+- 完了したジョブ（成功・失敗・取り消し）は deliver を介して on_done に渡す。
+  GUI は deliver に UiChannel.call を渡し、結果の反映はログ・状態表示の更新と同じキューから
+  Tk のスレッドでまとめて行う
+"""
+import heapq
+import itertools
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+# 優先度（小さいほど先に実行）
+PRIORITY_HIGH = 0      # 単一ファイルの抽出・プレビューなど、結果をすぐに画面に出す操作
+PRIORITY_NORMAL = 5
+PRIORITY_LOW = 10      # フォルダ一括処理・監視（監視は start_background でキューの外）
+
+# ジョブの状態
+STATE_QUEUED = "queued"
+STATE_RUNNING = "running"
+STATE_DONE = "done"
+STATE_FAILED = "failed"
+STATE_CANCELLED = "cancelled"
+
+
+class JobCancelled(Exception):
+    """JobContext.check() で取り消しを検出した"""
+
+
+class CancelToken:
+    """ジョブごとの取り消しフラグ。呼び出すと取り消し済みかを返す（should_cancel として渡せる）"""
+
+    def __init__(self):
+        self._event = threading.Event()
+
+    def cancel(self):
+        self._event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def __call__(self) -> bool:
+        return self._event.is_set()
+
+
+class JobContext:
+    """1ジョブの実行コンテキスト
+
+    ジョブの関数は ctx を受け取り、戻り値が ctx.result になる。
+    ジョブ中に使う Presentation などは ctx.presentation / ctx.params に置く。
+    """
+
+    def __init__(self, job_id: int, name: str, priority: int, params: Optional[Dict] = None):
+        self.id = job_id
+        self.name = name
+        self.priority = priority
+        self.params: Dict[str, Any] = dict(params or {})
+        self.token = CancelToken()
+        self.presentation = None
+        self.state = STATE_QUEUED
+        self.result = None
+        self.error: Optional[BaseException] = None
+        self.order = (priority, 0)   # (優先度, 投入順)。スケジューラが設定する
+        self.queued_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+
+    @property
+    def cancelled(self) -> bool:
+        return self.token.cancelled
+
+    def check(self):
+        """取り消されていれば JobCancelled を送出する（ループの区切りで呼ぶ）"""
+        if self.token.cancelled:
+            raise JobCancelled(self.name)
+
+    @property
+    def elapsed(self) -> float:
+        if self.started_at is None:
+            return 0.0
+        return (self.finished_at or time.time()) - self.started_at
+
+
+class JobScheduler:
+    """優先度付きキューのジョブを専用スレッドで1件ずつ実行する
+
+    Args:
+        deliver: コールバックを呼ぶ関数（GUI では UiChannel.call。Tk のスレッドが定期的に取り出して呼ぶ）。
+            None ならスケジューラのスレッドでそのまま呼ぶ
+        on_state: ジョブの状態が変わるたびに (ctx, state) で呼ばれる（deliver 経由）。
+            state は変化した時点の状態（届くまでに ctx.state が先に進んでいることがある）
+    """
+
+    def __init__(self, deliver: Optional[Callable[[Callable[[], None]], None]] = None,
+                 on_state: Optional[Callable[[JobContext, str], None]] = None):
+        self._deliver = deliver or (lambda fn: fn())
+        self._on_state = on_state
+        self._cond = threading.Condition()
+        self._queue: List = []
+        self._seq = itertools.count()
+        self._ids = itertools.count(1)
+        self._current: Optional[JobContext] = None
+        self._background: List[JobContext] = []
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="job-scheduler", daemon=True)
+        self._thread.start()
+
+    # === 投入・取り消し ===
+    def submit(self, name: str, fn: Callable[[JobContext], Any], priority: int = PRIORITY_NORMAL,
+               params: Optional[Dict] = None,
+               on_done: Optional[Callable[[JobContext], None]] = None) -> JobContext:
+        """ジョブを積む。fn(ctx) はスケジューラのスレッドで、on_done(ctx) は deliver 経由で呼ばれる"""
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("JobScheduler is shut down")
+            ctx = JobContext(next(self._ids), name, priority, params)
+            ctx.order = (priority, next(self._seq))
+            heapq.heappush(self._queue, (*ctx.order, ctx, fn, on_done))
+            self._cond.notify()
+        self._notify(ctx)
+        return ctx
+
+    def start_background(self, name: str, fn: Callable[[JobContext], Any], priority: int = PRIORITY_LOW,
+                         params: Optional[Dict] = None,
+                         on_done: Optional[Callable[[JobContext], None]] = None) -> JobContext:
+        """取り消すまで終わらないジョブを専用のスレッドで今すぐ始める（キューの順番は待たず、塞がない）
+
+        取り消しはジョブごとのトークンで行う。cancel() を省略して呼んだ場合は、
+        キューのジョブが実行中でなければ最後に始めたこのジョブを取り消す。
+        """
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("JobScheduler is shut down")
+            ctx = JobContext(next(self._ids), name, priority, params)
+            ctx.order = (priority, next(self._seq))
+            self._background.append(ctx)
+        self._notify(ctx)
+        threading.Thread(target=self._run_background, args=(ctx, fn, on_done),
+                         name=f"job-{ctx.id}", daemon=True).start()
+        return ctx
+
+    def cancel(self, ctx: Optional[JobContext] = None) -> Optional[JobContext]:
+        """ジョブを取り消す（省略時は実行中のジョブ、なければ最後に始めた start_background のジョブ）
+
+        取り消したジョブを返す。
+        """
+        with self._cond:
+            ctx = ctx or self._current or (self._background[-1] if self._background else None)
+            if ctx is None or ctx.state not in (STATE_QUEUED, STATE_RUNNING):
+                return None
+            ctx.token.cancel()
+            return ctx
+
+    def cancel_all(self):
+        """待機中のジョブをすべて取り消し、実行中のジョブにも取り消しを通知する"""
+        with self._cond:
+            pending = [entry[2] for entry in self._queue] + self._background
+            current = self._current
+        for ctx in pending + ([current] if current else []):
+            ctx.token.cancel()
+
+    def shutdown(self, wait: bool = False, timeout: Optional[float] = None):
+        self.cancel_all()
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        if wait:
+            self._thread.join(timeout)
+
+    # === 状態 ===
+    @property
+    def busy(self) -> bool:
+        """実行中か待機中のジョブがあるか（start_background のジョブを含む）"""
+        with self._cond:
+            return self._current is not None or bool(self._queue) or bool(self._background)
+
+    @property
+    def current(self) -> Optional[JobContext]:
+        """キューから取り出して実行中のジョブ（start_background のジョブは含まない）"""
+        return self._current
+
+    def background(self) -> List[JobContext]:
+        """start_background で動いているジョブ（始めた順）"""
+        with self._cond:
+            return list(self._background)
+
+    def pending(self) -> List[JobContext]:
+        """待機中のジョブ（実行される順）"""
+        with self._cond:
+            return [entry[2] for entry in sorted(self._queue)]
+
+    def ahead_of(self, ctx: JobContext) -> int:
+        """ctx より先に実行されるジョブの数（実行中のものを含む）"""
+        with self._cond:
+            ahead = sum(1 for entry in self._queue if entry[:2] < ctx.order)
+            return ahead + (1 if self._current is not None and self._current is not ctx else 0)
+
+    # === 実行 ===
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._queue and not self._closed:
+                    self._cond.wait()
+                if not self._queue:
+                    return
+                _, _, ctx, fn, on_done = heapq.heappop(self._queue)
+                self._current = ctx
+            self._execute(ctx, fn)
+            with self._cond:
+                self._current = None
+            self._finish(ctx, on_done)
+
+    def _run_background(self, ctx: JobContext, fn: Callable[[JobContext], Any],
+                        on_done: Optional[Callable[[JobContext], None]]):
+        self._execute(ctx, fn)
+        with self._cond:
+            self._background.remove(ctx)
+        self._finish(ctx, on_done)
+
+    def _finish(self, ctx: JobContext, on_done: Optional[Callable[[JobContext], None]]):
+        self._notify(ctx)
+        if on_done:
+            self._deliver(lambda: on_done(ctx))
+
+    def _execute(self, ctx: JobContext, fn: Callable[[JobContext], Any]):
+        ctx.started_at = time.time()
+        if ctx.cancelled:
+            ctx.state = STATE_CANCELLED
+            ctx.finished_at = ctx.started_at
+            return
+        ctx.state = STATE_RUNNING
+        self._notify(ctx)
+        try:
+            ctx.result = fn(ctx)
+            ctx.state = STATE_CANCELLED if ctx.cancelled else STATE_DONE
+        except JobCancelled:
+            ctx.state = STATE_CANCELLED
+        except Exception as e:
+            ctx.error = e
+            ctx.state = STATE_FAILED
+        finally:
+            ctx.finished_at = time.time()
+
+    def _notify(self, ctx: JobContext):
+        if self._on_state:
+            state = ctx.state
+            self._deliver(lambda: self._on_state(ctx, state))
@@ -0,0 +1,362 @@
+# -*- coding: utf-8 -*-
+"""
+Insight Slides - ライセンス検証・管理（GUI非依存）
+
+統一ライセンス形式 (INSS-{TIER}-XXXX-{EMAIL_HASH}-XXXX-CCCC) のローカル検証。
+"""
+import base64
+import hashlib
+import hmac
+import json
+import re
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from enum import Enum
+from typing import Dict, Optional, Tuple
+
+from insightslides_config import CONFIG_DIR, LICENSE_FILE, t, get_language
+
+
+# ============== ライセンス検証（ローカル実装） ==============
+
+class ProductCode(Enum):
+    INSS = "INSS"  # InsightSlide Standard
+    INSP = "INSP"  # InsightSlide Pro
+
+class InsightLicenseTier(Enum):
+    TRIAL = "TRIAL"
+    STD = "STD"
+    PRO = "PRO"
+    ENT = "ENT"
+
+@dataclass
+class LicenseInfo:
+    is_valid: bool
+    tier: Optional[InsightLicenseTier] = None
+    product: Optional[ProductCode] = None
+    expires: Optional[datetime] = None
+    error: Optional[str] = None
+
+# 署名用シークレットキー
+_LICENSE_SECRET = b"insight-series-license-secret-2026"
+
+# ライセンスキー正規表現: PPPP-PLAN-YYMM-HASH-SIG1-SIG2
+_LICENSE_KEY_REGEX = re.compile(r"^(INSS|INSP)-(TRIAL|STD|PRO)-(\d{4})-([A-Z0-9]{4})-([A-Z0-9]{4})-([A-Z0-9]{4})$")
+
+def _generate_signature(data: str) -> str:
+    sig = hmac.new(_LICENSE_SECRET, data.encode(), hashlib.sha256).digest()
+    return base64.b32encode(sig)[:8].decode().upper()
+
+def _verify_signature(data: str, signature: str) -> bool:
+    try:
+        expected = _generate_signature(data)
+        return hmac.compare_digest(expected, signature)
+    except Exception:
+        return False
+
+class LicenseValidator:
+    def validate(self, key: str, expires_at=None) -> LicenseInfo:
+        if not key:
+            return LicenseInfo(is_valid=False, error="キーが空です")
+
+        key = key.strip().upper()
+        match = _LICENSE_KEY_REGEX.match(key)
+        if not match:
+            return LicenseInfo(is_valid=False, error="キー形式が不正です")
+
+        product_str, tier_str, yymm, email_hash, sig1, sig2 = match.groups()
+
+        try:
+            product = ProductCode(product_str)
+            tier = InsightLicenseTier(tier_str)
+        except ValueError:
+            return LicenseInfo(is_valid=False, error="無効な製品/プラン")
+
+        # 署名検証
+        signature = sig1 + sig2
+        sign_data = f"{product_str}-{tier_str}-{yymm}-{email_hash}"
+        if not _verify_signature(sign_data, signature):
+            return LicenseInfo(is_valid=False, error="署名が無効です")
+
+        # 有効期限
+        try:
+            year = 2000 + int(yymm[:2])
+            month = int(yymm[2:])
+            if month == 12:
+                expires = datetime(year + 1, 1, 1) - timedelta(days=1)
+            else:
+                expires = datetime(year, month + 1, 1) - timedelta(days=1)
+        except ValueError:
+            return LicenseInfo(is_valid=False, error="有効期限が不正です")
+
+        if datetime.now() > expires:
+            return LicenseInfo(is_valid=False, tier=tier, error="期限切れです")
+
+        return LicenseInfo(is_valid=True, tier=tier, product=product, expires=expires)
+
+    def is_product_covered(self, info: LicenseInfo, product_code: str) -> bool:
+        if not info or not info.product:
+            return False
+        return info.product.value.startswith(product_code[:3])
+
+TIER_NAMES = {
+    InsightLicenseTier.TRIAL: "トライアル",
+    InsightLicenseTier.STD: "Standard",
+    InsightLicenseTier.PRO: "Pro",
+    InsightLicenseTier.ENT: "Enterprise",
+}
+
+INSIGHT_TIERS = {
+    InsightLicenseTier.TRIAL: {"duration_days": 14},
+    InsightLicenseTier.STD: {"duration_months": 12},
+    InsightLicenseTier.PRO: {"duration_months": 12},
+    InsightLicenseTier.ENT: {},
+}
+
+
+# ============== ライセンス設定（insight-common 統合） ==============
+PRODUCT_CODE = "INS"  # InsightSlide製品コードプレフィックス
+EXPIRY_WARNING_DAYS = 30  # 期限切れ警告の日数
+
+# ローカルティア定義（FREE追加）
+class LicenseTier:
+    FREE = "FREE"
+    TRIAL = "TRIAL"
+    STD = "STD"
+    PRO = "PRO"
+    ENT = "ENT"
+
+# ティア別設定（InsightSlide固有）
+# json: 1ファイルJSON入出力, batch: フォルダ一括処理, compare: 2ファイル比較
+TIERS = {
+    LicenseTier.FREE: {'name': 'Free', 'name_ja': 'フリー', 'badge': 'Free', 'update_limit': 3, 'batch': False, 'json': False, 'compare': False},
+    LicenseTier.TRIAL: {'name': 'Trial', 'name_ja': 'トライアル', 'badge': 'Trial', 'update_limit': None, 'batch': True, 'json': True, 'compare': True},
+    LicenseTier.STD: {'name': 'Standard', 'name_ja': 'スタンダード', 'badge': 'Standard', 'update_limit': None, 'batch': True, 'json': True, 'compare': True},
+    LicenseTier.PRO: {'name': 'Professional', 'name_ja': 'プロフェッショナル', 'badge': 'Pro', 'update_limit': None, 'batch': True, 'json': True, 'compare': True},
+    LicenseTier.ENT: {'name': 'Enterprise', 'name_ja': 'エンタープライズ', 'badge': 'Enterprise', 'update_limit': None, 'batch': True, 'json': True, 'compare': True},
+}
+
+# 未認証時のデフォルト設定（Free版と同じ）
+TIER_NOT_ACTIVATED = TIERS[LicenseTier.FREE]
+
+
+class LicenseManager:
+    """insight-common 統合ライセンスマネージャー（メールハッシュ検証付き）"""
+
+    def __init__(self):
+        CONFIG_DIR.mkdir(parents=True, exist_ok=True)
+        self.validator = LicenseValidator()
+        self.license_info: Dict = {}
+        self.insight_info: Optional[LicenseInfo] = None
+        self._load_license()
+
+    @staticmethod
+    def _compute_email_hash(email: str) -> str:
+        """メールアドレスからハッシュを生成（Base32エンコード、4文字）
+
+        insight-commonと同じBase32形式を使用
+        """
+        import base64
+        normalized = email.strip().lower()
+        hash_bytes = hashlib.sha256(normalized.encode('utf-8')).digest()
+        return base64.b32encode(hash_bytes)[:4].decode().upper()
+
+    @staticmethod
+    def _extract_email_hash_from_key(key: str) -> Optional[str]:
+        """ライセンスキーからメールハッシュ部分を抽出
+
+        形式: {PRODUCT}-{TIER}-XXXX-{EMAIL_HASH}-XXXX-CCCC
+        例: INSS-STD-3101-S467-J72J-IQB3
+        ハッシュは4番目のセグメント（0-indexed: 3）
+        """
+        parts = key.strip().upper().split('-')
+        if len(parts) >= 6:
+            return parts[3]  # 4番目のセグメント = EMAIL_HASH
+        return None
+
+    def _load_license(self):
+        """保存されたライセンス情報を読み込む"""
+        self.license_info = {'type': None, 'key': '', 'email': '', 'expires': None}
+
+        if LICENSE_FILE.exists():
+            try:
+                with open(LICENSE_FILE, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+
+                if data.get('key') and data.get('email'):
+                    # メールハッシュ検証
+                    stored_hash = self._extract_email_hash_from_key(data['key'])
+                    computed_hash = self._compute_email_hash(data['email'])
+
+                    if stored_hash != computed_hash:
+                        # ハッシュ不一致 - ライセンス無効
+                        return
+
+                    # 有効期限を復元
+                    expires_at = None
+                    if data.get('expires'):
+                        try:
+                            expires_at = datetime.fromisoformat(data['expires'])
+                        except:
+                            pass
+
+                    # insight-common で検証
+                    self.insight_info = self.validator.validate(data['key'], expires_at)
+
+                    if self.insight_info.is_valid:
+                        # 製品チェック
+                        if self.validator.is_product_covered(self.insight_info, PRODUCT_CODE):
+                            tier = self._map_insight_tier(self.insight_info.tier)
+                            self.license_info = {
+                                'type': tier,
+                                'key': data['key'],
+                                'email': data.get('email', ''),
+                                'expires': data.get('expires')
+                            }
+                            return
+
+            except Exception as e:
+                print(f"License load error: {e}")
+
+    def _save_license(self):
+        """ライセンス情報を保存"""
+        with open(LICENSE_FILE, 'w', encoding='utf-8') as f:
+            json.dump(self.license_info, f, ensure_ascii=False, indent=2)
+
+    def _map_insight_tier(self, tier: Optional[InsightLicenseTier]) -> Optional[str]:
+        """insight-common のティアをローカルティアにマップ"""
+        if not tier:
+            return None
+        mapping = {
+            InsightLicenseTier.TRIAL: LicenseTier.TRIAL,
+            InsightLicenseTier.STD: LicenseTier.STD,
+            InsightLicenseTier.PRO: LicenseTier.PRO,
+            InsightLicenseTier.ENT: LicenseTier.ENT,
+        }
+        return mapping.get(tier, None)
+
+    def activate(self, email: str, key: str) -> Tuple[bool, str]:
+        """ライセンスをアクティベート（メールハッシュ検証付き）"""
+        if not email or not key:
+            return False, t('license_enter_prompt')
+
+        email = email.strip()
+        key = key.strip().upper()
+
+        # メールハッシュ検証
+        key_hash = self._extract_email_hash_from_key(key)
+        email_hash = self._compute_email_hash(email)
+
+        if key_hash != email_hash:
+            return False, t('license_email_mismatch')
+
+        # insight-common で検証
+        self.insight_info = self.validator.validate(key)
+
+        if not self.insight_info.is_valid:
+            error_msg = self.insight_info.error or t('license_invalid')
+            return False, error_msg
+
+        # 製品チェック
+        if not self.validator.is_product_covered(self.insight_info, PRODUCT_CODE):
+            return False, t('license_wrong_product')
+
+        # 有効期限を計算（初回アクティベーション時）
+        expires_str = None
+        if self.insight_info.tier and self.insight_info.tier != InsightLicenseTier.ENT:
+            tier_config = INSIGHT_TIERS.get(self.insight_info.tier, {})
+            duration_months = tier_config.get('duration_months')
+            duration_days = tier_config.get('duration_days')
+
+            if duration_days:
+                expires = datetime.now() + timedelta(days=duration_days)
+                expires_str = expires.isoformat()
+            elif duration_months:
+                now = datetime.now()
+                new_month = now.month + duration_months
+                new_year = now.year + (new_month - 1) // 12
+                new_month = (new_month - 1) % 12 + 1
+                expires = datetime(new_year, new_month, min(now.day, 28))
+                expires_str = expires.isoformat()
+
+        tier = self._map_insight_tier(self.insight_info.tier)
+        self.license_info = {
+            'type': tier,
+            'key': key,
+            'email': email,
+            'expires': expires_str
+        }
+        self._save_license()
+
+        tier_info = TIERS.get(tier, TIERS[LicenseTier.TRIAL])
+        name = tier_info['name_ja'] if get_language() == 'ja' else tier_info['name']
+        return True, t('license_activated', name)
+
+    def deactivate(self):
+        """ライセンスを解除"""
+        self.license_info = {'type': None, 'key': '', 'email': '', 'expires': None}
+        self.insight_info = None
+        if LICENSE_FILE.exists():
+            LICENSE_FILE.unlink()
+
+    def get_tier(self) -> Optional[str]:
+        return self.license_info.get('type')
+
+    def get_tier_info(self) -> Dict:
+        tier = self.get_tier()
+        if tier is None:
+            return TIER_NOT_ACTIVATED
+        return TIERS.get(tier, TIER_NOT_ACTIVATED)
+
+    def get_update_limit(self) -> Optional[int]:
+        return self.get_tier_info().get('update_limit')
+
+    def can_batch(self) -> bool:
+        """フォルダ一括処理が可能か（PRO/Trial/ENT）"""
+        return self.get_tier_info().get('batch', False)
+
+    def can_json(self) -> bool:
+        """1ファイルJSON入出力が可能か（PRO/Trial/ENT）"""
+        return self.get_tier_info().get('json', False)
+
+    def can_compare(self) -> bool:
+        """2ファイル比較が可能か（STD以上）"""
+        return self.get_tier_info().get('compare', False)
+
+    def is_pro(self) -> bool:
+        """後方互換性のため維持（PRO機能 = batch + json）"""
+        return self.can_batch() and self.can_json()
+
+    def is_activated(self) -> bool:
+        """ライセンスがアクティベートされているか"""
+        return self.get_tier() is not None
+
+    def get_days_until_expiry(self) -> Optional[int]:
+        """有効期限までの日数を取得（期限なしの場合はNone）"""
+        expires_str = self.license_info.get('expires')
+        if not expires_str:
+            return None
+        try:
+            expires = datetime.fromisoformat(expires_str)
+            delta = expires - datetime.now()
+            return delta.days
+        except:
+            return None
+
+    def should_show_expiry_warning(self) -> bool:
+        """期限切れ警告を表示すべきか"""
+        days = self.get_days_until_expiry()
+        if days is None:
+            return False
+        return 0 < days <= EXPIRY_WARNING_DAYS
+
+    def get_expiry_date_str(self) -> str:
+        """有効期限の表示文字列"""
+        expires_str = self.license_info.get('expires')
+        if not expires_str:
+            return t('license_perpetual') if self.get_tier() == LicenseTier.ENT else '-'
+        try:
+            expires = datetime.fromisoformat(expires_str)
+            return expires.strftime('%Y/%m/%d')
+        except:
+            return '-'
@@ -0,0 +1,135 @@
+# -*- coding: utf-8 -*-
+"""
+Insight Slides - 処理ログのリングバッファ（GUI非依存）
+
+画面の処理ログは直近 capacity 件だけをメモリに持つ。溢れた古い行は捨てるが、
+spill_path を指定すると全行をファイルにも書き出し（max_bytes ごとにローテーション）、
+長時間の一括処理でも履歴を失わずにメモリ使用量を一定に保つ。
+
+ログダイアログは tail() で末尾から1ページずつ取り出す。レベルの絞り込みも
+末尾から辿りながら行うため、履歴全体をコピーしない。
+"""
+import os
+from collections import deque
+from pathlib import Path
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+DEFAULT_CAPACITY = 5000          # メモリに持つ行数
+DEFAULT_SPILL_MAX_BYTES = 2 * 1024 * 1024
+DEFAULT_SPILL_BACKUPS = 3        # session_log.txt.1 〜 .3 まで残す
+
+LEVELS = ("info", "success", "warning", "error")
+
+# (通し番号, レベル, テキスト)
+Entry = Tuple[int, str, str]
+
+
+class LogBuffer:
+    """上限付きのログバッファ（Tk のスレッドからのみ使う）
+
+    Args:
+        capacity: メモリに持つ最大件数。超えた分は古いものから捨てる
+        spill_path: 指定すると全件をこのファイルにも追記する
+        max_bytes: spill ファイルがこの大きさを超えたらローテーションする
+        backups: ローテーションで残す世代数
+    """
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY, spill_path: Optional[Path] = None,
+                 max_bytes: int = DEFAULT_SPILL_MAX_BYTES, backups: int = DEFAULT_SPILL_BACKUPS):
+        self._entries = deque(maxlen=max(1, capacity))
+        self._seq = 0
+        self.spill_path = Path(spill_path) if spill_path else None
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self._spill = None
+
+    # === 追加 ===
+    def append(self, text: str, level: str = "info"):
+        self.extend([(text, level)])
+
+    def extend(self, items: Iterable[Tuple[str, str]]):
+        """(テキスト, レベル) をまとめて追加する"""
+        written = []
+        for text, level in items:
+            self._seq += 1
+            self._entries.append((self._seq, level or "info", text))
+            written.append(text)
+        if written and self.spill_path:
+            self._write_spill(written)
+
+    def clear(self):
+        """メモリ上の行を消す（spill ファイルは残す）"""
+        self._entries.clear()
+
+    # === 参照 ===
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def total(self) -> int:
+        """これまでに追加された件数"""
+        return self._seq
+
+    @property
+    def dropped(self) -> int:
+        """上限を超えてメモリから捨てた件数（clear() で消した分を含む）"""
+        return self._seq - len(self._entries)
+
+    def tail(self, count: int, levels: Optional[Sequence[str]] = None,
+             before: Optional[int] = None) -> List[Entry]:
+        """末尾から count 件を古い順で返す
+
+        Args:
+            levels: 指定したレベルのみ
+            before: この通し番号より前の行のみ（前のページを読むときに、
+                表示中の先頭の通し番号を渡す）
+        """
+        page = []
+        for entry in reversed(self._entries):
+            if before is not None and entry[0] >= before:
+                continue
+            if levels and entry[1] not in levels:
+                continue
+            page.append(entry)
+            if len(page) >= count:
+                break
+        page.reverse()
+        return page
+
+    def last(self) -> Optional[Entry]:
+        return self._entries[-1] if self._entries else None
+
+    # === spill ===
+    def _write_spill(self, texts: List[str]):
+        try:
+            if self._spill is None:
+                self.spill_path.parent.mkdir(parents=True, exist_ok=True)
+                self._spill = open(self.spill_path, "a", encoding="utf-8")
+            self._spill.write("".join(texts))
+            self._spill.flush()
+            if self._spill.tell() >= self.max_bytes:
+                self._rotate()
+        except OSError:
+            # 書き出せなくても画面のログは続ける
+            self.close()
+            self.spill_path = None
+
+    def _rotate(self):
+        self._spill.close()
+        self._spill = None
+        base = str(self.spill_path)
+        for i in range(self.backups - 1, 0, -1):
+            if os.path.exists(f"{base}.{i}"):
+                os.replace(f"{base}.{i}", f"{base}.{i + 1}")
+        if self.backups > 0:
+            os.replace(base, f"{base}.1")
+        else:
+            os.remove(base)
+
+    def close(self):
+        if self._spill is not None:
+            try:
+                self._spill.close()
+            except OSError:
+                pass
+            self._spill = None
@@ -0,0 +1,361 @@
+# -*- coding: utf-8 -*-
+"""
+Insight Slides - 一括処理の運用メトリクス出力（GUI非依存）
+
+夜間の一括処理などをダッシュボードで見るため、処理中のカウンターとヒストグラムを
+指定フォルダへ書き出す。
+
+    insightslides.prom           Prometheus のテキスト形式（node_exporter の textfile collector で読める）。
+                                 interval 秒ごとに一時ファイル経由で置き換える
+    insightslides_events.jsonl   1ファイル処理するごと・処理の開始/終了ごとに1行の JSON を追記
+
+export() の間だけ current() が MetricsExporter を返し、batch._run_pool がワーカーで
+ファイルごとの処理時間・読み書きしたバイト数を測って record_file() に渡す。
+エラーは種類（例外のクラス名）ごと、キャッシュ（再実行時のマニフェスト・監視の内容ハッシュ・
+常駐サービスの LRU）はヒット/ミスごとに数える。export() していなければ何もしない。
+"""
+import json
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+PROM_FILE = "insightslides.prom"
+EVENTS_FILE = "insightslides_events.jsonl"
+DEFAULT_INTERVAL = 5.0   # .prom を書き直す最短の間隔（秒）
+
+# 1ファイルの処理時間のヒストグラムの区切り（秒）
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+
+COUNTER, GAUGE, HISTOGRAM = "counter", "gauge", "histogram"
+
+# 名前 → (種類, 説明)
+METRICS: Dict[str, Tuple[str, str]] = {
+    "insightslides_files_total": (COUNTER, "Files processed by kind and status"),
+    "insightslides_items_extracted_total": (COUNTER, "Text items extracted"),
+    "insightslides_items_updated_total": (COUNTER, "Text items updated"),
+    "insightslides_items_skipped_total": (COUNTER, "Text items skipped during update"),
+    "insightslides_compare_rows_total": (COUNTER, "Compared rows by change type"),
+    "insightslides_errors_total": (COUNTER, "Failed files by error type"),
+    "insightslides_file_duration_seconds": (HISTOGRAM, "Per-file processing time in the worker"),
+    "insightslides_bytes_read_total": (COUNTER, "Input bytes read"),
+    "insightslides_bytes_written_total": (COUNTER, "Output bytes written"),
+    "insightslides_cache_lookups_total": (COUNTER, "Cache lookups by cache and result"),
+    "insightslides_cache_hit_ratio": (GAUGE, "Cache hits / lookups"),
+    "insightslides_worker_busy_seconds_total": (COUNTER, "Time workers spent processing files"),
+    "insightslides_worker_capacity_seconds_total": (COUNTER, "Worker slots multiplied by pool run time"),
+    "insightslides_worker_utilization": (GAUGE, "Busy seconds / capacity seconds"),
+    "insightslides_workers": (GAUGE, "Worker slots of the running pool (0 when idle)"),
+    "insightslides_service_requests_total": (COUNTER, "Requests handled by the resident service"),
+    "insightslides_run_start_time_seconds": (GAUGE, "Unix time the run started"),
+    "insightslides_run_duration_seconds": (GAUGE, "Seconds since the run started"),
+    "insightslides_run_in_progress": (GAUGE, "1 while the run is active"),
+    "insightslides_last_update_time_seconds": (GAUGE, "Unix time of the last write of this file"),
+}
+
+Labels = Tuple[Tuple[str, str], ...]
+
+_current: Optional["MetricsExporter"] = None
+
+
+def current() -> Optional["MetricsExporter"]:
+    """出力中の MetricsExporter（export() の外では None）"""
+    return _current
+
+
+def _labels(labels: Dict[str, object]) -> Labels:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: Labels, extra: Iterable[Tuple[str, str]] = ()) -> str:
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf"
+    return repr(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class _Histogram:
+    __slots__ = ("counts", "sum", "count")
+
+    def __init__(self):
+        self.counts = [0] * len(LATENCY_BUCKETS)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        for i, bound in enumerate(LATENCY_BUCKETS):
+            if value <= bound:
+                self.counts[i] += 1
+        self.sum += value
+        self.count += 1
+
+
+class MetricsExporter:
+    """カウンター・ゲージ・ヒストグラムを持ち、.prom と JSONL に書き出す（スレッドセーフ）
+
+    Args:
+        directory: 出力先フォルダ
+        command: 全メトリクスの command ラベル（"batch extract" など）
+        params: 開始イベントに記録する処理のパラメータ
+        interval: .prom を書き直す最短の間隔（秒）
+    """
+
+    def __init__(self, directory: str, command: str, params: Optional[Dict] = None,
+                 interval: float = DEFAULT_INTERVAL):
+        self.directory = directory
+        self.command = command
+        self.params = dict(params or {})
+        self.interval = interval
+        self.prom_path = os.path.join(directory, PROM_FILE)
+        self.events_path = os.path.join(directory, EVENTS_FILE)
+        self._values: Dict[str, Dict[Labels, float]] = {}
+        self._histograms: Dict[str, Dict[Labels, _Histogram]] = {}
+        self._collectors: List[Callable[[], Iterable[Tuple[str, Dict, float]]]] = []
+        self._lock = threading.RLock()
+        self._events = None
+        self._last_flush = 0.0
+        self._dirty = False
+        self.started = time.time()
+        self._pool_slots = 0
+        self._pool_started = 0.0
+        self.status: Optional[str] = None   # 終了イベントの status（未設定なら例外の有無で決める）
+
+    # === 基本操作 ===
+    def inc(self, name: str, value: float = 1.0, **labels):
+        key = _labels({"command": self.command, **labels})
+        with self._lock:
+            series = self._values.setdefault(name, {})
+            series[key] = series.get(key, 0.0) + value
+            self._dirty = True
+
+    def set(self, name: str, value: float, **labels):
+        key = _labels({"command": self.command, **labels})
+        with self._lock:
+            self._values.setdefault(name, {})[key] = float(value)
+            self._dirty = True
+
+    def get(self, name: str, **labels) -> float:
+        key = _labels({"command": self.command, **labels})
+        with self._lock:
+            return self._values.get(name, {}).get(key, 0.0)
+
+    def observe(self, name: str, value: float, **labels):
+        key = _labels({"command": self.command, **labels})
+        with self._lock:
+            self._histograms.setdefault(name, {}).setdefault(key, _Histogram()).observe(value)
+            self._dirty = True
+
+    def add_collector(self, fn: Callable[[], Iterable[Tuple[str, Dict, float]]]):
+        """書き出しのたびに fn() の (名前, ラベル, 値) を set する（常駐サービスのキャッシュ統計など）"""
+        with self._lock:
+            self._collectors.append(fn)
+
+    def event(self, event: str, **fields):
+        """JSONL に1行追記する"""
+        record = {"ts": round(time.time(), 3), "event": event, "command": self.command, **fields}
+        line = json.dumps(record, ensure_ascii=False, default=str) + "\n"
+        with self._lock:
+            if self._events is None:
+                os.makedirs(self.directory, exist_ok=True)
+                self._events = open(self.events_path, "a", encoding="utf-8")
+            self._events.write(line)
+            self._events.flush()
+
+    # === 処理の記録 ===
+    def record_file(self, kind: str, status: str, file: str = "", elapsed: Optional[float] = None,
+                    bytes_read: int = 0, bytes_written: int = 0, error_type: str = "",
+                    counts: Optional[Dict[str, int]] = None, rows: Optional[Dict[str, int]] = None):
+        """1ファイル分の結果を記録する
+
+        Args:
+            kind: extract / update / compare
+            status: ok / skipped / cached / error
+            elapsed: ワーカーでの処理時間（ワーカーが落ちて測れなかった場合は None）
+            counts: {"extracted": 件数, "updated": 件数, "skipped": 件数}
+            rows: 比較結果の {"same": 件数, "changed": ...}
+        """
+        with self._lock:
+            self.inc("insightslides_files_total", kind=kind, status=status)
+            for name, value in (counts or {}).items():
+                if value:
+                    self.inc(f"insightslides_items_{name}_total", value, kind=kind)
+            for change, value in (rows or {}).items():
+                if value:
+                    self.inc("insightslides_compare_rows_total", value, change=change)
+            if status == "error":
+                self.inc("insightslides_errors_total", kind=kind, type=error_type or "Error")
+            if elapsed is not None:
+                self.observe("insightslides_file_duration_seconds", elapsed, kind=kind)
+                self.inc("insightslides_worker_busy_seconds_total", elapsed)
+            if bytes_read:
+                self.inc("insightslides_bytes_read_total", bytes_read, kind=kind)
+            if bytes_written:
+                self.inc("insightslides_bytes_written_total", bytes_written, kind=kind)
+        self.event("file", kind=kind, file=file, status=status,
+                   elapsed_s=round(elapsed, 4) if elapsed is not None else None,
+                   bytes_read=bytes_read, bytes_written=bytes_written, error_type=error_type or None,
+                   **(counts or {}), **({"rows": rows} if rows else {}))
+        self.flush()
+
+    def record_cache(self, cache: str, hit: bool, count: int = 1):
+        self.inc("insightslides_cache_lookups_total", count, cache=cache, result="hit" if hit else "miss")
+        self.flush()
+
+    def begin_pool(self, slots: int):
+        """一括処理の開始（slots: 同時に処理できるファイル数）"""
+        with self._lock:
+            self._pool_slots = slots
+            self._pool_started = time.monotonic()
+            self.set("insightslides_workers", slots)
+        self.event("pool_start", workers=slots)
+
+    def end_pool(self):
+        with self._lock:
+            if not self._pool_slots:
+                return
+            capacity = self._pool_slots * (time.monotonic() - self._pool_started)
+            self.inc("insightslides_worker_capacity_seconds_total", capacity)
+            self._pool_slots = 0
+            self.set("insightslides_workers", 0)
+        self.event("pool_end", capacity_s=round(capacity, 3), utilization=round(self.utilization(), 4))
+        self.flush(force=True)
+
+    def utilization(self) -> float:
+        """これまでの一括処理全体でのワーカーの稼働率（処理中の一括処理は現在までで計算）"""
+        with self._lock:
+            capacity = self.get("insightslides_worker_capacity_seconds_total")
+            if self._pool_slots:
+                capacity += self._pool_slots * (time.monotonic() - self._pool_started)
+            busy = self.get("insightslides_worker_busy_seconds_total")
+        return min(busy / capacity, 1.0) if capacity > 0 else 0.0
+
+    # === 書き出し ===
+    def flush(self, force: bool = False):
+        """前回から interval 秒経っていれば（force なら必ず）.prom を書き直す"""
+        now = time.monotonic()
+        with self._lock:
+            if not force and (not self._dirty and not self._collectors or now - self._last_flush < self.interval):
+                return
+            self._last_flush = now
+            text = self._render()
+            self._dirty = False
+        self._write(text)
+
+    def _write(self, text: str):
+        # 読み手が書きかけのファイルを見ないよう、一時ファイルに書いてから置き換える
+        # （更新スレッドと close() が同時に書いても別々の一時ファイルになるようスレッドごとの名前）
+        os.makedirs(self.directory, exist_ok=True)
+        tmp = f"{self.prom_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "w", encoding="utf-8", newline="\n") as f:
+            f.write(text)
+        os.replace(tmp, self.prom_path)
+
+    def _update_gauges(self, running: bool):
+        for fn in self._collectors:
+            for name, labels, value in fn():
+                self.set(name, value, **labels)
+        for key, lookups in self._cache_totals().items():
+            hits = lookups.get("hit", 0.0)
+            total = hits + lookups.get("miss", 0.0)
+            self._values.setdefault("insightslides_cache_hit_ratio", {})[key] = hits / total if total else 0.0
+        now = time.time()
+        self.set("insightslides_worker_utilization", self.utilization())
+        self.set("insightslides_run_start_time_seconds", self.started)
+        self.set("insightslides_run_duration_seconds", now - self.started)
+        self.set("insightslides_run_in_progress", 1 if running else 0)
+        self.set("insightslides_last_update_time_seconds", now)
+
+    def _cache_totals(self) -> Dict[Labels, Dict[str, float]]:
+        totals: Dict[Labels, Dict[str, float]] = {}
+        for key, value in self._values.get("insightslides_cache_lookups_total", {}).items():
+            labels = dict(key)
+            result = labels.pop("result")
+            totals.setdefault(_labels(labels), {})[result] = value
+        return totals
+
+    def _render(self, running: bool = True) -> str:
+        self._update_gauges(running)
+        lines = []
+        for name, (kind, help_text) in METRICS.items():
+            series = self._values.get(name)
+            histograms = self._histograms.get(name)
+            if not series and not histograms:
+                continue
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, value in sorted((series or {}).items()):
+                lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+            for labels, hist in sorted((histograms or {}).items()):
+                for bound, count in zip(LATENCY_BUCKETS, hist.counts):
+                    lines.append(f"{name}_bucket{_format_labels(labels, [('le', _format_value(bound))])} {count}")
+                lines.append(f"{name}_bucket{_format_labels(labels, [('le', '+Inf')])} {hist.count}")
+                lines.append(f"{name}_sum{_format_labels(labels)} {_format_value(round(hist.sum, 6))}")
+                lines.append(f"{name}_count{_format_labels(labels)} {hist.count}")
+        return "\n".join(lines) + "\n"
+
+    def close(self, status: str = "ok"):
+        """終了を記録して最後の .prom を書き出す"""
+        if self._pool_slots:
+            self.end_pool()
+        with self._lock:
+            text = self._render(running=False)
+        self._write(text)
+        self.event("run_end", status=self.status or status, duration_s=round(time.time() - self.started, 3),
+                   files=int(sum(self._values.get("insightslides_files_total", {}).values())),
+                   utilization=round(self.utilization(), 4))
+        with self._lock:
+            if self._events is not None:
+                self._events.close()
+                self._events = None
+
+
+@contextmanager
+def export(directory: Optional[str], command: str, params: Optional[Dict] = None,
+           interval: float = DEFAULT_INTERVAL) -> Iterator[Optional[MetricsExporter]]:
+    """directory を指定したときだけ、このブロックの処理のメトリクスを書き出す（None なら何もしない）
+
+    処理が止まっている間（常駐サービスの待ち受け中など）も interval 秒ごとに .prom を書き直す。
+    """
+    global _current
+    if not directory or _current is not None:
+        yield None
+        return
+    exporter = MetricsExporter(directory, command, params, interval)
+    exporter.event("run_start", pid=os.getpid(), started=datetime.now().isoformat(timespec="seconds"),
+                   params=exporter.params)
+    exporter.flush(force=True)
+    stop = threading.Event()
+
+    def refresh():
+        while not stop.wait(interval):
+            try:
+                exporter.flush(force=True)
+            except OSError:
+                pass
+
+    threading.Thread(target=refresh, daemon=True).start()
+    _current = exporter
+    status = "error"
+    try:
+        yield exporter
+        status = "ok"
+    except KeyboardInterrupt:
+        status = "cancelled"
+        raise
+    finally:
+        _current = None
+        stop.set()
+        exporter.close(status)
@@ -0,0 +1,523 @@
+# -*- coding: utf-8 -*-
+"""
+Insight Slides - 常駐ワーカープール（GUI非依存）
+
+一括処理用のワーカープロセスを管理する。
+
+- 起動時に pptx / openpyxl を読み込んでおく（spawn 方式でもタスクごとの import 待ちがない）
+- 各ワーカーは max_tasks_per_child 件処理するか、メモリ使用量（RSS）が max_rss_mb を
+  超えた時点で自分から終了し、プールが新しいワーカーを起動する
+  （lxml のツリーなどで長時間の一括処理中にメモリが増え続けないように）
+- タスクは空いているワーカーにだけ渡す（未着手のものは Future.cancel() で取り消せる）
+- ワーカーが異常終了した場合、処理中だったタスクは WorkerCrashedError で失敗させ、
+  ワーカーを起動し直す
+- 1タスクの処理時間が task_timeout 秒を超えたワーカーは親プロセスが強制終了し（TaskTimeoutError）、
+  処理中のメモリ使用量が task_max_rss_mb を超えたワーカーは自分で終了する（TaskMemoryError）。
+  壊れたファイルや ZIP 爆弾で1件が止まっても、他のワーカーはそのまま処理を続ける
+
+MemoryGovernor は投入の前段で、ファイルごとの見積もりメモリ（batch.estimate_memory）の
+合計が予算に収まるように同時実行数を絞る。
+
+アプリ起動時にバックグラウンドで起動して batch.set_shared_pool() に登録しておくと、
+一括処理はこのプールを使い回す。登録がなければ batch._run_pool が処理ごとに作る。
+"""
+import itertools
+import multiprocessing
+import os
+import queue
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from typing import Callable, Deque, Dict, Optional, Tuple
+
+# ワーカー起動時に読み込んでおくモジュール
+PRELOAD_MODULES = ("pptx", "openpyxl", "insightslides_core", "insightslides_batch")
+
+DEFAULT_MAX_TASKS_PER_CHILD = 200
+DEFAULT_MAX_RSS_MB = 1024
+
+# メモリ予算（MemoryGovernor）
+DEFAULT_MEMORY_BUDGET_RATIO = 0.6   # 予算の指定がなければ物理メモリのこの割合
+MEMORY_HEADROOM = 512 * 1024 * 1024  # 他のアプリ用に空けておく量（空きがこれを割り込む投入はしない）
+SERIAL_RATIO = 0.5                   # 見積もりが予算のこの割合を超えるファイルは単独で処理する
+DEFAULT_TASK_TIMEOUT = 600       # 秒。1ファイルの処理時間の上限（0 で無制限）
+DEFAULT_TASK_MAX_RSS_MB = 4096   # 処理中のワーカーのメモリ使用量の上限（0 で無制限）
+RSS_CHECK_INTERVAL = 0.1         # 秒。処理中のワーカーが自分のメモリ使用量を確かめる間隔
+PARENT_CHECK_INTERVAL = 2.0   # 秒。待機中のワーカーが親プロセスの生存を確かめる間隔
+
+# ワーカーからの通知
+_MSG_READY = "ready"
+_MSG_DONE = "done"
+
+# メモリ上限を超えたワーカーの終了コード
+EXIT_MEMORY_LIMIT = 87
+
+# ワーカーの終了理由
+RETIRE_TASKS = "tasks"
+RETIRE_RSS = "rss"
+
+
+class WorkerCrashedError(RuntimeError):
+    """タスクの処理中にワーカープロセスが異常終了した"""
+
+
+class TaskTimeoutError(WorkerCrashedError):
+    """タスクが制限時間を超えたためワーカーを強制終了した"""
+
+
+class TaskMemoryError(WorkerCrashedError):
+    """タスクの処理中にメモリ使用量が上限を超えたためワーカーを終了した"""
+
+
+def process_rss() -> int:
+    """このプロセスの現在のメモリ使用量（RSS、バイト）。取得できなければ 0"""
+    if sys.platform == "win32":
+        import ctypes
+        from ctypes import wintypes
+
+        class PROCESS_MEMORY_COUNTERS(ctypes.Structure):
+            _fields_ = [("cb", wintypes.DWORD), ("PageFaultCount", wintypes.DWORD),
+                        ("PeakWorkingSetSize", ctypes.c_size_t), ("WorkingSetSize", ctypes.c_size_t),
+                        ("QuotaPeakPagedPoolUsage", ctypes.c_size_t), ("QuotaPagedPoolUsage", ctypes.c_size_t),
+                        ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t), ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+                        ("PagefileUsage", ctypes.c_size_t), ("PeakPagefileUsage", ctypes.c_size_t)]
+
+        counters = PROCESS_MEMORY_COUNTERS()
+        counters.cb = ctypes.sizeof(counters)
+        try:
+            kernel32, psapi = ctypes.windll.kernel32, ctypes.windll.psapi
+            kernel32.GetCurrentProcess.restype = wintypes.HANDLE
+            psapi.GetProcessMemoryInfo.argtypes = [wintypes.HANDLE, ctypes.POINTER(PROCESS_MEMORY_COUNTERS),
+                                                   wintypes.DWORD]
+            if psapi.GetProcessMemoryInfo(kernel32.GetCurrentProcess(), ctypes.byref(counters), counters.cb):
+                return counters.WorkingSetSize
+        except (AttributeError, OSError):
+            pass
+        return 0
+    try:
+        with open("/proc/self/statm", "rb") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss  # 現在値が取れない環境ではピーク値
+        return peak if sys.platform == "darwin" else peak * 1024
+    except (ImportError, OSError):
+        return 0
+
+
+def system_memory() -> Tuple[int, int]:
+    """物理メモリの (総量, 空き) をバイトで返す。取得できなければ (0, 0)"""
+    if sys.platform == "win32":
+        import ctypes
+        from ctypes import wintypes
+
+        class MEMORYSTATUSEX(ctypes.Structure):
+            _fields_ = [("dwLength", wintypes.DWORD), ("dwMemoryLoad", wintypes.DWORD),
+                        ("ullTotalPhys", ctypes.c_ulonglong), ("ullAvailPhys", ctypes.c_ulonglong),
+                        ("ullTotalPageFile", ctypes.c_ulonglong), ("ullAvailPageFile", ctypes.c_ulonglong),
+                        ("ullTotalVirtual", ctypes.c_ulonglong), ("ullAvailVirtual", ctypes.c_ulonglong),
+                        ("ullAvailExtendedVirtual", ctypes.c_ulonglong)]
+
+        status = MEMORYSTATUSEX()
+        status.dwLength = ctypes.sizeof(status)
+        try:
+            if ctypes.windll.kernel32.GlobalMemoryStatusEx(ctypes.byref(status)):
+                return status.ullTotalPhys, status.ullAvailPhys
+        except (AttributeError, OSError):
+            pass
+        return 0, 0
+    try:
+        info = {}
+        with open("/proc/meminfo", "r") as f:
+            for line in f:
+                key, _, value = line.partition(":")
+                info[key] = int(value.split()[0]) * 1024
+        return info["MemTotal"], info.get("MemAvailable", info.get("MemFree", 0))
+    except (OSError, ValueError, IndexError, KeyError):
+        pass
+    try:
+        page = os.sysconf("SC_PAGE_SIZE")
+        return os.sysconf("SC_PHYS_PAGES") * page, os.sysconf("SC_AVPHYS_PAGES") * page
+    except (AttributeError, ValueError, OSError):
+        return 0, 0
+
+
+def _watch_rss(busy: threading.Event, limit: int):
+    """スレッド: タスクの処理中にメモリ使用量が limit を超えたら、その場でプロセスを終了する"""
+    while True:
+        busy.wait()
+        if process_rss() > limit:
+            os._exit(EXIT_MEMORY_LIMIT)
+        time.sleep(RSS_CHECK_INTERVAL)
+
+
+def _worker_main(wid: int, tasks, results, preload: Tuple[str, ...], max_tasks: int, max_rss: int,
+                 task_max_rss: int = 0):
+    """ワーカープロセス: 渡されたタスクを1件ずつ処理し、上限に達したら終了を知らせて抜ける"""
+    import importlib
+    import signal
+
+    # Ctrl+C はプロセスグループ全体に届く。終了は親プロセスが shutdown で指示する
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    for name in preload:
+        try:
+            importlib.import_module(name)
+        except ImportError:
+            pass
+    results.put((_MSG_READY, wid, process_rss()))
+    busy = threading.Event()
+    if task_max_rss:
+        threading.Thread(target=_watch_rss, args=(busy, task_max_rss), daemon=True).start()
+    parent = multiprocessing.parent_process()
+    done = 0
+    while True:
+        try:
+            item = tasks.get(timeout=PARENT_CHECK_INTERVAL)
+        except queue.Empty:
+            if parent is not None and not parent.is_alive():
+                return  # 親プロセスが強制終了された（daemon の後始末が働かない）
+            continue
+        if item is None:
+            return
+        tid, fn, arg = item
+        busy.set()
+        try:
+            ok, payload = True, fn(arg)
+        except BaseException as e:  # ワーカーは落とさず、例外は呼び出し側の Future へ
+            ok, payload = False, e
+        finally:
+            busy.clear()
+        done += 1
+        rss = process_rss()
+        retire = RETIRE_TASKS if done >= max_tasks else RETIRE_RSS if max_rss and rss > max_rss else None
+        # 終了するかどうかは結果と同じ通知で知らせる（別の通知にすると、その間に次のタスクが渡されうる）
+        results.put((_MSG_DONE, wid, tid, ok, payload, rss, retire))
+        if retire:
+            return
+
+
+class WorkerPool:
+    """ワーカーを再利用・入れ替えしながらタスクを処理するプロセスプール
+
+    concurrent.futures の Executor と同じ submit / shutdown を持つ。
+
+    Args:
+        workers: ワーカー数（既定: CPU 数）
+        max_tasks_per_child: 1ワーカーが処理する最大件数
+        max_rss_mb: この値を超えたワーカーはタスク終了後に入れ替える（0 で無効）
+        preload: ワーカー起動時に import するモジュール
+        task_timeout: 1タスクの処理時間の上限（秒、0 で無制限）
+        task_max_rss_mb: 処理中のメモリ使用量の上限（0 で無制限）
+    """
+
+    def __init__(self, workers: Optional[int] = None, max_tasks_per_child: int = DEFAULT_MAX_TASKS_PER_CHILD,
+                 max_rss_mb: int = DEFAULT_MAX_RSS_MB, preload: Tuple[str, ...] = PRELOAD_MODULES,
+                 task_timeout: float = DEFAULT_TASK_TIMEOUT, task_max_rss_mb: int = DEFAULT_TASK_MAX_RSS_MB):
+        self.size = max(1, workers or os.cpu_count() or 1)
+        self.max_tasks_per_child = max_tasks_per_child
+        self.max_rss = max_rss_mb * 1024 * 1024
+        self.preload = tuple(preload)
+        self.task_timeout = task_timeout
+        self.task_max_rss = task_max_rss_mb * 1024 * 1024
+        # Windows と同じ spawn 方式に揃える（fork はスレッドを持つ親プロセスでは安全でない）
+        self._ctx = multiprocessing.get_context("spawn")
+        self._results = self._ctx.Queue()
+        self._lock = threading.RLock()  # Future の完了コールバックはこのロックを持ったまま呼ばれる
+        self._procs: Dict[int, Tuple] = {}           # wid -> (Process, タスク用キュー)
+        self._idle: Deque[int] = deque()
+        self._running: Dict[int, Tuple[int, Future, float]] = {}   # wid -> (tid, Future, 開始時刻)
+        self._pending: Deque[Tuple[int, Callable, object, Future]] = deque()
+        self._wids = itertools.count(1)
+        self._tids = itertools.count(1)
+        self._closed = False
+        self._collector: Optional[threading.Thread] = None
+        self._stats = {"spawned": 0, "ready": 0, "tasks": 0, "recycled_tasks": 0, "recycled_rss": 0,
+                       "crashed": 0, "timeouts": 0, "killed_rss": 0, "peak_rss_mb": 0.0}
+        self._started_at = None
+        self._warm_at = None
+
+    # === 起動・終了 ===
+    def start(self) -> "WorkerPool":
+        """ワーカーを起動する（読み込み完了を待たずに戻る）"""
+        with self._lock:
+            if self._collector:
+                return self
+            self._started_at = time.monotonic()
+            for _ in range(self.size):
+                self._spawn()
+            self._collector = threading.Thread(target=self._collect, name="worker-pool", daemon=True)
+            self._collector.start()
+        return self
+
+    def _spawn(self):
+        wid = next(self._wids)
+        tasks = self._ctx.Queue()
+        proc = self._ctx.Process(target=_worker_main, name=f"InsightSlides-worker-{wid}", daemon=True,
+                                 args=(wid, tasks, self._results, self.preload,
+                                       self.max_tasks_per_child, self.max_rss, self.task_max_rss))
+        proc.start()
+        self._procs[wid] = (proc, tasks)
+        self._stats["spawned"] += 1
+
+    def shutdown(self, wait: bool = True, cancel_futures: bool = True):
+        """ワーカーを終了する（未着手のタスクは取り消し、処理中のものは終わるのを待つ）"""
+        with self._lock:
+            self._closed = True
+            while self._pending:
+                self._pending.popleft()[3].cancel()
+            procs = list(self._procs.values())
+        for _, tasks in procs:
+            try:
+                tasks.put(None)
+            except (OSError, ValueError):
+                pass
+        if wait:
+            for proc, _ in procs:
+                proc.join(timeout=10)
+                if proc.is_alive():
+                    proc.terminate()
+            with self._lock:
+                self._procs.clear()
+                self._idle.clear()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.shutdown()
+
+    # === タスク ===
+    def submit(self, fn: Callable, arg) -> Future:
+        """fn(arg) をワーカーで実行する（fn は pickle 可能なモジュールレベル関数）"""
+        future: Future = Future()
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("WorkerPool is shut down")
+            self._pending.append((next(self._tids), fn, arg, future))
+            self._dispatch()
+        if not self._collector:
+            self.start()
+        return future
+
+    def _dispatch(self):
+        """空いているワーカーに未着手のタスクを渡す（ロック取得済みで呼ぶ）"""
+        while self._idle and self._pending:
+            tid, fn, arg, future = self._pending.popleft()
+            if not future.set_running_or_notify_cancel():
+                continue  # 取り消し済み
+            wid = self._idle.popleft()
+            self._running[wid] = (tid, future, time.monotonic())
+            self._procs[wid][1].put((tid, fn, arg))
+
+    def _collect(self):
+        """スレッド: ワーカーからの通知を処理し、終了・異常終了したワーカーを入れ替える"""
+        while True:
+            try:
+                msg = self._results.get(timeout=0.5)
+            except queue.Empty:
+                msg = None
+            except (OSError, EOFError, ValueError):
+                return
+            with self._lock:
+                if msg:
+                    self._handle(msg)
+                self._kill_overdue()
+                self._reap()
+                if self._closed and not self._procs:
+                    return
+
+    def _handle(self, msg):
+        kind, wid = msg[0], msg[1]
+        if kind == _MSG_READY:
+            self._stats["ready"] += 1
+            if self._stats["ready"] == self.size and self._warm_at is None:
+                self._warm_at = time.monotonic()
+            self._note_rss(msg[2])
+            if wid in self._procs:
+                self._idle.append(wid)
+        elif kind == _MSG_DONE:
+            _, _, tid, ok, payload, rss, retire = msg
+            self._note_rss(rss)
+            self._stats["tasks"] += 1
+            _, future, _ = self._running.pop(wid, (None, None, None))
+            if future:
+                if ok:
+                    future.set_result(payload)
+                else:
+                    future.set_exception(payload)
+            if retire:
+                self._stats["recycled_tasks" if retire == RETIRE_TASKS else "recycled_rss"] += 1
+                proc, _ = self._procs.pop(wid, (None, None))
+                if proc and not self._closed:
+                    self._spawn()
+            elif wid in self._procs and not self._closed:
+                self._idle.append(wid)
+        self._dispatch()
+
+    def _reap(self):
+        """予告なく終了したワーカーを片付け、処理中だったタスクを失敗させる"""
+        if all(proc.is_alive() for proc, _ in self._procs.values()):
+            return
+        # 正常に終了したワーカーの最後の通知（結果・終了予告）を先に処理する
+        while True:
+            try:
+                self._handle(self._results.get_nowait())
+            except queue.Empty:
+                break
+            except (OSError, EOFError, ValueError):
+                break
+        for wid, (proc, _) in list(self._procs.items()):
+            if proc.is_alive():
+                continue
+            del self._procs[wid]
+            if wid in self._idle:
+                self._idle.remove(wid)
+            running = self._running.pop(wid, None)
+            if self._closed:
+                continue
+            if proc.exitcode == EXIT_MEMORY_LIMIT:
+                self._stats["killed_rss"] += 1
+                error = TaskMemoryError(f"メモリ使用量が {self.task_max_rss // 1024 // 1024}MB を超えたため中断しました")
+            else:
+                self._stats["crashed"] += 1
+                error = WorkerCrashedError(f"ワーカーが異常終了しました（終了コード {proc.exitcode}）")
+            if running:
+                running[1].set_exception(error)
+            self._spawn()
+        self._dispatch()
+
+    def _kill_overdue(self):
+        """制限時間を超えたタスクのワーカーを強制終了して入れ替える"""
+        if not self.task_timeout or self._closed:
+            return
+        now = time.monotonic()
+        for wid, (_, future, started) in list(self._running.items()):
+            if now - started <= self.task_timeout:
+                continue
+            proc, _ = self._procs.pop(wid, (None, None))
+            del self._running[wid]
+            if proc:
+                proc.kill()
+                proc.join(timeout=5)
+            self._stats["timeouts"] += 1
+            future.set_exception(TaskTimeoutError(f"処理が {self.task_timeout:g} 秒を超えたため中断しました"))
+            self._spawn()
+        self._dispatch()
+
+    def _note_rss(self, rss: int):
+        self._stats["peak_rss_mb"] = max(self._stats["peak_rss_mb"], round(rss / 1024 / 1024, 1))
+
+    # === 状態 ===
+    @property
+    def warm(self) -> bool:
+        """全ワーカーの起動（モジュールの読み込み）が済んでいるか"""
+        return self._warm_at is not None
+
+    def stats(self) -> Dict:
+        with self._lock:
+            stats = dict(self._stats)
+            stats.update(workers=self.size, alive=len(self._procs), busy=len(self._running),
+                         queued=sum(1 for *_, f in self._pending if not f.cancelled()), warm=self.warm,
+                         warmup_s=round(self._warm_at - self._started_at, 2) if self._warm_at else None)
+        return stats
+
+
+def format_stats(stats: Dict) -> str:
+    """ログ用の1行表記"""
+    text = (f"workers={stats['alive']}/{stats['workers']} tasks={stats['tasks']} "
+            f"recycled={stats['recycled_tasks']}+{stats['recycled_rss']}(rss) crashed={stats['crashed']} "
+            f"timeouts={stats['timeouts']} killed_rss={stats['killed_rss']} "
+            f"peak_rss={stats['peak_rss_mb']}MB warmup={stats['warmup_s']}s")
+    mem = stats.get("memory")
+    if mem:
+        text += (f" memory[budget={mem['budget_mb']}MB peak={mem['peak_projected_mb']}MB "
+                 f"serial={mem['serial']} throttled={mem['throttled']}]")
+    return text
+
+
+class MemoryGovernor:
+    """見積もりメモリの合計が予算に収まる範囲でだけタスクの投入を許可する
+
+    - 同時実行数は limit まで
+    - 投入中のタスクの見積もりの合計 + 新しいタスクの見積もりが budget を超えるなら待つ
+    - 実際の空きメモリが見積もり + MEMORY_HEADROOM に満たない場合も待つ
+      （他のアプリがメモリを使っていると並列数が自動的に下がる）
+    - 見積もりが予算の SERIAL_RATIO を超える大きなファイルは、他のタスクが終わるのを待って単独で処理する
+    - 何も実行していなければ、予算を超えるタスクでも必ず投入する（止まらないように）
+
+    Args:
+        limit: 最大同時実行数
+        budget: メモリ予算（バイト）。None で物理メモリの DEFAULT_MEMORY_BUDGET_RATIO、
+            物理メモリが分からなければ同時実行数だけで制御する
+    """
+
+    def __init__(self, limit: int, budget: Optional[int] = None):
+        self.limit = max(1, limit)
+        if budget is None:
+            total, _ = system_memory()
+            budget = int(total * DEFAULT_MEMORY_BUDGET_RATIO) or None
+        self.budget = budget
+        self._cond = threading.Condition()
+        self._running = 0
+        self._used = 0
+        self._exclusive = False
+        self._throttled_key = None
+        self._stats = {"peak_running": 0, "peak_projected_mb": 0.0, "serial": 0, "throttled": 0}
+
+    def _is_large(self, need: int) -> bool:
+        return bool(self.budget) and need > self.budget * SERIAL_RATIO
+
+    def _admissible(self, need: int) -> bool:
+        if self._running == 0:
+            return True
+        if self._exclusive or self._running >= self.limit:
+            return False
+        if not self.budget:
+            return True
+        if self._is_large(need) or self._used + need > self.budget:
+            return False
+        _, available = system_memory()
+        return not available or need + MEMORY_HEADROOM <= available
+
+    def acquire(self, need: int, timeout: Optional[float] = None, key=None) -> bool:
+        """need バイトを使うタスクの投入を待つ（timeout 秒以内に許可されなければ False）
+
+        key: 同じタスクで呼び直すときに同じ値を渡すと、待たせた回数を1件として数える
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while not self._admissible(need):
+                by_memory = self._running < self.limit and not self._exclusive
+                if by_memory and (key is None or key != self._throttled_key):
+                    self._stats["throttled"] += 1  # 同時実行数ではなくメモリの都合で待たせた
+                    self._throttled_key = key
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                # 空きメモリは他のプロセスの都合でも変わるため、通知がなくても定期的に見直す
+                self._cond.wait(0.5 if remaining is None else min(remaining, 0.5))
+            self._running += 1
+            self._used += need
+            if self._is_large(need):
+                self._exclusive = True
+                self._stats["serial"] += 1
+            self._stats["peak_running"] = max(self._stats["peak_running"], self._running)
+            self._stats["peak_projected_mb"] = max(self._stats["peak_projected_mb"],
+                                                   round(self._used / 1024 / 1024, 1))
+            return True
+
+    def release(self, need: int):
+        with self._cond:
+            self._running -= 1
+            self._used -= need
+            if self._is_large(need):
+                self._exclusive = False
+            self._cond.notify_all()
+
+    def stats(self) -> Dict:
+        with self._cond:
+            return {**self._stats, "budget_mb": round(self.budget / 1024 / 1024) if self.budget else None}
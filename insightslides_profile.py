@@ -0,0 +1,236 @@
+# -*- coding: utf-8 -*-
+"""
+Insight Slides - 1回分の処理の cProfile / tracemalloc 記録（GUI非依存）
+
+「抽出に10分かかった」といった報告に添付してもらう資料を作る。
+arm() しておくと（GUI のヘルプメニュー、CLI の --profile、環境変数 INSIGHTSLIDES_PROFILE=1）
+次の1回の処理だけを capture() で cProfile と tracemalloc にかけ、CONFIG_DIR/profiles/ に
+
+    <日時>_<処理名>.prof          cProfile の結果（python -m pstats / snakeviz などで開ける）
+    <日時>_<処理名>_alloc.txt     メモリ確保の多い行の上位と、時間のかかった関数の上位
+    <日時>_<処理名>.json          処理のパラメータ・経過時間・ピークメモリ・上記ファイルの一覧
+
+を書き出す。一括処理ではワーカープロセス側もファイルごとに計測し（profile_call）、
+関数ごとの統計を合算して <日時>_<処理名>_workers.prof に、ピークメモリの大きかった
+ファイルの確保の上位を _alloc.txt に追記する。
+
+arm() していなければ capture() は何もしないため、通常の処理には影響しない。
+"""
+import io
+import json
+import marshal
+import os
+import re
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from insightslides_config import CONFIG_DIR
+
+PROFILE_DIR = CONFIG_DIR / "profiles"
+ENV_VAR = "INSIGHTSLIDES_PROFILE"
+
+TRACE_FRAMES = 10        # tracemalloc で記録するスタックの深さ
+TOP_ALLOCATIONS = 30     # _alloc.txt に出すメモリ確保の上位件数
+TOP_FUNCTIONS = 40       # _alloc.txt に出す関数（累積時間）の上位件数
+WORKER_TOP_ALLOCATIONS = 10
+WORKER_FILES = 5         # ワーカーの確保の上位を残すファイル数（ピークメモリの大きい順）
+
+_armed = os.environ.get(ENV_VAR, "").strip().lower() in ("1", "true", "yes", "on")
+_lock = threading.Lock()
+_active: Optional["Capture"] = None
+
+
+def arm(on: bool = True):
+    """次の1回の処理を記録する（on=False で取り消し）"""
+    global _armed
+    _armed = bool(on)
+
+
+def armed() -> bool:
+    return _armed
+
+
+def current() -> Optional["Capture"]:
+    """記録中の Capture（記録していなければ None）"""
+    return _active
+
+
+class Capture:
+    """1回分の記録。ワーカーから返った統計もここに集める"""
+
+    def __init__(self, name: str, params: Dict[str, Any], directory: str):
+        stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        slug = re.sub(r"[^\w.-]+", "_", name).strip("_")[:60] or "job"
+        self.base = os.path.join(directory, f"{stamp}_{slug}")
+        self.name = name
+        self.params = params
+        self.paths: List[str] = []
+        self.write_error: Optional[OSError] = None   # 書き出しに失敗したとき（処理自体の結果は変えない）
+        self._worker_stats = None
+        self._worker_files: List[Tuple[int, str, List[str]]] = []
+        self._worker_lock = threading.Lock()
+
+    def add_worker(self, file: str, data: Optional[Dict]):
+        """profile_call の結果（ワーカー1件分）を合算する"""
+        if not data:
+            return
+        import pstats
+
+        with self._worker_lock:
+            holder = _StatsHolder(marshal.loads(data["stats"]))
+            if self._worker_stats is None:
+                self._worker_stats = pstats.Stats(holder)
+            else:
+                self._worker_stats.add(holder)
+            self._worker_files.append((data["peak"], file, data["top"]))
+            self._worker_files.sort(reverse=True)
+            del self._worker_files[WORKER_FILES:]
+
+
+class _StatsHolder:
+    """marshal で受け取った関数ごとの統計を pstats.Stats に渡すための入れ物"""
+
+    def __init__(self, stats):
+        self.stats = stats
+
+    def create_stats(self):
+        pass
+
+
+@contextmanager
+def capture(name: str, params: Optional[Dict[str, Any]] = None,
+            directory: Optional[str] = None) -> Iterator[Optional[Capture]]:
+    """arm() されていればこのブロックを記録する（1回で解除）。されていなければ None を返して何もしない"""
+    global _armed, _active
+    with _lock:
+        if not _armed or _active is not None:
+            start = False
+        else:
+            _armed, start = False, True
+            _active = Capture(name, dict(params or {}), str(directory or PROFILE_DIR))
+    if not start:
+        yield None
+        return
+
+    import cProfile
+    import tracemalloc
+
+    cap = _active
+    started_tracing = not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start(TRACE_FRAMES)
+    profiler = cProfile.Profile()
+    started = time.perf_counter()
+    error = None
+    profiler.enable()
+    try:
+        yield cap
+    except BaseException as e:
+        error = e
+        raise
+    finally:
+        profiler.disable()
+        elapsed = time.perf_counter() - started
+        snapshot = tracemalloc.take_snapshot()
+        _, peak = tracemalloc.get_traced_memory()
+        if started_tracing:
+            tracemalloc.stop()
+        with _lock:
+            _active = None
+        try:
+            _write_capture(cap, profiler, snapshot, peak, elapsed, error)
+        except OSError as e:
+            cap.write_error = e
+
+
+def _write_capture(cap: Capture, profiler, snapshot, peak: int, elapsed: float, error: Optional[BaseException]):
+    import pstats
+
+    os.makedirs(os.path.dirname(cap.base), exist_ok=True)
+    prof_path = cap.base + ".prof"
+    profiler.dump_stats(prof_path)
+    cap.paths.append(prof_path)
+
+    alloc_path = cap.base + "_alloc.txt"
+    with open(alloc_path, "w", encoding="utf-8") as f:
+        f.write(f"# {cap.name}\n# elapsed {elapsed:.3f}s / traced peak {peak / 1024 / 1024:.1f}MB\n\n")
+        f.write(f"## メモリ確保の上位 {TOP_ALLOCATIONS} 行\n")
+        f.writelines(f"{line}\n" for line in top_allocations(snapshot, TOP_ALLOCATIONS))
+        f.write(f"\n## 累積時間の上位 {TOP_FUNCTIONS} 関数\n")
+        f.write(_stats_text(pstats.Stats(profiler)))
+        if cap._worker_stats is not None:
+            f.write(f"\n## ワーカー: 累積時間の上位 {TOP_FUNCTIONS} 関数（全ファイルの合計）\n")
+            f.write(_stats_text(cap._worker_stats))
+            for worker_peak, file, top in cap._worker_files:
+                f.write(f"\n## ワーカー: {file}（peak {worker_peak / 1024 / 1024:.1f}MB）\n")
+                f.writelines(f"{line}\n" for line in top)
+    cap.paths.append(alloc_path)
+
+    if cap._worker_stats is not None:
+        workers_path = cap.base + "_workers.prof"
+        cap._worker_stats.dump_stats(workers_path)
+        cap.paths.append(workers_path)
+
+    meta_path = cap.base + ".json"
+    cap.paths.append(meta_path)
+    with open(meta_path, "w", encoding="utf-8") as f:
+        json.dump({"name": cap.name, "created": datetime.now().isoformat(timespec="seconds"),
+                   "params": cap.params, "elapsed_s": round(elapsed, 3), "traced_peak_bytes": peak,
+                   "error": repr(error) if error else None, "pid": os.getpid(),
+                   "files": [os.path.basename(p) for p in cap.paths]},
+                  f, ensure_ascii=False, indent=2, default=str)
+
+
+def _stats_text(stats) -> str:
+    out = io.StringIO()
+    stats.stream = out
+    stats.sort_stats("cumulative").print_stats(TOP_FUNCTIONS)
+    return out.getvalue()
+
+
+def top_allocations(snapshot, limit: int) -> List[str]:
+    """メモリ確保の多い行（ファイル:行 サイズ 回数）"""
+    import tracemalloc
+
+    # 計測そのもの（このモジュール・ワーカー統計の合算）の確保は除く
+    snapshot = snapshot.filter_traces((tracemalloc.Filter(False, tracemalloc.__file__),
+                                       tracemalloc.Filter(False, __file__),
+                                       tracemalloc.Filter(False, "*pstats.py"),
+                                       tracemalloc.Filter(False, "<frozen importlib._bootstrap>")))
+    lines = []
+    for stat in snapshot.statistics("lineno")[:limit]:
+        frame = stat.traceback[0]
+        lines.append(f"{frame.filename}:{frame.lineno}  {stat.size / 1024:.1f}KB  {stat.count}回")
+    return lines
+
+
+# ============== ワーカー側 ==============
+def profile_call(fn: Callable[[Any], Any], arg: Any) -> Tuple[Any, Dict]:
+    """ワーカー: fn(arg) を cProfile と tracemalloc にかけ、(戻り値, 統計) を返す
+
+    統計は {stats: marshal した関数ごとの統計, peak: ピークバイト数, top: 確保の上位行}。
+    プロセスをまたいで返せるよう、すべて組み込み型にする。
+    """
+    import cProfile
+    import tracemalloc
+
+    started_tracing = not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start(TRACE_FRAMES)
+    tracemalloc.reset_peak()
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        value = fn(arg)
+    finally:
+        profiler.disable()
+        snapshot = tracemalloc.take_snapshot()
+        _, peak = tracemalloc.get_traced_memory()
+        if started_tracing:
+            tracemalloc.stop()
+    profiler.create_stats()
+    return value, {"stats": marshal.dumps(profiler.stats), "peak": peak,
+                   "top": top_allocations(snapshot, WORKER_TOP_ALLOCATIONS)}
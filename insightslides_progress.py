@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+"""
+Insight Slides - 一括処理の進捗・処理速度・残り時間（GUI非依存）
+
+処理の前に対象ファイルを探索し、presentation.xml のスライド一覧（sldIdLst）と
+ファイルサイズだけを読んで総量を見積もる（python-pptx では開かない）。
+完了したファイルのスライド数で進捗率を出すため、大きいファイルと小さいファイルが
+混ざっていても進み方が偏らない。
+
+ProgressTracker.advance() は完了ごとに呼んでよく、画面に出すべきときだけ
+（interval 秒に1回と最後の1件）スナップショットを返す。
+"""
+import os
+import time
+from typing import Callable, Dict, Iterable, Optional, Sequence, Tuple
+
+import insightslides_batch as batch
+import insightslides_core as core
+
+DEFAULT_INTERVAL = 0.25   # 進捗を画面に出す最短の間隔（秒）
+
+# 結果のキー → (スライド数, バイト数)
+Weights = Dict[str, Tuple[int, int]]
+
+
+# ============== 事前スキャン ==============
+def _weight(paths: Iterable[Optional[str]]) -> Tuple[int, int]:
+    slides = size = 0
+    for path in paths:
+        if not path:
+            continue
+        try:
+            size += os.path.getsize(path)
+        except OSError:
+            continue
+        slides += batch.count_slides(path)
+    return slides, size
+
+
+def scan_extract(folder: str, recursive: bool = False, include: Sequence[str] = (), exclude: Sequence[str] = (),
+                 should_stop: Optional[Callable[[], bool]] = None) -> Weights:
+    """フォルダ一括抽出の対象を見積もる（キーは結果の path ＝ PPTX のパス）"""
+    return {path: _weight([path])
+            for path, _, _, _ in batch.walk_files(folder, "*.pptx", include, exclude, recursive,
+                                                  should_stop=should_stop)}
+
+
+def scan_update(folder: str, fmt: str = "excel", recursive: bool = False, include: Sequence[str] = (),
+                exclude: Sequence[str] = (), should_stop: Optional[Callable[[], bool]] = None) -> Weights:
+    """フォルダ一括更新の対象を見積もる（キーは結果の path ＝ 抽出ファイルのパス。スライド数は対応する PPTX）"""
+    suffix = f"_抽出{core.EXTRACT_EXTENSIONS[fmt]}".lower()
+    weights = {}
+    for data_file, _, _, size in batch.walk_files(folder, f"*{suffix}", include, exclude, recursive,
+                                                  should_stop=should_stop):
+        slides, pptx_size = _weight([data_file[:-len(suffix)] + ".pptx"])
+        weights[data_file] = (slides, size + pptx_size)
+    return weights
+
+
+def scan_compare(folder1: str, folder2: str) -> Weights:
+    """フォルダ比較の対象を見積もる（キーは結果の file ＝ 表示名）"""
+    return {name: _weight([f1, f2]) for name, f1, f2 in batch.pair_folder_files(folder1, folder2)}
+
+
+# ============== 進捗 ==============
+class ProgressTracker:
+    """完了したファイルから進捗率・ファイル/秒・スライド/秒・残り時間を出す
+
+    Args:
+        weights: 事前スキャンの結果（キー → (スライド数, バイト数)）
+        interval: advance() がスナップショットを返す最短の間隔（秒）
+    """
+
+    def __init__(self, weights: Weights, interval: float = DEFAULT_INTERVAL,
+                 clock: Callable[[], float] = time.monotonic):
+        self.weights = weights
+        self.files_total = len(weights)
+        self.slides_total = sum(w[0] for w in weights.values())
+        self.bytes_total = sum(w[1] for w in weights.values())
+        self.interval = interval
+        self._clock = clock
+        self.started = clock()
+        self.files_done = 0
+        self.slides_done = 0
+        self._last_emit = None
+
+    def advance(self, key: Optional[str] = None) -> Optional[Dict]:
+        """1件完了を記録する。前回から interval 秒経っていれば（最後の1件は必ず）スナップショットを返す"""
+        self.files_done += 1
+        self.slides_done += self.weights.get(key, (0, 0))[0]
+        now = self._clock()
+        last = self.files_done >= self.files_total
+        if not last and self._last_emit is not None and now - self._last_emit < self.interval:
+            return None
+        self._last_emit = now
+        return self.snapshot(now)
+
+    def snapshot(self, now: Optional[float] = None) -> Dict:
+        elapsed = max((now or self._clock()) - self.started, 1e-6)
+        files_total = max(self.files_total, self.files_done)
+        slides_total = max(self.slides_total, self.slides_done)
+        # スライド数が分かればスライドで、分からなければファイル数で進捗率を出す
+        if slides_total:
+            fraction = self.slides_done / slides_total
+        else:
+            fraction = self.files_done / files_total if files_total else 0.0
+        slides_per_s = self.slides_done / elapsed
+        files_per_s = self.files_done / elapsed
+        eta = None
+        if 0 < fraction < 1:
+            eta = elapsed * (1 - fraction) / fraction
+        elif fraction >= 1:
+            eta = 0.0
+        return {"fraction": min(fraction, 1.0), "files_done": self.files_done, "files_total": files_total,
+                "slides_done": self.slides_done, "slides_total": slides_total,
+                "files_per_s": files_per_s, "slides_per_s": slides_per_s,
+                "elapsed_s": elapsed, "eta_s": eta}
+
+
+def format_eta(seconds: Optional[float]) -> str:
+    if seconds is None:
+        return "--:--"
+    seconds = int(round(seconds))
+    h, rest = divmod(seconds, 3600)
+    m, s = divmod(rest, 60)
+    return f"{h}:{m:02d}:{s:02d}" if h else f"{m}:{s:02d}"
@@ -0,0 +1,474 @@
+# -*- coding: utf-8 -*-
+"""
+Insight Slides - 常駐サービス（GUI非依存）
+
+同じデッキを繰り返し抽出・更新する自動化向けに、プロセスを起動したまま
+localhost の HTTP で extract / update / preview / compare を受け付ける。
+読み込んだ Presentation と抽出結果は容量上限付きの LRU キャッシュに保持し、
+ファイルの更新日時かサイズが変わったものは自動的に読み直す。
+
+    InsightSlides.py serve [--port 8765] [--workers 4]
+
+リクエストはすべて POST の JSON（GET /health のみ例外）:
+    POST /extract  {"path", "include_notes"?, "output"?, "format"?}
+    POST /preview  {"pptx", "data" | "updates", "source"?, "normalize"?}
+    POST /update   {"pptx", "data" | "updates", "output"?, "backup"?, "normalize"?}
+    POST /compare  {"before", "after", "normalize"?, "changes_only"?}
+    POST /shutdown
+"updates" は [{"slide", "id", "text"}, ...] の形式。
+
+任意のパスを読み書きでき認証もないため、待ち受けはループバックアドレスに限る。
+ブラウザ上のページからの CSRF / DNS リバインディングを防ぐため、POST は
+Content-Type: application/json のみ受け付け、Host（と Origin があればそれも）が
+ループバックでない要求は拒否する。
+
+HTTP を介さずに同じ処理を呼ぶ LocalClient は、サービスを起動せずに
+自動化スクリプトを試すための代替クライアントとして使える。
+"""
+import ipaddress
+import json
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from typing import Callable, Dict, Hashable, Iterator, List, Optional, Tuple
+from urllib import error as urlerror, request as urlrequest
+from urllib.parse import urlsplit
+
+import insightslides_core as core
+from insightslides_config import APP_VERSION, t
+from insightslides_license import LicenseManager
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+DEFAULT_CACHE_ENTRIES = 64
+DEFAULT_CACHE_MB = 512
+
+
+class ServiceError(Exception):
+    """HTTP ステータス付きのエラー"""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+# ============== キャッシュ ==============
+class LRUCache:
+    """件数と概算バイト数の両方に上限を持つスレッドセーフな LRU キャッシュ
+
+    get_or_load は同じキーの読み込みを1回にまとめる（同時に来た要求は
+    先に始めた読み込みの完了を待つ）。
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_CACHE_ENTRIES, max_bytes: int = DEFAULT_CACHE_MB * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._items: "OrderedDict[Hashable, Tuple[object, int]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._loading: Dict[Hashable, threading.Lock] = {}
+        self.hits = self.misses = self.evictions = 0
+
+    def get(self, key: Hashable):
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                return None
+            self._items.move_to_end(key)
+            self.hits += 1
+            return item[0]
+
+    def put(self, key: Hashable, value, size: int):
+        with self._lock:
+            if key in self._items:
+                self._bytes -= self._items.pop(key)[1]
+            if size > self.max_bytes:
+                return  # 単体で上限を超えるものは保持しない
+            self._items[key] = (value, size)
+            self._bytes += size
+            while len(self._items) > self.max_entries or self._bytes > self.max_bytes:
+                _, (_, old_size) = self._items.popitem(last=False)
+                self._bytes -= old_size
+                self.evictions += 1
+
+    def get_or_load(self, key: Hashable, loader: Callable[[], object], sizer: Callable[[object], int]):
+        """キャッシュにあれば返し、なければ loader で読み込んで格納
+
+        Returns:
+            (値, キャッシュヒットしたか)
+        """
+        value = self.get(key)
+        if value is not None:
+            return value, True
+
+        with self._lock:
+            key_lock = self._loading.setdefault(key, threading.Lock())
+        with key_lock:
+            value = self.get(key)
+            if value is not None:
+                return value, True
+            with self._lock:
+                self.misses += 1
+            try:
+                value = loader()
+                self.put(key, value, sizer(value))
+            finally:
+                with self._lock:
+                    self._loading.pop(key, None)
+        return value, False
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {"entries": len(self._items), "bytes": self._bytes, "max_entries": self.max_entries,
+                    "max_bytes": self.max_bytes, "hits": self.hits, "misses": self.misses,
+                    "evictions": self.evictions}
+
+
+def _file_key(path: str) -> Tuple[str, int, int]:
+    """キャッシュキー用のファイル識別子（パス・更新日時・サイズ）"""
+    try:
+        st = os.stat(path)
+    except OSError:
+        raise ServiceError(404, f"ファイルが見つかりません: {path}")
+    return os.path.abspath(path), st.st_mtime_ns, st.st_size
+
+
+def _rows_size(rows: List[Dict]) -> int:
+    """抽出行リストの概算メモリ量"""
+    return sum(len(r.get("text", "")) * 2 + 200 for r in rows)
+
+
+# ============== サービス本体 ==============
+class InsightSlidesService:
+    """extract / update / preview / compare を受け付けるサービス本体（HTTP 非依存）
+
+    Args:
+        cache: 読み込み済み Presentation と抽出結果を保持するキャッシュ
+        license_manager: 機能制限の判定に使う（None なら保存済みライセンスを読む）
+    """
+
+    def __init__(self, cache: Optional[LRUCache] = None, license_manager: Optional[LicenseManager] = None):
+        self.cache = cache or LRUCache()
+        self.license = license_manager or LicenseManager()
+        self.requests = 0
+        self._stats_lock = threading.Lock()
+
+    # --- キャッシュ付き読み込み ---
+    @contextmanager
+    def _presentation(self, path: str) -> Iterator[Tuple[object, bool]]:
+        """読み取り専用で使う Presentation と、キャッシュから取れたか（キャッシュ共有のため変更してはならない）
+
+        lxml のツリーはスレッド間で同時に読めないため、ブロックの間はその Presentation のロックを持つ。
+        """
+        key = ("prs",) + _file_key(path)
+        (prs, lock), cached = self.cache.get_or_load(key, lambda: (core.load_presentation(path), threading.Lock()),
+                                                     lambda _: key[3] * 4)
+        with lock:
+            yield prs, cached
+
+    def _extracted(self, path: str, include_notes: bool = False):
+        key = ("extract", include_notes, t('type_notes')) + _file_key(path)
+
+        def load():
+            with self._presentation(path) as (prs, _):
+                return core.extract_from_presentation(prs, os.path.basename(path), include_notes, t('type_notes'))
+        return self.cache.get_or_load(key, load, lambda value: _rows_size(value[0]))
+
+    def _updates(self, payload: Dict) -> Dict:
+        if "updates" in payload:
+            try:
+                return {(int(u["slide"]), str(u["id"])): str(u.get("text", "")) for u in payload["updates"]}
+            except (KeyError, TypeError, ValueError):
+                raise ServiceError(400, "updates は [{slide, id, text}, ...] で指定してください")
+
+        path = self._required(payload, "data")
+        source = payload.get("source") or core.update_source_for(path)
+        self._require(source != "json" or self.license.can_json(), "JSON入力")
+        key = ("updates", source) + _file_key(path)
+        try:
+            updates, _ = self.cache.get_or_load(key, lambda: core.load_updates(path, source),
+                                                lambda value: sum(len(v) * 2 + 100 for v in value.values()))
+        except core.InvalidHeaderError:
+            raise ServiceError(400, t('log_invalid_header'))
+        return updates
+
+    # --- 共通 ---
+    @staticmethod
+    def _required(payload: Dict, name: str):
+        value = payload.get(name)
+        if not value:
+            raise ServiceError(400, f"{name} を指定してください")
+        return value
+
+    @staticmethod
+    def _require(allowed: bool, feature: str):
+        if not allowed:
+            raise ServiceError(403, f"現在のライセンスでは {feature} を利用できません")
+
+    @staticmethod
+    def _profile(payload: Dict) -> str:
+        try:
+            return core.get_profile(payload.get("normalize")).spec
+        except ValueError as e:
+            raise ServiceError(400, str(e))
+
+    # --- 各操作 ---
+    def extract(self, payload: Dict) -> Dict:
+        path = self._required(payload, "path")
+        include_notes = bool(payload.get("include_notes"))
+        self._require(not include_notes or self.license.is_pro(), "ノート抽出")
+        (data, meta), cached = self._extracted(path, include_notes)
+
+        result = {"file": path, "slides": meta.get("slide_count", 0), "count": len(data), "cached": cached}
+        if payload.get("output"):
+            fmt = payload.get("format") or "excel"
+            if fmt not in core.EXTRACT_EXTENSIONS:
+                raise ServiceError(400, f"format は {'/'.join(core.EXTRACT_EXTENSIONS)} のいずれか")
+            self._require(fmt != "json" or self.license.can_json(), "JSON出力")
+            core.save_extracted(data, payload["output"], fmt,
+                                [t('header_slide'), t('header_id'), t('header_type'), t('header_text')])
+            result["output"] = payload["output"]
+        else:
+            result["items"] = data
+        return result
+
+    def preview(self, payload: Dict) -> Dict:
+        path = self._required(payload, "pptx")
+        updates = self._updates(payload)
+        profile = self._profile(payload)
+        # preview=True は図形を書き換えないため、キャッシュ上の Presentation を共有して使える
+        with self._presentation(path) as (prs, cached):
+            _, skipped, changes = core.apply_updates(prs, updates, preview=True,
+                                                     limit=self.license.get_update_limit(), profile=profile)
+        return {"file": path, "updates": len(updates), "changes": len(changes), "skipped": skipped,
+                "diff": changes, "cached": cached}
+
+    def update(self, payload: Dict) -> Dict:
+        path = self._required(payload, "pptx")
+        updates = self._updates(payload)
+        backup = ""
+        if payload.get("backup") and self.license.is_pro():
+            backup = str(core.create_backup(path))
+
+        # 書き換えるためキャッシュは使わずに開き直す（出力先が変われば次回は別キーになる）
+        prs = core.load_presentation(path)
+        updated, skipped, _ = core.apply_updates(prs, updates, limit=self.license.get_update_limit(),
+                                                 profile=self._profile(payload))
+        out = payload.get("output") or core.updated_output_path(path)
+        core.save_presentation(prs, out)
+        return {"file": path, "output": out, "backup": backup, "updates": len(updates),
+                "updated": updated, "skipped": skipped}
+
+    def compare(self, payload: Dict) -> Dict:
+        self._require(self.license.can_compare(), "比較機能")
+        before = self._required(payload, "before")
+        after = self._required(payload, "after")
+        (data1, _), cached1 = self._extracted(before)
+        (data2, _), cached2 = self._extracted(after)
+        rows, stats = core.compare_texts(data1, data2, detect_moves=True, profile=self._profile(payload))
+        if payload.get("changes_only"):
+            rows = [r for r in rows if r["status"] != core.STATUS_SAME]
+        return {"before": before, "after": after, **stats, "rows": rows, "cached": cached1 and cached2}
+
+    def health(self, payload: Optional[Dict] = None) -> Dict:
+        with self._stats_lock:
+            requests = self.requests
+        return {"version": APP_VERSION, "requests": requests, "cache": self.cache.stats()}
+
+    def handle(self, op: str, payload: Optional[Dict]) -> Tuple[int, Dict]:
+        """操作名と JSON ペイロードを受け取り (HTTP ステータス, 応答) を返す"""
+        handler = {"extract": self.extract, "update": self.update, "preview": self.preview,
+                   "compare": self.compare, "health": self.health}.get(op)
+        if handler is None:
+            return 404, {"error": f"不明な操作: {op}"}
+        if not isinstance(payload, dict):
+            return 400, {"error": "JSON オブジェクトを送信してください"}
+        with self._stats_lock:
+            self.requests += 1
+        try:
+            return 200, handler(payload)
+        except ServiceError as e:
+            return e.status, {"error": str(e)}
+        except Exception as e:
+            return 500, {"error": str(e)}
+
+
+# ============== HTTP ==============
+def is_loopback(host: Optional[str]) -> bool:
+    """ホスト名・アドレスがループバックか（localhost / 127.0.0.0/8 / ::1）"""
+    if not host:
+        return False
+    host = host.strip("[]")
+    if host.lower() == "localhost":
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
+def _header_host(value: Optional[str]) -> Optional[str]:
+    """Host / Origin ヘッダーからホスト名を取り出す（"[::1]:8765" → "::1"）"""
+    if not value:
+        return None
+    return urlsplit(value if "//" in value else f"//{value}").hostname
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server_version = f"InsightSlides/{APP_VERSION}"
+
+    def _reply(self, status: int, body: Dict):
+        data = json.dumps(body, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _rejected(self, post: bool) -> bool:
+        """ループバック以外の Host・Origin と JSON 以外の POST を 403 / 415 で断る（断ったら True）"""
+        origin = self.headers.get("Origin")
+        host_ok = is_loopback(_header_host(self.headers.get("Host")))
+        if not host_ok or (origin and not is_loopback(_header_host(origin))):
+            self._reply(403, {"error": "ループバック以外からの要求は受け付けません"})
+            return True
+        content_type = (self.headers.get("Content-Type") or "").split(";")[0].strip().lower()
+        if post and content_type != "application/json":
+            self._reply(415, {"error": "Content-Type: application/json で送信してください"})
+            return True
+        return False
+
+    def do_GET(self):
+        if self._rejected(post=False):
+            return
+        if self.path.rstrip("/") == "/health":
+            return self._reply(*self.server.service.handle("health", {}))
+        self._reply(404, {"error": f"不明なパス: {self.path}"})
+
+    def do_POST(self):
+        if self._rejected(post=True):
+            return
+        op = self.path.strip("/")
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+            payload = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            return self._reply(400, {"error": "JSON を解析できません"})
+
+        if op == "shutdown":
+            self._reply(200, {"status": "stopping"})
+            threading.Thread(target=self.server.shutdown, daemon=True).start()
+            return
+        self._reply(*self.server.service.handle(op, payload))
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+class ServiceHTTPServer(HTTPServer):
+    """リクエストを固定数のワーカースレッドで処理する HTTP サーバー"""
+
+    daemon_threads = True
+
+    def __init__(self, address: Tuple[str, int], service: InsightSlidesService, workers: int = 4,
+                 verbose: bool = False):
+        super().__init__(address, _Handler)
+        self.service = service
+        self.verbose = verbose
+        self._pool = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="insightslides-service")
+
+    def process_request(self, request, client_address):
+        self._pool.submit(self._process_request_worker, request, client_address)
+
+    def _process_request_worker(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+    def server_close(self):
+        super().server_close()
+        self._pool.shutdown(wait=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+
+def create_server(host: str = DEFAULT_HOST, port: int = DEFAULT_PORT, workers: int = 4,
+                  cache_entries: int = DEFAULT_CACHE_ENTRIES, cache_mb: int = DEFAULT_CACHE_MB,
+                  service: Optional[InsightSlidesService] = None, verbose: bool = False) -> ServiceHTTPServer:
+    """サービスと HTTP サーバーを作成（port=0 で空きポートを自動割り当て）
+
+    認証がないため host はループバックアドレスに限る（それ以外は ValueError）。
+    """
+    if not is_loopback(host):
+        raise ValueError(f"待ち受けアドレスはループバック（127.0.0.1 / localhost）に限ります: {host}")
+    service = service or InsightSlidesService(LRUCache(cache_entries, cache_mb * 1024 * 1024))
+    return ServiceHTTPServer((host, port), service, workers, verbose)
+
+
+# ============== クライアント ==============
+class ServiceClient:
+    """常駐サービスへの HTTP クライアント"""
+
+    def __init__(self, url: str = f"http://{DEFAULT_HOST}:{DEFAULT_PORT}", timeout: float = 300):
+        self.url = url.rstrip("/")
+        self.timeout = timeout
+
+    def call(self, op: str, **payload) -> Dict:
+        """操作を呼び出して応答を返す（エラー応答は ServiceError）"""
+        if op == "health":
+            req = urlrequest.Request(f"{self.url}/health")
+        else:
+            req = urlrequest.Request(f"{self.url}/{op}", data=json.dumps(payload, ensure_ascii=False).encode("utf-8"),
+                                     headers={"Content-Type": "application/json"})
+        try:
+            with urlrequest.urlopen(req, timeout=self.timeout) as res:
+                return json.loads(res.read())
+        except urlerror.HTTPError as e:
+            raise ServiceError(e.code, json.loads(e.read() or b"{}").get("error", str(e)))
+
+    def extract(self, path: str, **options) -> Dict:
+        return self.call("extract", path=path, **options)
+
+    def update(self, pptx: str, **options) -> Dict:
+        return self.call("update", pptx=pptx, **options)
+
+    def preview(self, pptx: str, **options) -> Dict:
+        return self.call("preview", pptx=pptx, **options)
+
+    def compare(self, before: str, after: str, **options) -> Dict:
+        return self.call("compare", before=before, after=after, **options)
+
+    def health(self) -> Dict:
+        return self.call("health")
+
+    def shutdown(self) -> Dict:
+        return self.call("shutdown")
+
+
+class LocalClient(ServiceClient):
+    """ServiceClient と同じ呼び出し方で、HTTP を介さずプロセス内のサービスを呼ぶ代替クライアント
+
+    応答は JSON を経由させ、HTTP 経由と同じ型（タプル → リストなど）で返す。
+    """
+
+    def __init__(self, service: Optional[InsightSlidesService] = None):
+        self.service = service or InsightSlidesService()
+
+    def call(self, op: str, **payload) -> Dict:
+        if op == "shutdown":
+            return {"status": "stopping"}
+        status, body = self.service.handle(op, json.loads(json.dumps(payload)))
+        body = json.loads(json.dumps(body, ensure_ascii=False))
+        if status != 200:
+            raise ServiceError(status, body.get("error", ""))
+        return body
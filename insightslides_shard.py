@@ -0,0 +1,262 @@
+# -*- coding: utf-8 -*-
+"""
+Insight Slides - 複数マシンでのフォルダ一括処理（GUI非依存）
+
+共有フォルダ上の作業フォルダ（既定: <フォルダ>/.insightslides_shard_<処理>_<形式>/）を介して、
+複数のプロセス・マシンが同じフォルダの一括抽出・一括更新を分担する。
+
+作業フォルダ:
+    locks/<id>.lock  処理中の印。O_CREAT|O_EXCL で作成できたノードだけがそのファイルを処理する。
+                     処理中は更新日時を定期的に更新し（リースの延長）、lease 秒以上更新されて
+                     いないロックは異常終了したノードのものとみなして別のノードが引き継ぐ
+    done/<id>.json   処理結果（入力ファイルの更新日時・サイズ付き。入力が変わっていれば再処理）
+    summary.json     全ノードの結果をまとめたサマリー（各ノードが終了時に書き直す）
+
+各ノードは全体を探索し、結果のないファイルのロックを取って処理する。
+他ノードが処理中のものは結果が揃うかリースが切れるまで待つため、どのノードも
+全ファイルの結果が揃った時点で終了し、同じサマリーを返す。
+作業フォルダを残しておけば、次回は変更されたファイルだけを処理する。
+
+リースの判定にロックファイルの更新日時を使うため、各マシンの時計はおおむね合っている前提。
+期限切れの判定と引き継ぎの間にリースが延長された場合は同じファイルを2回処理しうるが、
+出力は一時ファイルから置き換えるため結果は壊れない。
+"""
+import hashlib
+import json
+import os
+import socket
+import threading
+import time
+import uuid
+from datetime import datetime
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import insightslides_batch as batch
+import insightslides_core as core
+
+DEFAULT_LEASE = 120.0   # 秒。この間ロックが更新されなければ異常終了とみなす
+DEFAULT_POLL = 2.0      # 秒。他ノードの処理中ファイルを待つ間隔
+
+# ロックを取れなかった（他ノードが処理中・処理済み）ことを示す内部の状態
+STATUS_BUSY = "他ノードで処理中"
+
+
+def shard_dir_for(folder: str, operation: str, fmt: str) -> str:
+    return os.path.join(folder, f".insightslides_shard_{operation}_{fmt}")
+
+
+def node_name() -> str:
+    """ノード名（ホスト名:プロセスID）"""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+class WorkQueue:
+    """作業フォルダ上のロックと処理結果の読み書き"""
+
+    def __init__(self, shard_dir: str, lease: float = DEFAULT_LEASE):
+        self.dir = shard_dir
+        self.lease = lease
+        os.makedirs(os.path.join(shard_dir, "locks"), exist_ok=True)
+        os.makedirs(os.path.join(shard_dir, "done"), exist_ok=True)
+
+    @staticmethod
+    def _id(key: str) -> str:
+        return hashlib.blake2b(key.encode("utf-8"), digest_size=12).hexdigest()
+
+    def lock_path(self, key: str) -> str:
+        return os.path.join(self.dir, "locks", self._id(key) + ".lock")
+
+    def done_path(self, key: str) -> str:
+        return os.path.join(self.dir, "done", self._id(key) + ".json")
+
+    # === ロック ===
+    def _lock_age(self, path: str) -> Optional[float]:
+        try:
+            return time.time() - os.stat(path).st_mtime
+        except OSError:
+            return None
+
+    def is_locked(self, key: str) -> bool:
+        """他ノードが処理中か（期限切れのロックは含めない）"""
+        age = self._lock_age(self.lock_path(key))
+        return age is not None and age <= self.lease
+
+    def claim(self, key: str, node: str) -> bool:
+        """ロックを取る。期限切れのロックは引き継ぐ"""
+        path = self.lock_path(key)
+        for _ in range(2):
+            try:
+                fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            except FileExistsError:
+                age = self._lock_age(path)
+                if age is not None and age <= self.lease:
+                    return False
+                if age is not None:
+                    # 期限切れのロックを一意な名前に改名して取り除く（改名できるのは1ノードだけ）
+                    stale = f"{path}.{uuid.uuid4().hex}.stale"
+                    try:
+                        os.rename(path, stale)
+                        os.remove(stale)
+                    except OSError:
+                        return False
+                continue
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump({"node": node, "claimed_at": datetime.now().isoformat(timespec="seconds")}, f)
+            return True
+        return False
+
+    def owner(self, key: str) -> Optional[str]:
+        try:
+            with open(self.lock_path(key), "r", encoding="utf-8") as f:
+                return json.load(f).get("node")
+        except (OSError, ValueError):
+            return None
+
+    def renew(self, key: str, node: str):
+        """リースを延長（他ノードに引き継がれていたら何もしない）"""
+        if self.owner(key) == node:
+            try:
+                os.utime(self.lock_path(key))
+            except OSError:
+                pass
+
+    def release(self, key: str, node: str):
+        if self.owner(key) == node:
+            try:
+                os.remove(self.lock_path(key))
+            except OSError:
+                pass
+
+    # === 処理結果 ===
+    def finish(self, key: str, node: str, result: Dict):
+        """結果を書いてからロックを外す（結果のないまま外れることはない）"""
+        with core.atomic_output(self.done_path(key)) as tmp:
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump({"key": key, "node": node, "at": datetime.now().isoformat(timespec="seconds"),
+                           "result": result}, f, ensure_ascii=False, default=str)
+        self.release(key, node)
+
+    def done_record(self, key: str) -> Optional[Dict]:
+        try:
+            with open(self.done_path(key), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def is_done(self, key: str, inputs: List[str]) -> bool:
+        """結果があり、入力がその時から変わっていないか"""
+        record = self.done_record(key)
+        return bool(record) and record["result"].get("inputs") == batch.input_signature(inputs)
+
+
+def _run_claimed(task: Tuple) -> Dict:
+    """ワーカー: ロックを取れたら処理して結果を作業フォルダに書く（処理中はリースを延長し続ける）"""
+    worker, shard_dir, lease, node, key, inputs, inner = task
+    work = WorkQueue(shard_dir, lease)
+    if not work.claim(key, node):
+        return {"file": key, "path": inputs[0], "status": STATUS_BUSY}
+    if work.is_done(key, inputs):
+        # 一覧を作ってからロックを取るまでの間に他ノードが終えていた
+        work.release(key, node)
+        return {"file": key, "path": inputs[0], "status": STATUS_BUSY}
+
+    stop = threading.Event()
+
+    def heartbeat():
+        while not stop.wait(lease / 4):
+            work.renew(key, node)
+
+    threading.Thread(target=heartbeat, daemon=True).start()
+    try:
+        result = batch._run_tracked((worker, inputs, inner))
+    finally:
+        stop.set()
+    result["file"] = key
+    result["node"] = node
+    work.finish(key, node, result)
+    return result
+
+
+def run_distributed(items: Callable[[], Iterable[Tuple[str, List[str], Tuple]]],
+                    worker: Callable[[Tuple], Dict], shard_dir: str,
+                    jobs: Optional[int] = None, lease: float = DEFAULT_LEASE, poll: float = DEFAULT_POLL,
+                    node: Optional[str] = None,
+                    on_progress: Optional[Callable[[int, int, Dict], None]] = None,
+                    should_cancel: Optional[Callable[[], bool]] = None) -> Tuple[List[Dict], List[Dict]]:
+    """作業フォルダを共有する他ノードと分担して処理し、全ノード分の結果が揃うまで待つ
+
+    Args:
+        items: 呼ぶたびに (表示名, 入力ファイル, ワーカーへのタスク) を列挙する関数
+            （batch.extract_items / batch.update_items を部分適用したもの）
+        worker: batch._extract_file / batch._update_file
+        on_progress: このノードで1件処理するごとに (今回の巡回での完了数, 今回の巡回の対象数, 結果) で呼ばれる
+
+    Returns:
+        (全ノードの結果（ファイル名順）, このノードが処理した結果)
+    """
+    node = node or node_name()
+    work = WorkQueue(shard_dir, lease)
+    processed: List[Dict] = []
+    keys: List[str] = []
+
+    while not (should_cancel and should_cancel()):
+        keys, tasks, busy = [], [], 0
+        for key, inputs, task in items():
+            keys.append(key)
+            if work.is_done(key, inputs):
+                continue
+            if work.is_locked(key):
+                busy += 1
+                continue
+            tasks.append((worker, shard_dir, lease, node, key, inputs, task))
+        if not tasks and not busy:
+            break
+        if not tasks:
+            time.sleep(poll)  # 他ノードの完了か、異常終了したノードのリース切れを待つ
+            continue
+
+        def progress(done, total, result):
+            if result["status"] != STATUS_BUSY:
+                processed.append(result)
+                if on_progress:
+                    on_progress(done, total, result)
+
+        def failed(task, error):
+            # ワーカーごと落ちた（制限時間・メモリ上限の超過など）ファイルもエラーとして記録し、
+            # 他のノードが同じファイルで繰り返し落ちないようにする
+            inner_worker, _, _, _, key, inputs, inner = task
+            result = batch._failed_result(batch._run_tracked, (inner_worker, inputs, inner), error)
+            result["file"] = key
+            result["node"] = node
+            work.finish(key, node, result)
+            return result
+
+        batch._run_pool(_run_claimed, tasks, jobs, progress, should_cancel,
+                        cost=lambda task: batch.estimate_cost(task[5]),
+                        memory=lambda task: batch.estimate_memory(task[5]), on_error=failed)
+
+    results = merge_results(work, keys)
+    write_summary(work, results)
+    return results, processed
+
+
+def merge_results(work: WorkQueue, keys: List[str]) -> List[Dict]:
+    """作業フォルダから各ファイルの最新の結果を集める（結果のないファイルは含めない）"""
+    results = []
+    for key in keys:
+        record = work.done_record(key)
+        if record:
+            results.append(record["result"])
+    results.sort(key=lambda r: r["file"].lower())
+    return results
+
+
+def write_summary(work: WorkQueue, results: List[Dict]):
+    nodes: Dict[str, int] = {}
+    for res in results:
+        nodes[res.get("node", "")] = nodes.get(res.get("node", ""), 0) + 1
+    summary = {**batch.summarize_results(results), "nodes": nodes,
+               "at": datetime.now().isoformat(timespec="seconds")}
+    with core.atomic_output(os.path.join(work.dir, "summary.json")) as tmp:
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(summary, f, ensure_ascii=False, indent=2)
@@ -0,0 +1,178 @@
+# -*- coding: utf-8 -*-
+"""
+Insight Slides - 処理の段階ごとの時間計測（GUI非依存）
+
+core の各処理（ZIP の確認・python-pptx での読み込み・テキストの取り出しとクリーニング・
+Excel / JSON の書き出し・PPTX の保存・バックアップ・比較など）を span() で囲んでおき、
+計測が有効なときだけ、collect() で始めたスレッドの Timings に段階ごとの
+回数・合計・最大を積み上げる。
+
+無効なとき span() は共有の何もしないオブジェクトを返すだけなので、処理への影響はほぼない。
+set_tracer() で区間の開始・終了を insightslides_trace のタイムラインにも渡せる。
+一括処理ではワーカーがファイルごとの Timings を結果に載せて返し、
+呼び出し側の Timings にファイル別・合計として集まる。
+"""
+import functools
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Callable, Dict, Iterator, List, Optional
+
+_enabled = False
+_local = threading.local()
+_tracer: Optional[Callable[[str, float, float], None]] = None
+
+SUMMARY_TOP = 6   # ログの1行に出す段階の数（合計時間の大きい順）
+
+
+def set_enabled(on: bool):
+    global _enabled
+    _enabled = bool(on)
+
+
+def enabled() -> bool:
+    return _enabled
+
+
+def set_tracer(fn: Optional[Callable[[str, float, float], None]]) -> Optional[Callable[[str, float, float], None]]:
+    """すべてのスレッドの span() の区間を fn(名前, 開始, 終了) にも渡す（insightslides_trace 用）。元の tracer を返す"""
+    global _tracer
+    previous, _tracer = _tracer, fn
+    return previous
+
+
+class Timings:
+    """段階ごとの [回数, 合計秒, 最大秒] と、ファイル別の合計秒"""
+
+    def __init__(self):
+        self.spans: Dict[str, List[float]] = {}
+        self.files: Dict[str, Dict[str, float]] = {}
+        self.started = time.perf_counter()
+
+    def add(self, name: str, seconds: float, count: int = 1, longest: Optional[float] = None):
+        entry = self.spans.get(name)
+        longest = seconds if longest is None else longest
+        if entry is None:
+            self.spans[name] = [count, seconds, longest]
+        else:
+            entry[0] += count
+            entry[1] += seconds
+            if longest > entry[2]:
+                entry[2] = longest
+
+    def merge(self, spans: Optional[Dict[str, List[float]]], file: Optional[str] = None):
+        """別の Timings（ワーカーから返った as_dict()）を合算する。file を渡すとファイル別にも残す"""
+        if not spans:
+            return
+        for name, (count, total, longest) in spans.items():
+            self.add(name, total, count, longest)
+        if file is not None:
+            self.files[file] = {name: round(total, 6) for name, (_, total, _) in spans.items()}
+
+    def as_dict(self) -> Dict[str, List[float]]:
+        return {name: list(entry) for name, entry in self.spans.items()}
+
+    @property
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    def summary(self, top: int = SUMMARY_TOP) -> str:
+        """合計時間の大きい段階から「名前 合計s」を並べた1行"""
+        ranked = sorted(self.spans.items(), key=lambda kv: kv[1][1], reverse=True)[:top]
+        return " · ".join(f"{name} {entry[1]:.2f}s" for name, entry in ranked)
+
+    def report(self, **params) -> Dict:
+        """JSON レポート（params には処理の種類・対象などを入れる）"""
+        return {
+            "created": datetime.now().isoformat(timespec="seconds"),
+            **params,
+            "wall_s": round(self.elapsed, 6),
+            "spans": {name: {"count": int(count), "total_s": round(total, 6),
+                             "mean_s": round(total / count, 6) if count else 0.0, "max_s": round(longest, 6)}
+                      for name, (count, total, longest) in
+                      sorted(self.spans.items(), key=lambda kv: kv[1][1], reverse=True)},
+            "files": self.files,
+        }
+
+
+class _Span:
+    __slots__ = ("_timings", "_name", "_start")
+
+    def __init__(self, timings: Optional[Timings], name: str):
+        self._timings = timings
+        self._name = name
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        end = time.perf_counter()
+        if self._timings is not None:
+            self._timings.add(self._name, end - self._start)
+        tracer = _tracer
+        if tracer is not None:
+            tracer(self._name, self._start, end)
+        return False
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+def span(name: str):
+    """with span("open_pptx"): ... の区間を計測する（無効なとき・collect() の外では何もしない）"""
+    if not _enabled and _tracer is None:
+        return _NULL_SPAN
+    timings = getattr(_local, "timings", None) if _enabled else None
+    return _NULL_SPAN if timings is None and _tracer is None else _Span(timings, name)
+
+
+def timed(name: str) -> Callable:
+    """関数全体を span(name) で囲むデコレータ"""
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _enabled and _tracer is None:
+                return fn(*args, **kwargs)
+            with span(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def current() -> Optional[Timings]:
+    """このスレッドで計測中の Timings（計測していなければ None）"""
+    return getattr(_local, "timings", None) if _enabled else None
+
+
+@contextmanager
+def collect() -> Iterator[Timings]:
+    """このスレッドで新しい Timings に計測を始める（抜けると元の Timings に戻す）"""
+    previous = getattr(_local, "timings", None)
+    timings = Timings()
+    _local.timings = timings
+    try:
+        yield timings
+    finally:
+        _local.timings = previous
+
+
+def write_report(timings: Timings, path: str, **params) -> str:
+    """JSON レポートを書き出してパスを返す"""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(timings.report(**params), f, ensure_ascii=False, indent=2)
+    return path
@@ -0,0 +1,181 @@
+# -*- coding: utf-8 -*-
+"""
+Insight Slides - 処理のタイムラインを Chrome trace-event 形式で記録（GUI非依存）
+
+並列の一括処理で、遅いファイル（ストラグラー）や手の空いたワーカーを目で見るためのもの。
+record() の間、ファイルごと・段階ごと（timing.span() の区間）の開始と終了を
+スレッド・ワーカープロセスをまたいで集め、chrome://tracing や Perfetto で開ける JSON に書き出す。
+
+ワーカープロセスの時刻は time.perf_counter() で測る。Windows の QueryPerformanceCounter も
+Linux の CLOCK_MONOTONIC もマシン全体で共通なので、そのまま親プロセスの時間軸に載る。
+共通でない環境に備え、各ワーカーは perf_counter と time.time() の組を返し、
+親の組との差が壁時計の分解能（CLOCK_TOLERANCE）を超えるときはその差で補正する。
+さらに、ファイルの終了が親で結果を受け取った時刻より後になる分は前にずらす。
+
+record() していなければ timing.span() は従来どおりで、記録の処理は一切動かない。
+"""
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+import insightslides_timing as timing
+
+CLOCK_TOLERANCE = 0.05   # perf_counter を共通とみなす、壁時計との差の上限（秒）
+
+CAT_RUN = "run"
+CAT_FILE = "file"
+CAT_PHASE = "phase"
+
+_current: Optional["TraceRecorder"] = None
+_lock = threading.Lock()
+
+
+def current() -> Optional["TraceRecorder"]:
+    """記録中の TraceRecorder（記録していなければ None）"""
+    return _current
+
+
+def _clock_pair() -> Tuple[float, float]:
+    return time.perf_counter(), time.time()
+
+
+class TraceRecorder:
+    """このプロセスのスレッドとワーカーから返ったイベントを親の時間軸で集める"""
+
+    def __init__(self, name: str, params: Optional[Dict[str, Any]] = None):
+        self.name = name
+        self.params = dict(params or {})
+        self.pid = os.getpid()
+        self.origin_perf, self.origin_wall = _clock_pair()
+        self.events: List[Dict] = []
+        self._threads: Dict[int, str] = {}
+        self._workers: Dict[int, Dict[str, float]] = {}   # pid → {offset_us, shifted_us}
+        self._lock = threading.Lock()
+        self.write_error: Optional[OSError] = None   # 書き出しに失敗したとき（処理自体の結果は変えない）
+
+    def _us(self, perf: float) -> float:
+        return round((perf - self.origin_perf) * 1e6, 1)
+
+    def add(self, name: str, cat: str, start: float, end: float, args: Optional[Dict] = None):
+        """このプロセスのイベント（perf_counter の開始・終了）"""
+        thread = threading.current_thread()
+        tid = threading.get_native_id()
+        event = {"name": name, "cat": cat, "ph": "X", "ts": self._us(start),
+                 "dur": round((end - start) * 1e6, 1), "pid": self.pid, "tid": tid}
+        if args:
+            event["args"] = args
+        with self._lock:
+            self._threads.setdefault(tid, thread.name)
+            self.events.append(event)
+
+    def add_worker(self, file: str, data: Optional[Dict], args: Optional[Dict] = None):
+        """trace_call の結果（ワーカー1件分）を親の時間軸に直して加える"""
+        if not data:
+            return
+        received = time.perf_counter()
+        # perf_counter が共通なら補正なし。そうでなければ壁時計で合わせる
+        delta = (data["wall"] - data["perf"]) - (self.origin_wall - self.origin_perf)
+        offset = delta if abs(delta) > CLOCK_TOLERANCE else 0.0
+        events = data["events"]
+        last_end = max(end for _, _, _, end in events) + offset
+        shift = max(0.0, last_end - received)  # 受け取る前に終わっているはず
+        pid, tid = data["pid"], data["tid"]
+        converted = []
+        for name, cat, start, end in events:
+            event = {"name": name or file, "cat": cat, "ph": "X", "ts": self._us(start + offset - shift),
+                     "dur": round((end - start) * 1e6, 1), "pid": pid, "tid": tid}
+            if cat == CAT_FILE and args:
+                event["args"] = args
+            converted.append(event)
+        with self._lock:
+            self.events.extend(converted)
+            if pid == self.pid:
+                self._threads.setdefault(tid, threading.current_thread().name)
+                return
+            stats = self._workers.setdefault(pid, {"offset_us": 0.0, "shifted_us": 0.0})
+            stats["offset_us"] = round(offset * 1e6, 1)
+            stats["shifted_us"] = max(stats["shifted_us"], round(shift * 1e6, 1))
+
+    def as_dict(self, elapsed: Optional[float] = None) -> Dict:
+        """Chrome trace-event 形式（JSON Object Format）"""
+        with self._lock:
+            self._threads.setdefault(threading.get_native_id(), threading.current_thread().name)
+            events = sorted(self.events, key=lambda e: (e["ts"], -e["dur"]))
+            threads = dict(self._threads)
+            workers = {pid: dict(stats) for pid, stats in self._workers.items()}
+        meta = [{"name": "process_name", "ph": "M", "pid": self.pid, "tid": 0, "args": {"name": "InsightSlides"}},
+                {"name": "process_sort_index", "ph": "M", "pid": self.pid, "tid": 0, "args": {"sort_index": 0}}]
+        meta += [{"name": "thread_name", "ph": "M", "pid": self.pid, "tid": tid, "args": {"name": name}}
+                 for tid, name in threads.items()]
+        for index, pid in enumerate(sorted(workers), 1):
+            meta.append({"name": "process_name", "ph": "M", "pid": pid, "tid": 0, "args": {"name": f"worker {pid}"}})
+            meta.append({"name": "process_sort_index", "ph": "M", "pid": pid, "tid": 0, "args": {"sort_index": index}})
+        if elapsed is not None:
+            events.insert(0, {"name": self.name, "cat": CAT_RUN, "ph": "X", "ts": 0.0,
+                              "dur": round(elapsed * 1e6, 1), "pid": self.pid,
+                              "tid": threading.get_native_id(), "args": self.params})
+        return {"traceEvents": meta + events, "displayTimeUnit": "ms",
+                "otherData": {"name": self.name, "params": self.params,
+                              "started": datetime.fromtimestamp(self.origin_wall).isoformat(timespec="milliseconds"),
+                              "clock": {"tolerance_s": CLOCK_TOLERANCE,
+                                        "workers": {str(pid): stats for pid, stats in workers.items()}}}}
+
+    def write(self, path: str, elapsed: Optional[float] = None) -> str:
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.as_dict(elapsed), f, ensure_ascii=False, default=str)
+        return path
+
+
+@contextmanager
+def record(name: str, path: Optional[str], params: Optional[Dict[str, Any]] = None) -> Iterator[Optional[TraceRecorder]]:
+    """path を指定したときだけ、このブロックのタイムラインを記録して path に書き出す（None なら何もしない）"""
+    global _current
+    with _lock:
+        start = bool(path) and _current is None
+        if start:
+            _current = TraceRecorder(name, params)
+    if not start:
+        yield None
+        return
+    recorder = _current
+    previous = timing.set_tracer(lambda span, begin, end: recorder.add(span, CAT_PHASE, begin, end))
+    started = time.perf_counter()
+    try:
+        yield recorder
+    finally:
+        timing.set_tracer(previous)
+        with _lock:
+            _current = None
+        try:
+            recorder.write(path, time.perf_counter() - started)
+        except OSError as e:
+            recorder.write_error = e
+
+
+# ============== ワーカー側 ==============
+def trace_call(fn: Callable[[Any], Any], arg: Any) -> Tuple[Any, Dict]:
+    """fn(arg) のファイル全体と段階ごとの区間を記録し、(戻り値, イベント) を返す
+
+    イベントは {pid, tid, perf, wall, events: [(名前, 分類, 開始, 終了)]}。ファイルの区間の名前は None
+    （親が結果のファイル名を付ける）。同じプロセスで記録中（jobs=1）なら段階ごとの区間は
+    timing から記録に直接入るため、ファイルの区間だけを返す。
+    """
+    events: List[Tuple[Optional[str], str, float, float]] = []
+    in_process = _current is not None
+    if not in_process:
+        previous = timing.set_tracer(lambda span, begin, end: events.append((span, CAT_PHASE, begin, end)))
+    start = time.perf_counter()
+    try:
+        value = fn(arg)
+    finally:
+        events.append((None, CAT_FILE, start, time.perf_counter()))
+        if not in_process:
+            timing.set_tracer(previous)
+    perf, wall = _clock_pair()
+    return value, {"pid": os.getpid(), "tid": threading.get_native_id(), "perf": perf, "wall": wall,
+                   "events": events}
@@ -0,0 +1,151 @@
+# -*- coding: utf-8 -*-
+"""
+Insight Slides - フォルダ監視による自動抽出（GUI非依存）
+
+フォルダ（サブフォルダを含む）をポーリングで監視し、追加・更新された PPTX を
+<名前>_抽出.<拡張子> として自動で抽出する。
+
+- 更新日時かサイズが変わったファイルは、debounce 秒間変化が止まるまで待ってから処理する
+  （保存中・コピー中の連続した書き込みは1回の抽出にまとまる）
+- 内容ハッシュが前回の抽出時と同じなら抽出しない（上書きコピーや更新日時だけの変更）
+- ~$ で始まるロックファイルと backup/ フォルダは対象外
+- 出力は一時ファイルに書いてから置き換える（core.atomic_output）
+
+OS 固有の通知 API に依存しないよう、os.scandir によるポーリングで実装している。
+"""
+import os
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+import insightslides_batch as batch
+import insightslides_core as core
+import insightslides_metrics as metrics
+
+# イベント種別
+EVENT_EXTRACTED = "extracted"
+EVENT_UNCHANGED = "unchanged"
+EVENT_SKIPPED = "skipped"
+EVENT_ERROR = "error"
+EVENT_REMOVED = "removed"
+
+
+def scan_pptx_tree(folder: str) -> Dict[str, Tuple[int, int]]:
+    """フォルダ以下の PPTX を列挙し {パス: (更新日時ns, サイズ)} を返す"""
+    return {path: (mtime_ns, size) for path, _, mtime_ns, size in batch.walk_files(folder)}
+
+
+class FolderWatcher:
+    """ポーリングでフォルダを監視し、変化が落ち着いた PPTX を抽出する
+
+    Args:
+        interval: ポーリング間隔（秒）
+        debounce: 最後の変化からこの秒数だけ変化がなければ処理する
+        jobs: 同時に処理できるファイルが複数あるときのワーカープロセス数
+        on_event: 1ファイル処理するごとに {event, file, ...} で呼ばれる
+    """
+
+    def __init__(self, folder: str, fmt: str = "excel", include_notes: bool = False,
+                 notes_label: str = "ノート", headers: Optional[List[str]] = None,
+                 interval: float = 1.0, debounce: float = 2.0, jobs: Optional[int] = None,
+                 on_event: Optional[Callable[[Dict], None]] = None):
+        self.folder = folder
+        self.fmt = fmt
+        self.include_notes = include_notes
+        self.notes_label = notes_label
+        self.headers = headers
+        self.interval = interval
+        self.debounce = debounce
+        self.jobs = jobs
+        self.on_event = on_event
+
+        self._seen: Dict[str, Tuple[int, int]] = {}   # 直近に観測した (更新日時ns, サイズ)
+        self._pending: Dict[str, float] = {}          # 処理待ち: 最後に変化を観測した時刻
+        self._digests: Dict[str, str] = {}            # 最後に抽出（または確認）した内容ハッシュ
+        self.stats = {"scans": 0, "extracted": 0, "unchanged": 0, "errors": 0}
+
+    def _emit(self, event: str, path: str, **info) -> Dict:
+        record = {"event": event, "file": path, **info}
+        exporter = metrics.current()
+        if exporter is not None and event != EVENT_REMOVED:
+            # 内容ハッシュが前回と同じで抽出を省けたものをキャッシュのヒットとして数える
+            exporter.record_cache("watch", hit=event == EVENT_UNCHANGED)
+        if self.on_event:
+            self.on_event(record)
+        return record
+
+    def prime(self, now: Optional[float] = None):
+        """初回スキャン: 抽出ファイルが PPTX より新しいものは抽出済みとみなし、それ以外を処理待ちにする"""
+        now = time.monotonic() if now is None else now
+        self._seen = scan_pptx_tree(self.folder)
+        for path, (mtime_ns, _) in self._seen.items():
+            out = core.extract_output_path(path, self.fmt)
+            try:
+                if os.stat(out).st_mtime_ns >= mtime_ns:
+                    self._digests[path] = core.file_digest(path)
+                    continue
+            except OSError:
+                pass
+            self._pending[path] = now
+
+    def poll(self, now: Optional[float] = None, force: bool = False) -> List[Dict]:
+        """1回分のスキャンと処理を行い、発生したイベントを返す
+
+        Args:
+            force: True なら debounce を待たずに処理待ちをすべて処理する
+        """
+        now = time.monotonic() if now is None else now
+        self.stats["scans"] += 1
+        current = scan_pptx_tree(self.folder)
+        events = []
+
+        for path, sig in current.items():
+            if self._seen.get(path) != sig:
+                self._pending[path] = now
+        for path in set(self._seen) - set(current):
+            self._pending.pop(path, None)
+            self._digests.pop(path, None)
+            events.append(self._emit(EVENT_REMOVED, path))
+        self._seen = current
+
+        ready = [p for p, t in self._pending.items() if force or now - t >= self.debounce]
+        to_extract = {}
+        for path in sorted(ready):
+            del self._pending[path]
+            try:
+                digest = core.file_digest(path)
+            except OSError:
+                # 書き込み中でロックされている等。次の変化（またはこのまま）で再試行
+                self._pending[path] = now
+                continue
+            if self._digests.get(path) == digest:
+                self.stats["unchanged"] += 1
+                events.append(self._emit(EVENT_UNCHANGED, path))
+            else:
+                to_extract[path] = digest
+
+        if to_extract:
+            results = batch.extract_files(list(to_extract), self.fmt, self.include_notes,
+                                          notes_label=self.notes_label, headers=self.headers, jobs=self.jobs)
+            for res in results:
+                path = res["path"]
+                if res["status"] == batch.RESULT_ERROR:
+                    self.stats["errors"] += 1
+                    events.append(self._emit(EVENT_ERROR, path, error=res["error"]))
+                    continue
+                self._digests[path] = to_extract[path]
+                if res["status"] == batch.RESULT_SKIPPED:
+                    events.append(self._emit(EVENT_SKIPPED, path, items=0))
+                else:
+                    self.stats["extracted"] += 1
+                    events.append(self._emit(EVENT_EXTRACTED, path, output=res["output"], items=res["items"]))
+        return events
+
+    def run(self, should_stop: Callable[[], bool]):
+        """should_stop が True を返すまで監視を続ける"""
+        self.prime()
+        while not should_stop():
+            started = time.monotonic()
+            self.poll(started)
+            # 停止要求に素早く応じるため短い間隔で確認しながら待つ
+            while not should_stop() and time.monotonic() - started < self.interval:
+                time.sleep(min(0.1, self.interval))
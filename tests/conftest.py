@@ -0,0 +1,29 @@
+# -*- coding: utf-8 -*-
+"""テスト共通: リポジトリ直下のモジュールを import できるようにし、小さなデッキを作る"""
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+
+def make_deck(path: str, texts) -> str:
+    """texts[i] を本文に持つスライドを並べたデッキを保存（タイトルは "スライド<i+1>"）"""
+    from pptx import Presentation
+
+    prs = Presentation()
+    for i, text in enumerate(texts):
+        slide = prs.slides.add_slide(prs.slide_layouts[1])
+        slide.shapes.title.text = f"スライド{i + 1}"
+        slide.placeholders[1].text = text
+    prs.save(path)
+    return path
+
+
+@pytest.fixture
+def deck(tmp_path):
+    """2枚のスライドを持つデッキのパス"""
+    return make_deck(str(tmp_path / "deck.pptx"), ["売上は前年比で増加", "新規顧客の獲得"])
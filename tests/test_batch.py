@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+"""フォルダ一括処理とマニフェスト（insightslides_batch）のテスト"""
+import os
+
+from conftest import make_deck
+
+import insightslides_batch as batch
+import insightslides_progress as progress
+
+
+def _corpus(folder, count=3):
+    os.makedirs(folder, exist_ok=True)
+    return [make_deck(os.path.join(folder, f"deck_{i}.pptx"), [f"本文{i}"]) for i in range(count)]
+
+
+def _interrupted(folder, after=1):
+    """after 件終えたところで取り消した一括抽出（途中までのマニフェストが残る）"""
+    done = []
+    batch.extract_folder(folder, "json", jobs=1, on_progress=lambda *args: done.append(args),
+                         should_cancel=lambda: len(done) >= after)
+    return done
+
+
+def test_resume_reports_skipped_files_to_progress(tmp_path):
+    folder = str(tmp_path / "decks")
+    _corpus(folder)
+    assert len(_interrupted(folder)) == 1
+
+    tracker = progress.ProgressTracker(progress.scan_extract(folder), interval=3600)
+    calls, snapshots = [], []
+
+    def on_progress(done, total, result):
+        calls.append((done, total, result["status"]))
+        snapshots.append(tracker.advance(result["path"]))
+
+    results = batch.extract_folder(folder, "json", jobs=1, on_progress=on_progress, mode=batch.RUN_RESUME)
+    assert sorted(r["status"] for r in results) == sorted([batch.RESULT_CACHED, batch.RESULT_OK, batch.RESULT_OK])
+    assert [done for done, _, _ in calls] == [1, 2, 3]
+    assert calls[-1][1] == 3
+    assert sum(1 for _, _, status in calls if status == batch.RESULT_CACHED) == 1
+    assert tracker.files_done == tracker.files_total == 3
+    assert snapshots[-1] is not None and snapshots[-1]["fraction"] == 1.0
+    assert snapshots[-1]["eta_s"] == 0.0
+
+
+def _manifest(folder):
+    return batch.BatchManifest(batch.manifest_path(folder, "extract", "json"), {"format": "json", "include_notes": False})
+
+
+def _statuses(results):
+    return {r["file"]: r["status"] for r in results}
+
+
+def test_resume_skips_finished_files(tmp_path):
+    folder = str(tmp_path / "decks")
+    _corpus(folder)
+    _interrupted(folder)
+    assert len(_manifest(folder).entries) == 1
+
+    results = batch.extract_folder(folder, "json", jobs=1, mode=batch.RUN_RESUME)
+    assert sorted(_statuses(results).values()) == sorted([batch.RESULT_CACHED, batch.RESULT_OK, batch.RESULT_OK])
+    assert sorted(_manifest(folder).entries) == [f"deck_{i}.pptx" for i in range(3)]
+    again = batch.extract_folder(folder, "json", jobs=1, mode=batch.RUN_RESUME)
+    assert set(_statuses(again).values()) == {batch.RESULT_CACHED}
+
+
+def test_changed_mode_reruns_only_modified_files(tmp_path):
+    folder = str(tmp_path / "decks")
+    decks = _corpus(folder)
+    batch.extract_folder(folder, "json", jobs=1)
+    make_deck(decks[1], ["差し替えた本文"])
+
+    results = batch.extract_folder(folder, "json", jobs=1, mode=batch.RUN_CHANGED)
+    assert _statuses(results) == {"deck_0.pptx": batch.RESULT_CACHED, "deck_1.pptx": batch.RESULT_OK,
+                                  "deck_2.pptx": batch.RESULT_CACHED}
+    touched = batch.extract_folder(folder, "json", jobs=1, mode=batch.RUN_CHANGED)
+    assert set(_statuses(touched).values()) == {batch.RESULT_CACHED}
+
+
+def test_cancelled_walk_keeps_records_of_unseen_files(tmp_path):
+    folder = str(tmp_path / "decks")
+    decks = _corpus(folder)
+    batch.extract_folder(folder, "json", jobs=1)
+    os.remove(decks[2])
+
+    batch.extract_folder(folder, "json", jobs=1, mode=batch.RUN_RESUME, should_cancel=lambda: True)
+    assert sorted(_manifest(folder).entries) == [f"deck_{i}.pptx" for i in range(3)]
+
+    batch.extract_folder(folder, "json", jobs=1, mode=batch.RUN_RESUME)   # 最後まで探索すると削除分を消す
+    assert sorted(_manifest(folder).entries) == ["deck_0.pptx", "deck_1.pptx"]
@@ -0,0 +1,158 @@
+# -*- coding: utf-8 -*-
+"""比較・移動検出・正規化（insightslides_core）のテスト"""
+import re
+
+import pytest
+
+import insightslides_core as core
+
+
+def _rows(*items):
+    return [{"slide": slide, "id": sid, "type": "本文", "text": text} for slide, sid, text in items]
+
+
+EDITED_BEFORE = "第四半期の売上は前年比で大きく増加した"
+EDITED_AFTER = "第四半期の売上は前年比で大きく増加しました"
+
+
+# ============== 移動検出 ==============
+def test_exact_move_and_light_edit_get_different_statuses():
+    before = _rows((1, "a", "新規顧客の獲得が好調"), (1, "b", EDITED_BEFORE), (1, "c", "変わらない行"))
+    after = _rows((2, "x", "新規顧客の獲得が好調"), (2, "y", EDITED_AFTER), (1, "c", "変わらない行"))
+    rows, stats = core.compare_texts(before, after, detect_moves=True)
+    by_id = {row["id"]: row for row in rows}
+
+    moved = by_id["x"]
+    assert moved["status"] == core.STATUS_MOVED
+    assert (moved["from_slide"], moved["from_id"], moved["score"]) == (1, "a", 1.0)
+
+    edited = by_id["y"]
+    assert edited["status"] == core.STATUS_CHANGED
+    assert (edited["before"], edited["after"]) == (EDITED_BEFORE, EDITED_AFTER)
+    assert core.MOVE_SIMILARITY_THRESHOLD <= edited["score"] < 1.0
+
+    assert by_id["c"]["status"] == core.STATUS_SAME
+    assert set(by_id) == {"x", "y", "c"}  # 対応付いた移動元の行は移動先の行にまとまる
+
+
+def test_equal_shingle_sets_are_not_reported_as_moves():
+    # 文字 shingle の集合が同じでも全文が違えば「変更」（類似度は 1.0 でも移動ではない）
+    rows, stats = core.compare_texts(_rows((1, "a", "abab")), _rows((2, "x", "ababab")), detect_moves=True)
+    assert [(row["status"], row["score"]) for row in rows] == [(core.STATUS_CHANGED, 1.0)]
+    assert stats["moved"] == 0 and stats["changed"] == 1
+
+
+def test_similarity_threshold():
+    rows, stats = core.compare_texts(_rows((1, "a", EDITED_BEFORE)), _rows((2, "x", EDITED_AFTER)))
+    strict = core.detect_moved_text([dict(row) for row in rows], dict(stats), threshold=0.99)
+    assert sorted(row["status"] for row in strict) == sorted([core.STATUS_ADDED, core.STATUS_REMOVED])
+
+    paired = core.detect_moved_text([dict(row) for row in rows], dict(stats), threshold=0.5)
+    assert [row["status"] for row in paired] == [core.STATUS_CHANGED]
+
+    unrelated = core.compare_texts(_rows((1, "a", "売上の分析資料")), _rows((2, "x", "revenue growth plan")),
+                                   detect_moves=True)[0]
+    assert sorted(row["status"] for row in unrelated) == sorted([core.STATUS_ADDED, core.STATUS_REMOVED])
+
+
+def test_stats_after_pairing():
+    before = _rows((1, "a", "移動するテキスト"), (1, "b", EDITED_BEFORE), (1, "c", "消えるテキスト"))
+    after = _rows((3, "x", "移動するテキスト"), (3, "y", EDITED_AFTER), (3, "z", "revenue growth plan"))
+    rows, stats = core.compare_texts(before, after, detect_moves=True)
+    assert stats == {"same": 0, "changed": 1, "added": 1, "removed": 1, "moved": 1}
+    counted = {"same": core.STATUS_SAME, "changed": core.STATUS_CHANGED, "added": core.STATUS_ADDED,
+               "removed": core.STATUS_REMOVED, "moved": core.STATUS_MOVED}
+    assert {name: sum(row["status"] == status for row in rows) for name, status in counted.items()} == stats
+
+
+def test_precomputed_digests_give_the_same_result():
+    before = _rows((1, "a", "移動するテキスト"), (1, "b", EDITED_BEFORE))
+    after = _rows((2, "x", "移動するテキスト"), (2, "y", EDITED_AFTER))
+    expected = core.compare_texts(before, after, detect_moves=True)
+    rows, stats = core.compare_texts(before, after)
+    assert (core.detect_moved_text(rows, stats), stats) == expected
+
+
+# ============== 正規化プロファイル ==============
+def _legacy_normalize(text):
+    """プロファイル導入前の InsightSlidesApp._normalize_for_compare"""
+    if text is None:
+        return ""
+    text = text.replace('\r\n', '\n').replace('\r', '\n').replace('\v', '\n')
+    text = text.replace('\u00A0', ' ').replace('\u3000', ' ')
+    return text.strip()
+
+
+NORMALIZE_SAMPLES = [
+    None, "", "  ", "売上", "  前後に空白  ", "行1\r\n行2", "行1\r行2", "行1\v行2", "改行\r\n\r\n連続",
+    "NBSP\u00A0区切り", "全角\u3000空白", "\u3000全角で囲む\u3000", "\u00A0", "タブ\tあり", "ＡＢＣ ａｂｃ", "MiXeD Case",
+    "\r\n前後の改行\r\n",
+]
+
+
+def test_standard_profile_matches_legacy_normalization():
+    profile = core.get_profile(core.DEFAULT_PROFILE)
+    for text in NORMALIZE_SAMPLES:
+        assert profile.normalize(text) == _legacy_normalize(text), repr(text)
+        assert core.normalize_for_compare(text) == _legacy_normalize(text), repr(text)
+    for a in NORMALIZE_SAMPLES:
+        for b in NORMALIZE_SAMPLES:
+            assert core.texts_are_equal(a, b) == (_legacy_normalize(a) == _legacy_normalize(b)), (a, b)
+
+
+def test_ignore_whitespace_digests_match_across_whitespace_edits():
+    profile = core.get_profile("whitespace")
+    variants = ["売上 前年比 増加", "売上前年比増加", "売上\n前年比\r\n増加", "売上\u3000前年比\t増加", " 売上\v前年比\u00A0増加 "]
+    assert len({profile.digest(text) for text in variants}) == 1
+    assert profile.digest("売上前年比増加") != profile.digest("売上前年比減少")
+    # standard では空白の違いは差分のまま
+    standard = core.get_profile(core.DEFAULT_PROFILE)
+    assert len({standard.digest(text) for text in variants}) > 1
+
+
+def test_compare_profile_option():
+    before, after = _rows((1, "a", "売上 増加")), _rows((1, "a", "売上\n増加"))
+    assert core.compare_texts(before, after)[1]["changed"] == 1
+    assert core.compare_texts(before, after, profile="whitespace")[1]["same"] == 1
+    assert core.compare_texts(_rows((1, "a", "ＡＢＣ")), _rows((1, "a", "abc")),
+                              profile="width+case")[1]["same"] == 1
+
+
+def test_profile_spec_validation():
+    assert core.get_profile("case+whitespace").spec == "whitespace+case"
+    assert core.get_profile("whitespace") is core.get_profile("whitespace")
+    for spec in ("unknown", "exact+case"):
+        with pytest.raises(ValueError):
+            core.get_profile(spec)
+
+
+# ============== テキストクリーニング ==============
+def _legacy_clean(text):
+    """バッチ化する前の InsightSlidesApp.clean_text"""
+    if text is None:
+        return ""
+    text = re.sub(r'[\x00-\x08\x0B-\x0C\x0E-\x1F]', '', text)
+    return text.replace('\r\n', '\n').replace('\r', '\n').replace('\v', '\n')
+
+
+CLEAN_SAMPLES = [
+    "", None, "plain ascii", "売上\x00前年比\x08増加", "soft\vline\vbreak", "縦タブ\v改行", "tab\tkept",
+    "crlf\r\nline\rcr", "\x0c\x1f\x1e制御文字のみ\x01", "\x00", "\r\n", "DEL\x7fは残す", "絵文字\U0001F389と\u3000区切り",
+    "区切り\uFFFF文字", "", "  ", "末尾の改行\n",
+]
+
+
+def test_clean_texts_matches_clean_text():
+    assert core.clean_texts(CLEAN_SAMPLES) == [core.clean_text(text) for text in CLEAN_SAMPLES]
+    assert [core.clean_text(text) for text in CLEAN_SAMPLES] == [_legacy_clean(text) for text in CLEAN_SAMPLES]
+
+
+def test_clean_texts_edge_batches():
+    assert core.clean_texts([]) == []
+    assert core.clean_texts([None]) == [""]
+    assert core.clean_texts(["", ""]) == ["", ""]
+    ascii_only = ["a\x0bb", "c\r\nd", "", "e\x7ff"]   # DEL を含む ASCII のみのバッチ
+    assert core.clean_texts(ascii_only) == [core.clean_text(text) for text in ascii_only]
+    for i in range(len(CLEAN_SAMPLES)):
+        batch = CLEAN_SAMPLES[i:] + CLEAN_SAMPLES[:i]
+        assert core.clean_texts(batch) == [core.clean_text(text) for text in batch]
@@ -0,0 +1,26 @@
+# -*- coding: utf-8 -*-
+"""一括処理のメトリクス出力（insightslides_metrics）のテスト"""
+import json
+import os
+
+from conftest import make_deck
+
+import insightslides_batch as batch
+import insightslides_metrics as metrics
+
+
+def test_files_in_subfolders_are_recorded_by_relative_path(tmp_path):
+    folder = tmp_path / "decks"
+    for sub in ("a", "b"):
+        os.makedirs(folder / sub)
+        make_deck(str(folder / sub / "deck.pptx"), [f"本文{sub}"])
+
+    out = tmp_path / "metrics"
+    with metrics.export(str(out), "batch_extract"):
+        results = batch.extract_folder(str(folder), "json", jobs=1, recursive=True)
+    assert sorted(r["file"] for r in results) == [os.path.join("a", "deck.pptx"), os.path.join("b", "deck.pptx")]
+
+    with open(out / metrics.EVENTS_FILE, encoding="utf-8") as f:
+        events = [json.loads(line) for line in f]
+    files = sorted(e["file"] for e in events if e["event"] == "file")
+    assert files == [os.path.join("a", "deck.pptx"), os.path.join("b", "deck.pptx")]
@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+"""一括処理の隔離（制限時間・メモリ上限・ZIP 爆弾）で問題のファイルだけが失敗するテスト"""
+import os
+import time
+import zipfile
+
+import pytest
+
+from conftest import make_deck
+
+import insightslides_batch as batch
+import insightslides_core as core
+
+HOG_BYTES = 512 * 1024 * 1024
+
+
+def _hostile_extract(task):
+    """ワーカー: slow / hog という名前のファイルだけ制限を超え、それ以外は普通に抽出する"""
+    name = os.path.basename(task[0])
+    if name.startswith("slow"):
+        time.sleep(60)
+    elif name.startswith("hog"):
+        hog = b"x" * HOG_BYTES   # 実際に書き込んだページだけが RSS に数えられる
+        time.sleep(60)
+        return {"file": task[0], "status": batch.RESULT_OK, "bytes": len(hog)}
+    return batch._extract_file(task)
+
+
+@pytest.fixture
+def limits():
+    yield batch.set_task_limits
+    batch.set_task_limits()
+
+
+def _corpus(folder, names):
+    os.makedirs(folder, exist_ok=True)
+    return [make_deck(os.path.join(folder, name), [f"本文{i}"]) for i, name in enumerate(names)]
+
+
+def _run(paths):
+    tasks = [(path, "json", False, "ノート", None) for path in paths]
+    results = batch._run_pool(_hostile_extract, tasks, 2, None, None)
+    return {os.path.basename(r["file"]): r for r in results}
+
+
+def _assert_only_failed(results, bad, error_type):
+    assert results[bad]["status"] == batch.RESULT_ERROR
+    assert results[bad]["error_type"] == error_type
+    for name, result in results.items():
+        if name != bad:
+            assert result["status"] == batch.RESULT_OK, result
+            assert os.path.exists(result["output"])
+
+
+def test_task_over_time_limit_is_killed(tmp_path, limits):
+    limits(timeout=2)
+    paths = _corpus(str(tmp_path), ["deck_0.pptx", "slow.pptx", "deck_1.pptx", "deck_2.pptx"])
+    started = time.monotonic()
+    results = _run(paths)
+    assert time.monotonic() - started < 30
+    _assert_only_failed(results, "slow.pptx", "TaskTimeoutError")
+    assert batch.last_pool_stats()["timeouts"] == 1
+
+
+def test_worker_over_memory_limit_is_killed(tmp_path, limits):
+    limits(max_rss_mb=HOG_BYTES // 1024 // 1024 // 2)
+    paths = _corpus(str(tmp_path), ["deck_0.pptx", "hog.pptx", "deck_1.pptx", "deck_2.pptx"])
+    results = _run(paths)
+    _assert_only_failed(results, "hog.pptx", "TaskMemoryError")
+    stats = batch.last_pool_stats()
+    assert stats["killed_rss"] == 1 and stats["timeouts"] == 0
+
+
+def test_zip_bomb_is_rejected_without_stopping_the_batch(tmp_path):
+    folder = str(tmp_path)
+    bomb = _corpus(folder, ["bomb.pptx", "deck_0.pptx", "deck_1.pptx"])[0]
+    size = core._RATIO_CHECK_BYTES * 2          # ゼロ埋めなので圧縮率は上限を大きく超える
+    with zipfile.ZipFile(bomb, "a", compression=zipfile.ZIP_DEFLATED) as zf:
+        with zf.open("ppt/media/bomb.bin", "w", force_zip64=True) as f:
+            chunk = bytes(1024 * 1024)
+            for _ in range(size // len(chunk)):
+                f.write(chunk)
+    with pytest.raises(core.PackageTooLargeError):
+        core.check_package(bomb)
+
+    results = {r["file"]: r for r in batch.extract_folder(folder, "json", jobs=2)}
+    _assert_only_failed(results, "bomb.pptx", "PackageTooLargeError")
@@ -0,0 +1,164 @@
+# -*- coding: utf-8 -*-
+"""常駐サービス（InsightSlidesService）を LocalClient / HTTP 経由で呼ぶテスト"""
+import http.client
+import json
+import threading
+
+import pytest
+
+from conftest import make_deck
+
+import insightslides_core as core
+from insightslides_service import (InsightSlidesService, LocalClient, LRUCache, ServiceClient, ServiceError,
+                                  create_server)
+
+
+class _License:
+    """機能制限のないライセンス（保存済みライセンスを読まないための代替）"""
+
+    def __init__(self, compare: bool = True):
+        self.compare = compare
+
+    def is_pro(self):
+        return True
+
+    def can_json(self):
+        return True
+
+    def can_compare(self):
+        return self.compare
+
+    def get_update_limit(self):
+        return None
+
+
+@pytest.fixture
+def client():
+    return LocalClient(InsightSlidesService(LRUCache(), license_manager=_License()))
+
+
+def _texts(result):
+    return [item["text"] for item in result["items"]]
+
+
+def test_extract_uses_cache_until_file_changes(client, deck):
+    first = client.extract(deck)
+    assert first["slides"] == 2
+    assert "売上は前年比で増加" in _texts(first)
+    assert first["cached"] is False
+    assert client.extract(deck)["cached"] is True
+
+    make_deck(deck, ["内容を差し替えたスライドの本文", "新規顧客の獲得"])
+    changed = client.extract(deck)
+    assert changed["cached"] is False
+    assert "内容を差し替えたスライドの本文" in _texts(changed)
+
+
+def test_extract_writes_output(client, deck, tmp_path):
+    out = tmp_path / "out.json"
+    result = client.extract(deck, output=str(out), format="json")
+    assert result["output"] == str(out)
+    assert "items" not in result
+    assert out.exists()
+
+
+def test_preview_and_update(client, deck, tmp_path):
+    body = next(item for item in client.extract(deck)["items"] if item["text"] == "売上は前年比で増加")
+    updates = [{"slide": body["slide"], "id": body["id"], "text": "売上は前年比で減少"}]
+
+    preview = client.preview(deck, updates=updates)
+    assert preview["changes"] == 1
+    assert "売上は前年比で増加" in _texts(client.extract(deck))  # プレビューは元のファイルを変えない
+
+    out = str(tmp_path / "updated.pptx")
+    result = client.update(deck, updates=updates, output=out)
+    assert result["updated"] == 1
+    assert "売上は前年比で減少" in _texts(client.extract(out))
+
+
+def test_compare(client, deck, tmp_path):
+    after = make_deck(str(tmp_path / "after.pptx"), ["売上は前年比で減少", "新規顧客の獲得"])
+    result = client.compare(deck, after, changes_only=True)
+    assert result["changed"] == 1
+    assert [row["status"] for row in result["rows"]] == [core.STATUS_CHANGED]
+
+
+def test_errors_keep_http_status(deck):
+    client = LocalClient(InsightSlidesService(LRUCache(), license_manager=_License(compare=False)))
+    with pytest.raises(ServiceError) as missing:
+        client.call("extract")
+    assert missing.value.status == 400
+    with pytest.raises(ServiceError) as forbidden:
+        client.compare(deck, deck)
+    assert forbidden.value.status == 403
+    with pytest.raises(ServiceError) as unknown:
+        client.call("unknown")
+    assert unknown.value.status == 404
+
+
+def test_health_counts_requests(client, deck):
+    client.extract(deck)
+    client.extract(deck)
+    health = client.health()
+    assert health["requests"] == 3
+    assert health["cache"]["hits"] >= 1
+
+
+def test_cached_presentation_is_used_by_one_thread_at_a_time(deck):
+    service = InsightSlidesService(LRUCache(), license_manager=_License())
+    client = LocalClient(service)
+    body = next(item for item in client.extract(deck)["items"] if item["text"] == "売上は前年比で増加")
+    updates = [{"slide": body["slide"], "id": body["id"], "text": "売上は前年比で減少"}]
+    results = []
+    with service._presentation(deck):
+        worker = threading.Thread(target=lambda: results.append(client.preview(deck, updates=updates)))
+        worker.start()
+        worker.join(0.3)
+        assert worker.is_alive()          # 使用中の Presentation のロックを待つ
+    worker.join(10)
+    assert results and results[0]["changes"] == 1
+
+
+def test_create_server_rejects_non_loopback_host():
+    with pytest.raises(ValueError):
+        create_server("0.0.0.0", 0, service=InsightSlidesService(LRUCache(), license_manager=_License()))
+
+
+@pytest.fixture
+def server():
+    server = create_server("127.0.0.1", 0, workers=2,
+                           service=InsightSlidesService(LRUCache(), license_manager=_License()))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+    thread.join(5)
+
+
+def _post(server, path, body, **headers):
+    host, port = server.server_address[:2]
+    conn = http.client.HTTPConnection(host, port, timeout=10)
+    try:
+        conn.request("POST", path, body=body, headers=headers)
+        res = conn.getresponse()
+        return res.status, json.loads(res.read())
+    finally:
+        conn.close()
+
+
+def test_http_client_round_trip(server, deck):
+    result = ServiceClient(server.url).extract(deck)
+    assert "売上は前年比で増加" in _texts(result)
+
+
+def test_http_rejects_cross_site_requests(server, deck):
+    body = json.dumps({"path": deck})
+    assert _post(server, "/extract", body, **{"Content-Type": "text/plain"})[0] == 415
+    assert _post(server, "/extract", body, **{"Content-Type": "application/json", "Host": "evil.example:8765"})[0] == 403
+    assert _post(server, "/extract", body, **{"Content-Type": "application/json",
+                                              "Origin": "http://evil.example"})[0] == 403
+    assert _post(server, "/shutdown", "{}", **{"Content-Type": "text/plain"})[0] == 415
+    status, result = _post(server, "/extract", body, **{"Content-Type": "application/json; charset=utf-8",
+                                                        "Origin": "http://127.0.0.1:8765"})
+    assert status == 200 and result["count"] > 0
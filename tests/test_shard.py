@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+"""作業フォルダを共有する複数プロセスでのフォルダ一括抽出（insightslides_shard）のテスト"""
+import functools
+import json
+import multiprocessing
+import os
+import time
+
+from conftest import make_deck
+
+import insightslides_batch as batch
+import insightslides_shard as shard
+
+FILES = 6
+
+
+def _slow_extract(task):
+    """ノードが交互にロックを取れるよう、1件ごとに少し待ってから抽出する"""
+    time.sleep(0.2)
+    return batch._extract_file(task)
+
+
+def _items(folder):
+    return functools.partial(batch.extract_items, folder, "json", False, "ノート", None)
+
+
+def _node(folder, shard_dir, node, start, out):
+    """1ノード分（別プロセス）: 揃って始め、このノードが処理したファイルと全体の件数を返す"""
+    start.wait()
+    results, processed = shard.run_distributed(_items(folder), _slow_extract, shard_dir, jobs=1,
+                                               lease=30, poll=0.05, node=node)
+    out.put((node, [r["file"] for r in processed], len(results)))
+
+
+def _corpus(folder, count=FILES):
+    os.makedirs(folder, exist_ok=True)
+    return [make_deck(os.path.join(folder, f"deck_{i}.pptx"), [f"本文{i}"]) for i in range(count)]
+
+
+def test_nodes_share_work_and_process_each_file_once(tmp_path):
+    folder = str(tmp_path / "decks")
+    _corpus(folder)
+    shard_dir = str(tmp_path / "shard")
+    ctx = multiprocessing.get_context("spawn")
+    start, out = ctx.Event(), ctx.Queue()
+    nodes = [ctx.Process(target=_node, args=(folder, shard_dir, f"node{i}", start, out)) for i in range(3)]
+    for proc in nodes:
+        proc.start()
+    start.set()
+    reports = [out.get(timeout=120) for _ in nodes]
+    for proc in nodes:
+        proc.join(30)
+        assert proc.exitcode == 0
+
+    processed = [file for _, files, _ in reports for file in files]
+    assert sorted(processed) == sorted(f"deck_{i}.pptx" for i in range(FILES))
+    assert all(total == FILES for _, _, total in reports)
+    assert sum(1 for _, files, _ in reports if files) >= 2
+
+    with open(os.path.join(shard_dir, "summary.json"), encoding="utf-8") as f:
+        summary = json.load(f)
+    assert summary["nodes"] == {node: len(files) for node, files, _ in reports if files}
+    assert os.listdir(os.path.join(shard_dir, "locks")) == []
+    assert all(os.path.exists(os.path.join(folder, f"deck_{i}_抽出.json")) for i in range(FILES))
+
+
+def test_stale_lock_is_taken_over_after_lease(tmp_path):
+    folder = str(tmp_path / "decks")
+    _corpus(folder, count=1)
+    shard_dir = str(tmp_path / "shard")
+    lease = 0.5
+    work = shard.WorkQueue(shard_dir, lease)
+    assert work.claim("deck_0.pptx", "crashed")           # 異常終了して更新されないロック
+    assert not work.claim("deck_0.pptx", "other")         # リース中は取れない
+
+    started = time.monotonic()
+    results, processed = shard.run_distributed(_items(folder), batch._extract_file, shard_dir, jobs=1,
+                                               lease=lease, poll=0.05, node="alive")
+    assert time.monotonic() - started >= lease * 0.8      # リースが切れるまで待ってから引き継ぐ
+    assert [(r["file"], r["node"], r["status"]) for r in processed] == [("deck_0.pptx", "alive", batch.RESULT_OK)]
+    assert [r["file"] for r in results] == ["deck_0.pptx"]
+    assert not os.path.exists(work.lock_path("deck_0.pptx"))